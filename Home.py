@@ -3,11 +3,16 @@ import sys
 import os
 import streamlit as st
 import config
-from persistencia import auth, database, logger
-from persistencia.unit_of_work import UnitOfWork
+from persistencia import auth, config_banco, logger, metricas_sql, perfilador, sessao
+from components import aquecimento, servicos_gerenciador as servico
 from sqlalchemy import text
+from utils.st_utils import painel_perfil, perfil_rerun_ligado
 import logging
 
+PARAM_SESSAO = 'sessao'
+# Todo log deste rerun (banco, IA, páginas) sai com o mesmo correlacao_id.
+logger.iniciar_rerun()
+
 def validar_configuracoes():
 
     if config.INITIALIZE_DATABASE_ON_STARTUP and (not config.DATABASE_ENABLED):
@@ -17,24 +22,29 @@ def validar_configuracoes():
         st.warning('\n            **Problema Detectado:**\n            - `INITIALIZE_DATABASE_ON_STARTUP` está definido como `True`.\n            - `DATABASE_ENABLED` está definido como `False`.\n\n            **Motivo:** O sistema não pode criar as tabelas do banco de dados (schema)\n            se o acesso ao banco de dados como um todo está desativado.\n            ')
         st.info('**Solução:** Altere seu arquivo `config.py` para uma das opções abaixo e reinicie o servidor:\n1. Habilite o banco de dados: `DATABASE_ENABLED = True`\n2. Desabilite a inicialização automática: `INITIALIZE_DATABASE_ON_STARTUP = False`')
         st.stop()
+    if config.DATABASE_ENABLED:
+        # Lido uma vez por processo (cache); nas demais execuções não custa nada.
+        try:
+            config_banco.config_banco()
+        except (FileNotFoundError, ValueError) as e:
+            st.set_page_config(page_title='Erro de Configuração', layout='centered')
+            st.title('❌ Erro de Configuração Inválida')
+            st.error(f'banco.ini inválido: {e}')
+            st.info('Corrija o arquivo (ou as variáveis BANCO_*) e confira com `python -m persistencia.config_banco --check`.')
+            st.stop()
 validar_configuracoes()
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 st.set_page_config(page_title='Pré-Moldados Garantia Eterna', layout='wide')
-if 'logger_setup' not in st.session_state:
-    logger.setup_loggers()
-    st.session_state.logger_setup = True
-if 'db_initialized' not in st.session_state and config.DATABASE_ENABLED:
-    if config.INITIALIZE_DATABASE_ON_STARTUP:
-        try:
-            database.DatabaseManager.initialize_database()
-            st.session_state.db_initialized = True
-        except Exception as e:
-            st.error(f'Falha crítica na inicialização do banco de dados: {e}')
-            st.stop()
-    else:
-        st.session_state.db_initialized = True
+logger.setup_loggers_uma_vez()
+# Uma vez por processo: engine, schema, pool e caches. Nas demais sessões só retorna o estado.
+try:
+    aquecimento.aquecer()
+except Exception as e:
+    st.error(f'Falha crítica na inicialização do banco de dados: {e}')
+    st.stop()
 if 'user_info' not in st.session_state:
-    st.session_state.user_info = None
+    # Recarregar a página cria uma sessão nova: tenta restaurar pelo token da URL, sem consultar o banco.
+    st.session_state.user_info = sessao.restaurar_sessao(st.query_params.get(PARAM_SESSAO)) if config.DATABASE_ENABLED else None
 if 'login_attempts' not in st.session_state:
     st.session_state.login_attempts = 0
 
@@ -56,11 +66,16 @@ def login_dialog():
             if not config.DATABASE_ENABLED:
                 st.error('O sistema de login está desabilitado pois o banco de dados não está ativo.')
                 return
-            user_data = auth.verify_user_credentials(username, password)
-            if user_data == 'connection_error':
+            user_data = auth.verify_user_credentials(username, password, ip=st.context.ip_address)
+            if user_data == auth.CONNECTION_ERROR:
                 st.error('Falha na conexão com o banco de dados.')
+            elif user_data == auth.THROTTLED:
+                st.error('Muitas tentativas de login. Aguarde um minuto e tente novamente.')
+            elif user_data == auth.BUSY:
+                st.warning('Servidor ocupado validando outros logins. Tente novamente em instantes.')
             elif user_data:
                 st.session_state.user_info = user_data
+                st.query_params[PARAM_SESSAO] = sessao.emitir_token(user_data)
                 st.session_state.login_attempts = 0
                 st.rerun()
             else:
@@ -74,17 +89,14 @@ def login_dialog():
 
 def get_allowed_pages_for_user(profile_name: str) -> list:
     try:
-        with UnitOfWork() as uow:
-            df = uow.paginas.get_allowed_pages_for_profile(profile_name)
+        paginas = servico.get_allowed_pages_for_profile(profile_name)
     except Exception as e:
         logging.error(f'Erro ao carregar páginas permitidas: {e}')
         return []
     page_list = []
     is_first_page = True
-    for _, row in df.iterrows():
+    for filename, friendly_name in paginas:
         try:
-            filename = row['nome_arquivo']
-            friendly_name = row['nome_amigavel']
             parts = filename.split('_')
             icon = parts[1] if len(parts) > 1 else '📄'
             page_list.append(st.Page(f'app_pages/{filename}', title=friendly_name, icon=icon, default=is_first_page))
@@ -104,5 +116,19 @@ else:
     if not allowed_pages:
         st.error('Erro: Seu perfil não tem permissão para ver nenhuma página.')
         st.stop()
+    if PARAM_SESSAO not in st.query_params:
+        # A troca de página limpa a URL; o token é regravado para sobreviver a um recarregamento.
+        st.query_params[PARAM_SESSAO] = sessao.emitir_token(st.session_state.user_info)
     navigation = st.navigation(allowed_pages)
-    navigation.run()
\ No newline at end of file
+    metricas_sql.definir_pagina(navigation.title)
+    perfil = None
+    if perfil_rerun_ligado():
+        perfil = perfilador.iniciar(navigation.title, st.session_state.user_info.get('username'), config.PERFIL_DETALHADO)
+    try:
+        navigation.run()
+    finally:
+        if perfil is not None:
+            painel_perfil(perfilador.finalizar(perfil))
+        # decorrido_ms deste registro é o tempo total do rerun.
+        logging.getLogger('rerun').debug('Página %s renderizada.', navigation.title,
+                                         extra={'pagina': navigation.title, 'usuario': (st.session_state.get('user_info') or {}).get('username')})
\ No newline at end of file
@@ -9,6 +9,7 @@ from pathlib import Path
 from persistencia.unit_of_work import UnitOfWork
 from utils.st_utils import st_check_session, check_access
 from components import servicos_gerenciador as servico
+from components.previsao_estoque import get_projecao_estoque
 import config
 
 st.set_page_config(page_title="Fábrica Dashboard", layout="wide", page_icon="🏭")
@@ -32,6 +33,8 @@ st.title("🏭 Dashboard da Fábrica de Pré-Moldados")
 st.markdown("Visão geral da produção, estoque e pedidos em andamento.")
 st.markdown("---")
 
+HORIZONTE_PROJECAO_DIAS = 30
+
 # ── Carregar dados ───────────────────────────────────────────
 try:
     with UnitOfWork() as uow:
@@ -99,57 +102,63 @@ with col_alerts:
     else:
         st.success("✅ Todos os materiais com estoque adequado (> 1.000 kg).")
 
+    st.subheader(f"📉 Projeção de Ruptura ({HORIZONTE_PROJECAO_DIAS} dias)")
+    try:
+        df_projecao = get_projecao_estoque(HORIZONTE_PROJECAO_DIAS)
+        df_ruptura = df_projecao[df_projecao["dias_ate_ruptura"].notna()]
+        if not df_ruptura.empty:
+            for _, row in df_ruptura.iterrows():
+                st.error(
+                    f"⛔ **{row['tipo']}**: estoque se esgota em **{int(row['dias_ate_ruptura'])} dia(s)** "
+                    f"({row['data_ruptura']:%d/%m/%Y}) — pedidos abertos: {row['demanda_comprometida']:,.0f} kg, "
+                    f"consumo médio: {row['consumo_semanal']:,.0f} kg/semana"
+                )
+        else:
+            st.success("✅ Nenhuma ruptura prevista no horizonte considerando pedidos abertos e consumo histórico.")
+    except Exception as e:
+        log.error(f"Erro ao calcular projeção de estoque: {e}", exc_info=True)
+        st.caption(f"Projeção de estoque indisponível: {e}")
+
 # ── Gráfico de Volume de Produção ao Longo do Tempo ─────────
 st.markdown("---")
 st.subheader("📈 Tendência de Produção")
 
 try:
     with UnitOfWork() as uow:
-        df_timeline = uow.fabrica.get_all_pedidos()
-
-    if not df_timeline.empty and "data_pedido" in df_timeline.columns:
-        df_timeline["data_pedido"] = pd.to_datetime(df_timeline["data_pedido"], errors="coerce")
-        df_timeline = df_timeline.dropna(subset=["data_pedido"])
-
-        if not df_timeline.empty:
-            df_timeline["semana"] = df_timeline["data_pedido"].dt.to_period("W").apply(lambda r: r.start_time)
-            df_semanal = df_timeline.groupby("semana").agg(
-                pedidos=("id", "count"),
-                volume=("volume_total_m3", "sum"),
-            ).reset_index()
-            df_semanal["semana"] = pd.to_datetime(df_semanal["semana"])
-
-            import plotly.graph_objects as go
-            fig2 = go.Figure()
-            fig2.add_trace(go.Scatter(
-                x=df_semanal["semana"],
-                y=df_semanal["volume"],
-                mode="lines+markers",
-                name="Volume (m³)",
-                line=dict(color="#42A5F5", width=3),
-                fill="tozeroy",
-                fillcolor="rgba(66, 165, 245, 0.1)",
-            ))
-            fig2.add_trace(go.Bar(
-                x=df_semanal["semana"],
-                y=df_semanal["pedidos"],
-                name="Pedidos",
-                marker_color="rgba(255, 167, 38, 0.6)",
-                yaxis="y2",
-            ))
-            fig2.update_layout(
-                xaxis_title="Semana",
-                yaxis_title="Volume (m³)",
-                yaxis2=dict(title="Nº Pedidos", overlaying="y", side="right"),
-                legend=dict(orientation="h", yanchor="bottom", y=1.02),
-                plot_bgcolor="rgba(0,0,0,0)",
-                paper_bgcolor="rgba(0,0,0,0)",
-                margin=dict(l=20, r=20, t=30, b=20),
-                height=350,
-            )
-            st.plotly_chart(fig2, use_container_width=True)
-        else:
-            st.info("Sem dados suficientes para gráfico de tendência.")
+        df_semanal = uow.fabrica.get_tendencia_semanal()
+
+    if not df_semanal.empty:
+        df_semanal["semana"] = pd.to_datetime(df_semanal["semana"])
+
+        import plotly.graph_objects as go
+        fig2 = go.Figure()
+        fig2.add_trace(go.Scatter(
+            x=df_semanal["semana"],
+            y=df_semanal["volume"],
+            mode="lines+markers",
+            name="Volume (m³)",
+            line=dict(color="#42A5F5", width=3),
+            fill="tozeroy",
+            fillcolor="rgba(66, 165, 245, 0.1)",
+        ))
+        fig2.add_trace(go.Bar(
+            x=df_semanal["semana"],
+            y=df_semanal["pedidos"],
+            name="Pedidos",
+            marker_color="rgba(255, 167, 38, 0.6)",
+            yaxis="y2",
+        ))
+        fig2.update_layout(
+            xaxis_title="Semana",
+            yaxis_title="Volume (m³)",
+            yaxis2=dict(title="Nº Pedidos", overlaying="y", side="right"),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02),
+            plot_bgcolor="rgba(0,0,0,0)",
+            paper_bgcolor="rgba(0,0,0,0)",
+            margin=dict(l=20, r=20, t=30, b=20),
+            height=350,
+        )
+        st.plotly_chart(fig2, use_container_width=True)
     else:
         st.info("Sem pedidos para exibir tendência.")
 except Exception as e:
@@ -12,7 +12,7 @@ from persistencia.unit_of_work import UnitOfWork
 from utils.st_utils import st_check_session, check_access
 from components.ai_concreto import sugerir_traco
 from components import servicos_gerenciador as servico
-from utils.traco_utils import formatar_traco_legivel, formatar_traco_detalhado
+from utils.traco_utils import formatar_traco_detalhado, formatar_traco_legivel_series
 import config
 
 log = logging.getLogger(__name__)
@@ -62,10 +62,11 @@ with st.container(border=True):
     cliente_id = clientes_opcoes[cliente_nome]
 
     # Elemento
-    elementos_opcoes = {
-        f"{row['nome']} (FCK {row['fck_necessario']:.0f} MPa)": row["id"]
-        for _, row in df_elementos.iterrows()
-    }
+    elementos_labels = (
+        df_elementos["nome"] + " (FCK "
+        + df_elementos["fck_necessario"].round().astype(int).astype(str) + " MPa)"
+    )
+    elementos_opcoes = dict(zip(elementos_labels, df_elementos["id"]))
     elemento_label = col2.selectbox("🧱 Elemento Pré-Moldado", options=list(elementos_opcoes.keys()))
     elemento_id = elementos_opcoes[elemento_label]
 
@@ -81,10 +82,10 @@ with st.container(border=True):
     )
 
     # Traço
-    tracos_opcoes = {
-        f"{row['nome']} ({formatar_traco_legivel(row['traco_str'])})": row["id"]
-        for _, row in df_tracos.iterrows()
-    }
+    tracos_opcoes = dict(zip(
+        df_tracos["nome"] + " (" + formatar_traco_legivel_series(df_tracos["traco_str"]) + ")",
+        df_tracos["id"],
+    ))
     tracos_labels = list(tracos_opcoes.keys())
     tracos_ids = list(tracos_opcoes.values())
 
@@ -5,10 +5,11 @@ import streamlit as st
 import pandas as pd
 import time
 from pathlib import Path
+from persistencia import perfilador
 from persistencia.unit_of_work import UnitOfWork
 from utils.st_utils import st_check_session, check_access
 from components import servicos_gerenciador as servico
-from utils.traco_utils import formatar_traco_legivel
+from utils.traco_utils import ADITIVO_PCT_PADRAO, Traco, formatar_traco_legivel
 import config
 
 st.set_page_config(page_title="Controle de Produção", layout="wide", page_icon="🏭")
@@ -27,23 +28,6 @@ if not config.DATABASE_ENABLED:
     st.warning("Banco de dados desabilitado.")
     st.stop()
 
-# ── Helper: Parse do Traço ───────────────────────────────────
-def parse_traco_str(traco_str: str) -> dict:
-    """Retorna proporções {areia: float, brita: float} a partir da string '1 : X : Y : Z'."""
-    try:
-        # Ex: "1 : 2.2 : 3.1 : 0.5 a/c"
-        clean = traco_str.replace("a/c", "").replace(" ", "")
-        parts = clean.split(":")
-        if len(parts) >= 3:
-            return {
-                "areia": float(parts[1]),
-                "brita": float(parts[2]),
-                "agua": float(parts[3]) if len(parts) > 3 else 0.5
-            }
-    except:
-        pass
-    return {"areia": 2.0, "brita": 3.0, "agua": 0.5} # Fallback
-
 # ── Título ───────────────────────────────────────────────────
 st.title("🏭 Controle de Produção")
 st.markdown("Gerencie o status dos pedidos e realize a baixa de materiais.")
@@ -62,7 +46,7 @@ if df_pedidos.empty:
 tab1, tab2, tab3 = st.tabs(["⏳ Pendentes", "⚙️ Em Produção", "✅ Concluídos"])
 
 # ── ABA: PENDENTES ───────────────────────────────────────────
-with tab1:
+with tab1, perfilador.medir("render", "aba Pendentes"):
     pendentes = df_pedidos[df_pedidos["status"] == "Pendente"]
     if pendentes.empty:
         st.write("Sem pedidos pendentes.")
@@ -82,7 +66,7 @@ with tab1:
                     st.rerun()
 
 # ── ABA: EM PRODUÇÃO ─────────────────────────────────────────
-with tab2:
+with tab2, perfilador.medir("render", "aba Em Produção"):
     em_producao = df_pedidos[df_pedidos["status"] == "Em Produção"]
     if em_producao.empty:
         st.write("Nenhum pedido em produção no momento.")
@@ -91,19 +75,21 @@ with tab2:
             with st.expander(f"⚙️ Pedido #{row['id']} - {row['cliente']} ({row['elemento']})", expanded=True):
                 # Detalhes do cálculo
                 vol_total = row['volume_total_m3']
-                traco_str = row['traco_str'] if row['traco_str'] else "1:2:3"
+                traco = Traco.from_row(row)
                 consumo_cimento_unit = row['consumo_cimento_m3'] if pd.notna(row['consumo_cimento_m3']) else 300.0
                 
-                # Parse
-                props = parse_traco_str(traco_str)
-                
                 # Totais Teóricos
                 kg_cimento = round(consumo_cimento_unit * vol_total, 1)
-                kg_areia = round(kg_cimento * props["areia"], 1)
-                kg_brita = round(kg_cimento * props["brita"], 1)
-                kg_aditivo = round(kg_cimento * 0.005, 2) # Est. 0.5%
-                
-                st.info(f"**Traço:** {formatar_traco_legivel(traco_str)}  ·  Subtotal Previsto: {vol_total} m³ de Concreto")
+                if traco is not None:
+                    consumo = traco.consumo_kg(kg_cimento)
+                    kg_areia = round(consumo["areia"], 1)
+                    kg_brita = round(consumo["brita"], 1)
+                    kg_aditivo = round(consumo["aditivo"], 2)
+                    st.info(f"**Traço:** {formatar_traco_legivel(traco)}  ·  Subtotal Previsto: {vol_total} m³ de Concreto")
+                else:
+                    kg_areia = kg_brita = 0.0
+                    kg_aditivo = round(kg_cimento * ADITIVO_PCT_PADRAO / 100, 2)
+                    st.warning(f"Pedido sem traço com proporções definidas: apenas o cimento pode ser estimado.  ·  Subtotal Previsto: {vol_total} m³ de Concreto")
                 
                 # Form para Baixa
                 c1, c2 = st.columns(2)
@@ -156,7 +142,7 @@ with tab2:
                         st.error(f"Erro ao processar: {e}")
 
 # ── ABA: CONCLUÍDOS ──────────────────────────────────────────
-with tab3:
+with tab3, perfilador.medir("render", "aba Concluídos"):
     concluidos = df_pedidos[df_pedidos["status"] == "Concluído"]
     if concluidos.empty:
         st.write("Histórico vazio.")
@@ -10,6 +10,7 @@ from pathlib import Path
 from persistencia.unit_of_work import UnitOfWork
 from utils.st_utils import st_check_session, check_access
 from components import servicos_gerenciador as servico
+from components import importacao_materiais
 import config
 
 st.set_page_config(page_title="Gestão de Materiais", layout="wide", page_icon="📦")
@@ -76,6 +77,60 @@ if c2.button("➕ Novo Material", width="stretch"):
 
 df_mat = get_materiais()
 
+# ── Importar lista de preços ─────────────────────────────────
+with st.expander("📥 Importar lista de preços / estoque (CSV ou XLSX)"):
+    st.caption(
+        "Colunas: **nome** (ou material), **tipo**, **custo_kg** (ou preço) e **estoque_atual** (ou estoque). "
+        "Os materiais são encontrados pelo nome; colunas ausentes mantêm o valor atual. "
+        "Materiais novos precisam de tipo e custo."
+    )
+    formatos = ["csv", "xlsx"] if importacao_materiais.xlsx_disponivel() else ["csv"]
+    arquivo = st.file_uploader("Planilha do fornecedor", type=formatos, key="mat_import_file")
+    if arquivo is not None:
+        try:
+            planilha = importacao_materiais.ler_planilha(arquivo, arquivo.name)
+            diff = importacao_materiais.get_diff(planilha)
+        except ValueError as e:
+            st.error(str(e))
+            diff = None
+        if diff is not None:
+            contagem = importacao_materiais.resumo(diff)
+            a_gravar = sum(contagem.get(a, 0) for a in importacao_materiais.ACOES_GRAVADAS)
+            k1, k2, k3, k4 = st.columns(4)
+            k1.metric("✏️ Atualizar", contagem.get(importacao_materiais.ATUALIZAR, 0))
+            k2.metric("🆕 Novos", contagem.get(importacao_materiais.NOVO, 0))
+            k3.metric("➖ Sem mudança", contagem.get(importacao_materiais.SEM_MUDANCA, 0))
+            k4.metric("⚠️ Ignorados", len(diff) - a_gravar - contagem.get(importacao_materiais.SEM_MUDANCA, 0))
+            so_mudancas = st.toggle("Mostrar só o que muda ou tem problema", value=True, key="mat_import_filtro")
+            exibir = diff[diff["acao"] != importacao_materiais.SEM_MUDANCA] if so_mudancas else diff
+            st.dataframe(
+                exibir.reset_index(),
+                width="stretch",
+                hide_index=True,
+                column_config={
+                    "linha": "Linha",
+                    "nome": "Nome (planilha)",
+                    "id": None,
+                    "nome_atual": "Material",
+                    "tipo_novo": "Tipo",
+                    "custo_atual": st.column_config.NumberColumn("Custo atual", format="R$ %.3f"),
+                    "custo_novo": st.column_config.NumberColumn("Custo novo", format="R$ %.3f"),
+                    "variacao_pct": st.column_config.NumberColumn("Variação", format="%+.1f%%"),
+                    "estoque_anterior": st.column_config.NumberColumn("Estoque atual (kg)", format="%.1f"),
+                    "estoque_novo": st.column_config.NumberColumn("Estoque novo (kg)", format="%.1f"),
+                    "acao": "Ação",
+                },
+            )
+            if st.button(f"✅ Aplicar {a_gravar} alteração(ões)", type="primary", disabled=not a_gravar):
+                try:
+                    gravados = importacao_materiais.aplicar(diff, origem=f"importação: {arquivo.name}")
+                    st.toast(f"{gravados} material(is) atualizado(s)!", icon="✅")
+                    time.sleep(1)
+                    st.rerun()
+                except Exception as e:
+                    log.error(f"Erro ao aplicar lista de preços: {e}")
+                    st.error(f"Nada foi gravado. Erro técnico: {e}")
+
 # ── Formulário (Criar / Editar) ──────────────────────────────
 TIPOS_MATERIAL = ["Cimento", "Areia", "Brita", "Aditivo", "Água"]
 
@@ -165,6 +220,23 @@ if st.session_state.mat_show_form:
                 st.session_state.mat_feedback = None
                 st.rerun()
 
+        if item:
+            with UnitOfWork() as uow:
+                df_hist = uow.fabrica.get_historico_precos(int(item["id"]))
+            if len(df_hist) > 1:
+                with st.expander(f"📈 Histórico de preços ({len(df_hist)} registros)"):
+                    st.dataframe(
+                        df_hist.iloc[::-1],
+                        hide_index=True,
+                        width="stretch",
+                        column_config={
+                            "custo_kg": st.column_config.NumberColumn("Custo/kg (R$)", format="R$ %.3f"),
+                            "vigente_desde": "Desde",
+                            "vigente_ate": "Até",
+                            "origem": "Origem",
+                        },
+                    )
+
 # ── Tabela de Materiais ──────────────────────────────────────
 if not df_mat.empty:
     st.subheader("📋 Materiais Cadastrados")
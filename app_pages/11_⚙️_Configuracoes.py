@@ -14,6 +14,7 @@ from persistencia.auth import hash_password
 from persistencia.unit_of_work import UnitOfWork
 from utils.st_utils import st_check_session, check_access
 from components import servicos_gerenciador as servico
+from components import importacao_usuarios
 
 st.set_page_config(page_title="Configurações do Sistema", layout="wide", page_icon="⚙️")
 log = logging.getLogger(__name__)
@@ -61,8 +62,8 @@ tab_users, tab_perms, tab_pages, tab_theme = st.tabs([
 with tab_users:
     from streamlit_option_menu import option_menu
     selected_sub = option_menu(
-        None, options=["Gerenciar Usuários", "Gerenciar Perfis de Acesso"],
-        icons=["person-fill-gear", "shield-lock-fill"], orientation="horizontal"
+        None, options=["Gerenciar Usuários", "Gerenciar Perfis de Acesso", "Importar / Exportar"],
+        icons=["person-fill-gear", "shield-lock-fill", "file-earmark-arrow-up"], orientation="horizontal"
     )
 
     if selected_sub == "Gerenciar Usuários":
@@ -218,6 +219,47 @@ with tab_users:
                 st.session_state.feedback_msg = None
                 st.rerun()
 
+    elif selected_sub == "Importar / Exportar":
+        st.caption("Planilha (CSV ou XLSX) com as colunas **login_usuario**, **nome_completo**, "
+                   "**perfil** (nome do perfil de acesso) e **senha**.")
+        formatos = ["csv", "xlsx"] if importacao_usuarios.xlsx_disponivel() else ["csv"]
+        c_imp, c_exp = st.columns([3, 1])
+        with c_exp:
+            st.markdown("**📤 Exportar**")
+            formato = st.radio("Formato", formatos, horizontal=True, key="user_export_fmt")
+            st.download_button(
+                "📥 Baixar usuários",
+                importacao_usuarios.para_arquivo(importacao_usuarios.exportar(), formato),
+                file_name=f"usuarios.{formato}", width="stretch",
+            )
+            st.caption("As senhas não são exportadas.")
+        with c_imp:
+            st.markdown("**📥 Importar**")
+            arquivo = st.file_uploader("Planilha de usuários", type=formatos, key="user_import_file")
+            senha_padrao = st.text_input("Senha padrão (linhas sem senha)", type="password", key="user_import_senha")
+            if arquivo is not None:
+                try:
+                    df_import = importacao_usuarios.ler_planilha(arquivo, arquivo.name)
+                except ValueError as e:
+                    st.error(str(e))
+                    df_import = None
+                if df_import is not None:
+                    st.write(f"{len(df_import)} linha(s) na planilha.")
+                    if st.button("🚀 Importar usuários", type="primary"):
+                        try:
+                            with st.spinner("Criptografando senhas e gravando..."):
+                                res = importacao_usuarios.importar(df_import, senha_padrao)
+                            st.success(f"{res['importados']} usuário(s) importado(s) "
+                                       f"(hash {res['hash_ms'] / 1000:.1f} s, gravação {res['gravacao_ms']:.0f} ms).")
+                            if not res["erros"].empty:
+                                st.warning(f"{len(res['erros'])} linha(s) ignorada(s):")
+                                st.dataframe(res["erros"], hide_index=True, width="stretch",
+                                             column_config={"linha": "Linha", "login_usuario": "Login", "motivo": "Motivo"})
+                        except Exception as e:
+                            log.error("Falha na importação de usuários: %s", e, exc_info=True)
+                            msg = "Login já existe." if "unique" in str(e).lower() else f"Erro: {e}"
+                            st.error(f"Nada foi importado. {msg}")
+
 # ═══════════════════════════════════════════════════════════════
 # ABA 2: PERMISSÕES
 # ═══════════════════════════════════════════════════════════════
@@ -226,21 +268,25 @@ with tab_perms:
         with UnitOfWork() as uow:
             df_p = uow.permissoes.get_all_pages()
             df_pr = uow.permissoes.get_all_profiles()
-            mapa = uow.permissoes.get_permissions_map()
-        return df_p, df_pr, mapa
+            df_perm = uow.permissoes.get_permissoes()
+        return df_p, df_pr, df_perm
 
-    def build_matrix(df_pag, df_perf, mapa):
-        m = df_pag[["pagina_id", "nome_amigavel"]].copy()
-        m = m.rename(columns={"nome_amigavel": "Página"})
-        for _, p in df_perf.iterrows():
-            m[p["nome_perfil"]] = m["pagina_id"].apply(lambda pid: p["perfil_id"] in mapa.get(pid, []))
-        return m
+    def build_matrix(df_pag, df_perf, df_perm):
+        """Páginas × perfis (True = concedida) por tabela cruzada, sem laço por perfil."""
+        concedidas = df_perm.merge(df_perf[["perfil_id", "nome_perfil"]], on="perfil_id")
+        if concedidas.empty:
+            tem = pd.DataFrame(False, index=df_pag["pagina_id"], columns=df_perf["nome_perfil"])
+        else:
+            tem = pd.crosstab(concedidas["pagina_id"], concedidas["nome_perfil"]).gt(0)
+            tem = tem.reindex(index=df_pag["pagina_id"], columns=df_perf["nome_perfil"], fill_value=False)
+        m = df_pag[["pagina_id", "nome_amigavel"]].rename(columns={"nome_amigavel": "Página"}).reset_index(drop=True)
+        return pd.concat([m, tem.reset_index(drop=True).astype(bool)], axis=1)
 
-    df_pags, df_perfs, mapa_perms = load_perm_data()
+    df_pags, df_perfs, df_perms = load_perm_data()
     if df_pags.empty:
         st.error("Tabela de páginas vazia.")
     else:
-        matrix = build_matrix(df_pags, df_perfs, mapa_perms)
+        matrix = build_matrix(df_pags, df_perfs, df_perms)
         st.info("O perfil **Administrador Global** sempre tem acesso a tudo.", icon="ℹ️")
         with st.form("matrix_form"):
             st.markdown("Marque as caixas para conceder permissão.")
@@ -258,9 +304,12 @@ with tab_perms:
                     granted["perfil_id"] = granted["nome_perfil"].map(lookup)
                     final = granted[["pagina_id", "perfil_id"]].dropna().astype(int)
                     with UnitOfWork() as uow:
-                        uow.permissoes.salvar_matriz_permissoes(final)
-                    st.balloons()
-                    st.toast("Permissões salvas!", icon="✅")
+                        inseridas, removidas = uow.permissoes.salvar_matriz_permissoes(final)
+                    if not inseridas and not removidas:
+                        st.toast("Nenhuma alteração nas permissões.", icon="ℹ️")
+                    else:
+                        st.balloons()
+                        st.toast(f"Permissões salvas! {inseridas} concedida(s), {removidas} removida(s).", icon="✅")
                     time.sleep(1)
                     st.rerun()
                 except Exception as e:
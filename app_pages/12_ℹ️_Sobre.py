@@ -81,7 +81,7 @@ with st.expander('👥 Perfis de Acesso', expanded=False):
 
     | Perfil | Foco Principal | Páginas com Acesso |
     | :--- | :--- | :--- |
-    | **Administrador** | Acesso total | Todas as 14 páginas do sistema |
+    | **Administrador** | Acesso total | Todas as 15 páginas do sistema |
     | **Engenharia** | Traços e Mock AI | Home, Sobre, AI Traço, Banco de Traços, Catálogo, Calculadora |
     | **Produção** | Estoque e Histórico | Home, Sobre, Dashboard, Calculadora, Histórico |
     | **Comercial** | Pedidos e Clientes | Home, Sobre, Dashboard, Novo Pedido, Catálogo, Clientes |
@@ -0,0 +1,123 @@
+"""
+13_📅_Programacao_Producao.py — Programação da Produção
+Sequencia os pedidos abertos por data de entrega, respeitando a capacidade
+diária da fábrica e o estoque disponível de cada material.
+"""
+import streamlit as st
+import logging
+from datetime import date
+from pathlib import Path
+from persistencia.unit_of_work import UnitOfWork
+from utils.st_utils import st_check_session, check_access
+from components import servicos_gerenciador as servico
+from components.programacao_producao import (
+    SITUACAO_ATRASADO, SITUACAO_SEM_MATERIAL, carga_diaria, get_plano_producao,
+)
+import config
+
+st.set_page_config(page_title="Programação da Produção", layout="wide", page_icon="📅")
+log = logging.getLogger(__name__)
+
+# ── Segurança ────────────────────────────────────────────────
+st_check_session()
+try:
+    allowed_roles = servico.get_allowed_roles_for_page(Path(__file__).name)
+    check_access(allowed_roles)
+except Exception as e:
+    st.error(f"Erro ao verificar permissões: {e}")
+    st.stop()
+
+if not config.DATABASE_ENABLED:
+    st.warning("Funcionalidade indisponível: banco de dados desabilitado.")
+    st.stop()
+
+# ── Título ───────────────────────────────────────────────────
+st.title("📅 Programação da Produção")
+st.markdown("Sequência sugerida dos pedidos abertos por data de entrega, capacidade e estoque.")
+
+# ── Parâmetros ───────────────────────────────────────────────
+c1, c2, c3 = st.columns(3)
+capacidade = c1.number_input(
+    "Capacidade da fábrica (m³/dia)", min_value=0.5, step=0.5,
+    value=float(config.CAPACIDADE_PRODUCAO_M3_DIA),
+)
+inicio = c2.date_input("Início da programação", value=date.today())
+apenas_dias_uteis = c3.checkbox("Somente dias úteis (seg–sex)", value=True)
+
+# ── Plano ────────────────────────────────────────────────────
+try:
+    plano = get_plano_producao(capacidade, inicio, apenas_dias_uteis)
+except Exception as e:
+    log.error(f"Erro ao calcular a programação da produção: {e}")
+    st.error(f"Erro ao calcular a programação: {e}")
+    st.stop()
+
+if plano.empty:
+    st.info("Nenhum pedido pendente ou em produção para programar.")
+    st.stop()
+
+viaveis = plano[plano["situacao"] != SITUACAO_SEM_MATERIAL]
+k1, k2, k3, k4 = st.columns(4)
+k1.metric("📋 Pedidos programados", len(viaveis))
+k2.metric("⚠️ Atrasados", int((plano["situacao"] == SITUACAO_ATRASADO).sum()))
+k3.metric("🚫 Sem material", int((plano["situacao"] == SITUACAO_SEM_MATERIAL).sum()))
+k4.metric("🏁 Fim da carteira", viaveis["data_fim"].max().strftime("%d/%m/%Y") if not viaveis.empty else "—")
+
+st.markdown("---")
+
+col_tabela, col_carga = st.columns([3, 2])
+
+with col_tabela:
+    st.subheader("🗂️ Sequência de Produção")
+    st.dataframe(
+        plano[[
+            "sequencia", "id", "cliente", "elemento", "quantidade", "volume_total_m3",
+            "status", "data_entrega", "data_inicio", "data_fim", "atraso_dias", "situacao",
+        ]],
+        column_config={
+            "sequencia": "Seq.",
+            "id": "Pedido",
+            "cliente": "Cliente",
+            "elemento": "Elemento",
+            "quantidade": "Qtd",
+            "volume_total_m3": st.column_config.NumberColumn("Volume (m³)", format="%.2f"),
+            "status": "Status",
+            "data_entrega": "Entrega",
+            "data_inicio": st.column_config.DateColumn("Início", format="DD/MM/YYYY"),
+            "data_fim": st.column_config.DateColumn("Fim", format="DD/MM/YYYY"),
+            "atraso_dias": "Atraso (dias)",
+            "situacao": "Situação",
+        },
+        hide_index=True,
+        use_container_width=True,
+    )
+
+with col_carga:
+    st.subheader("📊 Carga Diária")
+    df_carga = carga_diaria(plano, capacidade, inicio, apenas_dias_uteis)
+    if df_carga.empty:
+        st.info("Nenhum volume programado.")
+    else:
+        import plotly.express as px
+
+        fig = px.bar(df_carga, x="data", y="volume_m3", labels={"data": "Dia", "volume_m3": "Volume (m³)"})
+        fig.add_hline(y=capacidade, line_dash="dash", line_color="#EF5350", annotation_text="Capacidade")
+        fig.update_layout(height=380, margin=dict(t=20, b=20))
+        st.plotly_chart(fig, use_container_width=True)
+
+# ── Liberar pedidos do dia ───────────────────────────────────
+st.markdown("---")
+a_iniciar = viaveis[(viaveis["status"] == "Pendente") & (viaveis["data_inicio"].dt.date <= inicio)]
+st.subheader("▶️ Liberar para Produção")
+if a_iniciar.empty:
+    st.write("Nenhum pedido pendente programado para iniciar nesta data.")
+else:
+    st.write(f"{len(a_iniciar)} pedido(s) pendente(s) programado(s) para iniciar até {inicio:%d/%m/%Y}.")
+    if st.button("▶️ Iniciar pedidos programados", type="primary"):
+        try:
+            with UnitOfWork() as uow:
+                atualizados = uow.fabrica.update_pedidos_status(a_iniciar["id"].tolist(), "Em Produção")
+            st.toast(f"{atualizados} pedido(s) enviado(s) para produção!", icon="⚙️")
+            st.rerun()
+        except Exception as e:
+            st.error(f"Erro ao iniciar os pedidos: {e}")
@@ -0,0 +1,76 @@
+"""
+14_🩺_Saude_Sistema.py — Saúde do Sistema
+Mostra se o processo já foi aquecido, o tempo de cada etapa do aquecimento,
+o tempo de ida e volta ao banco e as estatísticas do pool de conexões.
+"""
+import streamlit as st
+import pandas as pd
+import logging
+from datetime import datetime
+from pathlib import Path
+from utils.st_utils import st_check_session, check_access
+from components import aquecimento, servicos_gerenciador as servico
+
+st.set_page_config(page_title="Saúde do Sistema", layout="wide", page_icon="🩺")
+log = logging.getLogger(__name__)
+
+# ── Segurança ────────────────────────────────────────────────
+st_check_session()
+try:
+    allowed_roles = servico.get_allowed_roles_for_page(Path(__file__).name)
+    check_access(allowed_roles)
+except Exception as e:
+    st.error(f"Erro ao verificar permissões: {e}")
+    st.stop()
+
+# ── Título ───────────────────────────────────────────────────
+st.title("🩺 Saúde do Sistema")
+st.markdown("Prontidão do servidor antes de liberar o chão de fábrica.")
+if st.button("🔄 Medir novamente"):
+    st.rerun()
+
+dados = aquecimento.saude()
+
+k1, k2, k3 = st.columns(3)
+k1.metric("🔥 Aquecido", "Sim" if dados["aquecido"] else "Não")
+k2.metric("🗄️ Banco", "OK" if dados["banco_ok"] else "Falha")
+k3.metric("⏱️ Ida e volta (SELECT 1)", f"{dados['ida_e_volta_ms']:.2f} ms" if "ida_e_volta_ms" in dados else "—")
+if dados.get("erro"):
+    st.error(dados["erro"])
+
+st.markdown("---")
+col_etapas, col_pool = st.columns(2)
+
+with col_etapas:
+    st.subheader("🧩 Etapas do Aquecimento")
+    estado = aquecimento.estado()
+    if estado["concluido_em"]:
+        st.caption(f"Concluído em {datetime.fromtimestamp(estado['concluido_em']):%d/%m/%Y %H:%M:%S}")
+    if dados["etapas"]:
+        df_etapas = pd.DataFrame.from_dict(dados["etapas"], orient="index").rename_axis("etapa").reset_index()
+        st.dataframe(
+            df_etapas,
+            column_config={
+                "etapa": "Etapa",
+                "ms": st.column_config.NumberColumn("Tempo (ms)", format="%.2f"),
+                "ok": "OK",
+                "erro": "Erro",
+            },
+            hide_index=True,
+            use_container_width=True,
+        )
+    else:
+        st.info("Nenhuma etapa registrada neste processo.")
+
+with col_pool:
+    st.subheader("🔌 Pool de Conexões")
+    pool = dados.get("pool")
+    if not pool:
+        st.info("Pool indisponível.")
+    else:
+        st.caption(f"{pool['classe']}: {pool['status']}")
+        p1, p2, p3, p4 = st.columns(4)
+        p1.metric("Tamanho", pool.get("size", "—"))
+        p2.metric("Livres", pool.get("checkedin", "—"))
+        p3.metric("Em uso", pool.get("checkedout", "—"))
+        p4.metric("Excedentes", pool.get("overflow", "—"))
@@ -0,0 +1,111 @@
+"""
+15_🐢_Consultas_SQL.py — Consultas SQL
+Ranking dos comandos SQL (por impressão digital) que mais consomem tempo de
+banco neste processo, com origem no repositório e página que os disparou.
+"""
+import streamlit as st
+import pandas as pd
+import logging
+from pathlib import Path
+from utils.st_utils import st_check_session, check_access
+from components import servicos_gerenciador as servico
+from persistencia import metricas_sql
+import config
+
+st.set_page_config(page_title="Consultas SQL", layout="wide", page_icon="🐢")
+log = logging.getLogger(__name__)
+
+# ── Segurança ────────────────────────────────────────────────
+st_check_session()
+try:
+    allowed_roles = servico.get_allowed_roles_for_page(Path(__file__).name)
+    check_access(allowed_roles)
+except Exception as e:
+    st.error(f"Erro ao verificar permissões: {e}")
+    st.stop()
+
+# ── Título ───────────────────────────────────────────────────
+st.title("🐢 Consultas SQL")
+st.markdown("Onde o tempo de banco está indo desde que o servidor subiu. "
+            f"Comandos acima de **{config.SQL_LENTA_MS:.0f} ms** também são registrados no log como SQL lenta.")
+if not config.SQL_INSTRUMENTAR:
+    st.warning("Instrumentação desligada (`sql_instrumentar = False` no config_settings.ini).")
+    st.stop()
+
+# ── Resumo ───────────────────────────────────────────────────
+resumo = metricas_sql.resumo()
+k1, k2, k3, k4, k5 = st.columns(5)
+k1.metric("🧾 Comandos distintos", resumo["impressoes"])
+k2.metric("🔁 Execuções", f"{resumo['chamadas']:,}")
+k3.metric("⏱️ Tempo total", f"{resumo['total_ms'] / 1000:.2f} s")
+k4.metric("🐢 Lentas", resumo["lentas"])
+k5.metric("❌ Erros", resumo["erros"])
+
+# ── Filtros ──────────────────────────────────────────────────
+st.markdown("---")
+ROTULOS = {
+    "total_ms": "Tempo total",
+    "media_ms": "Tempo médio",
+    "max_ms": "Pior execução",
+    "chamadas": "Execuções",
+    "lentas": "Execuções lentas",
+    "linhas": "Linhas",
+}
+c1, c2, c3 = st.columns([2, 2, 1])
+ordem = c1.selectbox("Ordenar por", list(ROTULOS), format_func=ROTULOS.get)
+n = c2.slider("Quantidade", min_value=5, max_value=100, value=20, step=5)
+c3.markdown("")
+if c3.button("🧹 Zerar métricas", use_container_width=True):
+    metricas_sql.zerar()
+    log.info("Métricas de SQL zeradas pelo administrador.")
+    st.rerun()
+
+ranking = metricas_sql.top(n, ordem)
+if not ranking:
+    st.info("Nenhum comando registrado ainda neste processo.")
+    st.stop()
+
+# ── Ranking ──────────────────────────────────────────────────
+df = pd.DataFrame(ranking)
+df["origem"] = df["origens"].map(lambda o: next(iter(o), metricas_sql.SEM_ORIGEM))
+df["pagina"] = df["paginas"].map(lambda p: next(iter(p), metricas_sql.SEM_ORIGEM))
+st.dataframe(
+    df[["impressao", "sql", "chamadas", "total_ms", "pct_tempo", "media_ms", "max_ms", "linhas", "lentas", "erros", "origem", "pagina"]],
+    column_config={
+        "impressao": "ID",
+        "sql": st.column_config.TextColumn("SQL", width="large"),
+        "chamadas": "Execuções",
+        "total_ms": st.column_config.NumberColumn("Total (ms)", format="%.1f"),
+        "pct_tempo": st.column_config.ProgressColumn("% do tempo", format="%.1f%%", min_value=0, max_value=1),
+        "media_ms": st.column_config.NumberColumn("Média (ms)", format="%.2f"),
+        "max_ms": st.column_config.NumberColumn("Pior (ms)", format="%.1f"),
+        "linhas": "Linhas",
+        "lentas": "Lentas",
+        "erros": "Erros",
+        "origem": "Origem principal",
+        "pagina": "Página principal",
+    },
+    hide_index=True,
+    use_container_width=True,
+)
+
+st.download_button(
+    "📥 Exportar CSV",
+    df.drop(columns=["origens", "paginas"]).to_csv(index=False).encode("utf-8"),
+    file_name="consultas_sql.csv",
+    mime="text/csv",
+)
+
+# ── Detalhe ──────────────────────────────────────────────────
+st.markdown("---")
+st.subheader("🔎 Detalhe")
+escolhido = st.selectbox("Comando", df["impressao"], format_func=lambda i: f"{i} — {df.set_index('impressao').at[i, 'sql'][:90]}")
+linha = df.set_index("impressao").loc[escolhido]
+st.code(linha["sql"], language="sql")
+d1, d2 = st.columns(2)
+with d1:
+    st.markdown("**Origens (método do repositório)**")
+    st.dataframe(pd.Series(linha["origens"], name="Execuções").rename_axis("Origem").reset_index(), hide_index=True, use_container_width=True)
+with d2:
+    st.markdown("**Páginas**")
+    st.dataframe(pd.Series(linha["paginas"], name="Execuções").rename_axis("Página").reset_index(), hide_index=True, use_container_width=True)
@@ -0,0 +1,137 @@
+"""
+16_💰_Custos_Pedidos.py — Custos por Pedido
+Custo de materiais dos pedidos aos preços vigentes na data de cada pedido,
+agregado por cliente, tipo de elemento ou mês, com exportação CSV/Parquet.
+"""
+import streamlit as st
+import logging
+from datetime import date, timedelta
+from pathlib import Path
+from utils.st_utils import st_check_session, check_access
+from components import servicos_gerenciador as servico
+from components import relatorio_custos
+from persistencia.repositorios.fabrica_repo import TIPOS_CONSUMO
+import config
+
+st.set_page_config(page_title="Custos por Pedido", layout="wide", page_icon="💰")
+log = logging.getLogger(__name__)
+
+# ── Segurança ────────────────────────────────────────────────
+st_check_session()
+try:
+    allowed_roles = servico.get_allowed_roles_for_page(Path(__file__).name)
+    check_access(allowed_roles)
+except Exception as e:
+    st.error(f"Erro ao verificar permissões: {e}")
+    st.stop()
+
+if not config.DATABASE_ENABLED:
+    st.warning("Funcionalidade indisponível: banco de dados desabilitado.")
+    st.stop()
+
+# ── Título ───────────────────────────────────────────────────
+st.title("💰 Custos por Pedido")
+st.markdown(
+    "Custo de materiais de cada pedido (volume × consumo do traço × preço/kg vigente na data do pedido). "
+    "Cada tipo de material é precificado pela média dos materiais do tipo naquela data."
+)
+
+# ── Filtros ──────────────────────────────────────────────────
+STATUS = ["Pendente", "Em Produção", "Concluído", "Cancelado"]
+c1, c2, c3 = st.columns([2, 2, 1])
+status = c1.multiselect("Status", STATUS, default=STATUS[:3])
+periodo = c2.date_input("Período (data do pedido)", value=(date.today() - timedelta(days=365), date.today()))
+dimensao = c3.selectbox("Agrupar por", list(relatorio_custos.DIMENSOES), format_func=relatorio_custos.DIMENSOES.get)
+data_inicio, data_fim = (periodo + (None,))[:2] if isinstance(periodo, tuple) else (periodo, None)
+if not status:
+    st.info("Selecione ao menos um status.")
+    st.stop()
+
+try:
+    df = relatorio_custos.get_custos_agregados(dimensao, tuple(status), data_inicio, data_fim)
+    df_pedidos = relatorio_custos.get_pedidos_mais_custosos(50, tuple(status), data_inicio, data_fim)
+except Exception as e:
+    log.error(f"Erro ao calcular custos dos pedidos: {e}")
+    st.error(f"Erro ao calcular os custos: {e}")
+    st.stop()
+
+if df.empty:
+    st.info("Nenhum pedido no período e status selecionados.")
+    st.stop()
+
+# ── KPIs ─────────────────────────────────────────────────────
+custo_total = df["custo_materiais"].sum()
+volume_custeado = (df["custo_materiais"] / df["custo_m3"]).sum()
+k1, k2, k3, k4 = st.columns(4)
+k1.metric("📋 Pedidos", int(df["pedidos"].sum()))
+k2.metric("💰 Custo de materiais", f"R$ {custo_total:,.2f}")
+k3.metric("📐 Custo médio/m³", f"R$ {custo_total / volume_custeado:,.2f}" if volume_custeado else "—")
+k4.metric("⚠️ Sem traço (sem custo)", int(df["pedidos_sem_custo"].sum()))
+st.markdown("---")
+
+# ── Agregado ─────────────────────────────────────────────────
+rotulo = relatorio_custos.DIMENSOES[dimensao]
+col_tabela, col_grafico = st.columns([3, 2])
+with col_tabela:
+    st.subheader(f"📊 Por {rotulo.lower()}")
+    colunas = {
+        "grupo": rotulo,
+        "pedidos": "Pedidos",
+        "volume_m3": st.column_config.NumberColumn("Volume (m³)", format="%.2f"),
+        "custo_materiais": st.column_config.NumberColumn("Custo (R$)", format="R$ %.2f"),
+        "custo_m3": st.column_config.NumberColumn("R$/m³", format="R$ %.2f"),
+        "pct_custo": st.column_config.ProgressColumn("% do custo", format="%.1f%%", min_value=0, max_value=100),
+    }
+    if dimensao == "mes":
+        colunas["custo_acumulado"] = st.column_config.NumberColumn("Acumulado (R$)", format="R$ %.2f")
+        colunas["variacao_custo_m3_pct"] = st.column_config.NumberColumn("Δ R$/m³", format="%+.1f%%")
+    st.dataframe(df[list(colunas)], column_config=colunas, hide_index=True, use_container_width=True)
+
+with col_grafico:
+    st.subheader("🧱 Custo por material")
+    import plotly.express as px
+
+    por_material = df.melt(
+        id_vars="grupo", value_vars=[f"custo_{col}" for col in TIPOS_CONSUMO], var_name="material", value_name="custo",
+    ).dropna(subset=["custo"])
+    por_material["material"] = por_material["material"].str.removeprefix("custo_").map(TIPOS_CONSUMO)
+    fig = px.bar(por_material, x="grupo", y="custo", color="material",
+                 labels={"grupo": rotulo, "custo": "Custo (R$)", "material": "Material"})
+    fig.update_layout(height=380, margin=dict(t=20, b=20))
+    st.plotly_chart(fig, use_container_width=True)
+
+# ── Pedidos mais custosos ────────────────────────────────────
+st.markdown("---")
+st.subheader("🔝 Pedidos mais custosos")
+st.dataframe(
+    df_pedidos,
+    column_config={
+        "id": "Pedido",
+        "cliente": "Cliente",
+        "elemento": "Elemento",
+        "tipo_elemento": "Tipo",
+        "data_pedido": "Data",
+        "status": "Status",
+        "volume_total_m3": st.column_config.NumberColumn("Volume (m³)", format="%.2f"),
+        "custo_materiais": st.column_config.NumberColumn("Custo (R$)", format="R$ %.2f"),
+        "custo_m3": st.column_config.NumberColumn("R$/m³", format="R$ %.2f"),
+    },
+    hide_index=True,
+    use_container_width=True,
+)
+
+# ── Exportar ─────────────────────────────────────────────────
+st.markdown("---")
+e1, e2, e3 = st.columns([1, 1, 3])
+formato = e1.radio("Formato", ["csv", "parquet"], horizontal=True)
+e2.download_button(
+    "📥 Exportar agregado",
+    relatorio_custos.para_arquivo(df, formato),
+    file_name=f"custos_por_{dimensao}.{formato}",
+    use_container_width=True,
+)
+e3.download_button(
+    "📥 Exportar pedidos",
+    relatorio_custos.para_arquivo(df_pedidos, formato),
+    file_name=f"pedidos_mais_custosos.{formato}",
+)
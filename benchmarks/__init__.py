@@ -0,0 +1,13 @@
+"""
+Benchmarks da camada de dados contra uma fábrica sintética de grande porte.
+
+- dados_sinteticos: gera (e guarda em cache) bancos SQLite determinísticos;
+- repositorios: mede cada método do FabricaRepository e compara com baselines;
+- carga: operadores virtuais simultâneos executando as páginas pelo AppTest;
+- llm_stub: servidor local compatível com a API da OpenAI, para medir a IA sem rede.
+
+Uso:
+    python -m benchmarks.repositorios --escala 0.1 --salvar local
+    python -m benchmarks.repositorios --escala 0.1 --comparar local
+    python -m benchmarks.carga --usuarios 8 --duracao 60
+"""
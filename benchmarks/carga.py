@@ -0,0 +1,409 @@
+"""
+Teste de carga: operadores virtuais usando as páginas sem navegador.
+
+Cada operador é uma thread que faz login e repete fluxos reais (novo pedido,
+sugestão da IA, iniciar/concluir produção, consultar histórico) executando os
+scripts das páginas com `streamlit.testing.v1.AppTest`. O banco é uma cópia
+de um banco sintético (benchmarks.dados_sinteticos), então a carga pode
+escrever à vontade. A IA é trocada por um stub com latência fixa: em
+processo (--ia funcao, padrão) ou pelo caminho HTTP real do ChatOpenAI contra
+o servidor benchmarks.llm_stub (--ia http), que inclui retries e a fila HTTP.
+
+O relatório traz a vazão (reruns e fluxos por segundo), os percentis de
+latência por rerun e por fluxo e as esperas de escrita no SQLite: a duração
+dos INSERT/UPDATE/DELETE (onde o driver espera o lock, até o timeout de 15 s)
+e quantos falharam com "database is locked". Com --json o resultado vai para
+um arquivo, para comparar execuções ao dimensionar servidores.
+
+Uso:
+    python -m benchmarks.carga --usuarios 8 --duracao 60
+    python -m benchmarks.carga --usuarios 32 --duracao 120 --latencia-ia 3000 --json carga.json
+    python -m benchmarks.carga --usuarios 8 --ia http --taxa-erro-ia 0.05
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from unittest import mock
+
+from sqlalchemy import event
+
+import config
+from benchmarks.dados_sinteticos import banco_sintetico
+from benchmarks.llm_stub import Latencia, ServidorLLMStub
+
+project_root = Path(__file__).parent.parent.resolve()
+PASTA_PAGINAS = project_root / 'app_pages'
+PAGINAS = {
+    'novo_pedido': '03_📝_Novo_Pedido.py',
+    'sugestao_ia': '03_📝_Novo_Pedido.py',
+    'producao': '04_🏭_Controle_Producao.py',
+    'historico': '10_📜_Historico_Producao.py',
+}
+# Proporção de cada fluxo no mix de um operador.
+PESOS = {'login': 1, 'novo_pedido': 3, 'sugestao_ia': 1, 'producao': 3, 'historico': 2}
+OPERADOR = 'admin'
+SENHA_CARGA = 'carga-123'
+ESCRITAS = ('INSERT', 'UPDATE', 'DELETE', 'REPLAC')
+
+
+def _percentil(valores: list, p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def _resumo(valores: list) -> dict:
+    return {
+        'n': len(valores),
+        'p50_ms': _percentil(valores, 50),
+        'p90_ms': _percentil(valores, 90),
+        'p95_ms': _percentil(valores, 95),
+        'p99_ms': _percentil(valores, 99),
+        'max_ms': max(valores, default=0.0),
+    }
+
+
+class Metricas:
+    """Coletor compartilhado pelas threads dos operadores."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reruns = defaultdict(list)
+        self.fluxos = defaultdict(list)
+        self.erros = Counter()
+        self.exemplos_erro = {}
+        self.escritas = []
+        self.bloqueios = 0
+
+    def rerun(self, fluxo: str, ms: float):
+        with self._lock:
+            self.reruns[fluxo].append(ms)
+
+    def fluxo(self, fluxo: str, ms: float):
+        with self._lock:
+            self.fluxos[fluxo].append(ms)
+
+    def erro(self, fluxo: str, detalhe: str):
+        with self._lock:
+            self.erros[fluxo] += 1
+            self.exemplos_erro.setdefault(fluxo, detalhe[:200])
+
+    def escrita(self, ms: float):
+        with self._lock:
+            self.escritas.append(ms)
+
+    def bloqueio(self):
+        with self._lock:
+            self.bloqueios += 1
+
+    def relatorio(self, duracao_s: float, usuarios: int) -> dict:
+        todos = [ms for valores in self.reruns.values() for ms in valores]
+        total_fluxos = sum(len(v) for v in self.fluxos.values())
+        return {
+            'usuarios': usuarios,
+            'duracao_s': duracao_s,
+            'reruns_s': len(todos) / duracao_s if duracao_s else 0.0,
+            'fluxos_s': total_fluxos / duracao_s if duracao_s else 0.0,
+            'rerun': _resumo(todos),
+            'reruns_por_fluxo': {nome: _resumo(v) for nome, v in sorted(self.reruns.items())},
+            'fluxos': {nome: _resumo(v) for nome, v in sorted(self.fluxos.items())},
+            'erros': dict(self.erros),
+            'exemplos_erro': dict(self.exemplos_erro),
+            'escritas': {**_resumo(self.escritas), 'total_s': sum(self.escritas) / 1000},
+            'database_is_locked': self.bloqueios,
+        }
+
+
+class FalhaFluxo(Exception):
+    pass
+
+
+def _instrumentar(engine, metricas: Metricas):
+    """Mede a duração das escritas e conta os 'database is locked' na engine da aplicação."""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('carga_inicio', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        inicio = conn.info['carga_inicio'].pop()
+        if statement.lstrip()[:6].upper() in ESCRITAS:
+            metricas.escrita((time.perf_counter() - inicio) * 1000)
+
+    @event.listens_for(engine, 'handle_error')
+    def _erro(contexto):
+        pilha = contexto.connection.info.get('carga_inicio') if contexto.connection is not None else None
+        if pilha:
+            pilha.pop()
+        if 'database is locked' in str(contexto.original_exception):
+            metricas.bloqueio()
+
+
+def _stub_ia(latencia_ms: float) -> dict:
+    """Funções que substituem a IA de components.ai_concreto: respostas fixas após `latencia_ms`."""
+
+    def sugerir_traco(fck, slump=100.0, agregado_max='Brita 1', materiais_selecionados=None):
+        time.sleep(latencia_ms / 1000)
+        return {
+            'raciocinio_cot': 'Resposta do stub de carga.',
+            'traco_sugerido': '1 : 2.1 : 2.9 : 0.55 a/c',
+            'cimento_tipo': 'CP-II-F-32',
+            'fck_alvo': fck,
+            'slump_alvo': slump,
+            'agregado_max': agregado_max,
+            'relacao_ac': 0.55,
+            'consumo_cimento_m3': 340.0,
+            'justificativa': 'Stub de carga.',
+            'custo_estimado': 310.0,
+            'materiais_m3': {},
+        }
+
+    def otimizar_traco(traco_dict):
+        time.sleep(latencia_ms / 1000)
+        return {
+            'nome_otimizado': f"{traco_dict.get('nome', 'Traço')} (stub)",
+            'traco_original': traco_dict.get('traco_str', ''),
+            'traco_otimizado': traco_dict.get('traco_str', ''),
+            'consumo_original': float(traco_dict.get('consumo_cimento_m3', 0)),
+            'consumo_otimizado': float(traco_dict.get('consumo_cimento_m3', 0)),
+            'aditivo_kg': 0.0,
+            'economia_liquida_m3': 0.0,
+            'justificativa': 'Stub de carga.',
+        }
+
+    return {'sugerir_traco': sugerir_traco, 'otimizar_traco': otimizar_traco}
+
+
+def preparar_banco(escala: float, semente: int, pasta: Path) -> Path:
+    """Copia o banco sintético para `pasta` e define a senha de carga para todos os usuários."""
+    from persistencia.auth import hash_password
+
+    destino = pasta / 'carga.db'
+    shutil.copyfile(banco_sintetico(escala, semente), destino)
+    con = sqlite3.connect(destino)
+    try:
+        with con:
+            con.execute('UPDATE usuarios SET senha_criptografada = ?', (hash_password(SENHA_CARGA),))
+    finally:
+        con.close()
+    return destino
+
+
+@contextmanager
+def _ambiente_de_carga(caminho: Path, latencia_ia_ms: float, ia: str = 'funcao', taxa_erro_ia: float = 0.0):
+    """
+    Aponta a aplicação para `caminho`, troca a IA pelo stub e desliga o limite
+    de logins; desfaz tudo ao sair. Com ia='http' produz o ServidorLLMStub.
+    """
+    from components import ai_concreto
+    from persistencia import auth, config_banco
+    from persistencia.database import DatabaseManager
+    from persistencia.throttle import LoginThrottle
+
+    with ExitStack() as pilha:
+        pilha.enter_context(mock.patch.dict(os.environ, {'BANCO_TYPE': 'sqlite', 'BANCO_PATH': str(caminho)}))
+        pilha.enter_context(mock.patch.object(DatabaseManager, '_engine', None))
+        servidor = None
+        if ia == 'http':
+            servidor = pilha.enter_context(ServidorLLMStub(latencia=Latencia('fixa', latencia_ia_ms), taxa_erro=taxa_erro_ia,
+                                                           status_erro=(429, 500, 503)))
+            pilha.enter_context(mock.patch.multiple(config, OPENAI_BASE_URL=servidor.base_url, OPENAI_API_KEY='stub'))
+        else:
+            for nome, funcao in _stub_ia(latencia_ia_ms).items():
+                pilha.enter_context(mock.patch.object(ai_concreto, nome, funcao))
+        # Todos os operadores entram com o mesmo login; o limite de tentativas
+        # mediria o throttle, não a aplicação.
+        pilha.enter_context(mock.patch.object(auth, '_throttle', LoginThrottle(10**9, 10**9, 10**9, 10**9)))
+        pilha.callback(config_banco.config_banco.cache_clear)
+        config_banco.config_banco.cache_clear()
+        yield servidor
+
+
+class Operador:
+    """Um usuário virtual: uma sessão do AppTest por página, como abas do navegador."""
+
+    def __init__(self, indice: int, metricas: Metricas, rng: random.Random, timeout_s: float):
+        self.indice = indice
+        self.metricas = metricas
+        self.rng = rng
+        self.timeout_s = timeout_s
+        self.user_info = None
+
+    def _rodar(self, fluxo: str, app):
+        inicio = time.perf_counter()
+        app.run(timeout=self.timeout_s)
+        self.metricas.rerun(fluxo, (time.perf_counter() - inicio) * 1000)
+        if app.exception:
+            raise FalhaFluxo(app.exception[0].value)
+        if app.error:
+            raise FalhaFluxo(app.error[0].value)
+        return app
+
+    def _abrir(self, fluxo: str):
+        from streamlit.testing.v1 import AppTest
+
+        app = AppTest.from_file(str(PASTA_PAGINAS / PAGINAS[fluxo]), default_timeout=self.timeout_s)
+        app.session_state['user_info'] = self.user_info
+        return self._rodar(fluxo, app)
+
+    def _botoes(self, app, prefixo: str) -> list:
+        return [b for b in app.button if (b.key or '').startswith(prefixo)]
+
+    def login(self):
+        from persistencia import auth
+
+        resultado = auth.verify_user_credentials(OPERADOR, SENHA_CARGA, ip=f'10.0.{self.indice // 256}.{self.indice % 256}')
+        if not isinstance(resultado, dict):
+            raise FalhaFluxo(f'Login recusado: {resultado}')
+        self.user_info = resultado
+
+    def novo_pedido(self):
+        app = self._abrir('novo_pedido')
+        salvar = [b for b in app.button if b.label == '💾 Salvar Pedido']
+        if not salvar:
+            raise FalhaFluxo('Botão "Salvar Pedido" não encontrado.')
+        salvar[0].click()
+        self._rodar('novo_pedido', app)
+
+    def sugestao_ia(self):
+        app = self._abrir('sugestao_ia')
+        app.button(key='btn_gerar_ia').click()
+        self._rodar('sugestao_ia', app)
+
+    def producao(self):
+        app = self._abrir('producao')
+        for prefixo in ('btn_start_', 'btn_finish_'):
+            botoes = self._botoes(app, prefixo)
+            if botoes:
+                self.rng.choice(botoes).click()
+                self._rodar('producao', app)
+
+    def historico(self):
+        app = self._abrir('historico')
+        status = next(s for s in app.selectbox if s.label == '📊 Status')
+        status.select(self.rng.choice(status.options))
+        self._rodar('historico', app)
+
+    def executar(self, fluxo: str):
+        inicio = time.perf_counter()
+        try:
+            getattr(self, fluxo)()
+        except Exception as e:
+            self.metricas.erro(fluxo, f'{type(e).__name__}: {e}')
+        else:
+            self.metricas.fluxo(fluxo, (time.perf_counter() - inicio) * 1000)
+
+
+def _ciclo(operador: Operador, fim: float, pausa_s: float, iteracoes: int = None):
+    fluxos, pesos = zip(*PESOS.items())
+    operador.executar('login')
+    feitas = 0
+    while time.perf_counter() < fim and (iteracoes is None or feitas < iteracoes):
+        if operador.user_info is None:
+            operador.executar('login')
+        else:
+            operador.executar(operador.rng.choices(fluxos, pesos)[0])
+        feitas += 1
+        # Tempo de "pensar" do operador, com variação para não sincronizar as threads.
+        time.sleep(pausa_s * operador.rng.uniform(0.5, 1.5))
+
+
+def executar(usuarios: int = 4, duracao_s: float = 30.0, escala: float = 0.001, semente: int = 42,
+             latencia_ia_ms: float = 1500.0, pausa_s: float = 0.5, timeout_s: float = 60.0,
+             rampa_s: float = 0.0, ia: str = 'funcao', taxa_erro_ia: float = 0.0, iteracoes: int = None) -> dict:
+    """
+    Roda a carga e retorna o relatório (veja Metricas.relatorio). Com
+    `iteracoes`, cada operador para após esse número de fluxos, mesmo antes
+    de `duracao_s`.
+    """
+    metricas = Metricas()
+    with tempfile.TemporaryDirectory(prefix='carga_') as pasta, \
+            _ambiente_de_carga(preparar_banco(escala, semente, Path(pasta)), latencia_ia_ms, ia, taxa_erro_ia) as servidor_ia:
+        from components import aquecimento
+        from persistencia.database import DatabaseManager
+
+        aquecimento.aquecer(incluir_llm=False)
+        engine = DatabaseManager.get_engine()
+        _instrumentar(engine, metricas)
+
+        inicio = time.perf_counter()
+        fim = inicio + duracao_s
+        threads = []
+        for i in range(usuarios):
+            operador = Operador(i, metricas, random.Random(semente + i), timeout_s)
+            thread = threading.Thread(target=_ciclo, args=(operador, fim, pausa_s, iteracoes), name=f'operador-{i}', daemon=True)
+            thread.start()
+            threads.append(thread)
+            if rampa_s:
+                time.sleep(rampa_s / usuarios)
+        for thread in threads:
+            thread.join()
+        decorrido = time.perf_counter() - inicio
+        engine.dispose()
+        relatorio = metricas.relatorio(decorrido, usuarios)
+        if servidor_ia:
+            relatorio['llm_stub'] = servidor_ia.estatisticas()
+    return relatorio
+
+
+def imprimir(relatorio: dict):
+    print(f"Operadores: {relatorio['usuarios']}   Duração: {relatorio['duracao_s']:.1f} s   "
+          f"Vazão: {relatorio['reruns_s']:.2f} reruns/s, {relatorio['fluxos_s']:.2f} fluxos/s")
+    colunas = ('n', 'p50_ms', 'p90_ms', 'p95_ms', 'p99_ms', 'max_ms')
+    linhas = [('rerun (todos)', relatorio['rerun'])]
+    linhas += [(f'rerun {nome}', r) for nome, r in relatorio['reruns_por_fluxo'].items()]
+    linhas += [(f'fluxo {nome}', r) for nome, r in relatorio['fluxos'].items()]
+    linhas += [('escritas SQL', relatorio['escritas'])]
+    largura = max(len(nome) for nome, _ in linhas) + 2
+    print(f"\n{'Latência (ms)':<{largura}}" + ''.join(f'{c.removesuffix("_ms"):>10}' for c in colunas))
+    print('-' * (largura + 10 * len(colunas)))
+    for nome, r in linhas:
+        print(f'{nome:<{largura}}{r["n"]:>10}' + ''.join(f'{r[c]:>10.1f}' for c in colunas[1:]))
+    print(f"\nTempo total em escritas: {relatorio['escritas']['total_s']:.2f} s   "
+          f"'database is locked': {relatorio['database_is_locked']}")
+    if 'llm_stub' in relatorio:
+        print('Servidor LLM stub: ' + ', '.join(f'{k}={v}' for k, v in sorted(relatorio['llm_stub'].items())))
+    for fluxo, quantidade in relatorio['erros'].items():
+        print(f"ERROS {fluxo}: {quantidade} (ex.: {relatorio['exemplos_erro'][fluxo]})", file=sys.stderr)
+
+
+def main(argv=None) -> int:
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    args.add_argument('--usuarios', type=int, default=4, help='Operadores virtuais simultâneos.')
+    args.add_argument('--duracao', type=float, default=30.0, help='Segundos de carga.')
+    args.add_argument('--escala', type=float, default=0.001, help='Escala do banco sintético (1.0 = 1 milhão de pedidos).')
+    args.add_argument('--semente', type=int, default=42)
+    args.add_argument('--latencia-ia', type=float, default=1500.0, help='Latência (ms) do stub da IA (por requisição com --ia http).')
+    args.add_argument('--ia', choices=('funcao', 'http'), default='funcao', help='Stub em processo ou servidor HTTP local.')
+    args.add_argument('--taxa-erro-ia', type=float, default=0.0, help='Fração de erros 429/5xx do servidor stub (--ia http).')
+    args.add_argument('--pausa', type=float, default=0.5, help='Tempo médio (s) entre fluxos de um operador.')
+    args.add_argument('--rampa', type=float, default=0.0, help='Segundos para colocar todos os operadores em carga.')
+    args.add_argument('--timeout', type=float, default=60.0, help='Limite (s) de um rerun.')
+    args.add_argument('--iteracoes', type=int, help='Fluxos por operador (sem limite: até acabar a duração).')
+    args.add_argument('--json', metavar='ARQUIVO', help='Grava o relatório em JSON.')
+    opcoes = args.parse_args(argv)
+
+    relatorio = executar(opcoes.usuarios, opcoes.duracao, opcoes.escala, opcoes.semente,
+                         opcoes.latencia_ia, opcoes.pausa, opcoes.timeout, opcoes.rampa,
+                         opcoes.ia, opcoes.taxa_erro_ia, opcoes.iteracoes)
+    imprimir(relatorio)
+    if opcoes.json:
+        Path(opcoes.json).write_text(json.dumps(relatorio, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f'\nRelatório gravado em {opcoes.json}')
+    return 1 if relatorio['erros'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Gerador determinístico de uma fábrica sintética em SQLite.
+
+Na escala 1.0: 10 mil clientes, 500 materiais, 2 mil traços, 5 mil elementos
+e 1 milhão de pedidos. A mesma (escala, semente) gera sempre o mesmo banco,
+que fica em cache em benchmarks/.dados/ para não ser refeito a cada execução.
+O schema e os dados de sistema (usuários, perfis, páginas) vêm do script
+oficial; as tabelas fab_* são substituídas pelos dados sintéticos.
+"""
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import create_engine
+
+from persistencia.bootstrap import SCRIPTS, bootstrap
+from persistencia.repositorios.fabrica_repo import INICIO_HISTORICO, FabricaRepository
+
+PASTA_CACHE = Path(__file__).parent / '.dados'
+# Mudou a forma de gerar? Incremente para invalidar os bancos em cache.
+VERSAO_GERADOR = 1
+
+TAMANHOS = {
+    'clientes': 10_000,
+    'materiais': 500,
+    'tracos': 2_000,
+    'elementos': 5_000,
+    'pedidos': 1_000_000,
+}
+TIPOS_MATERIAL = ('Cimento', 'Areia', 'Brita', 'Aditivo', 'Água', 'Adição', 'Pigmento', 'Fibra')
+PESOS_TIPO = (0.25, 0.2, 0.2, 0.15, 0.02, 0.08, 0.05, 0.05)
+TIPOS_ELEMENTO = ('Bloco', 'Tubo', 'Viga', 'Pilar', 'Laje', 'Poste', 'Piso')
+STATUS = ('Pendente', 'Em Produção', 'Concluído', 'Cancelado')
+PESOS_STATUS = (0.15, 0.1, 0.7, 0.05)
+INICIO_PEDIDOS = date(2024, 1, 1)
+DIAS_PEDIDOS = 730
+
+
+def tamanhos(escala: float) -> dict:
+    return {tabela: max(1, int(n * escala)) for tabela, n in TAMANHOS.items()}
+
+
+def _clientes(rng, n):
+    for i in range(1, n + 1):
+        yield (i, f'Cliente Sintético {i:06d}', f'{i:08d}/0001-{i % 100:02d}', f'Rua {int(rng.integers(1, 5000))}, {i}')
+
+
+def _materiais(rng, n):
+    tipos = rng.choice(len(TIPOS_MATERIAL), size=n, p=PESOS_TIPO)
+    custos = np.round(rng.uniform(0.005, 10.0, size=n), 3)
+    # ~10% abaixo de 1000 kg, para o relatório de estoque baixo ter o que mostrar.
+    estoques = np.round(np.where(rng.random(n) < 0.1, rng.uniform(0, 1000, n), rng.uniform(1000, 60000, n)), 1)
+    for i in range(n):
+        yield (i + 1, TIPOS_MATERIAL[tipos[i]], f'Material {i + 1:05d}', float(custos[i]), float(estoques[i]))
+
+
+def _tracos(rng, n):
+    fck = rng.choice([10, 15, 20, 25, 30, 35, 40, 50], size=n)
+    areia = np.round(rng.uniform(1.5, 3.5, n), 1)
+    brita = np.round(rng.uniform(2.0, 4.5, n), 1)
+    ac = np.round(rng.uniform(0.38, 0.68, n), 2)
+    consumo = rng.integers(250, 450, n)
+    aditivo = np.where(rng.random(n) < 0.3, np.round(rng.uniform(0.3, 1.2, n), 1), np.nan)
+    for i in range(n):
+        adt = None if np.isnan(aditivo[i]) else float(aditivo[i])
+        traco_str = f'1 : {areia[i]:g} : {brita[i]:g} : {ac[i]:g} a/c' + (f' + {adt:g}% aditivo' if adt else '')
+        yield (i + 1, f'Traço Sintético {i + 1:05d}', float(fck[i]), traco_str, float(consumo[i]),
+               1.0, float(areia[i]), float(brita[i]), float(ac[i]), adt)
+
+
+def _elementos(rng, n, n_tracos):
+    tipos = rng.integers(0, len(TIPOS_ELEMENTO), n)
+    volumes = np.round(rng.uniform(0.003, 0.3, n), 4)
+    fck = rng.choice([10, 20, 25, 30, 35, 40], size=n)
+    tracos = rng.integers(1, n_tracos + 1, n)
+    for i in range(n):
+        yield (i + 1, f'Elemento {i + 1:05d}', TIPOS_ELEMENTO[tipos[i]], float(volumes[i]), float(fck[i]), int(tracos[i]))
+
+
+def _pedidos(rng, n, n_clientes, n_elementos, n_tracos, lote=100_000):
+    """Gera em lotes para não materializar 1 milhão de tuplas de uma vez."""
+    inicio = np.datetime64(INICIO_PEDIDOS)
+    for base in range(0, n, lote):
+        m = min(lote, n - base)
+        clientes = rng.integers(1, n_clientes + 1, m)
+        elementos = rng.integers(1, n_elementos + 1, m)
+        quantidades = rng.integers(1, 2000, m)
+        data_pedido = inicio + rng.integers(0, DIAS_PEDIDOS, m).astype('timedelta64[D]')
+        data_entrega = data_pedido + rng.integers(7, 60, m).astype('timedelta64[D]')
+        status = rng.choice(len(STATUS), size=m, p=PESOS_STATUS)
+        tracos = np.where(rng.random(m) < 0.95, rng.integers(1, n_tracos + 1, m), 0)
+        pedido_str = data_pedido.astype(str)
+        entrega_str = data_entrega.astype(str)
+        yield [
+            (base + i + 1, int(clientes[i]), int(elementos[i]), int(quantidades[i]),
+             pedido_str[i], entrega_str[i], STATUS[status[i]], int(tracos[i]) or None)
+            for i in range(m)
+        ]
+
+
+def popular(caminho: Path, escala: float = 1.0, semente: int = 42):
+    """Cria o schema em `caminho` e preenche as tabelas fab_* com dados sintéticos."""
+    n = tamanhos(escala)
+    engine = create_engine(f'sqlite:///{caminho}')
+    bootstrap(engine, scripts=SCRIPTS[:1])
+
+    rng = np.random.default_rng(semente)
+    con = sqlite3.connect(caminho)
+    try:
+        con.execute('PRAGMA synchronous=OFF')
+        with con:
+            for tabela in ('fab_pedidos', 'fab_rollup_semanal', 'fab_catalogo_elementos',
+                           'fab_tracos_padrao', 'fab_materiais_precos', 'fab_materiais', 'fab_clientes'):
+                con.execute(f'DELETE FROM {tabela}')
+            con.executemany('INSERT INTO fab_clientes (id, nome, documento, endereco) VALUES (?, ?, ?, ?)',
+                            _clientes(rng, n['clientes']))
+            con.executemany('INSERT INTO fab_materiais (id, tipo, nome, custo_kg, estoque_atual) VALUES (?, ?, ?, ?, ?)',
+                            _materiais(rng, n['materiais']))
+            con.execute('INSERT INTO fab_materiais_precos (material_id, custo_kg, vigente_desde, origem) '
+                        "SELECT id, custo_kg, ?, 'inicial' FROM fab_materiais", (INICIO_HISTORICO,))
+            con.executemany(
+                'INSERT INTO fab_tracos_padrao (id, nome, fck_alvo, traco_str, consumo_cimento_m3, '
+                'prop_cimento, prop_areia, prop_brita, relacao_ac, aditivo_pct) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                _tracos(rng, n['tracos']))
+            con.executemany(
+                'INSERT INTO fab_catalogo_elementos (id, nome, tipo, volume_m3, fck_necessario, traco_id) VALUES (?, ?, ?, ?, ?, ?)',
+                _elementos(rng, n['elementos'], n['tracos']))
+            for lote in _pedidos(rng, n['pedidos'], n['clientes'], n['elementos'], n['tracos']):
+                con.executemany(
+                    'INSERT INTO fab_pedidos (id, cliente_id, elemento_id, quantidade, data_pedido, '
+                    'data_entrega, status, traco_usado_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', lote)
+        con.execute('ANALYZE')
+    finally:
+        con.close()
+
+    with engine.begin() as conn:
+        FabricaRepository(conn).reconstruir_rollup_semanal()
+    engine.dispose()
+
+
+def banco_sintetico(escala: float = 1.0, semente: int = 42, pasta: Path = PASTA_CACHE) -> Path:
+    """Caminho de um banco sintético pronto; gera na primeira vez e reaproveita depois."""
+    pasta.mkdir(parents=True, exist_ok=True)
+    caminho = pasta / f'fabrica_v{VERSAO_GERADOR}_e{escala:g}_s{semente}.db'
+    if not caminho.exists():
+        temporario = caminho.with_suffix('.tmp')
+        temporario.unlink(missing_ok=True)
+        popular(temporario, escala, semente)
+        temporario.replace(caminho)
+    return caminho
@@ -0,0 +1,361 @@
+"""
+Servidor local compatível com a API de chat da OpenAI, para testes sem rede.
+
+Responde em /v1/chat/completions no formato que o ChatOpenAI espera:
+- `response_format` json_schema (with_structured_output padrão): JSON no conteúdo;
+- `tool_choice` forçando uma função (with_structured_output por function calling)
+  ou `tools` sem resposta de ferramenta ainda (bind_tools): uma tool call;
+- demais casos: texto simples.
+Os argumentos de TracoOutput e OtimizacaoOutput são respostas válidas e fixas
+(o FCK vem da mensagem do usuário); outros schemas são preenchidos a partir
+do próprio JSON Schema da requisição.
+
+Latência (distribuição fixa, uniforme, normal ou lognormal, mais um custo
+por token de resposta), taxa de erro (status HTTP sorteados entre os
+configurados) e contagem de tokens em `usage` são configuráveis; com a mesma
+semente a sequência é a mesma. GET /stats traz os contadores.
+
+Uso:
+    python -m benchmarks.llm_stub --porta 8099 --latencia-ms 800 --desvio-ms 300 --distribuicao lognormal
+    APP_OPENAI_BASE_URL=http://127.0.0.1:8099/v1 APP_OPENAI_API_KEY=stub streamlit run Home.py
+"""
+import argparse
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DISTRIBUICOES = ('fixa', 'uniforme', 'normal', 'lognormal')
+MENSAGENS_ERRO = {
+    429: ('rate_limit_exceeded', 'Rate limit reached (stub).'),
+    500: ('server_error', 'The server had an error while processing your request (stub).'),
+    502: ('server_error', 'Bad gateway (stub).'),
+    503: ('server_error', 'The engine is currently overloaded (stub).'),
+}
+FCK_PADRAO = 25.0
+_RE_FCK = re.compile(r'FCK\s*=\s*([\d.]+)', re.IGNORECASE)
+
+
+class Latencia:
+    """Sorteia a latência (ms) de uma resposta; nunca negativa."""
+
+    def __init__(self, distribuicao: str = 'fixa', media_ms: float = 0.0, desvio_ms: float = 0.0):
+        if distribuicao not in DISTRIBUICOES:
+            raise ValueError(f"Distribuição '{distribuicao}' inválida. Use uma de {DISTRIBUICOES}.")
+        self.distribuicao = distribuicao
+        self.media_ms = media_ms
+        self.desvio_ms = desvio_ms
+
+    def sortear(self, rng: random.Random) -> float:
+        m, d = self.media_ms, self.desvio_ms
+        if self.distribuicao == 'fixa' or m <= 0:
+            valor = m
+        elif self.distribuicao == 'uniforme':
+            valor = rng.uniform(m - d, m + d)
+        elif self.distribuicao == 'normal':
+            valor = rng.gauss(m, d)
+        else:
+            # Parâmetros da normal subjacente para que média e desvio sejam os pedidos.
+            sigma2 = math.log(1 + (d / m) ** 2)
+            valor = rng.lognormvariate(math.log(m) - sigma2 / 2, math.sqrt(sigma2))
+        return max(0.0, valor)
+
+
+def resposta_traco(fck: float) -> dict:
+    """Argumentos válidos de TracoOutput (nomes pelo alias, como o modelo retorna)."""
+    ac = 0.65 if fck <= 20 else 0.55 if fck <= 30 else 0.45 if fck <= 40 else 0.40
+    cimento = round(260 + max(0.0, fck - 20) * 6, 1)
+    materiais = {
+        'Cimento': {'tipo': 'CP-II-F-32', 'kg': cimento, 'custo_kg': 0.65},
+        'Areia': {'tipo': 'Areia Média', 'kg': round(cimento * 2.2, 1), 'custo_kg': 0.08},
+        'Brita': {'tipo': 'Brita 1', 'kg': round(cimento * 3.0, 1), 'custo_kg': 0.10},
+        'Água': {'tipo': 'Água', 'kg': round(cimento * ac, 1), 'custo_kg': 0.005},
+        'Aditivo': {'tipo': 'Superplastificante', 'kg': round(cimento * 0.007, 2), 'custo_kg': 5.20},
+    }
+    return {
+        'raciocinio_cot': f'Stub: FCK {fck:g} MPa → a/c máxima {ac:g}, consumo mínimo respeitado.',
+        'traco_sugerido': f'1 : 2.2 : 3.0 : {ac:g} a/c',
+        'cimento_tipo': 'CP-II-F-32',
+        'fck_alvo': fck,
+        'slump_alvo': 100.0,
+        'agregado_max': 'Brita 1',
+        'relacao_ac': ac,
+        'consumo_cimento_m3': cimento,
+        'justificativa': '### Resposta do servidor stub\nValores determinísticos para testes de desempenho.',
+        'custo_estimado': round(sum(m['kg'] * m['custo_kg'] for m in materiais.values()), 2),
+        'materiais_m3': materiais,
+    }
+
+
+def resposta_otimizacao(_fck: float) -> dict:
+    return {
+        'nome_otimizado': 'Traço Otimizado (stub)',
+        'traco_original': '1 : 2.2 : 3.0 : 0.55 a/c',
+        'traco_otimizado': '1 : 2.4 : 3.2 : 0.52 a/c',
+        'consumo_original': 340.0,
+        'consumo_otimizado': 312.8,
+        'aditivo_kg': 2.5,
+        'economia_liquida_m3': 7.78,
+        'justificativa': '### Resposta do servidor stub\nRedução de 8% no cimento com superplastificante.',
+    }
+
+
+RESPOSTAS = {
+    'TracoOutput': resposta_traco,
+    'OtimizacaoOutput': resposta_otimizacao,
+}
+
+
+def exemplo_do_schema(schema: dict, dicas: dict = None, raiz: dict = None, nome: str = None):
+    """Valor qualquer que satisfaz `schema` (segue $ref/$defs); `dicas` fixa campos pelo nome."""
+    dicas = dicas or {}
+    raiz = raiz or schema
+    if nome in dicas:
+        return dicas[nome]
+    if '$ref' in schema:
+        alvo = raiz
+        for parte in schema['$ref'].lstrip('#/').split('/'):
+            alvo = alvo[parte]
+        return exemplo_do_schema(alvo, dicas, raiz, nome)
+    for chave in ('anyOf', 'oneOf', 'allOf'):
+        if schema.get(chave):
+            return exemplo_do_schema(schema[chave][0], dicas, raiz, nome)
+    if 'enum' in schema:
+        return schema['enum'][0]
+    tipo = schema.get('type', 'object')
+    if isinstance(tipo, list):
+        tipo = next((t for t in tipo if t != 'null'), 'null')
+    if tipo == 'object':
+        return {campo: exemplo_do_schema(sub, dicas, raiz, campo)
+                for campo, sub in schema.get('properties', {}).items()}
+    if tipo == 'array':
+        return [exemplo_do_schema(schema.get('items', {}), dicas, raiz)]
+    return {'string': 'stub', 'number': 1.0, 'integer': 1, 'boolean': True, 'null': None}.get(tipo, 'stub')
+
+
+def _texto(mensagem: dict) -> str:
+    conteudo = mensagem.get('content') or ''
+    if isinstance(conteudo, list):
+        return ' '.join(parte.get('text', '') for parte in conteudo if isinstance(parte, dict))
+    return str(conteudo)
+
+
+def _argumentos(nome: str, schema: dict, fck: float) -> dict:
+    if nome in RESPOSTAS:
+        return RESPOSTAS[nome](fck)
+    return exemplo_do_schema(schema or {}, {'fck': fck, 'fck_alvo': fck})
+
+
+def montar_mensagem(pedido: dict) -> dict:
+    """A mensagem do assistente (content / tool_calls) para o corpo de uma requisição de chat."""
+    mensagens = pedido.get('messages', [])
+    encontrado = _RE_FCK.search(' '.join(_texto(m) for m in mensagens if m.get('role') == 'user'))
+    fck = float(encontrado.group(1)) if encontrado else FCK_PADRAO
+    ferramentas = {t['function']['name']: t['function'].get('parameters', {})
+                   for t in pedido.get('tools', []) if t.get('type') == 'function'}
+
+    formato = pedido.get('response_format') or {}
+    if formato.get('type') == 'json_schema':
+        esquema = formato.get('json_schema', {})
+        conteudo = _argumentos(esquema.get('name', ''), esquema.get('schema'), fck)
+        return {'role': 'assistant', 'content': json.dumps(conteudo, ensure_ascii=False)}
+    if formato.get('type') == 'json_object':
+        return {'role': 'assistant', 'content': json.dumps({'fck': fck})}
+
+    escolha = pedido.get('tool_choice')
+    forcada = escolha.get('function', {}).get('name') if isinstance(escolha, dict) else None
+    ja_respondeu = any(m.get('role') == 'tool' for m in mensagens)
+    nome = forcada or (next(iter(ferramentas)) if ferramentas and not ja_respondeu and escolha != 'none' else None)
+    if nome is None:
+        return {'role': 'assistant', 'content': f'Resposta do servidor stub para FCK {fck:g} MPa.'}
+    argumentos = _argumentos(nome, ferramentas.get(nome), fck)
+    return {
+        'role': 'assistant',
+        'content': None,
+        'tool_calls': [{
+            'id': f'call_{uuid.uuid4().hex[:24]}',
+            'type': 'function',
+            'function': {'name': nome, 'arguments': json.dumps(argumentos, ensure_ascii=False)},
+        }],
+    }
+
+
+def _estimar_tokens(texto: str) -> int:
+    return max(1, len(texto) // 4)
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+    server_version = 'llm-stub/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder(self, status: int, corpo: dict, cabecalhos: dict = None):
+        dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(dados)))
+        for chave, valor in (cabecalhos or {}).items():
+            self.send_header(chave, valor)
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        if self.path.rstrip('/') in ('/stats', '/v1/stats'):
+            self._responder(200, self.server.stub.estatisticas())
+        elif self.path.rstrip('/') == '/v1/models':
+            self._responder(200, {'object': 'list', 'data': [{'id': 'gpt-4o-mini', 'object': 'model', 'owned_by': 'stub'}]})
+        else:
+            self._responder(404, {'error': {'message': f'Rota {self.path} não existe no stub.', 'type': 'invalid_request_error'}})
+
+    def do_POST(self):
+        tamanho = int(self.headers.get('Content-Length') or 0)
+        corpo = self.rfile.read(tamanho)
+        if self.path.rstrip('/') != '/v1/chat/completions':
+            self._responder(404, {'error': {'message': f'Rota {self.path} não existe no stub.', 'type': 'invalid_request_error'}})
+            return
+        try:
+            pedido = json.loads(corpo or b'{}')
+        except ValueError:
+            self._responder(400, {'error': {'message': 'JSON inválido.', 'type': 'invalid_request_error'}})
+            return
+        self._responder(*self.server.stub.atender(pedido, len(corpo)))
+
+
+class ServidorLLMStub:
+    """Servidor stub numa thread própria; `base_url` vai para config.OPENAI_BASE_URL."""
+
+    def __init__(self, host: str = '127.0.0.1', porta: int = 0, latencia: Latencia = None,
+                 ms_por_token: float = 0.0, taxa_erro: float = 0.0, status_erro=(500,),
+                 tokens_prompt: int = 0, tokens_resposta: int = 0, semente: int = 42):
+        self.latencia = latencia or Latencia()
+        self.ms_por_token = ms_por_token
+        self.taxa_erro = taxa_erro
+        self.status_erro = tuple(status_erro)
+        self.tokens_prompt = tokens_prompt
+        self.tokens_resposta = tokens_resposta
+        self._rng = random.Random(semente)
+        self._lock = threading.Lock()
+        self._contadores = Counter()
+        self._em_andamento = 0
+        self._servidor = ThreadingHTTPServer((host, porta), _Manipulador)
+        self._servidor.daemon_threads = True
+        self._servidor.stub = self
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, porta = self._servidor.server_address[:2]
+        return f'http://{host}:{porta}/v1'
+
+    def _sortear(self):
+        """(status de erro ou None, latência em ms), sob o lock para a sequência ser reprodutível."""
+        with self._lock:
+            erro = self._rng.choice(self.status_erro) if self._rng.random() < self.taxa_erro else None
+            return erro, self.latencia.sortear(self._rng)
+
+    def atender(self, pedido: dict, bytes_recebidos: int) -> tuple:
+        """(status, corpo, cabeçalhos) de uma requisição de chat."""
+        erro, espera_ms = self._sortear()
+        with self._lock:
+            self._contadores['requisicoes'] += 1
+            self._em_andamento += 1
+            self._contadores['em_andamento_max'] = max(self._contadores['em_andamento_max'], self._em_andamento)
+        try:
+            if erro:
+                time.sleep(espera_ms / 1000)
+                tipo, mensagem = MENSAGENS_ERRO.get(erro, ('server_error', f'Erro {erro} (stub).'))
+                with self._lock:
+                    self._contadores[f'erros_{erro}'] += 1
+                return erro, {'error': {'message': mensagem, 'type': tipo, 'code': tipo}}, {}
+
+            mensagem = montar_mensagem(pedido)
+            saida = mensagem['content'] or json.dumps(mensagem.get('tool_calls'))
+            prompt = self.tokens_prompt or _estimar_tokens(json.dumps(pedido.get('messages', []), ensure_ascii=False))
+            resposta = self.tokens_resposta or _estimar_tokens(saida)
+            time.sleep((espera_ms + resposta * self.ms_por_token) / 1000)
+            with self._lock:
+                self._contadores['respostas'] += 1
+                self._contadores['tool_calls'] += 'tool_calls' in mensagem
+                self._contadores['tokens_prompt'] += prompt
+                self._contadores['tokens_resposta'] += resposta
+                self._contadores['bytes_recebidos'] += bytes_recebidos
+            return 200, {
+                'id': f'chatcmpl-{uuid.uuid4().hex[:24]}',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': pedido.get('model', 'gpt-4o-mini'),
+                'choices': [{
+                    'index': 0,
+                    'message': mensagem,
+                    'finish_reason': 'tool_calls' if 'tool_calls' in mensagem else 'stop',
+                    'logprobs': None,
+                }],
+                'usage': {'prompt_tokens': prompt, 'completion_tokens': resposta, 'total_tokens': prompt + resposta},
+            }, {}
+        finally:
+            with self._lock:
+                self._em_andamento -= 1
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return dict(self._contadores)
+
+    def iniciar(self) -> 'ServidorLLMStub':
+        self._thread = threading.Thread(target=self._servidor.serve_forever, name='llm-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *_):
+        self.parar()
+
+
+def main(argv=None) -> int:
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    args.add_argument('--host', default='127.0.0.1')
+    args.add_argument('--porta', type=int, default=8099)
+    args.add_argument('--distribuicao', choices=DISTRIBUICOES, default='fixa')
+    args.add_argument('--latencia-ms', type=float, default=0.0, help='Latência média por resposta.')
+    args.add_argument('--desvio-ms', type=float, default=0.0, help='Desvio (normal/lognormal) ou meia-largura (uniforme).')
+    args.add_argument('--ms-por-token', type=float, default=0.0, help='Custo extra por token de resposta.')
+    args.add_argument('--taxa-erro', type=float, default=0.0, help='Fração das requisições que falham (0 a 1).')
+    args.add_argument('--status-erro', default='500', help='Status HTTP sorteados nas falhas, ex.: 429,500,503.')
+    args.add_argument('--tokens-prompt', type=int, default=0, help='Tokens de entrada informados (0 = estimar).')
+    args.add_argument('--tokens-resposta', type=int, default=0, help='Tokens de saída informados (0 = estimar).')
+    args.add_argument('--semente', type=int, default=42)
+    opcoes = args.parse_args(argv)
+
+    servidor = ServidorLLMStub(
+        opcoes.host, opcoes.porta, Latencia(opcoes.distribuicao, opcoes.latencia_ms, opcoes.desvio_ms),
+        opcoes.ms_por_token, opcoes.taxa_erro, [int(s) for s in opcoes.status_erro.split(',')],
+        opcoes.tokens_prompt, opcoes.tokens_resposta, opcoes.semente,
+    )
+    print(f'Stub LLM em {servidor.base_url} (Ctrl+C para parar). Use APP_OPENAI_BASE_URL={servidor.base_url}')
+    try:
+        servidor._servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor._servidor.server_close()
+        print(json.dumps(servidor.estatisticas(), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+Benchmark de cada método do FabricaRepository sobre um banco sintético.
+
+Cada caso roda `--rodadas` vezes numa conexão própria; as escritas acontecem
+dentro de uma transação desfeita ao fim de cada rodada, então o banco em
+cache não muda. A memória (pico do tracemalloc) é medida numa execução à
+parte, para não distorcer os tempos.
+
+Baselines ficam em benchmarks/baselines/<nome>.json. Com --comparar, o
+processo sai com código 1 se a mediana de algum caso passar da baseline em
+mais que --tolerancia (padrão 25%).
+
+Uso:
+    python -m benchmarks.repositorios --escala 0.1 --rodadas 5 --salvar local
+    python -m benchmarks.repositorios --escala 0.1 --comparar local
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+
+from benchmarks.dados_sinteticos import banco_sintetico, tamanhos
+from persistencia.repositorios.fabrica_repo import FabricaRepository
+
+PASTA_BASELINES = Path(__file__).parent / 'baselines'
+STATUS_ABERTOS = ('Pendente', 'Em Produção')
+
+
+def _casos(n: dict) -> dict:
+    """Nome do método → função(repo). Cobre todos os métodos públicos do repositório."""
+    meio = {tabela: max(1, qtd // 2) for tabela, qtd in n.items()}
+    lote = list(range(1, min(n['pedidos'], 1000) + 1))
+    hoje = date.today().isoformat()
+    # Lista de fornecedor: metade dos materiais com preço novo e alguns materiais novos.
+    lista_precos = [{'nome': f'Material {i:05d}', 'tipo': 'Areia', 'custo_kg': 0.5, 'estoque_atual': 100.0}
+                    for i in range(1, meio['materiais'] + 1)]
+    lista_precos += [{'nome': f'Bench {i}', 'tipo': 'Areia', 'custo_kg': 0.5, 'estoque_atual': 100.0} for i in range(10)]
+    return {
+        'get_all_clientes': lambda r: r.get_all_clientes(),
+        'get_cliente_by_id': lambda r: r.get_cliente_by_id(meio['clientes']),
+        'save_cliente': lambda r: r.save_cliente({'nome': 'Bench', 'documento': 'bench-doc', 'endereco': 'x'}),
+        'delete_cliente': lambda r: r.delete_cliente(n['clientes'] + 1),
+        'get_all_materiais': lambda r: r.get_all_materiais(),
+        'get_materiais_by_tipo': lambda r: r.get_materiais_by_tipo('Cimento'),
+        'get_estoque_baixo': lambda r: r.get_estoque_baixo(),
+        'update_estoque': lambda r: r.update_estoque(meio['materiais'], 1234.5),
+        'save_material': lambda r: r.save_material({'tipo': 'Areia', 'nome': 'Bench', 'custo_kg': 0.1, 'estoque_atual': 1.0}),
+        'upsert_materiais': lambda r: r.upsert_materiais(lista_precos, 'bench'),
+        'get_historico_precos': lambda r: r.get_historico_precos(meio['materiais']),
+        'get_preco_em': lambda r: r.get_preco_em(meio['materiais'], hoje),
+        'get_precos_em': lambda r: r.get_precos_em(hoje),
+        'delete_material': lambda r: r.delete_material(n['materiais'] + 1),
+        'get_catalogo_elementos': lambda r: r.get_catalogo_elementos(),
+        'get_elemento_by_id': lambda r: r.get_elemento_by_id(meio['elementos']),
+        'save_elemento': lambda r: r.save_elemento({'nome': 'Bench', 'tipo': 'Bloco', 'volume_m3': 0.01, 'fck_necessario': 20.0, 'traco_id': 1}),
+        'delete_elemento': lambda r: r.delete_elemento(n['elementos'] + 1),
+        'get_tracos_padrao': lambda r: r.get_tracos_padrao(),
+        'get_traco_by_id': lambda r: r.get_traco_by_id(meio['tracos']),
+        'save_traco': lambda r: r.save_traco({'nome': 'Bench', 'fck_alvo': 25.0, 'traco_str': '1 : 2 : 3 : 0.5 a/c', 'consumo_cimento_m3': 350.0}),
+        'get_all_pedidos': lambda r: r.get_all_pedidos(),
+        'get_pedido_by_id': lambda r: r.get_pedido_by_id(meio['pedidos']),
+        'save_pedido': lambda r: r.save_pedido({'cliente_id': 1, 'elemento_id': 1, 'quantidade': 10, 'data_pedido': hoje, 'status': 'Pendente'}),
+        'update_pedido_status': lambda r: r.update_pedido_status(meio['pedidos'], 'Cancelado'),
+        'update_pedidos_status': lambda r: r.update_pedidos_status(lote, 'Cancelado'),
+        'get_resumo_pedidos': lambda r: r.get_resumo_pedidos(),
+        'get_pedidos_por_status': lambda r: r.get_pedidos_por_status(),
+        'reconstruir_rollup_semanal': lambda r: r.reconstruir_rollup_semanal(),
+        'get_tendencia_semanal': lambda r: r.get_tendencia_semanal(),
+        'get_estoque_por_tipo': lambda r: r.get_estoque_por_tipo(),
+        'get_demanda_pedidos': lambda r: r.get_demanda_pedidos(STATUS_ABERTOS),
+        'get_custo_pedidos': lambda r: r.get_custo_pedidos(STATUS_ABERTOS),
+        'get_custo_agregado': lambda r: r.get_custo_agregado('cliente', STATUS_ABERTOS),
+        'get_pedidos_mais_custosos': lambda r: r.get_pedidos_mais_custosos(50, STATUS_ABERTOS),
+        'get_marcador_custos': lambda r: r.get_marcador_custos(),
+        'get_marcador_pedidos': lambda r: r.get_marcador_pedidos(),
+    }
+
+
+def _engine(caminho: Path):
+    engine = create_engine(f'sqlite:///{caminho}')
+
+    @event.listens_for(engine, 'connect')
+    def _fk(dbapi_connection, _):
+        dbapi_connection.execute('PRAGMA foreign_keys=ON')
+
+    return engine
+
+
+def _rodada(engine, funcao) -> float:
+    """Segundos de uma chamada; a transação é sempre desfeita."""
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            inicio = time.perf_counter()
+            funcao(FabricaRepository(conn))
+            return time.perf_counter() - inicio
+        finally:
+            trans.rollback()
+
+
+def _pico_memoria_mb(engine, funcao) -> float:
+    tracemalloc.start()
+    try:
+        _rodada(engine, funcao)
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def medir(escala: float = 1.0, rodadas: int = 5, aquecimento: int = 1, filtro: str = None, semente: int = 42) -> dict:
+    """Estatísticas (ms) e pico de memória (MB) de cada caso."""
+    engine = _engine(banco_sintetico(escala, semente))
+    resultados = {}
+    for nome, funcao in _casos(tamanhos(escala)).items():
+        if filtro and filtro not in nome:
+            continue
+        for _ in range(aquecimento):
+            _rodada(engine, funcao)
+        tempos = [_rodada(engine, funcao) * 1000 for _ in range(rodadas)]
+        resultados[nome] = {
+            'min_ms': min(tempos),
+            'max_ms': max(tempos),
+            'media_ms': statistics.fmean(tempos),
+            'mediana_ms': statistics.median(tempos),
+            'desvio_ms': statistics.stdev(tempos) if len(tempos) > 1 else 0.0,
+            'rodadas': rodadas,
+            'ops_s': 1000 / statistics.fmean(tempos) if statistics.fmean(tempos) else float('inf'),
+            'pico_mb': _pico_memoria_mb(engine, funcao),
+        }
+    engine.dispose()
+    return resultados
+
+
+def comparar(resultados: dict, baseline: dict, tolerancia: float) -> list:
+    """(caso, mediana atual, mediana da baseline) dos casos que regrediram."""
+    regressoes = []
+    for nome, atual in resultados.items():
+        base = baseline.get(nome)
+        if base and atual['mediana_ms'] > base['mediana_ms'] * (1 + tolerancia):
+            regressoes.append((nome, atual['mediana_ms'], base['mediana_ms']))
+    return regressoes
+
+
+def imprimir(resultados: dict, baseline: dict = None):
+    colunas = ('Min', 'Max', 'Média', 'Mediana', 'Desvio', 'OPS', 'Pico MB')
+    largura = max(len(n) for n in resultados) + 2
+    print(f"{'Caso (ms)':<{largura}}" + ''.join(f'{c:>11}' for c in colunas) + ('   vs baseline' if baseline else ''))
+    print('-' * (largura + 11 * len(colunas) + (15 if baseline else 0)))
+    for nome, r in sorted(resultados.items(), key=lambda item: item[1]['mediana_ms']):
+        linha = f'{nome:<{largura}}' + ''.join(
+            f'{r[c]:>11.3f}' for c in ('min_ms', 'max_ms', 'media_ms', 'mediana_ms', 'desvio_ms', 'ops_s', 'pico_mb'))
+        if baseline and nome in baseline:
+            linha += f"   {r['mediana_ms'] / baseline[nome]['mediana_ms'] - 1:+.1%}"
+        print(linha)
+
+
+def main(argv=None) -> int:
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    args.add_argument('--escala', type=float, default=1.0, help='Fração do tamanho cheio (1.0 = 1 milhão de pedidos).')
+    args.add_argument('--rodadas', type=int, default=5)
+    args.add_argument('--semente', type=int, default=42)
+    args.add_argument('-k', dest='filtro', help='Só os casos cujo nome contém este texto.')
+    args.add_argument('--salvar', metavar='NOME', help='Grava os resultados como baseline.')
+    args.add_argument('--comparar', metavar='NOME', help='Compara com a baseline e falha se houver regressão.')
+    args.add_argument('--tolerancia', type=float, default=0.25)
+    opcoes = args.parse_args(argv)
+
+    resultados = medir(opcoes.escala, opcoes.rodadas, filtro=opcoes.filtro, semente=opcoes.semente)
+    baseline = None
+    if opcoes.comparar:
+        caminho = PASTA_BASELINES / f'{opcoes.comparar}.json'
+        baseline = json.loads(caminho.read_text(encoding='utf-8'))
+        if baseline.get('escala') != opcoes.escala:
+            print(f"Aviso: baseline gerada na escala {baseline.get('escala')}, execução na escala {opcoes.escala}.", file=sys.stderr)
+        baseline = baseline['casos']
+    imprimir(resultados, baseline)
+
+    if opcoes.salvar:
+        PASTA_BASELINES.mkdir(exist_ok=True)
+        caminho = PASTA_BASELINES / f'{opcoes.salvar}.json'
+        caminho.write_text(json.dumps({'escala': opcoes.escala, 'rodadas': opcoes.rodadas, 'casos': resultados},
+                                      indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f'\nBaseline gravada em {caminho}')
+    if baseline:
+        regressoes = comparar(resultados, baseline, opcoes.tolerancia)
+        for nome, atual, base in regressoes:
+            print(f'REGRESSÃO {nome}: {atual:.3f} ms (baseline {base:.3f} ms)', file=sys.stderr)
+        return 1 if regressoes else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,59 +3,72 @@ Serviço de AI Generativa — Inteligência de Concreto.
 Refatorado para utilizar LangChain e Pydantic (Structured Outputs),
 conforme ensinado na Aula 05.
 """
+import importlib
 import json
 import logging
+import sys
+import time
 from datetime import datetime
-from pydantic import BaseModel, Field
-
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage
-from langchain_core.tools import tool
 
 import config
+from persistencia import perfilador
+from persistencia.logger import ms_desde
 
 log = logging.getLogger(__name__)
 
-from tools.limites_normativos import consultar_limites_normativos
-
-# --- 2. Modelos Pydantic para Structured Output (Aula 05 - Slide 29) ---
-class MaterialDetalhe(BaseModel):
-    tipo: str = Field(description="Nome ou tipo do material")
-    kg: float = Field(description="Quantidade em kg (ou litros para água)")
-    custo_kg: float = Field(description="Custo unitário")
-
-class MateriaisDict(BaseModel):
-    Cimento: MaterialDetalhe
-    Areia: MaterialDetalhe
-    Brita: MaterialDetalhe
-    Agua: MaterialDetalhe = Field(alias="Água")
-    Aditivo: MaterialDetalhe
-
-class TracoOutput(BaseModel):
-    raciocinio_cot: str = Field(description="Chain of Thought: Seu processo de raciocínio lógico, passo a passo, detalhando todas as restrições da norma ANTES de preencher o restante dos campos.", alias="raciocinio_cot")
-    traco_sugerido: str = Field(description="Proporção do traço no formato 'Cimento : Areia : Brita : a/c', ex: 1 : 2.2 : 3.1 : 0.5 a/c")
-    cimento_tipo: str
-    fck_alvo: float
-    slump_alvo: float
-    agregado_max: str
-    relacao_ac: float
-    consumo_cimento_m3: float
-    justificativa: str = Field(description="Texto longo em Markdown com a análise técnica")
-    custo_estimado: float = Field(description="Custo total estimado em R$/m³. OBRIGATÓRIO calcular: somar (kg × custo_kg) de CADA material (Cimento, Areia, Brita, Água, Aditivo). Se custos não forem informados nos materiais_selecionados, usar referência: Cimento R$0.65/kg, Areia R$0.08/kg, Brita R$0.10/kg, Água R$0.005/L, Aditivo R$5.20/kg. Este valor NUNCA pode ser 0.00.")
-    materiais_m3: MateriaisDict
-
-class OtimizacaoOutput(BaseModel):
-    nome_otimizado: str
-    traco_original: str
-    traco_otimizado: str
-    consumo_original: float
-    consumo_otimizado: float
-    aditivo_kg: float
-    economia_liquida_m3: float
-    justificativa: str = Field(description="Relatório Markdown de engenharia")
-
-
-# --- 3. Helper: Escapar cifrão para Streamlit Markdown ---
+# --- 1. Imports adiados (LangChain, pydantic) ---
+# Importar LangChain custa ~0,6 s. As páginas importam este módulo no topo,
+# então esses nomes só são carregados na primeira chamada à IA (ou no
+# primeiro acesso como atributo do módulo, via __getattr__).
+_ADIADOS = {
+    "ChatOpenAI": ("langchain_openai", "ChatOpenAI"),
+    "SystemMessage": ("langchain_core.messages", "SystemMessage"),
+    "HumanMessage": ("langchain_core.messages", "HumanMessage"),
+    "ToolMessage": ("langchain_core.messages", "ToolMessage"),
+    "consultar_limites_normativos": ("tools.limites_normativos", "consultar_limites_normativos"),
+    "MaterialDetalhe": ("components.ai_modelos", "MaterialDetalhe"),
+    "MateriaisDict": ("components.ai_modelos", "MateriaisDict"),
+    "TracoOutput": ("components.ai_modelos", "TracoOutput"),
+    "OtimizacaoOutput": ("components.ai_modelos", "OtimizacaoOutput"),
+}
+
+
+def _adiado(nome: str):
+    """
+    Nome adiado lido como atributo do módulo: o que já estiver definido (ex.:
+    mocks de teste) tem prioridade; senão o __getattr__ importa e fixa o nome.
+    """
+    return getattr(sys.modules[__name__], nome)
+
+
+def _carregar_dependencias():
+    """Importa de uma vez todos os nomes adiados (usado no aquecimento)."""
+    for nome in _ADIADOS:
+        _adiado(nome)
+
+
+def __getattr__(nome):
+    if nome in _ADIADOS:
+        modulo, atributo = _ADIADOS[nome]
+        valor = getattr(importlib.import_module(modulo), atributo)
+        globals()[nome] = valor
+        return valor
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
+def _criar_llm(temperature: float):
+    """ChatOpenAI com a chave, o endereço (OPENAI_BASE_URL) e os limites de config."""
+    return _adiado("ChatOpenAI")(
+        api_key=config.OPENAI_API_KEY,
+        base_url=config.OPENAI_BASE_URL,
+        model="gpt-4o-mini",
+        temperature=temperature,
+        timeout=config.OPENAI_TIMEOUT_S,
+        max_retries=config.OPENAI_MAX_RETRIES,
+    )
+
+
+# --- 2. Helper: Escapar cifrão para Streamlit Markdown ---
 
 def _escapar_cifrao(obj):
     """
@@ -71,6 +84,25 @@ def _escapar_cifrao(obj):
     return obj
 
 
+# --- 3. Helper: chamada ao LLM com tempo registrado no log ---
+
+def _invocar(etapa: str, runnable, entrada):
+    """
+    Executa `runnable.invoke(entrada)` e registra a latência (duracao_ms) com a
+    etapa, para que o trace do rerun mostre quanto tempo cada chamada levou.
+    """
+    inicio = time.perf_counter()
+    ok = False
+    try:
+        with perfilador.medir("ia", etapa):
+            resposta = runnable.invoke(entrada)
+        ok = True
+        return resposta
+    finally:
+        log.info('LLM %s: %s', etapa, 'ok' if ok else 'falhou',
+                 extra={'duracao_ms': ms_desde(inicio), 'etapa': etapa, 'ok': ok})
+
+
 # --- 4. Lógica Principal com LangChain ---
 
 def sugerir_traco(
@@ -80,15 +112,14 @@ def sugerir_traco(
     materiais_selecionados: dict = None,
 ) -> dict:
 
+    SystemMessage, HumanMessage, ToolMessage = (_adiado(n) for n in ("SystemMessage", "HumanMessage", "ToolMessage"))
+    consultar_limites_normativos = _adiado("consultar_limites_normativos")
+    TracoOutput = _adiado("TracoOutput")
     if materiais_selecionados is None:
         materiais_selecionados = {}
 
     # Instancia o modelo via LangChain
-    llm = ChatOpenAI(
-        api_key=config.OPENAI_API_KEY,
-        model="gpt-4o-mini",
-        temperature=0.2
-    )
+    llm = _criar_llm(temperature=0.2)
 
     # Associa a ferramenta (Tool Calling) ao modelo
     llm_com_tools = llm.bind_tools([consultar_limites_normativos])
@@ -112,14 +143,14 @@ def sugerir_traco(
 
     try:
         # Passo 1: O modelo raciocina e decide usar a ferramenta
-        resposta_inicial = llm_com_tools.invoke(messages)
+        resposta_inicial = _invocar("sugerir_traco.ferramentas", llm_com_tools, messages)
         messages.append(resposta_inicial)
 
         # Se o LLM solicitou a ferramenta, nós executamos
         if resposta_inicial.tool_calls:
             for tool_call in resposta_inicial.tool_calls:
                 if tool_call["name"] == "consultar_limites_normativos":
-                    resultado_tool = consultar_limites_normativos.invoke(tool_call["args"])
+                    resultado_tool = _invocar("sugerir_traco.limites_normativos", consultar_limites_normativos, tool_call["args"])
 
                     messages.append(ToolMessage(
                         tool_call_id=tool_call["id"],
@@ -129,7 +160,7 @@ def sugerir_traco(
 
         # Passo 2: Exige a formatação de saída como JSON Estruturado (Structured Output)
         llm_estruturado = llm.with_structured_output(TracoOutput)
-        resposta_final = llm_estruturado.invoke(messages)
+        resposta_final = _invocar("sugerir_traco.estruturado", llm_estruturado, messages)
 
         # Converte o Pydantic BaseModel de volta para um dicionário para o Streamlit renderizar
         resultado = resposta_final.model_dump(by_alias=True)
@@ -152,7 +183,7 @@ def sugerir_traco(
         return _escapar_cifrao(resultado)
 
     except Exception as e:
-        log.error(f"Erro ao processar LLM sugerir_traco: {e}")
+        log.error("Erro ao processar LLM sugerir_traco: %s", e)
         return {
             "raciocinio_cot": "Falha na geração do modelo.",
             "traco_sugerido": "Erro na IA",
@@ -169,13 +200,11 @@ def sugerir_traco(
 
 
 def otimizar_traco(traco_dict: dict) -> dict:
+    SystemMessage, HumanMessage = _adiado("SystemMessage"), _adiado("HumanMessage")
+    OtimizacaoOutput = _adiado("OtimizacaoOutput")
     traco_json = json.dumps(traco_dict, ensure_ascii=False)
 
-    llm = ChatOpenAI(
-        api_key=config.OPENAI_API_KEY,
-        model="gpt-4o-mini",
-        temperature=0.3
-    )
+    llm = _criar_llm(temperature=0.3)
 
     # Aplicação direta do output estruturado
     llm_estruturado = llm.with_structured_output(OtimizacaoOutput)
@@ -197,12 +226,12 @@ Regras:
     ]
 
     try:
-        resposta = llm_estruturado.invoke(messages)
+        resposta = _invocar("otimizar_traco", llm_estruturado, messages)
         # Escapar '$' para evitar renderização LaTeX no Streamlit (R$0.70 → R\$0.70)
         return _escapar_cifrao(resposta.model_dump())
 
     except Exception as e:
-        log.error(f"Erro ao processar LLM otimizar_traco: {e}")
+        log.error("Erro ao processar LLM otimizar_traco: %s", e)
         return {
             "nome_otimizado": "Erro de Otimização IA",
             "traco_original": traco_dict.get("traco_str", ""),
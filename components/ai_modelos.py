@@ -0,0 +1,43 @@
+"""
+Modelos Pydantic para Structured Output do serviço de IA (Aula 05 - Slide 29).
+
+Ficam separados de components.ai_concreto para que importar o serviço não
+carregue o pydantic; ai_concreto importa este módulo na primeira chamada.
+"""
+from pydantic import BaseModel, Field
+
+
+class MaterialDetalhe(BaseModel):
+    tipo: str = Field(description="Nome ou tipo do material")
+    kg: float = Field(description="Quantidade em kg (ou litros para água)")
+    custo_kg: float = Field(description="Custo unitário")
+
+class MateriaisDict(BaseModel):
+    Cimento: MaterialDetalhe
+    Areia: MaterialDetalhe
+    Brita: MaterialDetalhe
+    Agua: MaterialDetalhe = Field(alias="Água")
+    Aditivo: MaterialDetalhe
+
+class TracoOutput(BaseModel):
+    raciocinio_cot: str = Field(description="Chain of Thought: Seu processo de raciocínio lógico, passo a passo, detalhando todas as restrições da norma ANTES de preencher o restante dos campos.", alias="raciocinio_cot")
+    traco_sugerido: str = Field(description="Proporção do traço no formato 'Cimento : Areia : Brita : a/c', ex: 1 : 2.2 : 3.1 : 0.5 a/c")
+    cimento_tipo: str
+    fck_alvo: float
+    slump_alvo: float
+    agregado_max: str
+    relacao_ac: float
+    consumo_cimento_m3: float
+    justificativa: str = Field(description="Texto longo em Markdown com a análise técnica")
+    custo_estimado: float = Field(description="Custo total estimado em R$/m³. OBRIGATÓRIO calcular: somar (kg × custo_kg) de CADA material (Cimento, Areia, Brita, Água, Aditivo). Se custos não forem informados nos materiais_selecionados, usar referência: Cimento R$0.65/kg, Areia R$0.08/kg, Brita R$0.10/kg, Água R$0.005/L, Aditivo R$5.20/kg. Este valor NUNCA pode ser 0.00.")
+    materiais_m3: MateriaisDict
+
+class OtimizacaoOutput(BaseModel):
+    nome_otimizado: str
+    traco_original: str
+    traco_otimizado: str
+    consumo_original: float
+    consumo_otimizado: float
+    aditivo_kg: float
+    economia_liquida_m3: float
+    justificativa: str = Field(description="Relatório Markdown de engenharia")
@@ -0,0 +1,152 @@
+"""
+Aquecimento do processo e sonda de saúde.
+
+`aquecer()` roda uma única vez por processo (não por sessão): cria a engine,
+inicializa/migra o banco, abre as conexões do pool, carrega os caches de
+referência (versão e mapa de permissões, hash fictício do login) e, se
+configurado, as dependências do cliente LLM. `saude()` é barata e pode ser
+chamada a cada rerun da página de saúde ou por `python -m components.aquecimento`.
+"""
+import logging
+import sys
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+import config
+from persistencia import auth, sessao
+from persistencia.database import DatabaseManager
+from persistencia.logger import ms_desde
+from persistencia.unit_of_work import UnitOfWork
+from components import servicos_gerenciador as servico
+
+log = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_estado = {'pronto': False, 'concluido_em': None, 'etapas': {}}
+
+
+@contextmanager
+def _etapa(etapas: dict, nome: str, obrigatoria: bool = True):
+    """Cronometra uma etapa; falhas de etapas opcionais só geram aviso."""
+    inicio = time.perf_counter()
+    try:
+        yield
+        etapas[nome] = {'ms': ms_desde(inicio), 'ok': True}
+    except Exception as e:
+        etapas[nome] = {'ms': ms_desde(inicio), 'ok': False, 'erro': str(e)}
+        if obrigatoria:
+            raise
+        log.warning(f"Aquecimento: etapa '{nome}' falhou: {e}")
+
+
+def _encher_pool(engine) -> int:
+    """Abre as conexões do pool ao mesmo tempo e as devolve abertas ao pool."""
+    tamanho = engine.pool.size() if isinstance(engine.pool, QueuePool) else 1
+    n = config.AQUECER_CONEXOES or tamanho
+    with ExitStack() as pilha:
+        for _ in range(n):
+            pilha.enter_context(engine.connect()).execute(text('SELECT 1'))
+    return n
+
+
+def _preparar_caches():
+    sessao.versao_permissoes()
+    auth.aquecer()
+    with UnitOfWork() as uow:
+        perfis = uow.permissoes.get_all_profiles()
+        paginas = uow.permissoes.get_all_pages()
+    for perfil in perfis.get('nome_perfil', []):
+        servico.get_allowed_pages_for_profile(perfil)
+    for arquivo in paginas.get('nome_arquivo', []):
+        servico.get_allowed_roles_for_page(arquivo)
+
+
+def _preparar_llm():
+    from components import ai_concreto
+    ai_concreto._carregar_dependencias()
+    ai_concreto.ChatOpenAI(api_key=config.OPENAI_API_KEY or 'aquecimento', model='gpt-4o-mini')
+
+
+def aquecer(incluir_llm: bool = None) -> dict:
+    """
+    Executa o aquecimento uma vez por processo e retorna o estado.
+
+    Falhas no banco são propagadas (e a próxima chamada tenta de novo);
+    caches e LLM são opcionais e só ficam registrados nas etapas.
+    """
+    incluir_llm = config.AQUECER_LLM if incluir_llm is None else incluir_llm
+    with _lock:
+        if _estado['pronto']:
+            return estado()
+        etapas = {}
+        inicio = time.perf_counter()
+        try:
+            if config.DATABASE_ENABLED:
+                with _etapa(etapas, 'banco'):
+                    if config.INITIALIZE_DATABASE_ON_STARTUP:
+                        DatabaseManager.initialize_database()
+                    engine = DatabaseManager.get_engine()
+                with _etapa(etapas, 'pool'):
+                    _encher_pool(engine)
+                with _etapa(etapas, 'caches', obrigatoria=False):
+                    _preparar_caches()
+            if incluir_llm:
+                with _etapa(etapas, 'llm', obrigatoria=False):
+                    _preparar_llm()
+        finally:
+            _estado['etapas'] = etapas
+        _estado['pronto'] = True
+        _estado['concluido_em'] = time.time()
+        log.info('Aquecimento concluído.', extra={'duracao_ms': ms_desde(inicio), 'etapas': etapas})
+        return estado()
+
+
+def estado() -> dict:
+    return {**_estado, 'etapas': dict(_estado['etapas'])}
+
+
+def estatisticas_pool(engine) -> dict:
+    pool = engine.pool
+    dados = {'classe': type(pool).__name__, 'status': pool.status()}
+    for nome in ('size', 'checkedin', 'checkedout', 'overflow'):
+        if callable(getattr(pool, nome, None)):
+            dados[nome] = getattr(pool, nome)()
+    return dados
+
+
+def saude() -> dict:
+    """Prontidão, estatísticas do pool e tempo de ida e volta ao banco (SELECT 1)."""
+    resultado = {'aquecido': _estado['pronto'], 'etapas': dict(_estado['etapas']), 'banco_ok': False}
+    if not config.DATABASE_ENABLED:
+        resultado['erro'] = 'Banco de dados desabilitado.'
+        return resultado
+    try:
+        engine = DatabaseManager.get_engine()
+        inicio = time.perf_counter()
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+        resultado['ida_e_volta_ms'] = ms_desde(inicio)
+        resultado['banco_ok'] = True
+        resultado['pool'] = estatisticas_pool(engine)
+    except Exception as e:
+        resultado['erro'] = str(e)
+    return resultado
+
+
+def main() -> int:
+    try:
+        aquecer()
+    except Exception as e:
+        print(f'Aquecimento falhou: {e}', file=sys.stderr)
+    dados = saude()
+    for chave, valor in dados.items():
+        print(f'{chave}: {valor}')
+    return 0 if dados['aquecido'] and dados['banco_ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Importação de listas de preço e estoque de fornecedores (CSV ou XLSX).
+
+A planilha é lida em blocos e normalizada (sinônimos de coluna, números com
+vírgula decimal, R$). `comparar` casa cada linha com fab_materiais pelo nome
+(sem diferenciar maiúsculas nem espaços) e classifica a ação: atualizar, novo
+(material desconhecido com tipo e custo informados), sem mudança ou um erro.
+`aplicar` grava as linhas atualizar/novo num único upsert em lote; os custos
+alterados entram em fab_materiais_precos.
+
+Os custos gravados em fab_materiais são os que as páginas de pedido e do
+laboratório enviam à IA, então o cálculo de custo já usa os preços novos.
+"""
+import importlib.util
+import logging
+import numpy as np
+import pandas as pd
+from persistencia.unit_of_work import UnitOfWork
+
+log = logging.getLogger(__name__)
+
+COLUNAS = ("nome", "tipo", "custo_kg", "estoque_atual")
+# Cabeçalhos comuns nas planilhas de fornecedor → coluna de fab_materiais.
+SINONIMOS = {
+    "material": "nome", "descricao": "nome", "descrição": "nome", "produto": "nome",
+    "categoria": "tipo",
+    "preco_kg": "custo_kg", "preço_kg": "custo_kg", "preco": "custo_kg", "preço": "custo_kg", "custo": "custo_kg",
+    "estoque": "estoque_atual", "estoque_kg": "estoque_atual", "quantidade_kg": "estoque_atual",
+}
+# Mesmos valores do CHECK de fab_materiais.tipo.
+TIPOS = ("Cimento", "Areia", "Brita", "Aditivo", "Água", "Adição", "Pigmento", "Fibra")
+LINHAS_POR_BLOCO = 5000
+PRIMEIRA_LINHA = 2
+
+ATUALIZAR = "atualizar"
+NOVO = "novo"
+SEM_MUDANCA = "sem mudança"
+NAO_ENCONTRADO = "não encontrado"
+TIPO_DIVERGENTE = "tipo divergente"
+VALOR_INVALIDO = "valor inválido"
+REPETIDO = "repetido na planilha"
+ACOES_GRAVADAS = (ATUALIZAR, NOVO)
+
+
+def xlsx_disponivel() -> bool:
+    return importlib.util.find_spec("openpyxl") is not None
+
+
+def _chave(nomes: pd.Series) -> pd.Series:
+    return nomes.fillna("").astype(str).str.strip().str.casefold().str.replace(r"\s+", " ", regex=True)
+
+
+def _numero(valores: pd.Series) -> pd.Series:
+    """Texto → float; aceita 'R$ 1.234,56' e '0.68'. Vazio vira NaN; inválido vira -inf."""
+    texto = valores.fillna("").astype(str).str.replace(r"[R$\s]", "", regex=True)
+    com_virgula = texto.str.contains(",", regex=False)
+    texto = texto.mask(com_virgula, texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    numeros = pd.to_numeric(texto, errors="coerce")
+    return numeros.mask(numeros.isna() & (texto != ""), -np.inf)
+
+
+def _normalizar_bloco(bloco: pd.DataFrame) -> pd.DataFrame:
+    bloco = bloco.rename(columns=lambda c: str(c).strip().lower().replace(" ", "_"))
+    bloco = bloco.rename(columns=SINONIMOS)
+    if "nome" not in bloco.columns:
+        raise ValueError("A planilha precisa de uma coluna 'nome' (ou 'material').")
+    bloco = bloco.reindex(columns=list(COLUNAS))
+    bloco["nome"] = bloco["nome"].fillna("").astype(str).str.strip()
+    bloco["tipo"] = bloco["tipo"].fillna("").astype(str).str.strip()
+    bloco["custo_kg"] = _numero(bloco["custo_kg"])
+    bloco["estoque_atual"] = _numero(bloco["estoque_atual"])
+    return bloco
+
+
+def ler_planilha(arquivo, nome: str, linhas_por_bloco: int = LINHAS_POR_BLOCO) -> pd.DataFrame:
+    """Lê a lista de preços (CSV em blocos ou XLSX), já normalizada; o índice é a linha da planilha."""
+    if nome.lower().endswith((".xlsx", ".xls")):
+        if not xlsx_disponivel():
+            raise ValueError("Leitura de XLSX requer o pacote openpyxl; envie um CSV.")
+        blocos = [pd.read_excel(arquivo, dtype=str)]
+    else:
+        blocos = pd.read_csv(arquivo, dtype=str, sep=None, engine="python", encoding="utf-8-sig",
+                             chunksize=linhas_por_bloco)
+    partes = [_normalizar_bloco(bloco) for bloco in blocos]
+    if not partes:
+        return pd.DataFrame(columns=list(COLUNAS))
+    df = pd.concat(partes)
+    if df["custo_kg"].isna().all() and df["estoque_atual"].isna().all():
+        raise ValueError("A planilha precisa de 'custo_kg' ou 'estoque_atual'.")
+    df.index = df.index + PRIMEIRA_LINHA
+    return df.rename_axis("linha")
+
+
+def comparar(planilha: pd.DataFrame, materiais: pd.DataFrame) -> pd.DataFrame:
+    """
+    Diferença entre a planilha e fab_materiais, uma linha por linha da planilha.
+    Valores ausentes na planilha mantêm os atuais (custo_novo/estoque_novo já
+    vêm preenchidos). A coluna `acao` diz o que `aplicar` fará com a linha.
+    """
+    atuais = materiais[["id", "nome", "tipo", "custo_kg", "estoque_atual"]].rename(columns={
+        "nome": "nome_atual", "tipo": "tipo_atual", "custo_kg": "custo_atual", "estoque_atual": "estoque_anterior"})
+    atuais = atuais.assign(chave=_chave(atuais["nome_atual"])).drop_duplicates("chave")
+    diff = (planilha.reset_index().assign(chave=lambda d: _chave(d["nome"]))
+            .merge(atuais, on="chave", how="left").set_index("linha"))
+
+    tipos = {t.casefold(): t for t in TIPOS}
+    tipo_informado = diff["tipo"].str.casefold().map(tipos)
+    diff["tipo_novo"] = tipo_informado.fillna(diff["tipo_atual"])
+    diff["custo_novo"] = diff["custo_kg"].fillna(diff["custo_atual"])
+    diff["estoque_novo"] = diff["estoque_atual"].fillna(diff["estoque_anterior"]).fillna(0.0)
+    diff["variacao_pct"] = ((diff["custo_novo"] / diff["custo_atual"] - 1) * 100).replace([np.inf, -np.inf], np.nan)
+
+    encontrado = diff["id"].notna()
+    mudou = (~np.isclose(diff["custo_novo"], diff["custo_atual"])) | (~np.isclose(diff["estoque_novo"], diff["estoque_anterior"]))
+    acao = np.select(
+        [
+            (diff[["custo_kg", "estoque_atual"]] < 0).any(axis=1) | (diff["nome"] == ""),
+            diff["chave"].duplicated(keep="last"),
+            (diff["tipo"] != "") & tipo_informado.isna(),
+            encontrado & tipo_informado.notna() & (tipo_informado != diff["tipo_atual"]),
+            encontrado & mudou,
+            encontrado,
+            tipo_informado.notna() & diff["custo_kg"].notna(),
+        ],
+        [VALOR_INVALIDO, REPETIDO, TIPO_DIVERGENTE, TIPO_DIVERGENTE, ATUALIZAR, SEM_MUDANCA, NOVO],
+        default=NAO_ENCONTRADO,
+    )
+    diff["acao"] = acao
+    return diff[["nome", "id", "nome_atual", "tipo_novo", "custo_atual", "custo_novo", "variacao_pct",
+                 "estoque_anterior", "estoque_novo", "acao"]]
+
+
+def resumo(diff: pd.DataFrame) -> dict:
+    return diff["acao"].value_counts().to_dict()
+
+
+def aplicar(diff: pd.DataFrame, origem: str = None) -> int:
+    """Grava as linhas 'atualizar' e 'novo' num único upsert; retorna quantos materiais foram gravados."""
+    gravar = diff[diff["acao"].isin(ACOES_GRAVADAS)]
+    registros = [
+        {"nome": nome, "tipo": tipo, "custo_kg": float(custo), "estoque_atual": float(estoque)}
+        for nome, tipo, custo, estoque in zip(gravar["nome_atual"].fillna(gravar["nome"]), gravar["tipo_novo"],
+                                              gravar["custo_novo"], gravar["estoque_novo"])
+    ]
+    with UnitOfWork() as uow:
+        gravados = uow.fabrica.upsert_materiais(registros, origem)
+    log.info("Lista de preços aplicada (%s): %d material(is) gravado(s).", origem or "-", gravados)
+    return gravados
+
+
+def get_diff(planilha: pd.DataFrame) -> pd.DataFrame:
+    with UnitOfWork() as uow:
+        materiais = uow.fabrica.get_all_materiais()
+    return comparar(planilha, materiais)
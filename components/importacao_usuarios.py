@@ -0,0 +1,122 @@
+"""
+Importação e exportação de usuários em lote (CSV ou XLSX).
+
+A planilha tem as colunas login_usuario, nome_completo, perfil (nome do
+perfil de acesso) e senha. A validação é feita na tabela inteira de uma vez
+e devolve os erros por linha da planilha; só as linhas válidas são
+importadas. As senhas são criptografadas em paralelo (auth.hash_passwords) e
+os usuários entram num único INSERT em lote, na mesma transação.
+
+A exportação não inclui as senhas: para reimportar um arquivo exportado,
+informe uma senha padrão para as linhas sem senha.
+"""
+import importlib.util
+import io
+import logging
+import time
+import pandas as pd
+from persistencia.auth import hash_passwords
+from persistencia.unit_of_work import UnitOfWork
+
+log = logging.getLogger(__name__)
+
+COLUNAS = ("login_usuario", "nome_completo", "perfil", "senha")
+COLUNAS_OBRIGATORIAS = ("login_usuario", "nome_completo", "perfil")
+COLUNAS_EXPORTACAO = ("login_usuario", "nome_completo", "perfil")
+# Linha 1 da planilha é o cabeçalho.
+PRIMEIRA_LINHA = 2
+
+
+def xlsx_disponivel() -> bool:
+    return importlib.util.find_spec("openpyxl") is not None
+
+
+def ler_planilha(arquivo, nome: str) -> pd.DataFrame:
+    """Lê CSV ou XLSX (pela extensão de `nome`) como texto, com os nomes de coluna normalizados."""
+    if nome.lower().endswith((".xlsx", ".xls")):
+        if not xlsx_disponivel():
+            raise ValueError("Leitura de XLSX requer o pacote openpyxl; envie um CSV.")
+        df = pd.read_excel(arquivo, dtype=str)
+    else:
+        df = pd.read_csv(arquivo, dtype=str, sep=None, engine="python", encoding="utf-8-sig")
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    faltando = [c for c in COLUNAS_OBRIGATORIAS if c not in df.columns]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(faltando)}.")
+    return df.reindex(columns=list(COLUNAS))
+
+
+def validar(df: pd.DataFrame, perfis: dict, logins_existentes: set, senha_padrao: str = "") -> tuple:
+    """
+    Separa as linhas válidas das inválidas.
+
+    `perfis` mapeia nome do perfil → perfil_id (a comparação ignora
+    maiúsculas). Retorna (válidas com perfil_id, erros com linha, login e
+    motivo); cada linha inválida aparece uma vez, com o primeiro motivo.
+    """
+    dados = df.fillna("").astype(str).apply(lambda col: col.str.strip())
+    dados["senha"] = dados["senha"].where(dados["senha"] != "", senha_padrao)
+    dados["linha"] = range(PRIMEIRA_LINHA, PRIMEIRA_LINHA + len(dados))
+    por_nome = {str(nome).strip().lower(): int(pid) for nome, pid in perfis.items()}
+    dados["perfil_id"] = dados["perfil"].str.lower().map(por_nome)
+
+    motivo = pd.Series("", index=dados.index)
+    regras = [
+        (dados["login_usuario"] == "", "Login vazio."),
+        (dados["login_usuario"].str.contains(r"\s", regex=True), "Login com espaços."),
+        (dados["nome_completo"] == "", "Nome vazio."),
+        (dados["perfil_id"].isna(), "Perfil inexistente."),
+        (dados["senha"] == "", "Senha vazia."),
+        (dados["login_usuario"].isin(logins_existentes), "Login já existe."),
+        (dados["login_usuario"].duplicated(keep="first") & (dados["login_usuario"] != ""), "Login repetido na planilha."),
+    ]
+    for condicao, texto in regras:
+        motivo = motivo.mask((motivo == "") & condicao, texto)
+
+    invalidas = motivo != ""
+    erros = dados.loc[invalidas, ["linha", "login_usuario"]].assign(motivo=motivo[invalidas]).reset_index(drop=True)
+    validas = dados.loc[~invalidas].astype({"perfil_id": int}).reset_index(drop=True)
+    return validas, erros
+
+
+def importar(df: pd.DataFrame, senha_padrao: str = "", workers: int = None) -> dict:
+    """
+    Valida e importa as linhas válidas numa transação. Retorna o total
+    importado, os erros (DataFrame) e os tempos de hash e gravação em ms.
+    """
+    with UnitOfWork() as uow:
+        df_perfis = uow.usuarios.get_all_perfis()
+        perfis = dict(zip(df_perfis["nome_perfil"], df_perfis["perfil_id"]))
+        validas, erros = validar(df, perfis, uow.usuarios.get_logins(), senha_padrao)
+
+        inicio = time.perf_counter()
+        hashes = hash_passwords(validas["senha"], workers=workers)
+        hash_ms = (time.perf_counter() - inicio) * 1000
+
+        inicio = time.perf_counter()
+        registros = [
+            {"login_usuario": login, "senha_criptografada": h, "nome_completo": nome, "perfil_id": int(perfil_id)}
+            for login, nome, perfil_id, h in zip(validas["login_usuario"], validas["nome_completo"], validas["perfil_id"], hashes)
+        ]
+        importados = uow.usuarios.inserir_usuarios(registros)
+        gravacao_ms = (time.perf_counter() - inicio) * 1000
+
+    log.info("Importação de usuários: %d importados, %d com erro (hash %.0f ms, gravação %.0f ms).",
+             importados, len(erros), hash_ms, gravacao_ms)
+    return {"importados": importados, "erros": erros, "hash_ms": hash_ms, "gravacao_ms": gravacao_ms}
+
+
+def exportar() -> pd.DataFrame:
+    """Usuários no formato da importação, sem a coluna de senha."""
+    with UnitOfWork() as uow:
+        df = uow.usuarios.get_all_users_detailed()
+    return df.rename(columns={"nome_perfil": "perfil"}).reindex(columns=list(COLUNAS_EXPORTACAO))
+
+
+def para_arquivo(df: pd.DataFrame, formato: str) -> bytes:
+    """Conteúdo de `df` como 'csv' ou 'xlsx'."""
+    if formato == "xlsx":
+        buffer = io.BytesIO()
+        df.to_excel(buffer, index=False)
+        return buffer.getvalue()
+    return df.to_csv(index=False).encode("utf-8-sig")
@@ -0,0 +1,146 @@
+"""
+Previsão de Demanda de Materiais — Projeção de ruptura de estoque.
+
+Combina a demanda já comprometida (pedidos Pendentes e Em Produção, pela
+data de entrega) com o consumo semanal histórico dos pedidos concluídos para
+projetar, dia a dia, o estoque de cada tipo de material.
+
+Os pedidos referenciam o traço, e não um lote específico, por isso a
+projeção é feita por tipo de material (Cimento, Areia, Brita, Água, Aditivo).
+"""
+import logging
+import threading
+from datetime import date
+import numpy as np
+import pandas as pd
+from persistencia.repositorios.fabrica_repo import STATUS_CONCLUIDOS
+from persistencia.unit_of_work import UnitOfWork
+
+log = logging.getLogger(__name__)
+
+# Colunas de consumo retornadas por FabricaRepository.get_demanda_pedidos.
+COLUNAS_CONSUMO = {
+    "kg_cimento": "Cimento",
+    "kg_areia": "Areia",
+    "kg_brita": "Brita",
+    "kg_agua": "Água",
+    "kg_aditivo": "Aditivo",
+}
+STATUS_ABERTOS = ("Pendente", "Em Produção")
+# Só pedidos concluídos consumiram material; os abertos já entram como demanda comprometida.
+STATUS_HISTORICO = STATUS_CONCLUIDOS
+SEMANAS_HISTORICO = 8
+
+
+def _inicio_semana(datas: pd.Series) -> pd.Series:
+    """Segunda-feira da semana de cada data (vetorizado, sem to_period)."""
+    datas = pd.to_datetime(datas, errors="coerce").dt.normalize()
+    return datas - pd.to_timedelta(datas.dt.weekday, unit="D")
+
+
+def _agregar_semanal(df_demanda: pd.DataFrame) -> pd.DataFrame:
+    if df_demanda.empty:
+        return pd.DataFrame(columns=list(COLUNAS_CONSUMO.values()), dtype=float)
+    consumo = df_demanda[list(COLUNAS_CONSUMO)].fillna(0.0).rename(columns=COLUNAS_CONSUMO)
+    return consumo.groupby(_inicio_semana(df_demanda["data_pedido"])).sum()
+
+
+class _HistoricoSemanal:
+    """Consumo semanal acumulado, atualizado apenas com pedidos recém-concluídos.
+
+    Compartilhado entre sessões. Pedidos concluídos com id acima do último já
+    somado entram de forma incremental; edições de elemento ou traço, pedidos
+    que deixam de estar concluídos e conclusões fora da ordem de id (contador
+    `versao` do marcador) invalidam o acumulado e forçam a reconstrução
+    completa na próxima leitura.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.limpar()
+
+    def limpar(self):
+        self.ultimo_id = 0
+        self.versao = None
+        self.semanal = _agregar_semanal(pd.DataFrame())
+
+    def atualizar(self, repo) -> pd.DataFrame:
+        with self._lock:
+            marcador = repo.get_marcador_pedidos()
+            if marcador["versao"] != self.versao:
+                log.debug("Previsão: histórico semanal invalidado, reconstruindo.")
+                self.limpar()
+                self.versao = marcador["versao"]
+            if marcador["ultimo_id"] > self.ultimo_id:
+                novos = repo.get_demanda_pedidos(STATUS_HISTORICO, id_minimo=self.ultimo_id)
+                if not novos.empty:
+                    self.semanal = self.semanal.add(_agregar_semanal(novos), fill_value=0.0)
+                self.ultimo_id = marcador["ultimo_id"]
+            return self.semanal.copy()
+
+
+_historico = _HistoricoSemanal()
+
+
+def consumo_semanal_medio(semanal: pd.DataFrame, hoje: date, semanas: int = SEMANAS_HISTORICO) -> pd.Series:
+    """Média do consumo das últimas `semanas` semanas completas (semanas sem pedidos contam zero)."""
+    semana_atual = _inicio_semana(pd.Series([pd.Timestamp(hoje)])).iloc[0]
+    janela = pd.date_range(end=semana_atual - pd.Timedelta(weeks=1), periods=semanas, freq="7D")
+    return semanal.reindex(janela, fill_value=0.0).mean().reindex(list(COLUNAS_CONSUMO.values()), fill_value=0.0)
+
+
+def projetar_estoque(
+    df_estoque: pd.DataFrame,
+    df_abertos: pd.DataFrame,
+    consumo_semanal: pd.Series,
+    horizonte_dias: int,
+    hoje: date,
+) -> pd.DataFrame:
+    """
+    Projeta o estoque diário de cada tipo de material até `horizonte_dias`.
+
+    A demanda dos pedidos abertos é debitada na data de entrega (ou hoje, se
+    vencida/indefinida); o consumo semanal médio é debitado linearmente.
+    """
+    tipos = list(COLUNAS_CONSUMO.values())
+    dias = np.arange(horizonte_dias + 1)
+    estoque = (
+        df_estoque.set_index("tipo")["estoque_atual"].reindex(tipos, fill_value=0.0).to_numpy(dtype=float)
+        if not df_estoque.empty else np.zeros(len(tipos))
+    )
+
+    comprometido = np.zeros((len(tipos), len(dias)))
+    if not df_abertos.empty:
+        entrega = pd.to_datetime(df_abertos["data_entrega"], errors="coerce").fillna(pd.Timestamp(hoje))
+        offsets = (entrega - pd.Timestamp(hoje)).dt.days.clip(lower=0).to_numpy()
+        no_horizonte = offsets <= horizonte_dias
+        consumo = df_abertos[list(COLUNAS_CONSUMO)].fillna(0.0).to_numpy(dtype=float)[no_horizonte]
+        for i in range(len(tipos)):
+            comprometido[i] = np.bincount(offsets[no_horizonte], weights=consumo[:, i], minlength=len(dias))
+
+    taxa_diaria = consumo_semanal.reindex(tipos, fill_value=0.0).to_numpy(dtype=float) / 7.0
+    projetado = estoque[:, None] - comprometido.cumsum(axis=1) - taxa_diaria[:, None] * dias[None, :]
+
+    ruptura = projetado < 0
+    dias_ate_ruptura = pd.Series(ruptura.argmax(axis=1), dtype="Int64").where(ruptura.any(axis=1))
+
+    resultado = pd.DataFrame({
+        "tipo": tipos,
+        "estoque_atual": estoque,
+        "demanda_comprometida": comprometido.sum(axis=1),
+        "consumo_semanal": taxa_diaria * 7.0,
+        "estoque_projetado": projetado[:, -1],
+        "dias_ate_ruptura": dias_ate_ruptura,
+        "data_ruptura": pd.Timestamp(hoje) + pd.to_timedelta(dias_ate_ruptura.astype("float64"), unit="D"),
+    })
+    return resultado.sort_values("dias_ate_ruptura", na_position="last").reset_index(drop=True)
+
+
+def get_projecao_estoque(horizonte_dias: int = 30, hoje: date = None) -> pd.DataFrame:
+    """Projeção de estoque por tipo de material para os próximos `horizonte_dias`."""
+    hoje = hoje or date.today()
+    with UnitOfWork() as uow:
+        semanal = _historico.atualizar(uow.fabrica)
+        df_abertos = uow.fabrica.get_demanda_pedidos(STATUS_ABERTOS)
+        df_estoque = uow.fabrica.get_estoque_por_tipo()
+    return projetar_estoque(df_estoque, df_abertos, consumo_semanal_medio(semanal, hoje), horizonte_dias, hoje)
@@ -0,0 +1,132 @@
+"""
+Programação da Produção — Sequenciamento de pedidos abertos.
+
+Heurística EDD (Earliest Due Date) com restrições de capacidade e estoque:
+1. Pedidos Em Produção vêm primeiro, depois os Pendentes por data de entrega.
+2. Cada pedido reserva o material de que precisa; se algum tipo de material
+   não tiver saldo suficiente, o pedido fica "Sem material" e não ocupa capacidade.
+3. Os pedidos viáveis ocupam a capacidade da fábrica (m³/dia) em sequência,
+   podendo se estender por vários dias.
+
+Todo o cálculo é vetorizado com NumPy, exceto a reserva de material, que só
+percorre pedidos a partir do primeiro que não cabe no estoque acumulado.
+"""
+import logging
+from datetime import date
+import numpy as np
+import pandas as pd
+from persistencia.unit_of_work import UnitOfWork
+from components.previsao_estoque import COLUNAS_CONSUMO, STATUS_ABERTOS
+
+log = logging.getLogger(__name__)
+
+SITUACAO_PROGRAMADO = "Programado"
+SITUACAO_ATRASADO = "Atrasado"
+SITUACAO_SEM_MATERIAL = "Sem material"
+
+
+def _datas_producao(inicio: date, dias: np.ndarray, apenas_dias_uteis: bool) -> pd.Series:
+    if apenas_dias_uteis:
+        datas = np.busday_offset(np.datetime64(inicio, "D"), dias, roll="forward")
+    else:
+        datas = np.datetime64(inicio, "D") + dias.astype("timedelta64[D]")
+    return pd.Series(pd.to_datetime(datas))
+
+
+def _reservar_material(consumo: np.ndarray, estoque: np.ndarray) -> np.ndarray:
+    """Marca como viáveis os pedidos cujo material cabe no saldo, na ordem dada."""
+    viavel = (consumo.cumsum(axis=0) <= estoque + 1e-9).all(axis=1)
+    primeiro_inviavel = int(np.argmin(viavel)) if not viavel.all() else len(viavel)
+    saldo = estoque - consumo[:primeiro_inviavel].sum(axis=0)
+    for i in range(primeiro_inviavel, len(consumo)):
+        viavel[i] = bool((consumo[i] <= saldo + 1e-9).all())
+        if viavel[i]:
+            saldo -= consumo[i]
+    return viavel
+
+
+def programar_producao(
+    df_pedidos: pd.DataFrame,
+    df_estoque: pd.DataFrame,
+    capacidade_m3_dia: float,
+    inicio: date,
+    apenas_dias_uteis: bool = True,
+) -> pd.DataFrame:
+    """
+    Calcula o plano de produção dos pedidos abertos.
+
+    `df_pedidos` segue o formato de FabricaRepository.get_demanda_pedidos e
+    `df_estoque` o de get_estoque_por_tipo. Retorna um pedido por linha,
+    na ordem de produção, com datas de início/fim, atraso e situação.
+    """
+    if capacidade_m3_dia <= 0:
+        raise ValueError("A capacidade de produção deve ser maior que zero.")
+    if df_pedidos.empty:
+        return pd.DataFrame(columns=[
+            "sequencia", "id", "status", "data_entrega", "volume_total_m3",
+            "data_inicio", "data_fim", "atraso_dias", "situacao",
+        ])
+
+    entrega = pd.to_datetime(df_pedidos["data_entrega"], errors="coerce")
+    plano = (
+        df_pedidos.assign(_iniciado=df_pedidos["status"] != "Em Produção", _entrega=entrega)
+        .sort_values(["_iniciado", "_entrega", "id"], na_position="last", kind="stable")
+        .drop(columns=["_iniciado"])
+        .reset_index(drop=True)
+    )
+
+    tipos = list(COLUNAS_CONSUMO.values())
+    estoque = (
+        df_estoque.set_index("tipo")["estoque_atual"].reindex(tipos, fill_value=0.0).to_numpy(dtype=float)
+        if not df_estoque.empty else np.zeros(len(tipos))
+    )
+    consumo = plano[list(COLUNAS_CONSUMO)].fillna(0.0).to_numpy(dtype=float)
+    viavel = _reservar_material(consumo, estoque)
+
+    volume = np.where(viavel, plano["volume_total_m3"].fillna(0.0).to_numpy(dtype=float), 0.0)
+    fim_acumulado = volume.cumsum()
+    inicio_acumulado = fim_acumulado - volume
+    dia_inicio = np.floor(inicio_acumulado / capacidade_m3_dia + 1e-9).astype(int)
+    dia_fim = np.maximum(np.ceil(fim_acumulado / capacidade_m3_dia - 1e-9).astype(int) - 1, dia_inicio)
+
+    plano["sequencia"] = np.arange(1, len(plano) + 1)
+    plano["data_inicio"] = _datas_producao(inicio, dia_inicio, apenas_dias_uteis).where(viavel)
+    plano["data_fim"] = _datas_producao(inicio, dia_fim, apenas_dias_uteis).where(viavel)
+    plano["atraso_dias"] = (plano["data_fim"] - plano["_entrega"]).dt.days.clip(lower=0).astype("Int64")
+
+    plano["situacao"] = np.select(
+        [~viavel, plano["atraso_dias"].fillna(0).to_numpy() > 0],
+        [SITUACAO_SEM_MATERIAL, SITUACAO_ATRASADO],
+        default=SITUACAO_PROGRAMADO,
+    )
+    return plano.drop(columns=["_entrega"])
+
+
+def carga_diaria(plano: pd.DataFrame, capacidade_m3_dia: float, inicio: date, apenas_dias_uteis: bool = True) -> pd.DataFrame:
+    """Volume (m³) produzido em cada dia do plano."""
+    total = plano.loc[plano["situacao"] != SITUACAO_SEM_MATERIAL, "volume_total_m3"].sum()
+    n_dias = int(np.ceil(total / capacidade_m3_dia - 1e-9)) if total > 0 else 0
+    limites = np.minimum(total, capacidade_m3_dia * np.arange(n_dias + 1))
+    return pd.DataFrame({
+        "data": _datas_producao(inicio, np.arange(n_dias), apenas_dias_uteis),
+        "volume_m3": np.diff(limites),
+    })
+
+
+def get_plano_producao(capacidade_m3_dia: float, inicio: date = None, apenas_dias_uteis: bool = True) -> pd.DataFrame:
+    """Plano de produção dos pedidos abertos, com nomes de cliente e elemento."""
+    inicio = inicio or date.today()
+    with UnitOfWork() as uow:
+        df_pedidos = uow.fabrica.get_demanda_pedidos(STATUS_ABERTOS)
+        df_estoque = uow.fabrica.get_estoque_por_tipo()
+        df_clientes = uow.fabrica.get_all_clientes()
+        df_elementos = uow.fabrica.get_catalogo_elementos()
+
+    plano = programar_producao(df_pedidos, df_estoque, capacidade_m3_dia, inicio, apenas_dias_uteis)
+    if plano.empty:
+        return plano
+    log.debug(f"Programação: {len(plano)} pedidos sequenciados a {capacidade_m3_dia} m³/dia.")
+    return plano.assign(
+        cliente=plano["cliente_id"].map(df_clientes.set_index("id")["nome"]),
+        elemento=plano["elemento_id"].map(df_elementos.set_index("id")["nome"]),
+    )
@@ -0,0 +1,90 @@
+"""
+Relatório de custo de materiais por pedido.
+
+O custo de cada pedido é volume × consumo do traço × preço/kg vigente na data
+do pedido (FabricaRepository.custo_pedidos_sql); as agregações por cliente,
+tipo de elemento e mês rodam no banco. Os resultados ficam em cache no
+processo, compartilhado entre sessões, e valem enquanto o marcador de custos
+não muda (pedido novo, mudança de status, edição de elemento ou traço, preço
+novo) e por no máximo CACHE_TTL_S.
+"""
+import io
+import logging
+import threading
+import time
+from collections import OrderedDict
+import pandas as pd
+from persistencia.unit_of_work import UnitOfWork
+
+log = logging.getLogger(__name__)
+
+DIMENSOES = {"cliente": "Cliente", "tipo_elemento": "Tipo de elemento", "mes": "Mês"}
+MAX_ENTRADAS = 32
+CACHE_TTL_S = 600.0
+
+
+class _CacheRelatorios:
+    """Resultados por (consulta, filtros), com o marcador e o instante em que foram calculados."""
+
+    def __init__(self, max_entradas: int = MAX_ENTRADAS, ttl_s: float = CACHE_TTL_S, relogio=time.monotonic):
+        self._lock = threading.Lock()
+        self._max_entradas = max_entradas
+        self._ttl_s = ttl_s
+        self._relogio = relogio
+        self.limpar()
+
+    def limpar(self):
+        self._entradas = OrderedDict()
+        self.acertos = 0
+        self.calculos = 0
+
+    def obter(self, chave: tuple, marcador, calcular) -> pd.DataFrame:
+        agora = self._relogio()
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None and entrada[0] == marcador and agora - entrada[1] < self._ttl_s:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return entrada[2].copy()
+        df = calcular()
+        with self._lock:
+            self.calculos += 1
+            self._entradas[chave] = (marcador, agora, df)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self._max_entradas:
+                self._entradas.popitem(last=False)
+        return df.copy()
+
+
+_cache = _CacheRelatorios()
+
+
+def _consultar(nome: str, filtros: dict, consulta) -> pd.DataFrame:
+    chave = (nome,) + tuple(sorted((k, tuple(v) if isinstance(v, (list, tuple)) else v) for k, v in filtros.items()))
+    with UnitOfWork() as uow:
+        marcador = uow.fabrica.get_marcador_custos()
+        return _cache.obter(chave, marcador, lambda: consulta(uow.fabrica))
+
+
+def get_custos_agregados(dimensao: str, status: tuple = None, data_inicio=None, data_fim=None) -> pd.DataFrame:
+    """Custo de materiais por `dimensao` (ver DIMENSOES) dos pedidos no filtro."""
+    filtros = {"status": status or (), "data_inicio": data_inicio and str(data_inicio), "data_fim": data_fim and str(data_fim)}
+    return _consultar(f"agregado:{dimensao}", filtros, lambda repo: repo.get_custo_agregado(dimensao, **filtros))
+
+
+def get_pedidos_mais_custosos(limite: int = 50, status: tuple = None, data_inicio=None, data_fim=None) -> pd.DataFrame:
+    filtros = {"status": status or (), "data_inicio": data_inicio and str(data_inicio), "data_fim": data_fim and str(data_fim)}
+    return _consultar(f"pedidos:{int(limite)}", filtros, lambda repo: repo.get_pedidos_mais_custosos(limite, **filtros))
+
+
+def estatisticas_cache() -> dict:
+    return {"entradas": len(_cache._entradas), "acertos": _cache.acertos, "calculos": _cache.calculos}
+
+
+def para_arquivo(df: pd.DataFrame, formato: str) -> bytes:
+    """Conteúdo de `df` como 'csv' ou 'parquet'."""
+    if formato == "parquet":
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    return df.to_csv(index=False).encode("utf-8-sig")
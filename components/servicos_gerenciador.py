@@ -1,19 +1,37 @@
 import logging
-from typing import List
+from functools import lru_cache
+from typing import List, Tuple
 from persistencia.unit_of_work import UnitOfWork
+from persistencia import sessao
 log = logging.getLogger(__name__)
 
 def get_allowed_roles_for_page(page_filename: str) -> List[str]:
-    log.info(f'Serviço Gerenciador: Verificando permissões para: {page_filename}')
     try:
-        with UnitOfWork() as uow:
-            df = uow.paginas.get_allowed_roles_for_page(page_filename)
-        if df.empty:
-            return ['Administrador Global']
-        role_list = df['nome_perfil'].tolist()
-        if 'Administrador Global' not in role_list:
-            role_list.append('Administrador Global')
-        return role_list
+        return list(_allowed_roles_for_page(page_filename, sessao.versao_permissoes()))
     except Exception as e:
         log.error(f"Erro ao buscar perfis para página '{page_filename}': {e}", exc_info=True)
-        return ['Administrador Global']
\ No newline at end of file
+        return ['Administrador Global']
+
+def get_allowed_pages_for_profile(profile_name: str) -> List[Tuple[str, str]]:
+    """(nome_arquivo, nome_amigavel) das páginas do perfil, em cache até a próxima mudança de permissões."""
+    return list(_allowed_pages_for_profile(profile_name, sessao.versao_permissoes()))
+
+# As consultas abaixo ficam em cache por versão de permissões: qualquer alteração
+# de perfis/páginas incrementa a versão e as próximas chamadas vão ao banco.
+@lru_cache(maxsize=256)
+def _allowed_pages_for_profile(profile_name: str, versao: int) -> tuple:
+    with UnitOfWork() as uow:
+        df = uow.paginas.get_allowed_pages_for_profile(profile_name)
+    return tuple(zip(df['nome_arquivo'], df['nome_amigavel'])) if not df.empty else ()
+
+@lru_cache(maxsize=256)
+def _allowed_roles_for_page(page_filename: str, versao: int) -> tuple:
+    log.info(f'Serviço Gerenciador: Verificando permissões para: {page_filename}')
+    with UnitOfWork() as uow:
+        df = uow.paginas.get_allowed_roles_for_page(page_filename)
+    if df.empty:
+        return ('Administrador Global',)
+    role_list = df['nome_perfil'].tolist()
+    if 'Administrador Global' not in role_list:
+        role_list.append('Administrador Global')
+    return tuple(role_list)
\ No newline at end of file
@@ -10,7 +10,7 @@ _parser = configparser.ConfigParser()
 
 if not _config_path.is_file():
     print(f"Aviso: '{_config_path.name}' não encontrado. Criando arquivo padrão.", file=sys.stderr)
-    default_ini_content = '[Settings]\ndatabase_enabled = True\ninitialize_database_on_startup = True\nredirect_console_to_log = False\nenable_theme_menu = True\nlog_level = DEBUG\nlog_format = [%(asctime)s] [%(name)s] [%(levelname)-8s] - %(message)s\n'
+    default_ini_content = '[Settings]\ndatabase_enabled = True\ninitialize_database_on_startup = True\nredirect_console_to_log = False\nenable_theme_menu = True\nlog_level = DEBUG\nlog_format = [%(asctime)s] [%(correlacao_id)s] [%(name)s] [%(levelname)-8s] - %(message)s\n'
     try:
         with open(_config_path, 'w', encoding='utf-8') as f:
             f.write(default_ini_content)
@@ -27,6 +27,12 @@ except Exception as e:
     print(f'Erro ao ler .ini: {e}. Usando padrões.', file=sys.stderr)
     _parser['Settings'] = {}
 
+# Variáveis de ambiente APP_<CHAVE> (ex.: APP_LOG_LEVEL) sobrepõem o .ini.
+PREFIXO_AMBIENTE = 'APP_'
+for _chave, _valor in os.environ.items():
+    if _chave.startswith(PREFIXO_AMBIENTE) and len(_chave) > len(PREFIXO_AMBIENTE):
+        _parser['Settings'][_chave[len(PREFIXO_AMBIENTE):].lower()] = _valor.replace('%', '%%')
+
 def _get_boolean_setting(key, default=False):
     try:
         return _parser.getboolean('Settings', key, fallback=default)
@@ -39,16 +45,68 @@ def _get_string_setting(key, default=''):
     except (configparser.Error, ValueError):
         return default
 
+def _get_int_setting(key, default=0):
+    try:
+        return _parser.getint('Settings', key, fallback=default)
+    except (configparser.Error, ValueError):
+        return default
+
+def _get_float_setting(key, default=0.0):
+    try:
+        return _parser.getfloat('Settings', key, fallback=default)
+    except (configparser.Error, ValueError):
+        return default
+
 DATABASE_ENABLED = _get_boolean_setting('database_enabled', default=True)
 INITIALIZE_DATABASE_ON_STARTUP = _get_boolean_setting('initialize_database_on_startup', default=True)
 REDIRECT_CONSOLE_TO_LOG = _get_boolean_setting('redirect_console_to_log', default=False)
 ENABLE_THEME_MENU = _get_boolean_setting('enable_theme_menu', default=True)
 MAX_LOGIN_ATTEMPTS = 3
+# Login: pool de verificação bcrypt e limites (token bucket) por usuário e por IP.
+LOGIN_HASH_WORKERS = max(1, _get_int_setting('login_hash_workers', default=2))
+LOGIN_HASH_TIMEOUT_S = _get_float_setting('login_hash_timeout_s', default=5.0)
+LOGIN_RAJADA_USUARIO = _get_int_setting('login_rajada_usuario', default=5)
+LOGIN_TAXA_USUARIO_MIN = _get_float_setting('login_taxa_usuario_min', default=1.0)
+# Por IP: folgado, pois os operadores de uma fábrica costumam sair pelo mesmo IP; 0 desliga.
+LOGIN_RAJADA_IP = _get_int_setting('login_rajada_ip', default=200)
+LOGIN_TAXA_IP_MIN = _get_float_setting('login_taxa_ip_min', default=120.0)
+# Validade dos tokens de sessão (restauram o login ao recarregar a página).
+SESSAO_TTL_HORAS = _get_float_setting('sessao_ttl_horas', default=8.0)
+# Custo do bcrypt (4–31). Use instalacao/benchmark_bcrypt.py para escolher pelo tempo alvo.
+BCRYPT_ROUNDS = min(31, max(4, _get_int_setting('bcrypt_rounds', default=12)))
+# Threads de bcrypt na importação de usuários em lote (0 = um por CPU).
+IMPORTACAO_HASH_WORKERS = max(0, _get_int_setting('importacao_hash_workers', default=0))
 APP_TITLE = _get_string_setting('app_title', default='🚀 Painel de Controle Moderno')
 APP_HEADER = _get_string_setting('app_header', default='Sistema de Demonstração')
 LOG_LEVEL_STR = _get_string_setting('log_level', default='INFO').upper()
-LOG_FORMAT = _get_string_setting('log_format', default='[%(asctime)s] [%(name)s] [%(levelname)-8s] - %(message)s')
+LOG_FORMAT = _get_string_setting('log_format', default='[%(asctime)s] [%(correlacao_id)s] [%(name)s] [%(levelname)-8s] - %(message)s')
 LOG_LEVEL = getattr(logging, LOG_LEVEL_STR, logging.INFO)
+# Logs: gravação em thread própria (QueueListener) e rotação do logs/app.log.
+LOG_ASSINCRONO = _get_boolean_setting('log_assincrono', default=True)
+LOG_ROTACAO = _get_string_setting('log_rotacao', default='tamanho').lower()  # 'tamanho' ou 'diaria'
+LOG_MAX_MB = max(1, _get_int_setting('log_max_mb', default=10))
+LOG_BACKUPS = max(0, _get_int_setting('log_backups', default=5))
+# 'texto' (LOG_FORMAT) ou 'json' (uma linha por registro; ver instalacao/analisar_logs.py).
+LOG_FORMATO = _get_string_setting('log_formato', default='texto').lower()
+# Aquecimento por processo (components/aquecimento.py): conexões abertas no pool
+# (0 = tamanho do pool) e se o cliente LLM também é carregado.
+AQUECER_CONEXOES = max(0, _get_int_setting('aquecer_conexoes', default=0))
+AQUECER_LLM = _get_boolean_setting('aquecer_llm', default=False)
+# Métricas de SQL (persistencia/metricas_sql.py): eventos na engine, aviso no log acima
+# de sql_lenta_ms e limite de impressões digitais distintas guardadas em memória.
+SQL_INSTRUMENTAR = _get_boolean_setting('sql_instrumentar', default=True)
+SQL_LENTA_MS = _get_float_setting('sql_lenta_ms', default=250.0)
+SQL_MAX_IMPRESSOES = max(10, _get_int_setting('sql_max_impressoes', default=500))
+# Perfil por rerun (persistencia/perfilador.py): ligado para todos, ou só quando um
+# administrador liga na barra lateral; 'cprofile' ou 'pyinstrument' perfila também por função.
+PERFIL_RERUNS = _get_boolean_setting('perfil_reruns', default=False)
+PERFIL_DETALHADO = _get_string_setting('perfil_detalhado', default='').strip().lower()
+CAPACIDADE_PRODUCAO_M3_DIA = _get_float_setting('capacidade_producao_m3_dia', default=30.0)
+# Cliente LLM (ChatOpenAI). Base URL vazia = API da OpenAI; para testes sem rede,
+# aponte para o stub local (python -m benchmarks.llm_stub), ex.: http://127.0.0.1:8099/v1.
+OPENAI_BASE_URL = _get_string_setting('openai_base_url', default='').strip() or None
+OPENAI_TIMEOUT_S = _get_float_setting('openai_timeout_s', default=60.0)
+OPENAI_MAX_RETRIES = max(0, _get_int_setting('openai_max_retries', default=2))
 
 # Configuração da Chave da API da OpenAI
 _openai_key_file = Path(__file__).parent / 'openai_api_key.exe'
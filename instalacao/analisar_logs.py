@@ -0,0 +1,52 @@
+"""
+analisar_logs.py — Reruns mais lentos e trace completo a partir do logs/app.log.
+
+Requer log_formato = json no config_settings.ini. Cada rerun do Streamlit tem
+um correlacao_id; o resumo mostra tempo total, tempo em banco e tempo em IA.
+
+Uso:
+    python instalacao/analisar_logs.py                  # 10 reruns mais lentos
+    python instalacao/analisar_logs.py --id 3f9c0a1b2d4e   # trace de um rerun
+"""
+import argparse
+import sys
+from pathlib import Path
+
+INSTALL_DIR = Path(__file__).parent.resolve()
+PROJECT_ROOT = INSTALL_DIR.parent.resolve()
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import pandas as pd
+from utils.analise_logs import ler_registros, resumo_reruns, trace
+
+LOG_PADRAO = PROJECT_ROOT / 'logs' / 'app.log'
+
+
+def main(argv=None):
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    args.add_argument('--arquivo', type=Path, default=LOG_PADRAO)
+    args.add_argument('--id', help='correlacao_id do rerun a detalhar.')
+    args.add_argument('--top', type=int, default=10, help='Quantos reruns listar no resumo.')
+    opcoes = args.parse_args(argv)
+
+    if not opcoes.arquivo.is_file():
+        print(f"Arquivo '{opcoes.arquivo}' não encontrado.")
+        return 1
+    with open(opcoes.arquivo, encoding='utf-8', errors='replace') as f:
+        registros = ler_registros(f)
+    if not registros:
+        print('Nenhum registro JSON encontrado. Defina log_formato = json no config_settings.ini.')
+        return 1
+
+    with pd.option_context('display.width', 200, 'display.max_colwidth', 100, 'display.max_rows', 500):
+        if opcoes.id:
+            df = trace(registros, opcoes.id)
+            print(df.to_string(index=False) if not df.empty else f"Nenhum registro com correlacao_id '{opcoes.id}'.")
+        else:
+            print(resumo_reruns(registros).head(opcoes.top).to_string(index=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+benchmark_bcrypt.py — Escolhe o custo do bcrypt para o tempo de login desejado.
+
+Mede bcrypt.hashpw nesta máquina a partir do custo mínimo e sugere o maior
+custo que fica dentro do alvo. Com --gravar, atualiza `bcrypt_rounds` em
+config_settings.ini; os hashes antigos são regravados no próximo login.
+
+Uso:
+    python instalacao/benchmark_bcrypt.py --alvo-ms 250
+    python instalacao/benchmark_bcrypt.py --alvo-ms 400 --gravar
+"""
+import argparse
+import configparser
+import sys
+from pathlib import Path
+
+INSTALL_DIR = Path(__file__).parent.resolve()
+PROJECT_ROOT = INSTALL_DIR.parent.resolve()
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from persistencia.auth import escolher_custo_bcrypt, medir_bcrypt_ms
+
+CONFIG_INI = PROJECT_ROOT / 'config_settings.ini'
+
+
+def gravar_custo(rounds: int, ini_path: Path = CONFIG_INI):
+    parser = configparser.ConfigParser()
+    parser.read(ini_path, encoding='utf-8')
+    if 'Settings' not in parser:
+        parser['Settings'] = {}
+    parser.set('Settings', 'bcrypt_rounds', str(rounds))
+    with open(ini_path, 'w', encoding='utf-8') as configfile:
+        parser.write(configfile)
+
+
+def main(argv=None):
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    args.add_argument('--alvo-ms', type=float, default=250.0, help='Tempo alvo por verificação de senha (ms).')
+    args.add_argument('--minimo', type=int, default=10, help='Custo mínimo aceito (padrão: 10).')
+    args.add_argument('--maximo', type=int, default=16, help='Maior custo a medir (padrão: 16).')
+    args.add_argument('--repeticoes', type=int, default=3, help='Medições por custo (usa a mediana).')
+    args.add_argument('--gravar', action='store_true', help='Grava o custo escolhido em config_settings.ini.')
+    opcoes = args.parse_args(argv)
+
+    rounds, medicoes = escolher_custo_bcrypt(
+        opcoes.alvo_ms, opcoes.minimo, opcoes.maximo,
+        medir=lambda r: medir_bcrypt_ms(r, opcoes.repeticoes),
+    )
+    for custo, ms in medicoes.items():
+        marcador = '  <- escolhido' if custo == rounds else ''
+        print(f'custo {custo:2d}: {ms:8.1f} ms{marcador}')
+    if medicoes[rounds] > opcoes.alvo_ms:
+        print(f'Aviso: mesmo o custo mínimo ({rounds}) passa do alvo de {opcoes.alvo_ms:.0f} ms.')
+
+    if opcoes.gravar:
+        gravar_custo(rounds)
+        print(f"bcrypt_rounds = {rounds} gravado em '{CONFIG_INI.name}'.")
+    else:
+        print(f'Sugestão: bcrypt_rounds = {rounds} (use --gravar para salvar).')
+    return rounds
+
+
+if __name__ == '__main__':
+    main()
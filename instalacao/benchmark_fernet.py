@@ -0,0 +1,52 @@
+"""
+benchmark_fernet.py — Custo por chamada de cifrar/decifrar credenciais.
+
+Compara o caminho antigo (ler secret.key do disco e criar um Fernet a cada
+chamada) com o Keyring em cache de persistencia.security.
+
+Uso:
+    python instalacao/benchmark_fernet.py --chamadas 2000
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+INSTALL_DIR = Path(__file__).parent.resolve()
+PROJECT_ROOT = INSTALL_DIR.parent.resolve()
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from cryptography.fernet import Fernet
+from persistencia.security import KEY_PATH, decrypt_message, encrypt_message, keyring
+
+
+def _decifrar_sem_cache(token: str) -> str:
+    key = KEY_PATH.read_bytes().splitlines()[0]
+    return Fernet(key).decrypt(token.encode('utf-8')).decode('utf-8')
+
+
+def medir(chamadas: int) -> dict:
+    """Microssegundos por chamada de cada caminho."""
+    token = encrypt_message('usuario_do_banco')
+    casos = {
+        'disco + Fernet() por chamada': lambda: _decifrar_sem_cache(token),
+        'Keyring: decifrar (MultiFernet em cache)': lambda: keyring.fernet.decrypt(token.encode('utf-8')),
+        'decrypt_message (texto em cache)': lambda: decrypt_message(token),
+    }
+    return {nome: timeit.timeit(fn, number=chamadas) / chamadas * 1e6 for nome, fn in casos.items()}
+
+
+def main(argv=None):
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    args.add_argument('--chamadas', type=int, default=2000)
+    opcoes = args.parse_args(argv)
+    resultados = medir(opcoes.chamadas)
+    base = next(iter(resultados.values()))
+    for nome, us in resultados.items():
+        print(f'{nome:<42} {us:9.2f} µs/chamada  ({base / us:6.1f}x)')
+    return resultados
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+benchmark_logging.py — Custo de log por rerun de página com DEBUG ligado.
+
+Executa as verificações que toda página faz a cada rerun (st_check_session e
+check_access, em modo "bare" do Streamlit) com os handlers gravando em um
+diretório temporário, comparando:
+  - síncrono: FileHandler/StreamHandler no logger raiz (configuração antiga);
+  - assíncrono: QueueHandler + QueueListener (configuração atual).
+
+Em disco local rápido a fila não ganha nada (o custo de enfileirar é da mesma
+ordem da escrita). O ganho aparece quando a escrita bloqueia — pasta de rede,
+antivírus, disco ocupado —, simulado com --latencia-ms em cada gravação.
+
+Uso:
+    python instalacao/benchmark_logging.py --reruns 2000
+"""
+import argparse
+import contextlib
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+INSTALL_DIR = Path(__file__).parent.resolve()
+PROJECT_ROOT = INSTALL_DIR.parent.resolve()
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import streamlit as st
+from persistencia import logger
+from utils.st_utils import check_access, st_check_session
+
+
+def _rerun():
+    st_check_session()
+    check_access(['Administrador'])
+
+
+def _atrasar_arquivo(latencia_s: float):
+    """Simula disco lento: cada gravação no app.log espera `latencia_s`."""
+    handlers = logger._listener.handlers if logger._listener else logging.getLogger().handlers
+    for handler in handlers:
+        if isinstance(handler, logging.FileHandler):
+            emit = handler.emit
+            handler.emit = lambda record, emit=emit: (time.sleep(latencia_s), emit(record))
+
+
+def medir(reruns: int, assincrono: bool, nivel=logging.DEBUG, latencia_ms: float=0.0) -> float:
+    """Microssegundos por rerun na thread da sessão (a fila é esvaziada fora da medição)."""
+    with tempfile.TemporaryDirectory() as pasta, open(os.devnull, 'w') as nulo:
+        with contextlib.redirect_stdout(nulo):
+            logger.setup_loggers(log_level=nivel, log_dir=Path(pasta), assincrono=assincrono)
+        if latencia_ms:
+            _atrasar_arquivo(latencia_ms / 1000)
+        inicio = time.perf_counter()
+        for _ in range(reruns):
+            _rerun()
+        chamada = time.perf_counter() - inicio
+        logger.parar_loggers()
+        for handler in logging.getLogger().handlers:
+            handler.close()
+        logging.getLogger().handlers.clear()
+    return chamada / reruns * 1e6
+
+
+def main(argv=None):
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    args.add_argument('--reruns', type=int, default=2000)
+    args.add_argument('--latencia-ms', type=float, default=0.2, help='Atraso simulado por gravação no cenário de disco lento.')
+    opcoes = args.parse_args(argv)
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    st.session_state.user_info = {'username': 'bench', 'name': 'Benchmark', 'access_level': 'Administrador'}
+    _rerun()  # aquece o modo bare do Streamlit
+    casos = {
+        'INFO, síncrono (sem debug)': medir(opcoes.reruns, False, logging.INFO),
+        'DEBUG, síncrono (antes)': medir(opcoes.reruns, False),
+        'DEBUG, assíncrono (fila)': medir(opcoes.reruns, True),
+    }
+    lento = f'disco lento ({opcoes.latencia_ms:g} ms)'
+    casos[f'DEBUG, síncrono, {lento}'] = medir(opcoes.reruns, False, latencia_ms=opcoes.latencia_ms)
+    casos[f'DEBUG, assíncrono, {lento}'] = medir(opcoes.reruns, True, latencia_ms=opcoes.latencia_ms)
+    base = casos['DEBUG, síncrono (antes)']
+    for nome, us in casos.items():
+        print(f'{nome:<46} {us:9.1f} µs/rerun  ({base / us:5.2f}x)')
+    return casos
+
+
+if __name__ == '__main__':
+    main()
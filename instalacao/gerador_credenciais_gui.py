@@ -7,7 +7,7 @@ try:
     PROJECT_ROOT = INSTALL_DIR.parent.resolve()
     if str(PROJECT_ROOT) not in sys.path:
         sys.path.insert(0, str(PROJECT_ROOT))
-    from persistencia.security import load_key, encrypt_message
+    from persistencia.security import encrypt_message
     from persistencia.auth import hash_password
 except ImportError as e:
     messagebox.showerror('Erro Crítico de Importação', f"Não foi possível importar os módulos de segurança: {e}\n\nCertifique-se de que este script está na pasta 'instalacao' e que a pasta 'persistencia' existe na raiz do projeto.")
@@ -81,9 +81,8 @@ class CredentialToolApp(tk.Tk):
             messagebox.showwarning('Campos Vazios', 'Por favor, preencha o usuário e a senha.', parent=self)
             return
         try:
-            key = load_key()
-            encrypted_user = encrypt_message(user, key)
-            encrypted_password = encrypt_message(password, key)
+            encrypted_user = encrypt_message(user)
+            encrypted_password = encrypt_message(password)
             output_text = f'user = {encrypted_user}\npassword = {encrypted_password}'
             self.ini_output_area.config(state='normal')
             self.ini_output_area.delete('1.0', tk.END)
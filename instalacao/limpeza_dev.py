@@ -5,9 +5,13 @@ import shutil
 import os
 import logging
 import platform
+import sys
 logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s')
 HOME_DIR = Path.home()
 PROJECT_ROOT = Path(__file__).parent.parent.resolve()
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+from persistencia.config_banco import carregar_config_banco
 LOGS_DIR = PROJECT_ROOT / 'logs'
 INI_PATH = PROJECT_ROOT / 'banco.ini'
 if os.name == 'nt':
@@ -16,28 +20,15 @@ else:
     OPERA_PATH = HOME_DIR / '.config' / 'opera'
 
 def detect_active_sqlite_db(base_path: Path) -> Path | None:
-    ini_file = base_path / 'banco.ini'
-    if not ini_file.exists():
-        return None
-    active_type = None
-    db_path = None
     try:
-        with open(ini_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#') or line.startswith(';'):
-                    continue
-                if '=' in line:
-                    key, value = [part.strip() for part in line.split('=', 1)]
-                    if key == 'type':
-                        active_type = value.lower()
-                    elif key == 'path' and active_type == 'sqlite':
-                        db_path = value
-        if active_type == 'sqlite' and db_path:
-            return base_path / db_path
+        cfg = carregar_config_banco(base_path / 'banco.ini')
+    except FileNotFoundError:
+        return None
     except Exception as e:
         logging.error(f'Erro ao ler banco.ini: {e}')
         return None
+    if cfg.tipo == 'sqlite' and cfg.path:
+        return base_path / cfg.path
     return None
 DB_PATH = detect_active_sqlite_db(PROJECT_ROOT)
 
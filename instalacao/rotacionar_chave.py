@@ -0,0 +1,51 @@
+"""
+rotacionar_chave.py — Rotação da chave Fernet (secret.key) e recifragem do banco.ini.
+
+O secret.key guarda uma chave por linha: a primeira cifra, todas decifram.
+Fluxo recomendado:
+    python instalacao/rotacionar_chave.py --rotacionar --descartar-antigas
+
+1. --rotacionar        gera uma nova chave principal (as antigas continuam válidas);
+2. (sempre)            recifra user/password do banco.ini com a chave principal;
+3. --descartar-antigas remove as chaves antigas do secret.key.
+
+Tokens de sessão emitidos com chaves descartadas deixam de valer (novo login).
+"""
+import argparse
+import sys
+from pathlib import Path
+
+INSTALL_DIR = Path(__file__).parent.resolve()
+PROJECT_ROOT = INSTALL_DIR.parent.resolve()
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from persistencia.security import keyring, reencriptar_ini
+
+BANCO_INI = PROJECT_ROOT / 'banco.ini'
+
+
+def main(argv=None):
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    args.add_argument('--rotacionar', action='store_true', help='Gera uma nova chave principal antes de recifrar.')
+    args.add_argument('--descartar-antigas', action='store_true', help='Remove as chaves antigas após recifrar.')
+    args.add_argument('--ini', type=Path, default=BANCO_INI, help='Arquivo a recifrar (padrão: banco.ini).')
+    opcoes = args.parse_args(argv)
+
+    if opcoes.rotacionar:
+        keyring.rotacionar()
+        print(f"Nova chave principal gerada em '{keyring.path.name}' ({len(keyring.chaves)} chave(s) no arquivo).")
+
+    if opcoes.ini.is_file():
+        alterados = reencriptar_ini(opcoes.ini)
+        print(f"{alterados} valor(es) recifrado(s) em '{opcoes.ini.name}'.")
+    else:
+        print(f"Aviso: '{opcoes.ini}' não encontrado; nada a recifrar.")
+
+    if opcoes.descartar_antigas:
+        keyring.descartar_antigas()
+        print('Chaves antigas descartadas.')
+
+
+if __name__ == '__main__':
+    main()
@@ -34,7 +34,12 @@ CREATE TABLE IF NOT EXISTS fab_tracos_padrao (
     nome TEXT NOT NULL UNIQUE,
     fck_alvo REAL NOT NULL,
     traco_str TEXT NOT NULL,
-    consumo_cimento_m3 REAL NOT NULL
+    consumo_cimento_m3 REAL NOT NULL,
+    prop_cimento REAL,
+    prop_areia REAL,
+    prop_brita REAL,
+    relacao_ac REAL,
+    aditivo_pct REAL
 );
 
 CREATE TABLE IF NOT EXISTS fab_pedidos (
@@ -50,3 +55,12 @@ CREATE TABLE IF NOT EXISTS fab_pedidos (
     FOREIGN KEY (elemento_id) REFERENCES fab_catalogo_elementos(id),
     FOREIGN KEY (traco_usado_id) REFERENCES fab_tracos_padrao(id)
 );
+
+-- Pedidos e volume por semana/status, mantido pelo FabricaRepository.
+CREATE TABLE IF NOT EXISTS fab_rollup_semanal (
+    semana TEXT NOT NULL,
+    status TEXT NOT NULL,
+    pedidos INTEGER NOT NULL DEFAULT 0,
+    volume_m3 REAL NOT NULL DEFAULT 0.0,
+    PRIMARY KEY (semana, status)
+);
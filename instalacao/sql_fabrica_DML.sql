@@ -113,7 +113,7 @@ INSERT OR IGNORE INTO fab_pedidos (id, cliente_id, elemento_id, quantidade, data
     (10,1, 3,  2000, '2026-02-14', '2026-03-01', 'Em Produção', 1);
 
 -- ============================================================
--- 6. Páginas do módulo Fábrica (Pipeline 12 páginas)
+-- 6. Páginas do módulo Fábrica (Pipeline 14 páginas)
 -- ============================================================
 INSERT OR IGNORE INTO pagina (pagina_id, nome_arquivo, nome_amigavel) VALUES
     (2,  '02_🏭_Fabrica_Dashboard.py',              'Fábrica Dashboard'),
@@ -126,11 +126,13 @@ INSERT OR IGNORE INTO pagina (pagina_id, nome_arquivo, nome_amigavel) VALUES
     (9,  '09_🤝_Cadastro_Clientes.py',              'Cadastro de Clientes'),
     (10, '10_📜_Historico_Producao.py',              'Histórico Produção'),
     (11, '11_⚙️_Configuracoes.py',                   'Configurações'),
-    (12, '12_ℹ️_Sobre.py',                           'Sobre');
+    (12, '12_ℹ️_Sobre.py',                           'Sobre'),
+    (13, '13_📅_Programacao_Producao.py',            'Programação da Produção'),
+    (14, '14_🩺_Saude_Sistema.py',                   'Saúde do Sistema');
 
 -- 7. Permissões para Admin (perfil 1) — acesso total
 INSERT OR IGNORE INTO perfil_pagina_permissao (perfil_id, pagina_id)
-SELECT 1, pagina_id FROM pagina WHERE pagina_id BETWEEN 2 AND 12;
+SELECT 1, pagina_id FROM pagina WHERE pagina_id BETWEEN 2 AND 14;
 
 -- 8. Permissões: perfis específicos
 -- Dashboard (2) para todos
@@ -142,9 +144,9 @@ FROM perfil_acesso p WHERE p.perfil_id IN (2, 3, 4);
 INSERT OR IGNORE INTO perfil_pagina_permissao (perfil_id, pagina_id)
 SELECT 2, pagina_id FROM pagina WHERE pagina_id IN (4, 5, 6, 7, 8);
 
--- Produção (3): Controle(4), Histórico(10), Materiais(8)
+-- Produção (3): Controle(4), Histórico(10), Materiais(8), Programação(13)
 INSERT OR IGNORE INTO perfil_pagina_permissao (perfil_id, pagina_id)
-SELECT 3, pagina_id FROM pagina WHERE pagina_id IN (4, 8, 10);
+SELECT 3, pagina_id FROM pagina WHERE pagina_id IN (4, 8, 10, 13);
 
 -- Comercial (4): Novo Pedido(3), Clientes(9), Catálogo(7)
 INSERT OR IGNORE INTO perfil_pagina_permissao (perfil_id, pagina_id)
@@ -1,45 +1,178 @@
 import logging
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import bcrypt
 from sqlalchemy import text
+import config
 from .database import DatabaseManager
+from .throttle import LoginThrottle
+from .unit_of_work import UnitOfWork
 
-def verify_user_credentials(username, password):
+# Resultados de verify_user_credentials além de dict (sucesso) e None (credenciais inválidas).
+CONNECTION_ERROR = 'connection_error'
+THROTTLED = 'throttled'
+BUSY = 'busy'
+
+# bcrypt libera o GIL, então um pool pequeno de threads limita o uso de CPU
+# sem bloquear as outras sessões. O semáforo limita execução + fila: quem não
+# consegue vaga em LOGIN_HASH_TIMEOUT_S recebe BUSY em vez de enfileirar.
+_hash_executor = ThreadPoolExecutor(max_workers=config.LOGIN_HASH_WORKERS, thread_name_prefix='bcrypt')
+_hash_vagas = threading.BoundedSemaphore(config.LOGIN_HASH_WORKERS * 2)
+_throttle = LoginThrottle(
+    config.LOGIN_RAJADA_USUARIO, config.LOGIN_TAXA_USUARIO_MIN,
+    config.LOGIN_RAJADA_IP, config.LOGIN_TAXA_IP_MIN,
+)
+
+@lru_cache(maxsize=1)
+def _dummy_hash():
+    """Hash de referência para usuários inexistentes (mesmo custo de um hash real)."""
+    return bcrypt.hashpw(b'usuario-inexistente', bcrypt.gensalt(rounds=config.BCRYPT_ROUNDS))
+
+def aquecer():
+    """Calcula o hash de referência e sobe as threads do pool antes do primeiro login."""
+    _dummy_hash()
+    for futuro in [_hash_executor.submit(time.sleep, 0.01) for _ in range(config.LOGIN_HASH_WORKERS)]:
+        futuro.result()
+
+def _checkpw(password_bytes, hashed_bytes):
+    try:
+        return bcrypt.checkpw(password_bytes, hashed_bytes)
+    except (ValueError, TypeError):
+        return False
+
+def _no_pool(funcao, *args):
+    """Executa `funcao` no pool de bcrypt, dentro das vagas; retorna None se o pool estiver saturado."""
+    if not _hash_vagas.acquire(timeout=config.LOGIN_HASH_TIMEOUT_S):
+        return None
+    try:
+        return _hash_executor.submit(funcao, *args).result()
+    finally:
+        _hash_vagas.release()
+
+def _checkpw_no_pool(password_bytes, hashed_bytes):
+    """Executa a verificação no pool de bcrypt; retorna None se o pool estiver saturado."""
+    return _no_pool(_checkpw, password_bytes, hashed_bytes)
+
+def custo_do_hash(hashed):
+    """Fator de custo (log2 das iterações) de um hash bcrypt: '$2b$12$...' -> 12."""
+    if isinstance(hashed, str):
+        hashed = hashed.encode('utf-8')
+    try:
+        return int(hashed.split(b'$')[2])
+    except (IndexError, ValueError):
+        return 0
+
+def _atualizar_hash_se_antigo(login, password_bytes, hashed_bytes):
+    """
+    Regrava com o custo configurado um hash abaixo de BCRYPT_ROUNDS (após
+    login válido). Disputa as mesmas vagas do pool que a verificação; sem vaga,
+    fica para um próximo login.
+    """
+    if custo_do_hash(hashed_bytes) >= config.BCRYPT_ROUNDS:
+        return
+    logger = logging.getLogger('login_attempts')
+    try:
+        novo_hash = _no_pool(bcrypt.hashpw, password_bytes, bcrypt.gensalt(rounds=config.BCRYPT_ROUNDS))
+        if novo_hash is None:
+            logger.info(f'Pool de bcrypt saturado; hash de senha de {login} será atualizado num próximo login.')
+            return
+        novo_hash = novo_hash.decode('utf-8')
+        with UnitOfWork() as uow:
+            uow.usuarios.atualizar_hash_senha(login, novo_hash)
+        logger.info(f'Hash de senha de {login} atualizado para custo {config.BCRYPT_ROUNDS}.')
+    except Exception as e:
+        logger.error(f'Falha ao atualizar o hash de senha de {login}: {e}')
+
+def verify_user_credentials(username, password, ip=None):
     logger = logging.getLogger('login_attempts')
+    if not _throttle.permitir(username, ip):
+        logger.warning(f'Login limitado para o usuário: {username} (IP: {ip})')
+        return THROTTLED
     try:
         engine = DatabaseManager.get_engine()
         if not engine:
             logger.error('Falha na autenticação: engine do banco de dados não disponível.')
-            return 'connection_error'
+            return CONNECTION_ERROR
         with engine.connect() as connection:
-            query = text('\n                         SELECT u.login_usuario,\n                                u.senha_criptografada,\n                                u.nome_completo,\n                                p.nome_perfil AS tipo_acesso\n                         FROM usuarios u\n                                  JOIN perfil_acesso p ON u.perfil_id = p.perfil_id\n                         WHERE u.login_usuario = :user\n                         ')
+            query = text('\n                         SELECT u.usuario_id,\n                                u.login_usuario,\n                                u.senha_criptografada,\n                                u.nome_completo,\n                                p.nome_perfil AS tipo_acesso\n                         FROM usuarios u\n                                  JOIN perfil_acesso p ON u.perfil_id = p.perfil_id\n                         WHERE u.login_usuario = :user\n                         ')
             result = connection.execute(query, {'user': username}).fetchone()
-            if result:
-                user_data = {key.lower(): value for key, value in result._mapping.items()}
-                hashed_password_from_db = user_data['senha_criptografada'].encode('utf-8')
-                password_from_user = password.encode('utf-8')
-                if bcrypt.checkpw(password_from_user, hashed_password_from_db):
-                    logger.info(f'Login bem-sucedido para: {username}')
-                    return {'username': user_data['login_usuario'], 'name': user_data['nome_completo'], 'access_level': user_data['tipo_acesso']}
-                else:
-                    logger.warning(f'Senha inválida para o usuário: {username}')
-                    return None
+        if result:
+            user_data = {key.lower(): value for key, value in result._mapping.items()}
+            hashed_password_from_db = user_data['senha_criptografada'].encode('utf-8')
+            password_from_user = password.encode('utf-8')
+            valido = _checkpw_no_pool(password_from_user, hashed_password_from_db)
+            if valido is None:
+                logger.warning(f'Pool de verificação de senha saturado; login recusado para: {username}')
+                return BUSY
+            if valido:
+                logger.info(f'Login bem-sucedido para: {username}')
+                _atualizar_hash_se_antigo(user_data['login_usuario'], password_from_user, hashed_password_from_db)
+                return {'user_id': user_data['usuario_id'], 'username': user_data['login_usuario'], 'name': user_data['nome_completo'], 'access_level': user_data['tipo_acesso']}
             else:
-                logger.warning(f'Usuário não encontrado: {username}')
+                logger.warning(f'Senha inválida para o usuário: {username}')
                 return None
+        else:
+            # Verificação fictícia para que o tempo de resposta não revele se o usuário existe.
+            if _checkpw_no_pool(password.encode('utf-8'), _dummy_hash()) is None:
+                return BUSY
+            logger.warning(f'Usuário não encontrado: {username}')
+            return None
     except ConnectionError as e:
         logger.critical(f'Falha de conexão durante a autenticação: {e}')
-        return 'connection_error'
+        return CONNECTION_ERROR
     except Exception as e:
         logger.error(f"Erro inesperado durante a verificação de credenciais para '{username}': {e}", exc_info=True)
         return None
 
-def hash_password(plain_text_password):
-    salt = bcrypt.gensalt()
+def hash_password(plain_text_password, rounds=None):
+    salt = bcrypt.gensalt(rounds=rounds or config.BCRYPT_ROUNDS)
     hashed_bytes = bcrypt.hashpw(plain_text_password.encode('utf-8'), salt)
     return hashed_bytes.decode('utf-8')
 
+def hash_passwords(senhas, workers=None, rounds=None):
+    """
+    Hashes de várias senhas, na ordem recebida, num pool de threads próprio
+    (não disputa vaga com o pool do login). `workers` None usa
+    IMPORTACAO_HASH_WORKERS, ou um por CPU se ele for 0.
+    """
+    senhas = list(senhas)
+    workers = workers or config.IMPORTACAO_HASH_WORKERS or os.cpu_count() or 1
+    if len(senhas) <= 1 or workers == 1:
+        return [hash_password(s, rounds) for s in senhas]
+    with ThreadPoolExecutor(max_workers=min(workers, len(senhas)), thread_name_prefix='bcrypt-lote') as pool:
+        return list(pool.map(lambda s: hash_password(s, rounds), senhas))
+
 def check_password_hash(plain_password, hashed_password):
     try:
         return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
     except (ValueError, TypeError):
-        return False
\ No newline at end of file
+        return False
+
+def medir_bcrypt_ms(rounds, repeticoes=3):
+    """Mediana, em ms, de bcrypt.hashpw com o custo informado nesta máquina."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        bcrypt.hashpw(b'benchmark-bcrypt', bcrypt.gensalt(rounds=rounds))
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+def escolher_custo_bcrypt(alvo_ms, minimo=10, maximo=16, medir=medir_bcrypt_ms):
+    """
+    Maior custo cujo hash fica dentro de `alvo_ms`, medindo de `minimo` para cima.
+
+    Cada ponto a mais dobra o tempo, então a medição para no primeiro custo que
+    passa do alvo. Nunca retorna menos que `minimo`. Retorna (custo, {custo: ms}).
+    """
+    medicoes = {}
+    escolhido = minimo
+    for rounds in range(minimo, maximo + 1):
+        medicoes[rounds] = medir(rounds)
+        if medicoes[rounds] > alvo_ms:
+            break
+        escolhido = rounds
+    return escolhido, medicoes
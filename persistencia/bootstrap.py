@@ -0,0 +1,144 @@
+"""
+Criação do banco a partir dos scripts SQL, numa única transação.
+
+Os scripts (schema + seeds da fábrica) são executados pelo `executescript`
+do driver SQLite, que entende ponto e vírgula dentro de strings e corpos de
+trigger. Cada script aplicado fica registrado em `controle_scripts` com o
+SHA-256 do conteúdo: na próxima inicialização só roda o que é novo ou mudou.
+Scripts, registro e migrações Python entram no mesmo BEGIN ... COMMIT, então
+uma falha em qualquer ponto deixa o banco como estava.
+
+Os scripts de schema precisam ser reexecutáveis (CREATE ... IF NOT EXISTS);
+mudanças que não podem ser reaplicadas vão para persistencia.migracoes. Os
+seeds (SEEDS) rodam uma única vez, na primeira aplicação: alterar um seed já
+aplicado só atualiza o checksum, para não recriar num banco em uso os
+pedidos, usuários e permissões que o administrador excluiu. Dados novos para
+bancos existentes entram num script de seed com outro nome ou numa migração.
+"""
+import hashlib
+import logging
+import re
+import sqlite3
+from pathlib import Path
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from .migracoes import aplicar_migracoes, executar_migracoes
+
+log = logging.getLogger(__name__)
+
+project_root = Path(__file__).parent.parent.resolve()
+SCRIPTS = [
+    ('schema', project_root / 'persistencia/sql_schema_SQLLite.sql'),
+    ('fabrica_dml', project_root / 'instalacao/sql_fabrica_DML.sql'),
+]
+# Scripts de dados: só executados quando ainda não foram aplicados nenhuma vez.
+SEEDS = {'fabrica_dml'}
+TABELA_CONTROLE = 'controle_scripts'
+# Tabela que só existe em bancos já criados pelo schema (antes do controle por checksum).
+TABELA_SENTINELA = 'usuarios'
+
+_CONTROLE_TRANSACAO = re.compile(r'^(BEGIN(\s+(DEFERRED|IMMEDIATE|EXCLUSIVE))?(\s+TRANSACTION)?|COMMIT(\s+TRANSACTION)?|END(\s+TRANSACTION)?)\s*;$', re.IGNORECASE)
+
+
+def checksum(conteudo: str) -> str:
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+
+def _sem_comentarios(trecho: str) -> str:
+    return '\n'.join(l for l in trecho.splitlines() if not l.strip().startswith('--')).strip()
+
+
+def sem_controle_de_transacao(script: str) -> str:
+    """Remove BEGIN/COMMIT de nível superior; a transação é aberta pelo bootstrap."""
+    comandos, atual = [], ''
+    for linha in script.splitlines(keepends=True):
+        atual += linha
+        if sqlite3.complete_statement(atual):
+            if not _CONTROLE_TRANSACAO.match(_sem_comentarios(atual)):
+                comandos.append(atual)
+            atual = ''
+    comandos.append(atual)
+    return ''.join(comandos)
+
+
+def scripts_pendentes(aplicados: dict, scripts=None) -> list:
+    """(nome, checksum, conteúdo) dos scripts ainda não aplicados ou alterados."""
+    pendentes = []
+    for nome, caminho in scripts or SCRIPTS:
+        if not caminho.is_file():
+            raise FileNotFoundError(f'Script SQL não encontrado em {caminho}')
+        conteudo = caminho.read_text(encoding='utf-8')
+        soma = checksum(conteudo)
+        if aplicados.get(nome) != soma:
+            pendentes.append((nome, soma, conteudo))
+    return pendentes
+
+
+def _ler_aplicados(conn) -> dict:
+    return dict(conn.exec_driver_sql(f'SELECT nome, checksum FROM {TABELA_CONTROLE}').fetchall())
+
+
+def _montar_lote(pendentes: list, so_registrar: set) -> str:
+    partes = [
+        'BEGIN;',
+        f'CREATE TABLE IF NOT EXISTS {TABELA_CONTROLE} (nome TEXT PRIMARY KEY, checksum TEXT NOT NULL, '
+        "aplicado_em TEXT NOT NULL DEFAULT (datetime('now')));",
+    ]
+    for nome, soma, conteudo in pendentes:
+        if nome not in so_registrar:
+            partes.append(sem_controle_de_transacao(conteudo))
+        partes.append(
+            f"INSERT OR REPLACE INTO {TABELA_CONTROLE} (nome, checksum, aplicado_em) "
+            f"VALUES ('{nome}', '{soma}', datetime('now'));"
+        )
+    return '\n'.join(partes)
+
+
+def bootstrap(engine: Engine, scripts=None) -> list:
+    """
+    Aplica os scripts pendentes e as migrações numa transação; retorna os nomes aplicados.
+
+    Bancos criados antes do controle por checksum (têm o schema mas não a
+    tabela de controle) só registram os checksums atuais, sem reexecutar os
+    seeds, para não recriar dados ou permissões removidos pelo administrador;
+    pelo mesmo motivo um seed já aplicado e depois alterado não é reexecutado.
+    """
+    if engine.url.drivername != 'sqlite':
+        log.info('Bootstrap por script pulado para banco não-SQLite.')
+        aplicar_migracoes(engine)
+        return []
+    with engine.connect() as conn:
+        tabelas = set(inspect(conn).get_table_names())
+        aplicados = _ler_aplicados(conn) if TABELA_CONTROLE in tabelas else {}
+        pendentes = scripts_pendentes(aplicados, scripts)
+        registrar_apenas = TABELA_CONTROLE not in tabelas and TABELA_SENTINELA in tabelas
+        if registrar_apenas:
+            so_registrar = {nome for nome, _, _ in pendentes}
+        else:
+            so_registrar = {nome for nome, _, _ in pendentes if nome in SEEDS and nome in aplicados}
+        conn.rollback()
+        if not pendentes:
+            log.info('Banco de dados SQLite já está atualizado com os scripts.')
+            aplicar_migracoes(engine)
+            return []
+
+        bruta = conn.connection.driver_connection
+        try:
+            # executescript faz COMMIT do que estiver pendente e roda o lote como veio:
+            # o BEGIN do lote só é fechado pelo commit abaixo, depois das migrações.
+            bruta.executescript(_montar_lote(pendentes, so_registrar))
+            executar_migracoes(conn)
+            bruta.commit()
+        except Exception:
+            bruta.rollback()
+            raise
+    nomes = [nome for nome, _, _ in pendentes]
+    if registrar_apenas:
+        log.info(f'Banco existente: checksums registrados sem reexecutar os scripts {nomes}.')
+    else:
+        if so_registrar:
+            log.info(f'Seeds já aplicados, só o checksum foi atualizado: {sorted(so_registrar)}.')
+        executados = [nome for nome in nomes if nome not in so_registrar]
+        if executados:
+            log.info(f'Scripts SQL aplicados numa transação: {executados}.')
+    return nomes
@@ -0,0 +1,156 @@
+"""
+config_banco.py — Configuração do banco lida uma única vez por processo.
+
+Junta o banco.ini (conexão ativa) e o config_settings.ini (via módulo config)
+num objeto imutável e validado. Variáveis de ambiente BANCO_<CHAVE> (ex.:
+BANCO_TYPE, BANCO_PATH, BANCO_HOST) sobrepõem o banco.ini; BANCO_USER e
+BANCO_PASSWORD aceitam o valor cifrado com o secret.key ou o texto puro.
+
+Verificação sem abrir o Streamlit:
+    python -m persistencia.config_banco --check
+"""
+import argparse
+import os
+import sys
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+
+import config
+
+project_root = Path(__file__).parent.parent.resolve()
+CONFIG_PATH = project_root / 'banco.ini'
+PREFIXO_AMBIENTE = 'BANCO_'
+CHAVES = ('type', 'path', 'host', 'port', 'dbname', 'user', 'password')
+TIPOS_SUPORTADOS = ('sqlite', 'postgresql', 'mysql', 'sqlserver', 'mariadb', 'oracle', 'firebird')
+_DRIVERS = {
+    'postgresql': 'postgresql+psycopg2',
+    'mysql': 'mysql+pymysql',
+    'sqlserver': 'mssql+pymssql',
+    'mariadb': 'mariadb+mariadbconnector',
+    'oracle': 'oracle+oracledb',
+    'firebird': 'firebird+fdb',
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ConfigBanco:
+    tipo: str
+    path: str | None = None
+    host: str | None = None
+    port: str | None = None
+    dbname: str | None = None
+    user: str | None = field(default=None, repr=False)
+    password: str | None = field(default=None, repr=False)
+    habilitado: bool = True
+    inicializar: bool = True
+
+    @property
+    def sqlite_path(self) -> Path | None:
+        if self.tipo != 'sqlite':
+            return None
+        return project_root / (self.path or 'sistema.db')
+
+    def url(self) -> str:
+        """URL do SQLAlchemy; decifra user/password só quando necessário."""
+        if self.tipo == 'sqlite':
+            return f'sqlite:///{self.sqlite_path}'
+        from .security import decrypt_message
+        user = decrypt_message(self.user)
+        password = decrypt_message(self.password)
+        return f'{_DRIVERS[self.tipo]}://{user}:{password}@{self.host}:{self.port}/{self.dbname}'
+
+
+def _ler_ini(caminho: Path) -> dict:
+    """Pares chave = valor não comentados; numa chave repetida vale a última."""
+    if not caminho.is_file():
+        raise FileNotFoundError(f"Arquivo de configuração '{caminho}' não encontrado.")
+    ativo = {}
+    with open(caminho, 'r', encoding='utf-8') as f:
+        for linha in f:
+            linha = linha.strip()
+            if not linha or linha.startswith(('#', ';', '[')) or '=' not in linha:
+                continue
+            chave, valor = linha.split('=', 1)
+            ativo[chave.strip()] = valor.strip()
+    return ativo
+
+
+def carregar_config_banco(caminho: Path = CONFIG_PATH, ambiente=None) -> ConfigBanco:
+    """Lê e valida a configuração; levanta ValueError/FileNotFoundError se inválida."""
+    ambiente = os.environ if ambiente is None else ambiente
+    sobrepostos = {c: ambiente[PREFIXO_AMBIENTE + c.upper()] for c in CHAVES
+                   if PREFIXO_AMBIENTE + c.upper() in ambiente}
+    # Com BANCO_TYPE definido o banco.ini é opcional.
+    ativo = {} if 'type' in sobrepostos and not caminho.is_file() else _ler_ini(caminho)
+    ativo.update(sobrepostos)
+    if 'type' not in ativo:
+        raise ValueError("Nenhuma configuração de banco de dados ativa (descomentada) foi encontrada no 'banco.ini'.")
+    tipo = ativo['type'].lower()
+    if tipo not in TIPOS_SUPORTADOS:
+        raise ValueError(f"Tipo de banco de dados não suportado: '{tipo}'")
+    if tipo != 'sqlite':
+        faltando = [c for c in ('host', 'dbname', 'user', 'password') if not ativo.get(c)]
+        if faltando:
+            raise ValueError(f"Parâmetros faltando no 'banco.ini' para a conexão '{tipo}': {', '.join(faltando)}")
+    return ConfigBanco(
+        tipo=tipo,
+        **{c: ativo.get(c) for c in CHAVES if c != 'type'},
+        habilitado=config.DATABASE_ENABLED,
+        inicializar=config.INITIALIZE_DATABASE_ON_STARTUP,
+    )
+
+
+@lru_cache(maxsize=1)
+def config_banco() -> ConfigBanco:
+    """Configuração do processo: lida na primeira chamada e mantida em cache."""
+    return carregar_config_banco()
+
+
+def verificar() -> list:
+    """Conecta ao banco configurado e confere os PRAGMAs; devolve (item, ok, detalhe)."""
+    from sqlalchemy import text
+    from .database import criar_engine
+
+    resultados = []
+    try:
+        cfg = config_banco()
+        resultados.append(('configuração', True, f"tipo={cfg.tipo}" + (f" arquivo={cfg.sqlite_path}" if cfg.sqlite_path else f" host={cfg.host}")))
+    except (FileNotFoundError, ValueError) as e:
+        return [('configuração', False, str(e))]
+    if not cfg.habilitado:
+        return resultados + [('conexão', False, 'database_enabled = False no config_settings.ini')]
+    engine = None
+    try:
+        # Engine própria, criada a partir de cfg: a verificação confere o banco
+        # configurado agora, não o engine que o processo já tenha em cache.
+        engine = criar_engine(cfg)
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+            resultados.append(('conexão', True, engine.url.render_as_string(hide_password=True)))
+            if cfg.tipo == 'sqlite':
+                fk = conn.execute(text('PRAGMA foreign_keys')).scalar()
+                resultados.append(('PRAGMA foreign_keys', fk == 1, f'= {fk}'))
+    except Exception as e:
+        resultados.append(('conexão', False, str(e)))
+    finally:
+        if engine is not None:
+            engine.dispose()
+    return resultados
+
+
+def main(argv=None) -> int:
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    args.add_argument('--check', action='store_true', help='Valida a configuração, conecta e confere os PRAGMAs.')
+    opcoes = args.parse_args(argv)
+    if not opcoes.check:
+        print(config_banco())
+        return 0
+    resultados = verificar()
+    for item, ok, detalhe in resultados:
+        print(f"[{'OK' if ok else 'FALHA'}] {item}: {detalhe}")
+    return 0 if all(ok for _, ok, _ in resultados) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,18 @@
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import queue
 import sys
 import os
+import threading
+import time
+import uuid
+from datetime import datetime
 from pathlib import Path
 try:
-    from config import LOG_LEVEL, LOG_FORMAT, REDIRECT_CONSOLE_TO_LOG
+    from config import LOG_LEVEL, LOG_FORMAT, REDIRECT_CONSOLE_TO_LOG, LOG_ASSINCRONO, LOG_ROTACAO, LOG_MAX_MB, LOG_BACKUPS, LOG_FORMATO
 except ImportError as e:
     print(f'Erro fatal: Não foi possível importar configurações do logger: {e}', file=sys.stderr)
     print('Verifique se o arquivo config.py existe e define LOG_LEVEL, LOG_FORMAT e REDIRECT_CONSOLE_TO_LOG.', file=sys.stderr)
@@ -12,6 +21,68 @@ except Exception as e:
     print(f'Erro inesperado ao importar config: {e}', file=sys.stderr)
     sys.exit(1)
 
+LOG_DIR = Path(__file__).parent.parent / 'logs'
+
+# Listener ativo (thread que grava os registros enfileirados); None no modo síncrono.
+_listener = None
+# setup_loggers_uma_vez: o Home.py roda a cada rerun de cada sessão, mas o
+# logger raiz é do processo.
+_configurado = False
+_configuracao_lock = threading.Lock()
+
+# ── Correlação por rerun ─────────────────────────────────────────────────────
+# Cada execução do script (rerun) recebe um ID; todo registro emitido na mesma
+# thread/contexto leva esse ID e o tempo decorrido desde o início do rerun.
+_correlacao_id = contextvars.ContextVar('correlacao_id', default='-')
+_inicio_rerun = contextvars.ContextVar('inicio_rerun', default=None)
+
+def iniciar_rerun() -> str:
+    """Gera e ativa um novo ID de correlação para o rerun atual."""
+    novo_id = uuid.uuid4().hex[:12]
+    _correlacao_id.set(novo_id)
+    _inicio_rerun.set(time.perf_counter())
+    return novo_id
+
+def correlacao_id() -> str:
+    return _correlacao_id.get()
+
+def ms_desde(inicio: float) -> float:
+    """Milissegundos desde um time.perf_counter(), arredondados para os campos de tempo."""
+    return round((time.perf_counter() - inicio) * 1000, 2)
+
+class FiltroContexto(logging.Filter):
+    """Anexa correlacao_id e decorrido_ms (desde o início do rerun) a cada registro."""
+
+    def filter(self, record):
+        record.correlacao_id = _correlacao_id.get()
+        inicio = _inicio_rerun.get()
+        record.decorrido_ms = ms_desde(inicio) if inicio is not None else None
+        return True
+
+# Atributos padrão do LogRecord; o que sobrar veio de `extra=` (ex.: duracao_ms, sql).
+_ATRIBUTOS_PADRAO = set(logging.LogRecord('', 0, '', 0, '', (), None).__dict__) | {'message', 'asctime', 'taskName', 'correlacao_id', 'decorrido_ms'}
+
+class FormatadorJSON(logging.Formatter):
+    """Uma linha JSON por registro, com os campos de correlação e de tempo."""
+
+    def format(self, record):
+        dados = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'correlacao_id': getattr(record, 'correlacao_id', '-'),
+            'decorrido_ms': getattr(record, 'decorrido_ms', None),
+        }
+        for chave, valor in record.__dict__.items():
+            if chave not in _ATRIBUTOS_PADRAO:
+                dados[chave] = valor
+        if record.exc_info:
+            dados['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            dados['exc'] = record.exc_text
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
 class LogRedirector:
 
     def __init__(self, logger_instance, log_level=logging.INFO):
@@ -20,40 +91,99 @@ class LogRedirector:
         self.line_buffer = ''
 
     def write(self, buf):
-        for line in buf.rstrip().splitlines():
-            self.logger.log(self.log_level, line.rstrip())
+        # print() costuma chegar em pedaços ('texto' e depois '\n'): só registra linhas completas.
+        if not buf or not self.logger.isEnabledFor(self.log_level):
+            return len(buf or '')
+        if '\n' not in buf:
+            self.line_buffer += buf
+            return len(buf)
+        linhas = (self.line_buffer + buf).split('\n')
+        self.line_buffer = linhas.pop()
+        for line in linhas:
+            if line.strip():
+                self.logger.log(self.log_level, line.rstrip())
+        return len(buf)
 
     def flush(self):
-        pass
+        if self.line_buffer.strip():
+            self.logger.log(self.log_level, self.line_buffer.rstrip())
+        self.line_buffer = ''
 
-def setup_loggers():
-    log_level = LOG_LEVEL
-    formatter = logging.Formatter(LOG_FORMAT)
+def _criar_handler_arquivo(log_file_path: Path) -> logging.Handler:
+    if LOG_ROTACAO == 'diaria':
+        return logging.handlers.TimedRotatingFileHandler(log_file_path, when='midnight', backupCount=LOG_BACKUPS, encoding='utf-8')
+    return logging.handlers.RotatingFileHandler(log_file_path, mode='a', maxBytes=LOG_MAX_MB * 1024 * 1024, backupCount=LOG_BACKUPS, encoding='utf-8')
+
+def parar_loggers():
+    """Esvazia a fila e encerra a thread de gravação (chamado também no atexit)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+def setup_loggers(log_level=None, log_dir: Path=None, assincrono: bool=None):
+    """
+    Configura o logger raiz. No modo assíncrono (padrão) o raiz recebe só um
+    QueueHandler: as threads das sessões enfileiram o registro e a escrita em
+    console/arquivo acontece na thread do QueueListener.
+    """
+    global _listener
+    log_level = LOG_LEVEL if log_level is None else log_level
+    assincrono = LOG_ASSINCRONO if assincrono is None else assincrono
+    log_dir = Path(log_dir) if log_dir else LOG_DIR
+    formatter = FormatadorJSON() if LOG_FORMATO == 'json' else logging.Formatter(LOG_FORMAT)
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
+    parar_loggers()
     if root_logger.hasHandlers():
         root_logger.handlers.clear()
+    handlers = []
     try:
-        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler = logging.StreamHandler(sys.__stdout__ if isinstance(sys.stdout, LogRedirector) else sys.stdout)
         console_handler.setLevel(log_level)
         console_handler.setFormatter(formatter)
-        root_logger.addHandler(console_handler)
+        handlers.append(console_handler)
     except Exception as e:
         print(f'Erro ao configurar o logger do console: {e}', file=sys.stderr)
+    log_file_path = log_dir / 'app.log'
+    erro_arquivo = None
     try:
-        log_dir = Path(__file__).parent.parent / 'logs'
         log_dir.mkdir(parents=True, exist_ok=True)
-        log_file_path = log_dir / 'app.log'
-        file_handler = logging.FileHandler(log_file_path, mode='a', encoding='utf-8')
+        file_handler = _criar_handler_arquivo(log_file_path)
         file_handler.setLevel(log_level)
         file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
     except Exception as e:
-        root_logger.error(f"Não foi possível criar o handler de arquivo de log em '{log_file_path}': {e}")
-    if REDIRECT_CONSOLE_TO_LOG:
+        erro_arquivo = e
+    if assincrono:
+        fila = queue.SimpleQueue()
+        root_logger.addHandler(logging.handlers.QueueHandler(fila))
+        _listener = logging.handlers.QueueListener(fila, *handlers, respect_handler_level=True)
+        _listener.start()
+    else:
+        for handler in handlers:
+            root_logger.addHandler(handler)
+    # O filtro roda na thread que emite o registro (antes da fila), onde o contexto do rerun existe.
+    for handler in root_logger.handlers:
+        handler.addFilter(FiltroContexto())
+    if erro_arquivo is not None:
+        root_logger.error("Não foi possível criar o handler de arquivo de log em '%s': %s", log_file_path, erro_arquivo)
+    if REDIRECT_CONSOLE_TO_LOG and not isinstance(sys.stdout, LogRedirector):
         root_logger.info('Redirecionando stdout e stderr para os handlers de log...')
         sys.stdout = LogRedirector(logging.getLogger('STDOUT'), logging.INFO)
         sys.stderr = LogRedirector(logging.getLogger('STDERR'), logging.ERROR)
     root_logger.info('=' * 30)
-    root_logger.info('Sistema de loggers configurado com sucesso.')
-    root_logger.debug(f'Nível de log definido como: {logging.getLevelName(log_level)} ({log_level})')
\ No newline at end of file
+    root_logger.info('Sistema de loggers configurado com sucesso (%s).', 'assíncrono' if assincrono else 'síncrono')
+    root_logger.debug('Nível de log definido como: %s (%s)', logging.getLevelName(log_level), log_level)
+
+def setup_loggers_uma_vez():
+    """setup_loggers() com as opções do config só na primeira chamada do processo."""
+    global _configurado
+    with _configuracao_lock:
+        if not _configurado:
+            setup_loggers()
+            _configurado = True
+
+atexit.register(parar_loggers)
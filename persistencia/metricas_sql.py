@@ -0,0 +1,204 @@
+"""
+Métricas de SQL por impressão digital, coletadas na engine do DatabaseManager.
+
+Os eventos before/after_cursor_execute medem cada comando enviado ao driver.
+A impressão digital é o SQL normalizado (espaços, literais e listas IN
+colapsados), então as variações de parâmetros de um mesmo comando somam na
+mesma linha. BaseRepository envolve cada _execute_* em `chamada()`, que
+atribui os comandos ao método do repositório e informa as linhas lidas; a
+página vem de `definir_pagina()` (Home.py, a cada rerun).
+
+Comandos acima de SQL_LENTA_MS geram um aviso no log com duração, linhas,
+origem e página. `top()` alimenta a página de Consultas SQL; os agregados
+vivem no processo e zeram ao reiniciar o servidor (ou com `zerar()`).
+"""
+import contextvars
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import config
+
+log = logging.getLogger(__name__)
+
+SEM_ORIGEM = '-'
+# Impressões além do limite somam nesta linha, para a memória não crescer sem fim.
+IMPRESSAO_EXCEDENTE = 'outras'
+ORDENACOES = ('total_ms', 'media_ms', 'max_ms', 'chamadas', 'lentas', 'linhas')
+
+_RE_STRING = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMERO = re.compile(r'\b\d+(?:\.\d+)?\b')
+_RE_LISTA = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_RE_ESPACO = re.compile(r'\s+')
+
+_pagina = contextvars.ContextVar('sql_pagina', default=SEM_ORIGEM)
+_chamada = contextvars.ContextVar('sql_chamada', default=None)
+_lock = threading.Lock()
+_estatisticas = {}
+
+
+@lru_cache(maxsize=2048)
+def normalizar(sql: str) -> str:
+    """SQL sem literais nem variações de espaço; listas IN (?, ?, ...) viram IN (?...)."""
+    texto = _RE_STRING.sub('?', sql)
+    texto = _RE_NUMERO.sub('?', texto)
+    texto = _RE_ESPACO.sub(' ', texto).strip()
+    return _RE_LISTA.sub('(?...)', texto)
+
+
+@lru_cache(maxsize=2048)
+def impressao_digital(sql: str) -> str:
+    return hashlib.sha1(normalizar(sql).encode('utf-8')).hexdigest()[:12]
+
+
+class Chamada:
+    """Comandos executados durante um método de repositório."""
+
+    __slots__ = ('origem', 'linhas', 'consultas')
+
+    def __init__(self, origem: str):
+        self.origem = origem
+        self.linhas = None
+        self.consultas = []
+
+
+class Estatistica:
+    __slots__ = ('sql', 'chamadas', 'total_ms', 'max_ms', 'linhas', 'lentas', 'erros', 'origens', 'paginas')
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.chamadas = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.linhas = 0
+        self.lentas = 0
+        self.erros = 0
+        self.origens = Counter()
+        self.paginas = Counter()
+
+
+def definir_pagina(pagina: str):
+    """Página do rerun atual, atribuída aos comandos executados nesta thread."""
+    _pagina.set(pagina or SEM_ORIGEM)
+
+
+@contextmanager
+def chamada(origem: str):
+    atual = Chamada(origem)
+    token = _chamada.set(atual)
+    try:
+        yield atual
+    finally:
+        _chamada.reset(token)
+        unica = len(atual.consultas) == 1
+        for sql, ms, linhas in atual.consultas:
+            # SELECT não informa rowcount no cursor: vale a contagem do repositório.
+            registrar(sql, ms, linhas if linhas is not None else (atual.linhas if unica else None), atual.origem)
+
+
+def _estatistica(sql: str) -> Estatistica:
+    chave = impressao_digital(sql)
+    estatistica = _estatisticas.get(chave)
+    if estatistica is None:
+        if len(_estatisticas) >= config.SQL_MAX_IMPRESSOES:
+            return _estatisticas.setdefault(IMPRESSAO_EXCEDENTE, Estatistica('(demais comandos)'))
+        estatistica = _estatisticas[chave] = Estatistica(normalizar(sql))
+    return estatistica
+
+
+def registrar(sql: str, ms: float, linhas: int = None, origem: str = None):
+    origem = origem or SEM_ORIGEM
+    pagina = _pagina.get()
+    lenta = ms >= config.SQL_LENTA_MS
+    with _lock:
+        estatistica = _estatistica(sql)
+        estatistica.chamadas += 1
+        estatistica.total_ms += ms
+        estatistica.max_ms = max(estatistica.max_ms, ms)
+        estatistica.linhas += linhas or 0
+        estatistica.lentas += lenta
+        estatistica.origens[origem] += 1
+        estatistica.paginas[pagina] += 1
+    if lenta:
+        log.warning('SQL lenta (%.0f ms) em %s: %s', ms, origem, normalizar(sql)[:200],
+                    extra={'duracao_ms': round(ms, 3), 'impressao': impressao_digital(sql), 'linhas': linhas,
+                           'origem': origem, 'pagina': pagina})
+
+
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metricas_sql_inicio', []).append(time.perf_counter())
+
+
+def _depois(conn, cursor, statement, parameters, context, executemany):
+    ms = (time.perf_counter() - conn.info['metricas_sql_inicio'].pop()) * 1000
+    linhas = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None
+    atual = _chamada.get()
+    if atual is not None:
+        atual.consultas.append((statement, ms, linhas))
+    else:
+        registrar(statement, ms, linhas)
+
+
+def _erro(contexto):
+    conn = contexto.connection
+    pilha = conn.info.get('metricas_sql_inicio') if conn is not None else None
+    if pilha and contexto.statement:
+        pilha.pop()
+        with _lock:
+            _estatistica(contexto.statement).erros += 1
+
+
+def instrumentar(engine: Engine):
+    """Registra os eventos na engine (uma vez; chamadas repetidas não duplicam)."""
+    if event.contains(engine, 'before_cursor_execute', _antes):
+        return
+    event.listen(engine, 'before_cursor_execute', _antes)
+    event.listen(engine, 'after_cursor_execute', _depois)
+    event.listen(engine, 'handle_error', _erro)
+
+
+def top(n: int = 20, ordem: str = 'total_ms') -> list:
+    """As `n` impressões com maior `ordem` (ver ORDENACOES), com origem e página mais frequentes."""
+    if ordem not in ORDENACOES:
+        raise ValueError(f"Ordenação '{ordem}' inválida. Use uma de {ORDENACOES}.")
+    with _lock:
+        total_geral = sum(e.total_ms for e in _estatisticas.values()) or 1.0
+        linhas = [{
+            'impressao': chave,
+            'sql': e.sql,
+            'chamadas': e.chamadas,
+            'total_ms': e.total_ms,
+            'media_ms': e.total_ms / e.chamadas if e.chamadas else 0.0,
+            'max_ms': e.max_ms,
+            'linhas': e.linhas,
+            'lentas': e.lentas,
+            'erros': e.erros,
+            'pct_tempo': e.total_ms / total_geral,
+            'origens': dict(e.origens.most_common()),
+            'paginas': dict(e.paginas.most_common()),
+        } for chave, e in _estatisticas.items()]
+    return sorted(linhas, key=lambda linha: -linha[ordem])[:n]
+
+
+def resumo() -> dict:
+    with _lock:
+        return {
+            'impressoes': len(_estatisticas),
+            'chamadas': sum(e.chamadas for e in _estatisticas.values()),
+            'total_ms': sum(e.total_ms for e in _estatisticas.values()),
+            'lentas': sum(e.lentas for e in _estatisticas.values()),
+            'erros': sum(e.erros for e in _estatisticas.values()),
+        }
+
+
+def zerar():
+    with _lock:
+        _estatisticas.clear()
@@ -0,0 +1,245 @@
+"""
+Migrações incrementais de schema para bancos já existentes.
+
+Cada migração é idempotente: inspeciona o estado atual do banco antes de
+alterar qualquer coisa e pode ser reexecutada a cada inicialização.
+"""
+import logging
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from persistencia.repositorios.fabrica_repo import INICIO_HISTORICO, FabricaRepository
+from utils.traco_utils import COLUNAS_TRACO, parse_traco
+
+log = logging.getLogger(__name__)
+
+# Contador de controle_versao com o maior id de traço já examinado por migrar_tracos_estruturados.
+CHAVE_TRACOS_EXAMINADOS = "migracao_tracos_ultimo_id"
+
+
+def migrar_tracos_estruturados(conn: Connection) -> int:
+    """
+    Adiciona as colunas numéricas de traço e preenche a partir de traco_str.
+
+    Cada traço é examinado uma única vez (CHAVE_TRACOS_EXAMINADOS): os de
+    formato inválido geram um aviso só na primeira execução e, nas seguintes,
+    a migração não faz nada.
+    """
+    existentes = {col["name"] for col in inspect(conn).get_columns("fab_tracos_padrao")}
+    for coluna in COLUNAS_TRACO:
+        if coluna not in existentes:
+            log.info(f"Migração: adicionando coluna fab_tracos_padrao.{coluna}")
+            conn.execute(text(f"ALTER TABLE fab_tracos_padrao ADD COLUMN {coluna} REAL"))
+
+    criar_controle_versao(conn)
+    examinados = conn.execute(
+        text("SELECT valor FROM controle_versao WHERE chave = :chave"), {"chave": CHAVE_TRACOS_EXAMINADOS}
+    ).scalar() or 0
+    pendentes = conn.execute(
+        text("SELECT id, traco_str FROM fab_tracos_padrao WHERE prop_cimento IS NULL AND id > :examinados ORDER BY id"),
+        {"examinados": examinados},
+    ).fetchall()
+    if not pendentes:
+        return 0
+    atualizacoes = []
+    for traco_id, traco_str in pendentes:
+        traco = parse_traco(traco_str)
+        if traco is None:
+            log.warning(f"Migração: traço #{traco_id} com formato inválido ('{traco_str}'), mantido sem proporções.")
+            continue
+        atualizacoes.append({"id": traco_id, **traco.como_colunas()})
+
+    if atualizacoes:
+        set_str = ", ".join(f"{coluna} = :{coluna}" for coluna in COLUNAS_TRACO)
+        conn.execute(text(f"UPDATE fab_tracos_padrao SET {set_str} WHERE id = :id"), atualizacoes)
+        log.info(f"Migração: {len(atualizacoes)} traço(s) preenchido(s) com proporções numéricas.")
+    params = {"chave": CHAVE_TRACOS_EXAMINADOS, "valor": pendentes[-1][0]}
+    if not conn.execute(text("UPDATE controle_versao SET valor = :valor WHERE chave = :chave"), params).rowcount:
+        conn.execute(text("INSERT INTO controle_versao (chave, valor) VALUES (:chave, :valor)"), params)
+    return len(atualizacoes)
+
+
+def _registrar_pagina(conn: Connection, nome_arquivo: str, nome_amigavel: str, perfis: tuple) -> bool:
+    """Cadastra uma página nova e a libera para `perfis` (ids de perfil_acesso).
+
+    Só atua quando a página ainda não existe, para não reconceder permissões
+    que o administrador tenha removido depois.
+    """
+    existe = conn.execute(
+        text("SELECT 1 FROM pagina WHERE nome_arquivo = :nome"), {"nome": nome_arquivo}
+    ).first()
+    if existe:
+        return False
+
+    conn.execute(
+        text("INSERT INTO pagina (nome_arquivo, nome_amigavel) VALUES (:nome, :amigavel)"),
+        {"nome": nome_arquivo, "amigavel": nome_amigavel},
+    )
+    # SQL comum a todos os bancos suportados (sem lastrowid nem INSERT OR IGNORE).
+    pagina_id = conn.execute(
+        text("SELECT pagina_id FROM pagina WHERE nome_arquivo = :nome"), {"nome": nome_arquivo}
+    ).scalar()
+    conn.execute(
+        text(f"""
+            INSERT INTO perfil_pagina_permissao (perfil_id, pagina_id)
+            SELECT a.perfil_id, :pagina_id FROM perfil_acesso a
+            WHERE a.perfil_id IN ({", ".join(str(int(p)) for p in perfis)})
+              AND NOT EXISTS (
+                  SELECT 1 FROM perfil_pagina_permissao pp
+                  WHERE pp.perfil_id = a.perfil_id AND pp.pagina_id = :pagina_id
+              )
+        """),
+        {"pagina_id": pagina_id},
+    )
+    log.info(f"Migração: página '{nome_arquivo}' registrada (id {pagina_id}).")
+    return True
+
+
+def registrar_pagina_programacao(conn: Connection) -> bool:
+    """Cadastra a página de Programação da Produção para Administrador e Produção."""
+    return _registrar_pagina(conn, "13_📅_Programacao_Producao.py", "Programação da Produção", (1, 3))
+
+
+def registrar_pagina_saude(conn: Connection) -> bool:
+    """Cadastra a página de Saúde do Sistema, só para o Administrador."""
+    return _registrar_pagina(conn, "14_🩺_Saude_Sistema.py", "Saúde do Sistema", (1,))
+
+
+def registrar_pagina_consultas_sql(conn: Connection) -> bool:
+    """Cadastra a página de Consultas SQL (relatório das mais custosas), só para o Administrador."""
+    return _registrar_pagina(conn, "15_🐢_Consultas_SQL.py", "Consultas SQL", (1,))
+
+
+def registrar_pagina_custos(conn: Connection) -> bool:
+    """Cadastra a página de Custos por Pedido para Administrador e Comercial."""
+    return _registrar_pagina(conn, "16_💰_Custos_Pedidos.py", "Custos por Pedido", (1, 4))
+
+
+def criar_rollup_semanal(conn: Connection) -> bool:
+    """Cria fab_rollup_semanal e o preenche quando há pedidos mas o rollup está vazio."""
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS fab_rollup_semanal (
+            semana TEXT NOT NULL,
+            status TEXT NOT NULL,
+            pedidos INTEGER NOT NULL DEFAULT 0,
+            volume_m3 REAL NOT NULL DEFAULT 0.0,
+            PRIMARY KEY (semana, status)
+        )
+    """))
+    vazio = conn.execute(text("SELECT NOT EXISTS (SELECT 1 FROM fab_rollup_semanal)")).scalar()
+    if not vazio or not conn.execute(text("SELECT EXISTS (SELECT 1 FROM fab_pedidos)")).scalar():
+        return False
+    FabricaRepository(conn).reconstruir_rollup_semanal()
+    log.info("Migração: rollup semanal de pedidos reconstruído.")
+    return True
+
+
+def criar_controle_versao(conn: Connection) -> bool:
+    """Cria a tabela de contadores (versões de permissões, sessões e pedidos, marcadores de migração)."""
+    if "controle_versao" in inspect(conn).get_table_names():
+        return False
+    conn.execute(text("""
+        CREATE TABLE controle_versao (
+            chave TEXT PRIMARY KEY,
+            valor INTEGER NOT NULL DEFAULT 0
+        )
+    """))
+    log.info("Migração: tabela controle_versao criada.")
+    return True
+
+
+def criar_historico_precos(conn: Connection) -> bool:
+    """Cria fab_materiais_precos e registra o custo atual de cada material como ponto de partida."""
+    if "fab_materiais_precos" in inspect(conn).get_table_names():
+        return False
+    conn.execute(text("""
+        CREATE TABLE fab_materiais_precos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            material_id INTEGER NOT NULL,
+            custo_kg REAL NOT NULL,
+            vigente_desde TEXT NOT NULL,
+            vigente_ate TEXT,
+            origem TEXT,
+            FOREIGN KEY (material_id) REFERENCES fab_materiais(id) ON DELETE CASCADE
+        )
+    """))
+    conn.execute(text("CREATE INDEX idx_materiais_precos_material ON fab_materiais_precos (material_id, vigente_desde)"))
+    conn.execute(text("CREATE INDEX idx_materiais_precos_vigencia ON fab_materiais_precos (vigente_desde, vigente_ate)"))
+    conn.execute(text("INSERT INTO fab_materiais_precos (material_id, custo_kg, vigente_desde, origem) "
+                      "SELECT id, custo_kg, :inicio, 'inicial' FROM fab_materiais"), {"inicio": INICIO_HISTORICO})
+    log.info("Migração: histórico de preços de materiais criado.")
+    return True
+
+
+def criar_intervalos_precos(conn: Connection) -> bool:
+    """
+    Adiciona vigente_ate a fab_materiais_precos e fecha os intervalos já
+    registrados. O preço inicial de cada material passa a valer desde
+    INICIO_HISTORICO, para que pedidos anteriores ao histórico tenham custo.
+    """
+    tabelas = inspect(conn).get_table_names()
+    if "fab_materiais_precos" not in tabelas:
+        return False
+    if "vigente_ate" in {col["name"] for col in inspect(conn).get_columns("fab_materiais_precos")}:
+        return False
+    conn.execute(text("ALTER TABLE fab_materiais_precos ADD COLUMN vigente_ate TEXT"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS idx_materiais_precos_vigencia ON fab_materiais_precos (vigente_desde, vigente_ate)"))
+    conn.execute(text("UPDATE fab_materiais_precos SET vigente_desde = :inicio WHERE origem = 'inicial'"),
+                 {"inicio": INICIO_HISTORICO})
+    FabricaRepository(conn)._fechar_intervalos_precos()
+    log.info("Migração: intervalos de vigência adicionados ao histórico de preços.")
+    return True
+
+
+def normalizar_datas_precos(conn: Connection) -> bool:
+    """
+    Reduz a 'AAAA-MM-DD' as datas do histórico de preços gravadas com hora
+    (o antigo padrão datetime('now')), para compará-las com data_pedido.
+    """
+    linhas = conn.execute(text(
+        "SELECT id, vigente_desde, vigente_ate FROM fab_materiais_precos "
+        "WHERE vigente_desde LIKE '% %' OR vigente_ate LIKE '% %'"
+    )).fetchall()
+    if not linhas:
+        return False
+    conn.execute(text("UPDATE fab_materiais_precos SET vigente_desde = :desde, vigente_ate = :ate WHERE id = :id"),
+                 [{"id": id_, "desde": desde[:10], "ate": ate and ate[:10]} for id_, desde, ate in linhas])
+    log.info("Migração: %d data(s) do histórico de preços normalizada(s).", len(linhas))
+    return True
+
+
+MIGRACOES = [
+    ("fab_tracos_padrao", migrar_tracos_estruturados),
+    ("pagina", registrar_pagina_programacao),
+    ("pagina", registrar_pagina_saude),
+    ("pagina", registrar_pagina_consultas_sql),
+    ("pagina", registrar_pagina_custos),
+    ("fab_pedidos", criar_rollup_semanal),
+    ("perfil_pagina_permissao", criar_controle_versao),
+    ("fab_materiais", criar_historico_precos),
+    ("fab_materiais", criar_intervalos_precos),
+    ("fab_materiais_precos", normalizar_datas_precos),
+]
+
+# Migrações com SQL próprio do SQLite (AUTOINCREMENT, funções de data do
+# SQLite, UPDATE com subconsulta correlacionada); nos demais bancos o schema
+# equivalente é criado pelo administrador.
+SOMENTE_SQLITE = {criar_rollup_semanal, criar_historico_precos, criar_intervalos_precos}
+
+
+def executar_migracoes(conn: Connection):
+    """Executa as migrações na transação já aberta em `conn`."""
+    tabelas = set(inspect(conn).get_table_names())
+    sqlite = conn.dialect.name == "sqlite"
+    for tabela, migracao in MIGRACOES:
+        if tabela not in tabelas:
+            continue
+        if migracao in SOMENTE_SQLITE and not sqlite:
+            log.info(f"Migração {migracao.__name__} pulada: exige SQLite (banco '{conn.dialect.name}').")
+            continue
+        migracao(conn)
+
+
+def aplicar_migracoes(engine: Engine):
+    """Executa todas as migrações numa única transação."""
+    with engine.begin() as conn:
+        executar_migracoes(conn)
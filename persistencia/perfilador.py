@@ -0,0 +1,249 @@
+"""
+Perfil por rerun: onde foi o tempo de uma execução da página.
+
+Home.py abre um PerfilRerun em volta de `navigation.run()` quando o perfil
+está ligado (PERFIL_RERUNS no config ou o interruptor do administrador na
+barra lateral). Os ganchos em UnitOfWork, BaseRepository._execute_* e
+ai_concreto._invocar registram intervalos aninhados ('uow', 'sql', 'ia'); as
+páginas podem marcar trechos próprios com `medir('render', ...)`. O que não
+cai em nenhum intervalo fica com a própria página (Python, pandas, widgets).
+
+Sem perfil ativo os ganchos custam uma leitura de ContextVar. Com
+PERFIL_DETALHADO = cprofile (ou pyinstrument, se instalado) o rerun também é
+perfilado função a função. Cada perfil é gravado em logs/perfis.jsonl;
+`python -m persistencia.perfilador` compara as páginas pelas medianas.
+"""
+import argparse
+import contextvars
+import io
+import json
+import logging
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+ARQUIVO_PERFIS = Path(__file__).parent.parent / 'logs' / 'perfis.jsonl'
+CATEGORIA_PAGINA = 'pagina'
+TOP_FUNCOES = 25
+
+_perfil_atual = contextvars.ContextVar('perfil_rerun', default=None)
+_lock_arquivo = threading.Lock()
+
+
+class PerfilRerun:
+    """Árvore de intervalos de um rerun: caminho (rótulos da raiz até o nó) → [ms, chamadas]."""
+
+    def __init__(self, pagina: str, usuario: str = None):
+        self.pagina = pagina
+        self.usuario = usuario
+        self.iniciado_em = datetime.now().isoformat(timespec='seconds')
+        self.total_ms = None
+        self.nos = {}
+        self.detalhe = ''
+        self._pilha = []
+        self._inicio = time.perf_counter()
+        self._token = None
+        self._profiler = None
+
+    def entrar(self, categoria: str, rotulo: str):
+        self._pilha.append((f'{categoria}:{rotulo}', time.perf_counter()))
+
+    def sair(self):
+        nome, inicio = self._pilha.pop()
+        caminho = tuple(n for n, _ in self._pilha) + (nome,)
+        no = self.nos.setdefault(caminho, [0.0, 0])
+        no[0] += (time.perf_counter() - inicio) * 1000
+        no[1] += 1
+
+    def _filhos_ms(self) -> dict:
+        soma = defaultdict(float)
+        for caminho, (ms, _) in self.nos.items():
+            soma[caminho[:-1]] += ms
+        return soma
+
+    def categorias(self) -> dict:
+        """Tempo próprio (sem os filhos) somado por categoria; a soma é o total do rerun."""
+        filhos = self._filhos_ms()
+        resultado = defaultdict(float)
+        for caminho, (ms, _) in self.nos.items():
+            resultado[caminho[-1].split(':', 1)[0]] += ms - filhos[caminho]
+        total = self.total_ms if self.total_ms is not None else (time.perf_counter() - self._inicio) * 1000
+        resultado[CATEGORIA_PAGINA] += total - filhos[()]
+        return dict(resultado)
+
+    def arvore(self) -> list:
+        """Nós em ordem de profundidade, os mais caros primeiro: (nível, rótulo, ms total, ms próprio, chamadas)."""
+        filhos = self._filhos_ms()
+        por_pai = defaultdict(list)
+        for caminho, (ms, n) in self.nos.items():
+            por_pai[caminho[:-1]].append((caminho, ms, n))
+        linhas = []
+
+        def visitar(pai, nivel):
+            for caminho, ms, n in sorted(por_pai[pai], key=lambda item: -item[1]):
+                linhas.append((nivel, caminho[-1], ms, ms - filhos[caminho], n))
+                visitar(caminho, nivel + 1)
+
+        visitar((), 0)
+        return linhas
+
+    def para_dict(self) -> dict:
+        return {
+            'iniciado_em': self.iniciado_em,
+            'pagina': self.pagina,
+            'usuario': self.usuario,
+            'total_ms': self.total_ms,
+            'categorias': self.categorias(),
+            'nos': [{'caminho': list(caminho), 'ms': ms, 'chamadas': n} for caminho, (ms, n) in self.nos.items()],
+            'detalhe': self.detalhe,
+        }
+
+
+def ativo() -> bool:
+    return _perfil_atual.get() is not None
+
+
+def entrar(categoria: str, rotulo: str):
+    """Abre um intervalo no perfil atual; retorna o perfil (para `sair()`) ou None."""
+    perfil = _perfil_atual.get()
+    if perfil is not None:
+        perfil.entrar(categoria, rotulo)
+    return perfil
+
+
+@contextmanager
+def medir(categoria: str, rotulo: str):
+    perfil = entrar(categoria, rotulo)
+    try:
+        yield
+    finally:
+        if perfil is not None:
+            perfil.sair()
+
+
+def _iniciar_detalhado(perfil: PerfilRerun, motor: str):
+    if motor == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            log.warning('pyinstrument não está instalado; usando cProfile.')
+        else:
+            perfil._profiler = ('pyinstrument', Profiler(async_mode='disabled'))
+            perfil._profiler[1].start()
+            return
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Só um perfilador por processo (sys.monitoring): outro rerun já está usando.
+        log.warning('cProfile indisponível neste rerun: %s', e)
+        return
+    perfil._profiler = ('cprofile', profiler)
+
+
+def _finalizar_detalhado(perfil: PerfilRerun):
+    motor, profiler = perfil._profiler
+    perfil._profiler = None
+    if motor == 'pyinstrument':
+        profiler.stop()
+        perfil.detalhe = profiler.output_text(unicode=True, color=False)
+        return
+    import pstats
+    profiler.disable()
+    saida = io.StringIO()
+    pstats.Stats(profiler, stream=saida).strip_dirs().sort_stats('cumulative').print_stats(TOP_FUNCOES)
+    perfil.detalhe = saida.getvalue().strip()
+
+
+def iniciar(pagina: str, usuario: str = None, detalhado: str = '') -> PerfilRerun:
+    """Ativa um perfil para o contexto atual (o rerun); `detalhado` = '', 'cprofile' ou 'pyinstrument'."""
+    perfil = PerfilRerun(pagina, usuario)
+    perfil._token = _perfil_atual.set(perfil)
+    if detalhado:
+        _iniciar_detalhado(perfil, detalhado)
+    return perfil
+
+
+def finalizar(perfil: PerfilRerun, salvar: bool = True, arquivo: Path = None) -> PerfilRerun:
+    """Fecha intervalos pendentes (ex.: st.stop no meio de um UoW), desativa e grava o perfil."""
+    if perfil._profiler:
+        _finalizar_detalhado(perfil)
+    while perfil._pilha:
+        perfil.sair()
+    perfil.total_ms = (time.perf_counter() - perfil._inicio) * 1000
+    _perfil_atual.reset(perfil._token)
+    if salvar:
+        try:
+            salvar_perfil(perfil, arquivo)
+        except OSError as e:
+            log.warning('Não foi possível gravar o perfil do rerun: %s', e)
+    return perfil
+
+
+def salvar_perfil(perfil: PerfilRerun, arquivo: Path = None):
+    arquivo = Path(arquivo or ARQUIVO_PERFIS)
+    linha = json.dumps(perfil.para_dict(), ensure_ascii=False)
+    with _lock_arquivo:
+        arquivo.parent.mkdir(parents=True, exist_ok=True)
+        with open(arquivo, 'a', encoding='utf-8') as f:
+            f.write(linha + '\n')
+
+
+def carregar_perfis(arquivo: Path = None) -> list:
+    arquivo = Path(arquivo or ARQUIVO_PERFIS)
+    if not arquivo.is_file():
+        return []
+    perfis = []
+    with open(arquivo, encoding='utf-8') as f:
+        for linha in f:
+            try:
+                perfis.append(json.loads(linha))
+            except json.JSONDecodeError:
+                continue
+    return perfis
+
+
+def comparar(perfis: list) -> dict:
+    """Por página: reruns, mediana e p95 do total e mediana do tempo de cada categoria (ms)."""
+    por_pagina = defaultdict(list)
+    for perfil in perfis:
+        por_pagina[perfil['pagina']].append(perfil)
+    resultado = {}
+    for pagina, lista in sorted(por_pagina.items()):
+        totais = sorted(p['total_ms'] for p in lista)
+        categorias = sorted({c for p in lista for c in p['categorias']})
+        resultado[pagina] = {
+            'reruns': len(lista),
+            'mediana_ms': statistics.median(totais),
+            'p95_ms': totais[min(len(totais) - 1, int(0.95 * len(totais)))],
+            'categorias_ms': {c: statistics.median(p['categorias'].get(c, 0.0) for p in lista) for c in categorias},
+        }
+    return resultado
+
+
+def main(argv=None) -> int:
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    args.add_argument('arquivo', nargs='?', default=str(ARQUIVO_PERFIS))
+    args.add_argument('--pagina', help='Só os perfis desta página.')
+    opcoes = args.parse_args(argv)
+
+    perfis = [p for p in carregar_perfis(opcoes.arquivo) if not opcoes.pagina or p['pagina'] == opcoes.pagina]
+    if not perfis:
+        print(f'Nenhum perfil em {opcoes.arquivo}.', file=sys.stderr)
+        return 1
+    for pagina, r in comparar(perfis).items():
+        categorias = '  '.join(f'{c}={ms:.1f}' for c, ms in sorted(r['categorias_ms'].items(), key=lambda i: -i[1]))
+        print(f"{pagina}: {r['reruns']} reruns, mediana {r['mediana_ms']:.1f} ms, p95 {r['p95_ms']:.1f} ms  [{categorias}]")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
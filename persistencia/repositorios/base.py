@@ -1,10 +1,22 @@
 import pandas as pd
 from sqlalchemy import text, exc, Connection
 import logging
+import sys
+import time
 import config
+from persistencia import metricas_sql, perfilador
+from persistencia.logger import ms_desde
 from typing import Optional, Any
 log = logging.getLogger(__name__)
 
+def _contexto_sql(query, inicio: float) -> dict:
+    """Campos extras dos logs de erro SQL: duração até a falha e o início do comando."""
+    return {'duracao_ms': ms_desde(inicio), 'sql': ' '.join(str(query).split())[:200]}
+
+def _rotulo_chamador(repo) -> str:
+    """'Classe.metodo' do repositório que chamou o _execute_* (dois níveis acima)."""
+    return f'{type(repo).__name__}.{sys._getframe(2).f_code.co_name}'
+
 class BaseRepository:
 
     def __init__(self, connection: Connection):
@@ -15,46 +27,70 @@ class BaseRepository:
     def _execute_query_to_dataframe(self, query: str, params: dict=None) -> pd.DataFrame:
         if not config.DATABASE_ENABLED:
             return pd.DataFrame()
+        inicio = time.perf_counter()
         try:
             safe_params = params if params else {}
-            df = pd.read_sql_query(text(query), self.conn, params=safe_params)
+            rotulo = _rotulo_chamador(self)
+            with perfilador.medir('sql', rotulo), metricas_sql.chamada(rotulo) as chamada:
+                df = pd.read_sql_query(text(query), self.conn, params=safe_params)
+                chamada.linhas = len(df)
             df.columns = [str(col).lower() for col in df.columns]
             return df
         except exc.SQLAlchemyError as e:
-            log.error(f'Erro query DF: {e}')
+            log.error('Erro query DF: %s', e, extra=_contexto_sql(query, inicio))
             raise
 
     def _execute_raw_sql(self, query: str, params: dict=None) -> Optional[int]:
         if not config.DATABASE_ENABLED:
             return None
+        inicio = time.perf_counter()
         try:
             sql_query = text(query) if isinstance(query, str) else query
-            result = self.conn.execute(sql_query, params)
+            rotulo = _rotulo_chamador(self)
+            with perfilador.medir('sql', rotulo), metricas_sql.chamada(rotulo):
+                result = self.conn.execute(sql_query, params)
             return result.rowcount
         except exc.SQLAlchemyError as e:
-            log.error(f'Erro SQL Raw: {e}')
+            log.error('Erro SQL Raw: %s', e, extra=_contexto_sql(query, inicio))
             raise
 
     def _execute_scalar(self, query: str, params: dict=None) -> Any:
         if not config.DATABASE_ENABLED:
             return None
+        inicio = time.perf_counter()
         try:
             sql_query = text(query) if isinstance(query, str) else query
-            result = self.conn.execute(sql_query, params)
-            return result.scalar()
+            rotulo = _rotulo_chamador(self)
+            with perfilador.medir('sql', rotulo), metricas_sql.chamada(rotulo) as chamada:
+                result = self.conn.execute(sql_query, params)
+                chamada.linhas = 1
+                return result.scalar()
         except exc.SQLAlchemyError as e:
-            log.error(f'Erro Scalar: {e}')
+            log.error('Erro Scalar: %s', e, extra=_contexto_sql(query, inicio))
             raise
 
+    def _ler_contador(self, chave: str) -> int:
+        """Valor do contador `chave` de controle_versao (0 se ainda não existe)."""
+        return self._execute_scalar('SELECT COALESCE((SELECT valor FROM controle_versao WHERE chave = :chave), 0)', {'chave': chave}) or 0
+
+    def _incrementar_contador(self, chave: str):
+        """Soma 1 ao contador `chave` de controle_versao (UPDATE e, se não existir, INSERT: SQL comum a todos os bancos)."""
+        if not self._execute_raw_sql('UPDATE controle_versao SET valor = valor + 1 WHERE chave = :chave', {'chave': chave}):
+            self._execute_raw_sql('INSERT INTO controle_versao (chave, valor) VALUES (:chave, 1)', {'chave': chave})
+
     def _write_dataframe_to_table(self, df: pd.DataFrame, table_name: str):
         if not config.DATABASE_ENABLED:
             return
+        inicio = time.perf_counter()
         try:
             df_to_write = df.copy()
             df_to_write.columns = [str(col).lower() for col in df_to_write.columns]
-            df_to_write.to_sql(table_name, con=self.conn, if_exists='append', index=False)
+            rotulo = _rotulo_chamador(self)
+            with perfilador.medir('sql', rotulo), metricas_sql.chamada(rotulo):
+                df_to_write.to_sql(table_name, con=self.conn, if_exists='append', index=False)
         except exc.SQLAlchemyError as e:
-            log.error(f"Erro ao escrever na tabela '{table_name}'. Erro: {e}")
+            log.error("Erro ao escrever na tabela '%s'. Erro: %s", table_name, e,
+                      extra={'duracao_ms': ms_desde(inicio), 'tabela': table_name, 'linhas': len(df)})
             raise
 
     def _update_table(self, table_name: str, update_values: dict, where_conditions: dict):
@@ -2,15 +2,117 @@
 Repositório para o módulo Fábrica de Pré-Moldados.
 Encapsula todas as operações de banco de dados das tabelas fab_*.
 """
+from datetime import date
 from persistencia.repositorios.base import BaseRepository
+from utils.traco_utils import ADITIVO_PCT_PADRAO, COLUNAS_TRACO, parse_traco
 import pandas as pd
 import logging
 log = logging.getLogger(__name__)
 
+# Segunda-feira da semana (ISO) de uma data, em SQL.
+_SEMANA_SQL = "date({}, 'weekday 0', '-6 days')"
+# Início da vigência do primeiro preço conhecido de cada material.
+INICIO_HISTORICO = "0001-01-01"
+# Status dos pedidos que já consumiram material (histórico de consumo, ver get_marcador_pedidos).
+STATUS_CONCLUIDOS = ("Concluído",)
+# Colunas de consumo (kg) de get_demanda_pedidos → tipo de material que as precifica.
+TIPOS_CONSUMO = {"cimento": "Cimento", "areia": "Areia", "brita": "Brita", "agua": "Água", "aditivo": "Aditivo"}
+# Dimensões de get_custo_agregado: expressão do grupo e JOIN necessário sobre custo_pedidos_sql (alias c).
+DIMENSOES_CUSTO = {
+    "cliente": ("cl.nome", "JOIN fab_clientes cl ON cl.id = c.cliente_id"),
+    "tipo_elemento": ("e.tipo", "JOIN fab_catalogo_elementos e ON e.id = c.elemento_id"),
+    "mes": ("strftime('%Y-%m', c.data_pedido)", ""),
+}
+
+
+def _demanda_sql(condicao: str) -> str:
+    """SELECT do consumo (kg) por tipo de material dos pedidos que atendem `condicao` (usa :aditivo_pct)."""
+    return f"""
+            SELECT id, cliente_id, elemento_id, quantidade, status, data_pedido, data_entrega,
+                   volume_total_m3, kg_cimento,
+                   kg_cimento * prop_areia / NULLIF(prop_cimento, 0) AS kg_areia,
+                   kg_cimento * prop_brita / NULLIF(prop_cimento, 0) AS kg_brita,
+                   kg_cimento * relacao_ac AS kg_agua,
+                   kg_cimento * COALESCE(aditivo_pct, :aditivo_pct) / 100.0 AS kg_aditivo
+            FROM (
+                SELECT p.id, p.cliente_id, p.elemento_id, p.quantidade, p.status, p.data_pedido, p.data_entrega,
+                       p.quantidade * e.volume_m3 AS volume_total_m3,
+                       p.quantidade * e.volume_m3 * t.consumo_cimento_m3 AS kg_cimento,
+                       t.prop_cimento, t.prop_areia, t.prop_brita, t.relacao_ac, t.aditivo_pct
+                FROM fab_pedidos p
+                JOIN fab_catalogo_elementos e ON p.elemento_id = e.id
+                LEFT JOIN fab_tracos_padrao t ON p.traco_usado_id = t.id
+                WHERE {condicao}
+            ) d
+        """
+
+
+def custo_pedidos_filtros(status: tuple = None, data_inicio: str = None, data_fim: str = None) -> tuple:
+    """(condição SQL sobre fab_pedidos p, parâmetros) para custo_pedidos_sql."""
+    condicoes, params = ["1 = 1"], {"aditivo_pct": ADITIVO_PCT_PADRAO}
+    if status:
+        condicoes.append("p.status IN ({})".format(", ".join(f":status_{i}" for i in range(len(status)))))
+        params.update({f"status_{i}": s for i, s in enumerate(status)})
+    if data_inicio:
+        condicoes.append("p.data_pedido >= :data_inicio")
+        params["data_inicio"] = str(data_inicio)
+    if data_fim:
+        condicoes.append("p.data_pedido <= :data_fim")
+        params["data_fim"] = str(data_fim)
+    return " AND ".join(condicoes), params
+
+
+def custo_pedidos_sql(condicao: str, historico: bool = True) -> str:
+    """
+    SELECT (alias c) de consumo, preço/kg por tipo na data do pedido e custo por
+    pedido. As datas distintas dos pedidos são casadas uma vez com os
+    intervalos de vigência de fab_materiais_precos; os relatórios agregam
+    sobre este SELECT no próprio banco. Sem `historico` (bancos sem
+    fab_materiais_precos) vale o custo atual de fab_materiais.
+    """
+    preco = "h.custo_kg" if historico else "m.custo_kg"
+    precos = ",\n".join(
+        f"                   AVG(CASE WHEN m.tipo = '{tipo}' THEN {preco} END) AS preco_{col}"
+        for col, tipo in TIPOS_CONSUMO.items()
+    )
+    if historico:
+        vigentes = """JOIN fab_materiais_precos h
+                  ON h.vigente_desde <= datas.data_pedido
+                 AND (h.vigente_ate IS NULL OR datas.data_pedido < h.vigente_ate)
+                JOIN fab_materiais m ON m.id = h.material_id"""
+    else:
+        vigentes = "CROSS JOIN fab_materiais m"
+    custos = ",\n".join(f"                   d.kg_{col} * pr.preco_{col} AS custo_{col}" for col in TIPOS_CONSUMO)
+    total = " + ".join(f"COALESCE(d.kg_{col} * pr.preco_{col}, 0)" for col in TIPOS_CONSUMO)
+    return f"""
+        SELECT c.* FROM (
+            WITH demanda AS ({_demanda_sql(condicao)}),
+            precos AS (
+                SELECT datas.data_pedido,
+{precos}
+                FROM (SELECT DISTINCT data_pedido FROM demanda) datas
+                {vigentes}
+                GROUP BY datas.data_pedido
+            )
+            SELECT d.*,
+                   {", ".join(f"pr.preco_{col}" for col in TIPOS_CONSUMO)},
+{custos},
+                   CASE WHEN d.kg_cimento IS NULL THEN NULL ELSE {total} END AS custo_materiais,
+                   CASE WHEN d.kg_cimento IS NULL THEN NULL ELSE ({total}) / NULLIF(d.volume_total_m3, 0) END AS custo_m3
+            FROM demanda d
+            LEFT JOIN precos pr ON pr.data_pedido = d.data_pedido
+        ) c
+        """
+
 
 class FabricaRepository(BaseRepository):
     """Acesso a dados do módulo de fábrica de pré-moldados."""
 
+    @property
+    def _sqlite(self) -> bool:
+        """O rollup semanal e o histórico de preços só existem no SQLite (ver migracoes.SOMENTE_SQLITE)."""
+        return self.conn.dialect.name == "sqlite"
+
     # ── Clientes ─────────────────────────────────────────────
     def get_all_clientes(self) -> pd.DataFrame:
         return self._execute_query_to_dataframe(
@@ -62,10 +164,125 @@ class FabricaRepository(BaseRepository):
         """Salva ou atualiza um material no banco de dados."""
         if material_id:
             self._update_table("fab_materiais", data, {"id": material_id})
+            if "custo_kg" in data:
+                self._registrar_precos("id", [{"id": material_id}], "cadastro")
         else:
             self._write_dataframe_to_table(
                 pd.DataFrame([data]), "fab_materiais"
             )
+            self._registrar_precos("nome", [{"nome": data["nome"]}], "cadastro")
+
+    def upsert_materiais(self, registros: list, origem: str = None) -> int:
+        """
+        Insere ou atualiza (pelo nome) vários materiais num único lote.
+        `registros`: dicts com nome, tipo, custo_kg e estoque_atual. Os custos
+        alterados entram no histórico de preços (só no SQLite) com a `origem`
+        informada.
+        """
+        if not registros:
+            return 0
+        # SELECT + UPDATE/INSERT em lote em vez de ON CONFLICT, que nem todo banco suportado tem.
+        existentes = set()
+        for inicio in range(0, len(registros), 500):
+            bloco = registros[inicio:inicio + 500]
+            filtros = ", ".join(f":nome_{i}" for i in range(len(bloco)))
+            existentes.update(self._execute_query_to_dataframe(
+                f"SELECT nome FROM fab_materiais WHERE nome IN ({filtros})",
+                {f"nome_{i}": r["nome"] for i, r in enumerate(bloco)},
+            ).get("nome", []))
+        atualizar = [r for r in registros if r["nome"] in existentes]
+        inserir = [r for r in registros if r["nome"] not in existentes]
+        if atualizar:
+            self._execute_raw_sql("""
+                UPDATE fab_materiais SET tipo = :tipo, custo_kg = :custo_kg, estoque_atual = :estoque_atual
+                WHERE nome = :nome
+            """, atualizar)
+        if inserir:
+            self._execute_raw_sql("""
+                INSERT INTO fab_materiais (nome, tipo, custo_kg, estoque_atual)
+                VALUES (:nome, :tipo, :custo_kg, :estoque_atual)
+            """, inserir)
+        self._registrar_precos("nome", [{"nome": r["nome"]} for r in registros], origem)
+        return len(registros)
+
+    def _registrar_precos(self, chave: str, params: list, origem: str = None):
+        """
+        Grava no histórico o custo atual dos materiais cujo último preço
+        registrado é diferente. vigente_desde é a data de hoje ('AAAA-MM-DD',
+        o formato de data_pedido): o preço vale para os pedidos do dia.
+        Fora do SQLite não há histórico (ver _sqlite). Em todos os bancos
+        conta a mudança em 'versao_precos' (marcador de custos).
+        """
+        self._incrementar_contador("versao_precos")
+        if not self._sqlite:
+            return
+        self._execute_raw_sql(f"""
+            INSERT INTO fab_materiais_precos (material_id, custo_kg, vigente_desde, origem)
+            SELECT m.id, m.custo_kg, :hoje, :origem FROM fab_materiais m
+            WHERE m.{chave} = :{chave}
+              AND m.custo_kg IS NOT (
+                  SELECT h.custo_kg FROM fab_materiais_precos h
+                  WHERE h.material_id = m.id
+                  ORDER BY h.vigente_desde DESC, h.id DESC LIMIT 1
+              )
+        """, [{**p, "hoje": date.today().isoformat(), "origem": origem} for p in params])
+        self._fechar_intervalos_precos()
+
+    def _fechar_intervalos_precos(self):
+        """
+        Preenche vigente_ate dos preços em aberto que já têm um sucessor: o
+        próximo registro do material na ordem (vigente_desde, id), a mesma das
+        consultas de preço vigente.
+        """
+        sucessores = """
+                FROM fab_materiais_precos n
+                WHERE n.material_id = fab_materiais_precos.material_id
+                  AND (n.vigente_desde > fab_materiais_precos.vigente_desde
+                       OR (n.vigente_desde = fab_materiais_precos.vigente_desde AND n.id > fab_materiais_precos.id))"""
+        self._execute_raw_sql(f"""
+            UPDATE fab_materiais_precos SET vigente_ate = (
+                SELECT n.vigente_desde {sucessores}
+                ORDER BY n.vigente_desde, n.id LIMIT 1
+            )
+            WHERE vigente_ate IS NULL AND EXISTS (SELECT 1 {sucessores})
+        """)
+
+    def get_historico_precos(self, material_id: int) -> pd.DataFrame:
+        if not self._sqlite:
+            return self._execute_query_to_dataframe("""
+                SELECT custo_kg, :inicio AS vigente_desde, NULL AS vigente_ate, 'atual' AS origem
+                FROM fab_materiais WHERE id = :id
+            """, {"id": material_id, "inicio": INICIO_HISTORICO})
+        return self._execute_query_to_dataframe("""
+            SELECT custo_kg, vigente_desde, vigente_ate, origem
+            FROM fab_materiais_precos
+            WHERE material_id = :id
+            ORDER BY vigente_desde, id
+        """, {"id": material_id})
+
+    def get_preco_em(self, material_id: int, data: str):
+        """Custo/kg do material vigente em `data` ('AAAA-MM-DD'), ou None se ainda não havia preço."""
+        if not self._sqlite:
+            return self._execute_scalar("SELECT custo_kg FROM fab_materiais WHERE id = :id", {"id": material_id})
+        return self._execute_scalar("""
+            SELECT custo_kg FROM fab_materiais_precos
+            WHERE material_id = :id AND vigente_desde <= :data
+            ORDER BY vigente_desde DESC, id DESC LIMIT 1
+        """, {"id": material_id, "data": str(data)})
+
+    def get_precos_em(self, data: str) -> pd.DataFrame:
+        """Custo/kg de todos os materiais vigente em `data` (materiais sem preço na data ficam de fora)."""
+        if not self._sqlite:
+            return self._execute_query_to_dataframe(
+                "SELECT id, nome, tipo, custo_kg FROM fab_materiais ORDER BY tipo, nome"
+            )
+        return self._execute_query_to_dataframe("""
+            SELECT m.id, m.nome, m.tipo, h.custo_kg
+            FROM fab_materiais_precos h
+            JOIN fab_materiais m ON m.id = h.material_id
+            WHERE h.vigente_desde <= :data AND (h.vigente_ate IS NULL OR :data < h.vigente_ate)
+            ORDER BY m.tipo, m.nome
+        """, {"data": str(data)})
 
     def delete_material(self, material_id: int):
         """Exclui um material do banco de dados."""
@@ -89,6 +306,9 @@ class FabricaRepository(BaseRepository):
     def save_elemento(self, data: dict, elemento_id: int = None):
         if elemento_id:
             self._update_table("fab_catalogo_elementos", data, {"id": elemento_id})
+            self._incrementar_versao_pedidos()
+            if "volume_m3" in data:
+                self.reconstruir_rollup_semanal()
         else:
             self._write_dataframe_to_table(
                 pd.DataFrame([data]), "fab_catalogo_elementos"
@@ -96,6 +316,7 @@ class FabricaRepository(BaseRepository):
 
     def delete_elemento(self, elemento_id: int):
         self._delete_from_table("fab_catalogo_elementos", {"id": elemento_id})
+        self._incrementar_versao_pedidos()
 
     # ── Traços Padrão ────────────────────────────────────────
     def get_tracos_padrao(self) -> pd.DataFrame:
@@ -109,9 +330,18 @@ class FabricaRepository(BaseRepository):
         )
 
     def save_traco(self, data: dict, traco_id: int = None):
-        """Salva ou atualiza um traço padrão no banco de dados."""
+        """Salva ou atualiza um traço padrão no banco de dados.
+
+        As proporções numéricas são derivadas de `traco_str` quando não
+        informadas explicitamente.
+        """
+        if "traco_str" in data and not any(col in data for col in COLUNAS_TRACO):
+            traco = parse_traco(data["traco_str"])
+            colunas = traco.como_colunas() if traco else dict.fromkeys(COLUNAS_TRACO)
+            data = {**data, **colunas}
         if traco_id:
             self._update_table("fab_tracos_padrao", data, {"id": traco_id})
+            self._incrementar_versao_pedidos()
         else:
             self._write_dataframe_to_table(
                 pd.DataFrame([data]), "fab_tracos_padrao"
@@ -125,6 +355,7 @@ class FabricaRepository(BaseRepository):
                    ROUND(p.quantidade * e.volume_m3, 2) AS volume_total_m3,
                    p.data_pedido, p.data_entrega, p.status,
                    t.nome AS traco_nome, t.traco_str, t.consumo_cimento_m3,
+                   t.prop_cimento, t.prop_areia, t.prop_brita, t.relacao_ac, t.aditivo_pct,
                    p.cliente_id, p.elemento_id, p.traco_usado_id
             FROM fab_pedidos p
             JOIN fab_clientes c ON p.cliente_id = c.id
@@ -137,7 +368,8 @@ class FabricaRepository(BaseRepository):
         return self._execute_query_to_dataframe("""
             SELECT p.*, c.nome AS cliente, e.nome AS elemento,
                    e.volume_m3, e.fck_necessario,
-                   t.nome AS traco_nome, t.traco_str, t.consumo_cimento_m3
+                   t.nome AS traco_nome, t.traco_str, t.consumo_cimento_m3,
+                   t.prop_cimento, t.prop_areia, t.prop_brita, t.relacao_ac, t.aditivo_pct
             FROM fab_pedidos p
             JOIN fab_clientes c ON p.cliente_id = c.id
             JOIN fab_catalogo_elementos e ON p.elemento_id = e.id
@@ -147,10 +379,66 @@ class FabricaRepository(BaseRepository):
 
     def save_pedido(self, data: dict):
         self._write_dataframe_to_table(pd.DataFrame([data]), "fab_pedidos")
+        if not self._sqlite:
+            return
+        semana = _SEMANA_SQL.format("COALESCE(:data_pedido, date('now'))")
+        self._somar_rollup(f"""
+            SELECT {semana}, COALESCE(:status, 'Pendente'), 1, :quantidade * e.volume_m3
+            FROM fab_catalogo_elementos e
+            WHERE e.id = :elemento_id AND {semana} IS NOT NULL
+        """, {
+            "data_pedido": data.get("data_pedido"),
+            "status": data.get("status"),
+            "quantidade": data.get("quantidade"),
+            "elemento_id": data.get("elemento_id"),
+        })
 
     def update_pedido_status(self, pedido_id: int, status: str):
+        self._mover_rollup([pedido_id], status)
+        self._registrar_mudanca_status([pedido_id], status)
         self._update_table("fab_pedidos", {"status": status}, {"id": pedido_id})
 
+    def update_pedidos_status(self, pedido_ids: list, status: str) -> int:
+        """Atualiza o status de vários pedidos num único lote."""
+        if not pedido_ids:
+            return 0
+        self._mover_rollup(pedido_ids, status)
+        self._registrar_mudanca_status(pedido_ids, status)
+        self._execute_raw_sql(
+            "UPDATE fab_pedidos SET status = :status WHERE id = :id",
+            [{"status": status, "id": int(pid)} for pid in pedido_ids],
+        )
+        return len(pedido_ids)
+
+    def _registrar_mudanca_status(self, pedido_ids: list, status: str):
+        """
+        Conta a mudança de status (antes do UPDATE) em 'versao_status' e, só
+        quando o acumulado por id de get_marcador_pedidos não a acompanha, em
+        'versao_pedidos': pedidos que saem de STATUS_CONCLUIDOS ou que são
+        concluídos com id menor que o último pedido já concluído.
+        """
+        self._incrementar_contador("versao_status")
+        filtros = ", ".join(f":id_{i}" for i in range(len(pedido_ids)))
+        params = {f"id_{i}": int(pid) for i, pid in enumerate(pedido_ids)}
+        params.update({f"concluido_{i}": s for i, s in enumerate(STATUS_CONCLUIDOS)})
+        concluidos = ", ".join(f":concluido_{i}" for i in range(len(STATUS_CONCLUIDOS)))
+        if status in STATUS_CONCLUIDOS:
+            fora_de_ordem = f"""p.status NOT IN ({concluidos})
+                AND p.id < (SELECT COALESCE(MAX(id), 0) FROM fab_pedidos WHERE status IN ({concluidos}))"""
+        else:
+            fora_de_ordem = f"p.status IN ({concluidos})"
+        if self._execute_scalar(f"SELECT COUNT(*) FROM fab_pedidos p WHERE p.id IN ({filtros}) AND {fora_de_ordem}", params):
+            self._incrementar_versao_pedidos()
+
+    def _incrementar_versao_pedidos(self):
+        """
+        Conta as mudanças que o acumulado incremental do histórico de consumo
+        não acompanha: edições de elementos e traços e as mudanças de status
+        descritas em _registrar_mudanca_status. Pedidos concluídos em ordem
+        de id aparecem pelo último id do marcador (get_marcador_pedidos).
+        """
+        self._incrementar_contador("versao_pedidos")
+
     # ── Estatísticas / Dashboard ─────────────────────────────
     def get_resumo_pedidos(self) -> dict:
         total = self._execute_scalar("SELECT COUNT(*) FROM fab_pedidos")
@@ -184,3 +472,188 @@ class FabricaRepository(BaseRepository):
             GROUP BY status
             ORDER BY status
         """)
+
+    # ── Rollup Semanal (tendência de produção) ───────────────
+    def _somar_rollup(self, select_sql: str, params: dict):
+        """Soma as linhas (semana, status, pedidos, volume_m3) do SELECT ao rollup."""
+        self._execute_raw_sql(f"""
+            INSERT INTO fab_rollup_semanal (semana, status, pedidos, volume_m3)
+            {select_sql}
+            ON CONFLICT (semana, status) DO UPDATE SET
+                pedidos = pedidos + excluded.pedidos,
+                volume_m3 = volume_m3 + excluded.volume_m3
+        """, params)
+
+    def _mover_rollup(self, pedido_ids: list, status: str):
+        """Transfere os pedidos do status atual para `status` no rollup (antes do UPDATE)."""
+        if not self._sqlite:
+            return
+        filtros = ", ".join(f":id_{i}" for i in range(len(pedido_ids)))
+        params = {f"id_{i}": int(pid) for i, pid in enumerate(pedido_ids)}
+        params["status"] = status
+        semana = _SEMANA_SQL.format("p.data_pedido")
+        origem = f"""
+            FROM fab_pedidos p
+            JOIN fab_catalogo_elementos e ON p.elemento_id = e.id
+            WHERE p.id IN ({filtros}) AND p.status <> :status AND {semana} IS NOT NULL
+        """
+        self._somar_rollup(
+            f"SELECT {semana}, p.status, -COUNT(*), -SUM(p.quantidade * e.volume_m3) {origem} GROUP BY 1, 2",
+            params,
+        )
+        self._somar_rollup(
+            f"SELECT {semana}, :status, COUNT(*), SUM(p.quantidade * e.volume_m3) {origem} GROUP BY 1",
+            params,
+        )
+
+    def reconstruir_rollup_semanal(self):
+        """Recalcula fab_rollup_semanal inteiro a partir de fab_pedidos."""
+        if not self._sqlite:
+            return
+        semana = _SEMANA_SQL.format("p.data_pedido")
+        self._execute_raw_sql("DELETE FROM fab_rollup_semanal")
+        self._execute_raw_sql(f"""
+            INSERT INTO fab_rollup_semanal (semana, status, pedidos, volume_m3)
+            SELECT {semana}, p.status, COUNT(*), SUM(p.quantidade * e.volume_m3)
+            FROM fab_pedidos p
+            JOIN fab_catalogo_elementos e ON p.elemento_id = e.id
+            WHERE {semana} IS NOT NULL
+            GROUP BY 1, 2
+        """)
+
+    def get_tendencia_semanal(self) -> pd.DataFrame:
+        """Pedidos e volume (m³) por semana, somando todos os status.
+
+        Fora do SQLite não há rollup: agrega fab_pedidos na hora.
+        """
+        if not self._sqlite:
+            return self._tendencia_semanal_direta()
+        return self._execute_query_to_dataframe("""
+            SELECT semana, SUM(pedidos) AS pedidos, SUM(volume_m3) AS volume
+            FROM fab_rollup_semanal
+            GROUP BY semana
+            HAVING SUM(pedidos) > 0
+            ORDER BY semana
+        """)
+
+    def _tendencia_semanal_direta(self) -> pd.DataFrame:
+        """Mesmo resultado de get_tendencia_semanal, calculando a semana no pandas."""
+        df = self._execute_query_to_dataframe("""
+            SELECT p.data_pedido, p.quantidade * e.volume_m3 AS volume
+            FROM fab_pedidos p
+            JOIN fab_catalogo_elementos e ON p.elemento_id = e.id
+        """)
+        if df.empty:
+            return pd.DataFrame(columns=["semana", "pedidos", "volume"])
+        datas = pd.to_datetime(df["data_pedido"], errors="coerce").dt.normalize()
+        df["semana"] = (datas - pd.to_timedelta(datas.dt.weekday, unit="D")).dt.strftime("%Y-%m-%d")
+        return (
+            df.dropna(subset=["semana"])
+            .groupby("semana", as_index=False)
+            .agg(pedidos=("volume", "size"), volume=("volume", "sum"))
+            .sort_values("semana", ignore_index=True)
+        )
+
+    # ── Demanda de Materiais ─────────────────────────────────
+    def get_estoque_por_tipo(self) -> pd.DataFrame:
+        return self._execute_query_to_dataframe("""
+            SELECT tipo, SUM(estoque_atual) AS estoque_atual
+            FROM fab_materiais
+            GROUP BY tipo
+        """)
+
+    def get_demanda_pedidos(self, status: tuple, id_minimo: int = 0) -> pd.DataFrame:
+        """Volume e consumo teórico (kg) de cada tipo de material por pedido.
+
+        Calculado no banco a partir de volume × consumo de cimento × proporções
+        do traço (nulo para pedidos sem traço). Apenas pedidos com
+        `id > id_minimo` e status em `status`.
+        """
+        filtros = ", ".join(f":status_{i}" for i in range(len(status)))
+        params = {f"status_{i}": s for i, s in enumerate(status)}
+        params.update({"id_minimo": id_minimo, "aditivo_pct": ADITIVO_PCT_PADRAO})
+        demanda = _demanda_sql(f"p.id > :id_minimo AND p.status IN ({filtros})")
+        return self._execute_query_to_dataframe(f"{demanda} ORDER BY id", params)
+
+    def get_custo_pedidos(self, status: tuple = None, data_inicio: str = None, data_fim: str = None) -> pd.DataFrame:
+        """Consumo e custo de materiais de cada pedido aos preços vigentes na data do pedido.
+
+        Uma consulta só: o preço de cada tipo numa data é a média dos custos
+        vigentes dos materiais daquele tipo (o pedido referencia o traço, não
+        o lote). Pedidos sem traço ficam com custo nulo.
+        """
+        condicoes, params = custo_pedidos_filtros(status, data_inicio, data_fim)
+        return self._execute_query_to_dataframe(f"{custo_pedidos_sql(condicoes, self._sqlite)} ORDER BY c.data_pedido, c.id", params)
+
+    def get_custo_agregado(self, dimensao: str, status: tuple = None,
+                           data_inicio: str = None, data_fim: str = None) -> pd.DataFrame:
+        """Pedidos, volume e custo de materiais por cliente, tipo de elemento ou mês, agregados no banco.
+
+        `pct_custo` é a participação de cada grupo no total; por mês também
+        vêm o custo acumulado e a variação do custo/m³ sobre o mês anterior.
+        """
+        if dimensao not in DIMENSOES_CUSTO:
+            raise ValueError(f"Dimensão '{dimensao}' inválida. Use uma de {tuple(DIMENSOES_CUSTO)}.")
+        grupo, join = DIMENSOES_CUSTO[dimensao]
+        condicoes, params = custo_pedidos_filtros(status, data_inicio, data_fim)
+        por_tipo = ", ".join(f"SUM(c.custo_{col}) AS custo_{col}" for col in TIPOS_CONSUMO)
+        if dimensao == "mes":
+            extras = """,
+                   SUM(custo_materiais) OVER (ORDER BY grupo) AS custo_acumulado,
+                   100.0 * (custo_m3 / NULLIF(LAG(custo_m3) OVER (ORDER BY grupo), 0) - 1) AS variacao_custo_m3_pct"""
+            ordem = "grupo"
+        else:
+            extras, ordem = "", "custo_materiais DESC, grupo"
+        return self._execute_query_to_dataframe(f"""
+            SELECT g.*,
+                   100.0 * custo_materiais / NULLIF(SUM(custo_materiais) OVER (), 0) AS pct_custo{extras}
+            FROM (
+                SELECT {grupo} AS grupo,
+                       COUNT(*) AS pedidos,
+                       SUM(c.custo_materiais IS NULL) AS pedidos_sem_custo,
+                       SUM(c.volume_total_m3) AS volume_m3,
+                       SUM(c.custo_materiais) AS custo_materiais,
+                       SUM(c.custo_materiais) / NULLIF(SUM(CASE WHEN c.custo_materiais IS NOT NULL THEN c.volume_total_m3 END), 0) AS custo_m3,
+                       {por_tipo}
+                FROM ({custo_pedidos_sql(condicoes, self._sqlite)}) c
+                {join}
+                GROUP BY 1
+            ) g
+            ORDER BY {ordem}
+        """, params)
+
+    def get_pedidos_mais_custosos(self, limite: int = 50, status: tuple = None,
+                                  data_inicio: str = None, data_fim: str = None) -> pd.DataFrame:
+        condicoes, params = custo_pedidos_filtros(status, data_inicio, data_fim)
+        params["limite"] = int(limite)
+        return self._execute_query_to_dataframe(f"""
+            SELECT c.id, cl.nome AS cliente, e.nome AS elemento, e.tipo AS tipo_elemento,
+                   c.data_pedido, c.status, c.volume_total_m3, c.custo_materiais, c.custo_m3
+            FROM ({custo_pedidos_sql(condicoes, self._sqlite)}) c
+            JOIN fab_clientes cl ON cl.id = c.cliente_id
+            JOIN fab_catalogo_elementos e ON e.id = c.elemento_id
+            WHERE c.custo_materiais IS NOT NULL
+            ORDER BY c.custo_materiais DESC
+            LIMIT :limite
+        """, params)
+
+    def get_marcador_custos(self) -> tuple:
+        """Valores baratos que mudam com pedido novo, mudança de status, edição de elemento ou traço e preço novo."""
+        df = self._execute_query_to_dataframe("""
+            SELECT (SELECT COALESCE(MAX(id), 0) FROM fab_pedidos) AS ultimo_pedido,
+                   COALESCE((SELECT valor FROM controle_versao WHERE chave = 'versao_status'), 0) AS versao_status,
+                   COALESCE((SELECT valor FROM controle_versao WHERE chave = 'versao_pedidos'), 0) AS versao_pedidos,
+                   COALESCE((SELECT valor FROM controle_versao WHERE chave = 'versao_precos'), 0) AS versao_precos
+        """)
+        linha = df.iloc[0]
+        return (int(linha["ultimo_pedido"]), int(linha["versao_status"]),
+                int(linha["versao_pedidos"]), int(linha["versao_precos"]))
+
+    def get_marcador_pedidos(self) -> dict:
+        """Último id entre os pedidos concluídos e contador das mudanças que exigem recalcular o histórico."""
+        filtros = ", ".join(f":status_{i}" for i in range(len(STATUS_CONCLUIDOS)))
+        df = self._execute_query_to_dataframe(f"""
+            SELECT (SELECT COALESCE(MAX(id), 0) FROM fab_pedidos WHERE status IN ({filtros})) AS ultimo_id,
+                   COALESCE((SELECT valor FROM controle_versao WHERE chave = 'versao_pedidos'), 0) AS versao
+        """, {f"status_{i}": s for i, s in enumerate(STATUS_CONCLUIDOS)})
+        return {"ultimo_id": int(df.iloc[0]["ultimo_id"]), "versao": int(df.iloc[0]["versao"])}
@@ -1,6 +1,7 @@
 from typing import List
 import pandas as pd
 from .base import BaseRepository
+from .permissoes import PermissaoRepository
 
 class PaginaRepository(BaseRepository):
 
@@ -13,9 +14,11 @@ class PaginaRepository(BaseRepository):
             self._execute_raw_sql('UPDATE pagina SET nome_arquivo=:arq, nome_amigavel=:nome WHERE pagina_id=:id', {'arq': data['nome_arquivo'], 'nome': data['nome_amigavel'], 'id': pagina_id})
         else:
             self._execute_raw_sql('INSERT INTO pagina (nome_arquivo, nome_amigavel) VALUES (:arq, :nome)', {'arq': data['nome_arquivo'], 'nome': data['nome_amigavel']})
+        PermissaoRepository(self.conn).incrementar_versao_permissoes()
 
     def excluir_pagina(self, pagina_id: int):
         self._execute_raw_sql('DELETE FROM pagina WHERE pagina_id=:id', {'id': pagina_id})
+        PermissaoRepository(self.conn).incrementar_versao_permissoes()
 
     def get_allowed_pages_for_profile(self, profile_name: str) -> pd.DataFrame:
         if profile_name == 'Administrador Global':
@@ -1,6 +1,18 @@
 import pandas as pd
 from .base import BaseRepository
 
+# Perfil cujas permissões a matriz não remove (o Administrador mantém acesso a tudo).
+PERFIL_ADMIN_ID = 1
+# Chave em Connection.info da versão de permissões incrementada na transação;
+# a UnitOfWork a publica em persistencia.sessao só depois do COMMIT.
+VERSAO_PENDENTE = 'versao_permissoes_pendente'
+
+
+def _como_parametros(df: pd.DataFrame) -> list:
+    """Linhas como dicts de int nativo (o driver não aceita numpy.int64) para executemany."""
+    return [{'perfil_id': int(perfil), 'pagina_id': int(pagina)} for perfil, pagina in df.itertuples(index=False)]
+
+
 class PermissaoRepository(BaseRepository):
 
     def get_all_pages(self):
@@ -9,13 +21,49 @@ class PermissaoRepository(BaseRepository):
     def get_all_profiles(self):
         return self._execute_query_to_dataframe("SELECT * FROM perfil_acesso WHERE nome_perfil != 'Administrador Global' ORDER BY nome_perfil")
 
+    def get_permissoes(self) -> pd.DataFrame:
+        return self._execute_query_to_dataframe('SELECT permissao_id, perfil_id, pagina_id FROM perfil_pagina_permissao')
+
     def get_permissions_map(self):
-        df = self._execute_query_to_dataframe('SELECT * FROM perfil_pagina_permissao')
+        df = self.get_permissoes()
         if df.empty:
             return {}
         return df.groupby('pagina_id')['perfil_id'].apply(list).to_dict()
 
-    def salvar_matriz_permissoes(self, df_permissoes: pd.DataFrame):
-        self._execute_raw_sql('DELETE FROM perfil_pagina_permissao WHERE perfil_id != 1')
-        if not df_permissoes.empty:
-            self._write_dataframe_to_table(df_permissoes, 'perfil_pagina_permissao')
\ No newline at end of file
+    def salvar_matriz_permissoes(self, df_permissoes: pd.DataFrame) -> tuple:
+        """
+        Grava a matriz (pares perfil_id, pagina_id concedidos) aplicando só a
+        diferença com perfil_pagina_permissao: um lote de DELETE e um de INSERT
+        na transação da UoW, sem recriar as linhas que não mudaram. Permissões
+        do Administrador (perfil 1) nunca são removidas por aqui. A versão de
+        permissões só é incrementada se algo mudou. Retorna (inseridas, removidas).
+        """
+        chaves = ['perfil_id', 'pagina_id']
+        desejadas = df_permissoes.reindex(columns=chaves).dropna().astype(int).drop_duplicates()
+        atuais = self.get_permissoes().reindex(columns=chaves).astype(int)
+        diferenca = atuais.merge(desejadas, on=chaves, how='outer', indicator=True)
+        inserir = diferenca.loc[diferenca['_merge'] == 'right_only', chaves]
+        remover = diferenca.loc[(diferenca['_merge'] == 'left_only') & (diferenca['perfil_id'] != PERFIL_ADMIN_ID), chaves]
+        if not remover.empty:
+            self._execute_raw_sql('DELETE FROM perfil_pagina_permissao WHERE perfil_id = :perfil_id AND pagina_id = :pagina_id',
+                                  _como_parametros(remover))
+        if not inserir.empty:
+            self._execute_raw_sql('INSERT INTO perfil_pagina_permissao (perfil_id, pagina_id) VALUES (:perfil_id, :pagina_id)',
+                                  _como_parametros(inserir))
+        if not inserir.empty or not remover.empty:
+            self.incrementar_versao_permissoes()
+        return len(inserir), len(remover)
+
+    def get_versao_permissoes(self) -> int:
+        return self._ler_contador('versao_permissoes')
+
+    def incrementar_versao_permissoes(self) -> int:
+        """
+        Invalida os tokens de sessão emitidos antes de uma mudança de
+        perfis/permissões. A nova versão fica pendente na conexão e só vale
+        para o processo após o COMMIT (ver UnitOfWork.__exit__).
+        """
+        self._incrementar_contador('versao_permissoes')
+        versao = self.get_versao_permissoes()
+        self.conn.info[VERSAO_PENDENTE] = versao
+        return versao
\ No newline at end of file
@@ -1,5 +1,6 @@
 from typing import Optional
 from .base import BaseRepository
+from .permissoes import PermissaoRepository
 
 class UsuarioRepository(BaseRepository):
 
@@ -11,6 +12,10 @@ class UsuarioRepository(BaseRepository):
         query = '\n            SELECT u.usuario_id, u.login_usuario, u.nome_completo, p.nome_perfil, u.perfil_id\n            FROM usuarios u\n            LEFT JOIN perfil_acesso p ON u.perfil_id = p.perfil_id\n            ORDER BY u.nome_completo\n        '
         return self._execute_query_to_dataframe(query)
 
+    def get_logins(self) -> set:
+        df = self._execute_query_to_dataframe('SELECT login_usuario FROM usuarios')
+        return set(df['login_usuario']) if not df.empty else set()
+
     def get_all_perfis(self):
         return self._execute_query_to_dataframe('SELECT * FROM perfil_acesso ORDER BY nome_perfil')
 
@@ -19,19 +24,41 @@ class UsuarioRepository(BaseRepository):
             fields = ', '.join([f'{k}=:{k}' for k in data.keys()])
             data['id'] = user_id
             self._execute_raw_sql(f'UPDATE usuarios SET {fields} WHERE usuario_id=:id', data)
+            PermissaoRepository(self.conn).incrementar_versao_permissoes()
         else:
             cols = ', '.join(data.keys())
             params = ', '.join([f':{k}' for k in data.keys()])
             self._execute_raw_sql(f'INSERT INTO usuarios ({cols}) VALUES ({params})', data)
 
+    def inserir_usuarios(self, registros: list) -> int:
+        """INSERT em lote de dicts com login_usuario, senha_criptografada, nome_completo e perfil_id."""
+        if not registros:
+            return 0
+        self._execute_raw_sql('INSERT INTO usuarios (login_usuario, senha_criptografada, nome_completo, perfil_id) VALUES (:login_usuario, :senha_criptografada, :nome_completo, :perfil_id)', registros)
+        return len(registros)
+
+    def atualizar_hash_senha(self, login: str, senha_criptografada: str):
+        self._execute_raw_sql('UPDATE usuarios SET senha_criptografada=:hash WHERE login_usuario=:login', {'hash': senha_criptografada, 'login': login})
+
+    def get_versao_sessao(self, user_id: int) -> int:
+        return self._ler_contador(f'sessao_{int(user_id)}')
+
+    def incrementar_versao_sessao(self, user_id: int) -> int:
+        """Invalida os tokens de sessão já emitidos para o usuário (logout)."""
+        self._incrementar_contador(f'sessao_{int(user_id)}')
+        return self.get_versao_sessao(user_id)
+
     def excluir_usuario(self, user_id: int):
         self._execute_raw_sql('DELETE FROM usuarios WHERE usuario_id=:id', {'id': user_id})
+        PermissaoRepository(self.conn).incrementar_versao_permissoes()
 
     def salvar_perfil(self, data: dict, perfil_id: int=None):
         if perfil_id:
             self._execute_raw_sql('UPDATE perfil_acesso SET nome_perfil=:nome WHERE perfil_id=:id', {'nome': data['nome_perfil'], 'id': perfil_id})
+            PermissaoRepository(self.conn).incrementar_versao_permissoes()
         else:
             self._execute_raw_sql('INSERT INTO perfil_acesso (nome_perfil) VALUES (:nome)', {'nome': data['nome_perfil']})
 
     def excluir_perfil(self, perfil_id: int):
-        self._execute_raw_sql('DELETE FROM perfil_acesso WHERE perfil_id=:id', {'id': perfil_id})
\ No newline at end of file
+        self._execute_raw_sql('DELETE FROM perfil_acesso WHERE perfil_id=:id', {'id': perfil_id})
+        PermissaoRepository(self.conn).incrementar_versao_permissoes()
\ No newline at end of file
@@ -1,31 +1,152 @@
 import os
+import threading
+from functools import lru_cache
 from pathlib import Path
-from cryptography.fernet import Fernet, InvalidToken
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 KEY_PATH = Path(__file__).parent.parent / 'secret.key'
 
 def generate_and_save_key():
     key = Fernet.generate_key()
     with open(KEY_PATH, 'wb') as key_file:
         key_file.write(key)
+    keyring.recarregar()
     return key
 
+def _ler_chaves(path: Path) -> list:
+    """Uma chave por linha; a primeira é a principal (cifra), as demais só decifram."""
+    with open(path, 'rb') as key_file:
+        return [linha.strip() for linha in key_file.read().splitlines() if linha.strip()]
+
+class Keyring:
+    """
+    Chaves Fernet carregadas uma única vez por processo.
+
+    Mantém em cache o MultiFernet e os textos já decifrados. `rotacionar()`
+    adiciona uma nova chave principal sem descartar as antigas, para que os
+    valores cifrados continuem legíveis até serem recifrados.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._chaves = None
+        self._fernet = None
+
+    def _carregar(self):
+        with self._lock:
+            if self._fernet is None:
+                if not self.path.exists():
+                    self.path.write_bytes(Fernet.generate_key())
+                self._chaves = _ler_chaves(self.path)
+                self._fernet = MultiFernet([Fernet(k) for k in self._chaves])
+                self._decifrar.cache_clear()
+        return self._fernet
+
+    @property
+    def fernet(self) -> MultiFernet:
+        return self._fernet or self._carregar()
+
+    @property
+    def chave_principal(self) -> bytes:
+        self.fernet
+        return self._chaves[0]
+
+    @property
+    def chaves(self) -> list:
+        self.fernet
+        return list(self._chaves)
+
+    def recarregar(self):
+        with self._lock:
+            self._fernet = None
+        return self.fernet
+
+    def encrypt(self, message: str) -> str:
+        if not message:
+            return ''
+        return self.fernet.encrypt(message.encode('utf-8')).decode('utf-8')
+
+    def decrypt(self, encrypted_message: str) -> str:
+        if not encrypted_message:
+            return ''
+        return self._decifrar(encrypted_message)
+
+    @lru_cache(maxsize=64)
+    def _decifrar(self, encrypted_message: str) -> str:
+        try:
+            return self.fernet.decrypt(encrypted_message.encode('utf-8')).decode('utf-8')
+        except (InvalidToken, TypeError, AttributeError):
+            return encrypted_message
+
+    def rotate(self, encrypted_message: str) -> str:
+        """Recifra um valor com a chave principal (aceita valores de qualquer chave conhecida)."""
+        return self.fernet.rotate(encrypted_message.encode('utf-8')).decode('utf-8')
+
+    def rotacionar(self) -> bytes:
+        """Gera uma nova chave principal e mantém as anteriores para decifrar."""
+        nova = Fernet.generate_key()
+        self._gravar([nova] + self.chaves)
+        return nova
+
+    def descartar_antigas(self):
+        """Mantém só a chave principal; use depois de recifrar todos os valores."""
+        self._gravar([self.chave_principal])
+
+    def _gravar(self, chaves: list):
+        temporario = self.path.with_suffix('.tmp')
+        temporario.write_bytes(b'\n'.join(chaves) + b'\n')
+        os.replace(temporario, self.path)
+        self.recarregar()
+
+keyring = Keyring(KEY_PATH)
+
 def load_key():
-    if not KEY_PATH.exists():
-        return generate_and_save_key()
-    with open(KEY_PATH, 'rb') as key_file:
-        return key_file.read()
+    return keyring.chave_principal
 
-def encrypt_message(message: str, key: bytes) -> str:
+@lru_cache(maxsize=8)
+def _fernet_para(key: bytes) -> Fernet:
+    return Fernet(key)
+
+def encrypt_message(message: str, key: bytes=None) -> str:
     if not message:
         return ''
-    f = Fernet(key)
-    return f.encrypt(message.encode('utf-8')).decode('utf-8')
+    if key is None:
+        return keyring.encrypt(message)
+    return _fernet_para(key).encrypt(message.encode('utf-8')).decode('utf-8')
 
-def decrypt_message(encrypted_message: str, key: bytes) -> str:
+def decrypt_message(encrypted_message: str, key: bytes=None) -> str:
     if not encrypted_message:
         return ''
-    f = Fernet(key)
+    if key is None:
+        return keyring.decrypt(encrypted_message)
     try:
-        return f.decrypt(encrypted_message.encode('utf-8')).decode('utf-8')
+        return _fernet_para(key).decrypt(encrypted_message.encode('utf-8')).decode('utf-8')
     except (InvalidToken, TypeError, AttributeError):
-        return encrypted_message
\ No newline at end of file
+        return encrypted_message
+
+def reencriptar_ini(ini_path: Path, anel: Keyring=None, campos=('user', 'password')) -> int:
+    """
+    Recifra com a chave principal os valores Fernet de `campos` no arquivo,
+    inclusive em linhas comentadas, preservando o restante do texto.
+    Retorna o número de valores recifrados.
+    """
+    anel = anel or keyring
+    linhas = Path(ini_path).read_text(encoding='utf-8').splitlines(keepends=True)
+    alterados = 0
+    for i, linha in enumerate(linhas):
+        prefixo, sep, valor = linha.partition('=')
+        chave = prefixo.strip().lstrip('#;').strip()
+        token = valor.strip()
+        if not sep or chave not in campos or not token.startswith('gAAAA'):
+            continue
+        try:
+            novo = anel.rotate(token)
+        except InvalidToken:
+            continue
+        linhas[i] = linha.replace(token, novo)
+        alterados += 1
+    if alterados:
+        temporario = Path(ini_path).with_suffix('.tmp')
+        temporario.write_text(''.join(linhas), encoding='utf-8')
+        os.replace(temporario, ini_path)
+    return alterados
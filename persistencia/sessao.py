@@ -0,0 +1,115 @@
+"""
+Tokens de sessão assinados e com validade (Fernet).
+
+O token carrega id, login, nome, perfil, a versão de permissões e a versão
+de sessão do usuário vigentes na emissão. Restaurar a sessão a partir dele
+não consulta o banco: as versões ficam em memória e só são lidas do banco
+na primeira vez em cada processo. Qualquer mudança de perfis/permissões
+incrementa a versão de permissões e invalida todos os tokens emitidos antes
+dela; o logout (encerrar_sessao) incrementa a versão de sessão do usuário e
+invalida os tokens dele.
+"""
+import json
+import logging
+import threading
+from cryptography.fernet import InvalidToken, MultiFernet
+import config
+from .security import keyring
+
+log = logging.getLogger(__name__)
+
+_versao_lock = threading.Lock()
+_versao_permissoes = None
+_versoes_sessao = {}
+
+
+def _fernet() -> MultiFernet:
+    return keyring.fernet
+
+
+def versao_permissoes() -> int:
+    """Versão de permissões em memória (carregada do banco uma vez por processo)."""
+    global _versao_permissoes
+    with _versao_lock:
+        if _versao_permissoes is None:
+            from .unit_of_work import UnitOfWork
+            with UnitOfWork() as uow:
+                _versao_permissoes = uow.permissoes.get_versao_permissoes()
+        return _versao_permissoes
+
+
+def atualizar_versao_permissoes(versao: int):
+    """Chamado pelo repositório ao incrementar a versão; nunca retrocede."""
+    global _versao_permissoes
+    with _versao_lock:
+        _versao_permissoes = max(versao, _versao_permissoes or 0)
+    log.info(f'Versão de permissões: {_versao_permissoes}. Tokens de sessão anteriores invalidados.')
+
+
+def versao_sessao(user_id: int) -> int:
+    """Versão de sessão do usuário em memória (carregada do banco uma vez por processo)."""
+    if user_id is None:
+        return 0
+    with _versao_lock:
+        if user_id not in _versoes_sessao:
+            from .unit_of_work import UnitOfWork
+            with UnitOfWork() as uow:
+                _versoes_sessao[user_id] = uow.usuarios.get_versao_sessao(user_id)
+        return _versoes_sessao[user_id]
+
+
+def encerrar_sessao(user_info: dict):
+    """Logout: invalida os tokens já emitidos para o usuário."""
+    user_id = user_info.get('user_id')
+    if user_id is None:
+        return
+    from .unit_of_work import UnitOfWork
+    with UnitOfWork() as uow:
+        versao = uow.usuarios.incrementar_versao_sessao(user_id)
+    with _versao_lock:
+        _versoes_sessao[user_id] = max(versao, _versoes_sessao.get(user_id, 0))
+    log.info(f"Sessão de '{user_info.get('username')}' encerrada. Tokens de sessão anteriores invalidados.")
+
+
+def limpar_cache():
+    global _versao_permissoes
+    with _versao_lock:
+        _versao_permissoes = None
+        _versoes_sessao.clear()
+_versoes_sessao = {}
+
+
+def emitir_token(user_info: dict) -> str:
+    payload = {
+        'uid': user_info.get('user_id'),
+        'u': user_info['username'],
+        'n': user_info['name'],
+        'p': user_info['access_level'],
+        'v': versao_permissoes(),
+        's': versao_sessao(user_info.get('user_id')),
+    }
+    return _fernet().encrypt(json.dumps(payload, separators=(',', ':')).encode('utf-8')).decode('ascii')
+
+
+def restaurar_sessao(token: str):
+    """Retorna o user_info do token, ou None se inválido, expirado ou de versão antiga."""
+    if not token:
+        return None
+    try:
+        payload = json.loads(_fernet().decrypt(token.encode('ascii'), ttl=int(config.SESSAO_TTL_HORAS * 3600)))
+    except (InvalidToken, ValueError, UnicodeError) as e:
+        log.info(f'Token de sessão rejeitado: {type(e).__name__}')
+        return None
+    try:
+        versao_atual = versao_permissoes()
+        sessao_atual = versao_sessao(payload.get('uid'))
+    except Exception as e:
+        log.error(f'Não foi possível validar o token de sessão: {e}')
+        return None
+    if payload.get('v') != versao_atual:
+        log.info(f"Token de sessão de '{payload.get('u')}' rejeitado: versão de permissões desatualizada.")
+        return None
+    if payload.get('s') != sessao_atual:
+        log.info(f"Token de sessão de '{payload.get('u')}' rejeitado: sessão encerrada.")
+        return None
+    return {'user_id': payload['uid'], 'username': payload['u'], 'name': payload['n'], 'access_level': payload['p']}
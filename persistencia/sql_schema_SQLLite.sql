@@ -25,6 +25,11 @@ CREATE TABLE IF NOT EXISTS perfil_pagina_permissao (
     FOREIGN KEY (pagina_id) REFERENCES pagina(pagina_id) ON DELETE CASCADE,
     UNIQUE(perfil_id, pagina_id)
 );
+-- Contadores globais (ex.: versao_permissoes, que invalida tokens de sessão).
+CREATE TABLE IF NOT EXISTS controle_versao (
+    chave TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL DEFAULT 0
+);
 -- ============================================================
 -- DML: Dados iniciais do sistema
 -- Contexto: Sistema de Gestão para Fábrica de Pré-Moldados
@@ -45,7 +50,7 @@ INSERT OR IGNORE INTO usuarios (login_usuario, senha_criptografada, nome_complet
     ('prod.francis', '$2b$12$EzaobIi.BJeAbu3xbR0sr.2viD6cOJ9h.c7snQk9TYlnetxd3IhNG', 'Francis Mestre de Obras',  3),
     ('vend.calos',   '$2b$12$EzaobIi.BJeAbu3xbR0sr.2viD6cOJ9h.c7snQk9TYlnetxd3IhNG', 'Carlos Vendas',            4);
 
--- 3. Páginas do Sistema (12 páginas no Pipeline)
+-- 3. Páginas do Sistema (14 páginas no Pipeline)
 INSERT OR IGNORE INTO pagina (pagina_id, nome_arquivo, nome_amigavel) VALUES
     (1,  '01_🏠_Pagina_Inicial.py',                'Página Inicial'),
     (2,  '02_🏭_Fabrica_Dashboard.py',              'Fábrica Dashboard'),
@@ -58,7 +63,9 @@ INSERT OR IGNORE INTO pagina (pagina_id, nome_arquivo, nome_amigavel) VALUES
     (9,  '09_🤝_Cadastro_Clientes.py',              'Cadastro de Clientes'),
     (10, '10_📜_Historico_Producao.py',              'Histórico Produção'),
     (11, '11_⚙️_Configuracoes.py',                   'Configurações'),
-    (12, '12_ℹ️_Sobre.py',                           'Sobre');
+    (12, '12_ℹ️_Sobre.py',                           'Sobre'),
+    (13, '13_📅_Programacao_Producao.py',            'Programação da Produção'),
+    (14, '14_🩺_Saude_Sistema.py',                   'Saúde do Sistema');
 
 -- 4. Permissões: Administrador (1) — acesso total
 INSERT OR IGNORE INTO perfil_pagina_permissao (perfil_id, pagina_id)
@@ -68,9 +75,9 @@ SELECT 1, pagina_id FROM pagina;
 INSERT OR IGNORE INTO perfil_pagina_permissao (perfil_id, pagina_id) VALUES
     (2, 1), (2, 12), (2, 4), (2, 5), (2, 6), (2, 7), (2, 8);
 
--- 6. Permissões: Produção (3) — Home, Sobre, Dashboard(2), Produção(4), Histórico(10), Materiais(8)
+-- 6. Permissões: Produção (3) — Home, Sobre, Dashboard(2), Produção(4), Histórico(10), Materiais(8), Programação(13)
 INSERT OR IGNORE INTO perfil_pagina_permissao (perfil_id, pagina_id) VALUES
-    (3, 1), (3, 12), (3, 2), (3, 4), (3, 8), (3, 10);
+    (3, 1), (3, 12), (3, 2), (3, 4), (3, 8), (3, 10), (3, 13);
 
 -- 7. Permissões: Comercial (4) — Home, Sobre, Dashboard(2), Novo Pedido(3), Catálogo(7), Clientes(9)
 INSERT OR IGNORE INTO perfil_pagina_permissao (perfil_id, pagina_id) VALUES
@@ -106,7 +113,12 @@ CREATE TABLE IF NOT EXISTS fab_tracos_padrao (
     nome TEXT NOT NULL UNIQUE,
     fck_alvo REAL NOT NULL,
     traco_str TEXT NOT NULL,
-    consumo_cimento_m3 REAL NOT NULL
+    consumo_cimento_m3 REAL NOT NULL,
+    prop_cimento REAL,
+    prop_areia REAL,
+    prop_brita REAL,
+    relacao_ac REAL,
+    aditivo_pct REAL
 );
 CREATE TABLE IF NOT EXISTS fab_pedidos (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -121,6 +133,14 @@ CREATE TABLE IF NOT EXISTS fab_pedidos (
     FOREIGN KEY (elemento_id) REFERENCES fab_catalogo_elementos(id),
     FOREIGN KEY (traco_usado_id) REFERENCES fab_tracos_padrao(id)
 );
+-- Pedidos e volume por semana/status, mantido pelo FabricaRepository.
+CREATE TABLE IF NOT EXISTS fab_rollup_semanal (
+    semana TEXT NOT NULL,
+    status TEXT NOT NULL,
+    pedidos INTEGER NOT NULL DEFAULT 0,
+    volume_m3 REAL NOT NULL DEFAULT 0.0,
+    PRIMARY KEY (semana, status)
+);
 
 -- ============================================================
 -- MÓDULO FÁBRICA DE PRÉ-MOLDADOS (DML)
@@ -0,0 +1,76 @@
+"""
+Limitação de tentativas de login por usuário e por IP (token bucket).
+
+O estado fica no processo e é compartilhado por todas as sessões do
+Streamlit, então abrir uma nova aba não zera o limite. O limite por IP é
+folgado: numa fábrica, todos os operadores costumam sair pelo mesmo IP (NAT
+ou proxy). Com rajada_ip = 0 ele fica desligado.
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    """Balde com `capacidade` fichas, reposto continuamente a `taxa_por_s`."""
+
+    __slots__ = ('capacidade', 'taxa_por_s', 'fichas', 'atualizado')
+
+    def __init__(self, capacidade: float, taxa_por_s: float, agora: float):
+        self.capacidade = capacidade
+        self.taxa_por_s = taxa_por_s
+        self.fichas = capacidade
+        self.atualizado = agora
+
+    def repor(self, agora: float) -> float:
+        self.fichas = min(self.capacidade, self.fichas + (agora - self.atualizado) * self.taxa_por_s)
+        self.atualizado = agora
+        return self.fichas
+
+    def cheio(self, agora: float) -> bool:
+        return self.repor(agora) >= self.capacidade
+
+
+class LoginThrottle:
+    """Token buckets por usuário e por IP, protegidos por um único lock."""
+
+    def __init__(self, rajada_usuario: int, taxa_usuario_min: float, rajada_ip: int, taxa_ip_min: float,
+                 relogio=time.monotonic, max_chaves: int = 10000):
+        self._limites = {
+            'usuario': (rajada_usuario, taxa_usuario_min / 60.0),
+            'ip': (rajada_ip, taxa_ip_min / 60.0),
+        }
+        self._relogio = relogio
+        self._max_chaves = max_chaves
+        self._baldes = {}
+        self._lock = threading.Lock()
+
+    def _balde(self, tipo: str, chave: str, agora: float) -> TokenBucket:
+        balde = self._baldes.get((tipo, chave))
+        if balde is None:
+            if len(self._baldes) >= self._max_chaves:
+                self._descartar_cheios(agora)
+            capacidade, taxa = self._limites[tipo]
+            balde = self._baldes[(tipo, chave)] = TokenBucket(capacidade, taxa, agora)
+        return balde
+
+    def _descartar_cheios(self, agora: float):
+        # Um balde cheio equivale a um balde novo, então pode ser esquecido.
+        for chave in [k for k, b in self._baldes.items() if b.cheio(agora)]:
+            del self._baldes[chave]
+
+    def permitir(self, username: str, ip: str = None) -> bool:
+        """Consome uma ficha do usuário e do IP; recusa se qualquer um estiver vazio."""
+        agora = self._relogio()
+        with self._lock:
+            baldes = [self._balde('usuario', (username or '').strip().lower(), agora)]
+            if ip and self._limites['ip'][0] > 0:
+                baldes.append(self._balde('ip', ip, agora))
+            if any(b.repor(agora) < 1 for b in baldes):
+                return False
+            for b in baldes:
+                b.fichas -= 1
+            return True
+
+    def limpar(self):
+        with self._lock:
+            self._baldes.clear()
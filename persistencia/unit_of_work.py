@@ -1,13 +1,26 @@
 
 import logging
+import os
+import sys
+import time
 from sqlalchemy.engine import Engine
 from persistencia.database import DatabaseManager
-from streamlit.runtime.scriptrunner.script_runner import StopException
+from persistencia import perfilador, sessao
+from persistencia.logger import ms_desde
 from persistencia.repositorios import UsuarioRepository, PermissaoRepository, PaginaRepository
 
 from persistencia.repositorios.fabrica_repo import FabricaRepository
+from persistencia.repositorios.permissoes import VERSAO_PENDENTE
 log = logging.getLogger(__name__)
 
+# st.stop() levanta StopException. Se o Streamlit não foi importado (CLI,
+# testes), essa exceção não pode ter ocorrido: não há por que importá-lo aqui.
+_MODULO_STOP = 'streamlit.runtime.scriptrunner_utils.exceptions'
+
+def _e_st_stop(exc_type) -> bool:
+    modulo = sys.modules.get(_MODULO_STOP)
+    return modulo is not None and issubclass(exc_type, modulo.StopException)
+
 class SimulationRollback(Exception):
 
     def __init__(self, message):
@@ -21,44 +34,61 @@ class UnitOfWork:
             self.engine: Engine = DatabaseManager.get_engine()
             if self.engine is None:
                 raise ConnectionError('A engine do banco de dados não está disponível.')
+            self._inicio = time.perf_counter()
             self.connection = self.engine.connect()
             self.transaction = self.connection.begin()
-            log.debug('UoW: Transação iniciada.')
+            log.debug('UoW: Transação iniciada.', extra={'duracao_ms': ms_desde(self._inicio)})
             self.usuarios = UsuarioRepository(self.connection)
             self.permissoes = PermissaoRepository(self.connection)
             self.paginas = PaginaRepository(self.connection)
 
             self.fabrica = FabricaRepository(self.connection)
+            self._perfil = None
+            if perfilador.ativo():
+                chamador = sys._getframe(1)
+                self._perfil = perfilador.entrar('uow', f'{os.path.basename(chamador.f_code.co_filename)}:{chamador.f_lineno}')
             return self
         except Exception as e:
-            log.error(f'UoW: Falha ao iniciar a transação: {e}', exc_info=True)
+            log.error('UoW: Falha ao iniciar a transação: %s', e, exc_info=True)
             if hasattr(self, 'connection') and self.connection:
                 self.connection.close()
             raise
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        confirmada = False
         try:
             if exc_type:
-                if exc_type == StopException:
+                if _e_st_stop(exc_type):
                     log.debug('UoW: Interrupção do Streamlit (st.stop) detectada. Commitando transação.')
                     self.transaction.commit()
+                    confirmada = True
                     return False
                 if exc_type == SimulationRollback:
-                    log.info(f'UoW: Simulação finalizada. Executando ROLLBACK preventivo.')
+                    log.info('UoW: Simulação finalizada. Executando ROLLBACK preventivo.')
                     self.transaction.rollback()
                     return False
-                log.warning(f'UoW: Erro detectado. Executando ROLLBACK. Erro: {exc_val}', exc_info=True)
+                log.warning('UoW: Erro detectado. Executando ROLLBACK. Erro: %s', exc_val, exc_info=True,
+                            extra={'duracao_ms': ms_desde(self._inicio)})
                 self.transaction.rollback()
             else:
                 log.debug('UoW: Sucesso. Executando COMMIT.')
                 self.transaction.commit()
+                confirmada = True
         except Exception as e:
-            log.error(f'UoW: Erro crítico durante o __exit__ (commit/rollback): {e}', exc_info=True)
+            log.error('UoW: Erro crítico durante o __exit__ (commit/rollback): %s', e, exc_info=True)
             try:
                 self.transaction.rollback()
             except:
                 pass
         finally:
             if hasattr(self, 'connection') and self.connection:
+                # A conexão volta ao pool com o mesmo info: a versão pendente
+                # sai sempre, mas só é publicada se a transação foi confirmada.
+                versao = self.connection.info.pop(VERSAO_PENDENTE, None)
+                if confirmada and versao is not None:
+                    sessao.atualizar_versao_permissoes(versao)
                 self.connection.close()
-            log.debug('UoW: Conexão fechada.')
\ No newline at end of file
+            # duracao_ms: tempo total da unidade de trabalho (abrir, consultas, commit/rollback).
+            log.debug('UoW: Conexão fechada.', extra={'duracao_ms': ms_desde(self._inicio)})
+            if self._perfil is not None:
+                self._perfil.sair()
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+test_aquecimento.py — Testes do aquecimento por processo e da sonda de saúde.
+"""
+import sys
+import os
+import pytest
+from sqlalchemy import create_engine
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from components import aquecimento
+from persistencia.database import DatabaseManager
+
+
+@pytest.fixture
+def estado_limpo(monkeypatch):
+    monkeypatch.setattr(aquecimento, '_estado', {'pronto': False, 'concluido_em': None, 'etapas': {}})
+    monkeypatch.setattr(config, 'INITIALIZE_DATABASE_ON_STARTUP', False)
+
+
+def test_aquece_uma_vez_por_processo(estado_limpo):
+    primeiro = aquecimento.aquecer(incluir_llm=False)
+    assert primeiro['pronto']
+    assert {'banco', 'pool', 'caches'} <= set(primeiro['etapas'])
+    assert primeiro['etapas']['banco']['ok'] and primeiro['etapas']['pool']['ok']
+
+    segundo = aquecimento.aquecer(incluir_llm=False)
+    assert segundo['concluido_em'] == primeiro['concluido_em']
+
+
+def test_falha_no_banco_propaga_e_permite_nova_tentativa(estado_limpo, monkeypatch):
+    def falhar():
+        raise ConnectionError('banco fora do ar')
+
+    with monkeypatch.context() as m:
+        m.setattr(DatabaseManager, 'get_engine', falhar)
+        with pytest.raises(ConnectionError):
+            aquecimento.aquecer(incluir_llm=False)
+    assert not aquecimento.estado()['pronto']
+    assert aquecimento.estado()['etapas']['banco']['ok'] is False
+
+    assert aquecimento.aquecer(incluir_llm=False)['pronto']
+
+
+def test_encher_pool_deixa_conexoes_livres(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'AQUECER_CONEXOES', 0)
+    engine = create_engine(f'sqlite:///{tmp_path / "pool.db"}', pool_size=3)
+    assert aquecimento._encher_pool(engine) == 3
+    stats = aquecimento.estatisticas_pool(engine)
+    assert stats['checkedin'] == 3
+    assert stats['checkedout'] == 0
+
+
+def test_saude_reporta_ida_e_volta_e_pool(engine):
+    dados = aquecimento.saude()
+    assert dados['banco_ok']
+    assert dados['ida_e_volta_ms'] >= 0
+    assert dados['pool']['classe'] == 'StaticPool'
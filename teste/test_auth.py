@@ -0,0 +1,149 @@
+"""
+test_auth.py — Testes da verificação de credenciais e do limitador de login.
+"""
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import bcrypt
+import pytest
+from sqlalchemy import text
+import config
+from persistencia import auth
+from persistencia.auth import escolher_custo_bcrypt
+from persistencia.throttle import LoginThrottle
+from persistencia.unit_of_work import UnitOfWork
+
+
+class _Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+def test_token_bucket_por_usuario_e_reposicao():
+    relogio = _Relogio()
+    throttle = LoginThrottle(rajada_usuario=2, taxa_usuario_min=1.0, rajada_ip=100, taxa_ip_min=100.0, relogio=relogio)
+
+    assert throttle.permitir('Operador')
+    assert throttle.permitir(' operador ')  # mesma chave, normalizada
+    assert not throttle.permitir('operador')
+    assert throttle.permitir('outro')
+
+    relogio.agora = 60.0  # 1 ficha por minuto
+    assert throttle.permitir('operador')
+    assert not throttle.permitir('operador')
+
+
+def test_token_bucket_por_ip_independe_do_usuario():
+    throttle = LoginThrottle(rajada_usuario=100, taxa_usuario_min=1.0, rajada_ip=3, taxa_ip_min=1.0, relogio=_Relogio())
+
+    assert all(throttle.permitir(f'usuario{i}', ip='10.0.0.1') for i in range(3))
+    assert not throttle.permitir('usuario9', ip='10.0.0.1')
+    assert throttle.permitir('usuario9', ip='10.0.0.2')
+
+
+def test_limite_por_ip_desligado_com_rajada_zero():
+    throttle = LoginThrottle(rajada_usuario=100, taxa_usuario_min=1.0, rajada_ip=0, taxa_ip_min=0.0, relogio=_Relogio())
+    assert all(throttle.permitir(f'usuario{i}', ip='10.0.0.1') for i in range(50))
+
+
+def test_throttle_descarta_baldes_cheios():
+    relogio = _Relogio()
+    throttle = LoginThrottle(2, 60.0, 2, 60.0, relogio=relogio, max_chaves=3)
+    for i in range(3):
+        throttle.permitir(f'u{i}')
+    relogio.agora = 10.0
+    throttle.permitir('novo')
+    assert len(throttle._baldes) == 1
+
+
+@pytest.fixture
+def usuario_teste(engine, monkeypatch):
+    monkeypatch.setattr(config, 'BCRYPT_ROUNDS', 5)
+    senha_hash = bcrypt.hashpw(b'senha-correta', bcrypt.gensalt(rounds=4)).decode('utf-8')
+    with UnitOfWork() as uow:
+        uow.connection.execute(text("INSERT OR IGNORE INTO perfil_acesso (perfil_id, nome_perfil) VALUES (1, 'Administrador')"))
+        uow.usuarios.salvar_usuario({'login_usuario': 'auth.teste', 'senha_criptografada': senha_hash,
+                                     'nome_completo': 'Auth Teste', 'perfil_id': 1})
+    auth._throttle.limpar()
+    yield 'auth.teste'
+    with UnitOfWork() as uow:
+        uow.connection.execute(text("DELETE FROM usuarios WHERE login_usuario = 'auth.teste'"))
+    auth._throttle.limpar()
+
+
+def test_verify_user_credentials(usuario_teste):
+    user = auth.verify_user_credentials(usuario_teste, 'senha-correta', ip='127.0.0.1')
+    user.pop('user_id')
+    assert user == {'username': 'auth.teste', 'name': 'Auth Teste', 'access_level': 'Administrador'}
+    assert auth.verify_user_credentials(usuario_teste, 'errada', ip='127.0.0.1') is None
+    assert auth.verify_user_credentials('nao.existe', 'qualquer', ip='127.0.0.1') is None
+
+
+def test_verify_user_credentials_limitado(usuario_teste):
+    resultados = [auth.verify_user_credentials(usuario_teste, 'errada') for _ in range(6)]
+    assert resultados[-1] == auth.THROTTLED
+    # Nem a senha correta passa enquanto o balde do usuário estiver vazio.
+    assert auth.verify_user_credentials(usuario_teste, 'senha-correta') == auth.THROTTLED
+
+
+def _hash_gravado(login):
+    with UnitOfWork() as uow:
+        return uow.connection.execute(
+            text("SELECT senha_criptografada FROM usuarios WHERE login_usuario = :login"), {'login': login}
+        ).scalar()
+
+
+def test_login_regrava_hash_com_custo_menor(usuario_teste):
+    assert auth.custo_do_hash(_hash_gravado(usuario_teste)) == 4
+
+    assert auth.verify_user_credentials(usuario_teste, 'errada') is None
+    assert auth.custo_do_hash(_hash_gravado(usuario_teste)) == 4
+
+    assert auth.verify_user_credentials(usuario_teste, 'senha-correta')
+    novo_hash = _hash_gravado(usuario_teste)
+    assert auth.custo_do_hash(novo_hash) == 5
+    assert auth.check_password_hash('senha-correta', novo_hash)
+
+
+def test_regravacao_do_hash_respeita_as_vagas_do_pool(usuario_teste, monkeypatch):
+    vagas = threading.BoundedSemaphore(1)
+    vagas.acquire()
+    monkeypatch.setattr(auth, '_hash_vagas', vagas)
+    monkeypatch.setattr(config, 'LOGIN_HASH_TIMEOUT_S', 0.01)
+    hash_antigo = _hash_gravado(usuario_teste)
+
+    auth._atualizar_hash_se_antigo(usuario_teste, b'senha-correta', hash_antigo.encode('utf-8'))
+    assert _hash_gravado(usuario_teste) == hash_antigo
+
+    vagas.release()
+    auth._atualizar_hash_se_antigo(usuario_teste, b'senha-correta', hash_antigo.encode('utf-8'))
+    assert auth.custo_do_hash(_hash_gravado(usuario_teste)) == config.BCRYPT_ROUNDS
+
+
+def test_hash_password_usa_custo_configurado(monkeypatch):
+    monkeypatch.setattr(config, 'BCRYPT_ROUNDS', 6)
+    assert auth.custo_do_hash(auth.hash_password('abc')) == 6
+    assert auth.custo_do_hash(auth.hash_password('abc', rounds=4)) == 4
+    assert auth.custo_do_hash('texto qualquer') == 0
+
+
+def test_escolher_custo_bcrypt():
+    medir = lambda rounds: 2.0 ** (rounds - 4)  # 10 -> 64 ms, 12 -> 256 ms
+    assert escolher_custo_bcrypt(300, minimo=10, maximo=16, medir=medir)[0] == 12
+    rounds, medicoes = escolher_custo_bcrypt(10, minimo=10, maximo=16, medir=medir)
+    assert rounds == 10 and list(medicoes) == [10]
+    assert escolher_custo_bcrypt(1e9, minimo=10, maximo=13, medir=medir)[0] == 13
+
+
+def test_hash_passwords_em_paralelo_mantem_a_ordem():
+    senhas = [f'senha-{i}' for i in range(6)]
+    hashes = auth.hash_passwords(senhas, workers=3, rounds=4)
+    assert len(hashes) == len(senhas)
+    assert all(auth.check_password_hash(s, h) for s, h in zip(senhas, hashes))
+    assert auth.hash_passwords([], workers=3) == []
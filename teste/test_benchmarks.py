@@ -0,0 +1,59 @@
+"""
+test_benchmarks.py — Testes do gerador sintético e do benchmark de repositórios.
+Roda numa escala mínima; os números de desempenho não são verificados aqui.
+"""
+import sys
+import os
+import inspect
+import sqlite3
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks import dados_sinteticos, repositorios
+from persistencia.repositorios.fabrica_repo import FabricaRepository
+
+ESCALA = 0.001
+
+
+def _contagens(caminho):
+    with sqlite3.connect(caminho) as con:
+        return {t: con.execute(f'SELECT COUNT(*) FROM fab_{t}').fetchone()[0]
+                for t in ('clientes', 'materiais', 'tracos_padrao', 'catalogo_elementos', 'pedidos')}
+
+
+def test_gerador_deterministico(tmp_path):
+    a = dados_sinteticos.banco_sintetico(ESCALA, semente=7, pasta=tmp_path / 'a')
+    b = dados_sinteticos.banco_sintetico(ESCALA, semente=7, pasta=tmp_path / 'b')
+    n = dados_sinteticos.tamanhos(ESCALA)
+    assert _contagens(a) == {'clientes': n['clientes'], 'materiais': n['materiais'],
+                             'tracos_padrao': n['tracos'], 'catalogo_elementos': n['elementos'],
+                             'pedidos': n['pedidos']}
+    consulta = 'SELECT * FROM fab_pedidos ORDER BY id'
+    with sqlite3.connect(a) as ca, sqlite3.connect(b) as cb:
+        assert ca.execute(consulta).fetchall() == cb.execute(consulta).fetchall()
+
+
+def test_banco_em_cache_e_reaproveitado(tmp_path):
+    primeiro = dados_sinteticos.banco_sintetico(ESCALA, pasta=tmp_path)
+    modificado = primeiro.stat().st_mtime_ns
+    assert dados_sinteticos.banco_sintetico(ESCALA, pasta=tmp_path) == primeiro
+    assert primeiro.stat().st_mtime_ns == modificado
+
+
+def test_casos_cobrem_todos_os_metodos_publicos():
+    publicos = {nome for nome, _ in inspect.getmembers(FabricaRepository, inspect.isfunction)
+                if not nome.startswith('_') and nome in vars(FabricaRepository)}
+    assert publicos <= set(repositorios._casos(dados_sinteticos.tamanhos(ESCALA)))
+
+
+def test_medir_e_comparar(tmp_path, monkeypatch):
+    monkeypatch.setattr(dados_sinteticos, 'PASTA_CACHE', tmp_path)
+    monkeypatch.setattr(repositorios, 'banco_sintetico',
+                        lambda escala, semente: dados_sinteticos.banco_sintetico(escala, semente, pasta=tmp_path))
+    resultados = repositorios.medir(ESCALA, rodadas=2, aquecimento=0)
+    assert set(resultados) == set(repositorios._casos(dados_sinteticos.tamanhos(ESCALA)))
+    assert all(r['mediana_ms'] >= 0 and r['pico_mb'] >= 0 for r in resultados.values())
+
+    baseline = {nome: {**r, 'mediana_ms': r['mediana_ms'] / 10} for nome, r in resultados.items()}
+    assert repositorios.comparar(resultados, resultados, 0.25) == []
+    assert len(repositorios.comparar(resultados, baseline, 0.25)) == len(resultados)
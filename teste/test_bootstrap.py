@@ -0,0 +1,103 @@
+"""
+test_bootstrap.py — Testes da criação transacional do banco por scripts SQL.
+"""
+import sys
+import os
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from persistencia.bootstrap import SCRIPTS, bootstrap, sem_controle_de_transacao
+
+
+@pytest.fixture
+def engine_arquivo(tmp_path):
+    return create_engine(f'sqlite:///{tmp_path / "bootstrap.db"}')
+
+
+def _script(tmp_path, nome, conteudo):
+    caminho = tmp_path / f'{nome}.sql'
+    caminho.write_text(conteudo, encoding='utf-8')
+    return (nome, caminho)
+
+
+def test_banco_novo_com_scripts_reais(engine_arquivo):
+    assert bootstrap(engine_arquivo) == [nome for nome, _ in SCRIPTS]
+    with engine_arquivo.connect() as conn:
+        assert conn.execute(text('SELECT COUNT(*) FROM usuarios')).scalar() > 0
+        assert conn.execute(text('SELECT COUNT(*) FROM fab_materiais')).scalar() > 0
+        paginas = conn.execute(text('SELECT COUNT(*) FROM pagina')).scalar()
+
+    assert bootstrap(engine_arquivo) == []  # reexecução: nada pendente
+    with engine_arquivo.connect() as conn:
+        assert conn.execute(text('SELECT COUNT(*) FROM pagina')).scalar() == paginas
+
+
+def test_ponto_e_virgula_em_string_e_trigger(tmp_path, engine_arquivo):
+    scripts = [_script(tmp_path, 'a', """
+        BEGIN TRANSACTION;
+        CREATE TABLE IF NOT EXISTS nota (id INTEGER PRIMARY KEY, texto TEXT);
+        CREATE TABLE IF NOT EXISTS auditoria (texto TEXT);
+        CREATE TRIGGER IF NOT EXISTS nota_auditada AFTER INSERT ON nota BEGIN
+            INSERT INTO auditoria VALUES (NEW.texto);
+        END;
+        INSERT OR IGNORE INTO nota VALUES (1, 'a; b; c');
+        COMMIT;
+    """)]
+    bootstrap(engine_arquivo, scripts)
+    with engine_arquivo.connect() as conn:
+        assert conn.execute(text('SELECT texto FROM auditoria')).scalar() == 'a; b; c'
+
+
+def test_script_alterado_e_reaplicado(tmp_path, engine_arquivo):
+    a = _script(tmp_path, 'a', 'CREATE TABLE IF NOT EXISTS t (v INTEGER);')
+    b = _script(tmp_path, 'b', 'INSERT INTO t VALUES (1);')
+    assert bootstrap(engine_arquivo, [a, b]) == ['a', 'b']
+    b[1].write_text('INSERT INTO t VALUES (2);', encoding='utf-8')
+    assert bootstrap(engine_arquivo, [a, b]) == ['b']
+    with engine_arquivo.connect() as conn:
+        assert [r[0] for r in conn.execute(text('SELECT v FROM t ORDER BY v'))] == [1, 2]
+
+
+def test_falha_desfaz_tudo(tmp_path, engine_arquivo):
+    scripts = [
+        _script(tmp_path, 'a', 'CREATE TABLE t (v INTEGER);'),
+        _script(tmp_path, 'b', 'INSERT INTO tabela_inexistente VALUES (1);'),
+    ]
+    with pytest.raises(Exception):
+        bootstrap(engine_arquivo, scripts)
+    assert inspect(engine_arquivo).get_table_names() == []
+
+
+def test_banco_existente_so_registra_checksums(tmp_path, engine_arquivo):
+    with engine_arquivo.begin() as conn:
+        conn.execute(text('CREATE TABLE usuarios (login TEXT)'))
+    scripts = [_script(tmp_path, 'seed', "INSERT INTO usuarios VALUES ('removido_pelo_admin');")]
+    assert bootstrap(engine_arquivo, scripts) == ['seed']
+    with engine_arquivo.connect() as conn:
+        assert conn.execute(text('SELECT COUNT(*) FROM usuarios')).scalar() == 0
+        assert conn.execute(text('SELECT COUNT(*) FROM controle_scripts')).scalar() == 1
+
+
+def test_remove_apenas_controle_de_transacao():
+    script = "BEGIN TRANSACTION;\nINSERT INTO x VALUES ('COMMIT;');\n-- fim\nCOMMIT;\n"
+    limpo = sem_controle_de_transacao(script)
+    assert 'BEGIN TRANSACTION' not in limpo
+    assert "VALUES ('COMMIT;')" in limpo
+    assert limpo.strip().endswith("VALUES ('COMMIT;');")
+
+
+def test_seed_alterado_nao_e_reexecutado(tmp_path, engine_arquivo, monkeypatch):
+    monkeypatch.setattr('persistencia.bootstrap.SEEDS', {'seed'})
+    schema = _script(tmp_path, 'schema', 'CREATE TABLE IF NOT EXISTS usuarios (login TEXT);')
+    seed = _script(tmp_path, 'seed', "INSERT INTO usuarios VALUES ('admin');")
+    assert bootstrap(engine_arquivo, [schema, seed]) == ['schema', 'seed']
+    with engine_arquivo.begin() as conn:
+        conn.execute(text("DELETE FROM usuarios WHERE login = 'admin'"))
+
+    seed[1].write_text("INSERT INTO usuarios VALUES ('admin');\nINSERT INTO usuarios VALUES ('novo');", encoding='utf-8')
+    assert bootstrap(engine_arquivo, [schema, seed]) == ['seed']
+    assert bootstrap(engine_arquivo, [schema, seed]) == []
+    with engine_arquivo.connect() as conn:
+        assert conn.execute(text('SELECT COUNT(*) FROM usuarios')).scalar() == 0
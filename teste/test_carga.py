@@ -0,0 +1,46 @@
+"""
+test_carga.py — Testes do gerador de carga com operadores virtuais.
+Uma execução mínima (um operador, um fluxo após o login); os números de desempenho não são verificados aqui.
+"""
+import sys
+import os
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks import carga
+
+ESCALA = 0.001
+
+
+def test_resumo_percentis():
+    r = carga._resumo([float(v) for v in range(1, 101)])
+    assert r['n'] == 100
+    assert r['p50_ms'] == 51.0
+    assert r['p99_ms'] == 99.0
+    assert r['max_ms'] == 100.0
+    assert carga._resumo([])['p95_ms'] == 0.0
+
+
+def test_stub_ia_respeita_latencia():
+    stub = carga._stub_ia(latencia_ms=0)
+    res = stub['sugerir_traco'](25.0)
+    assert {'traco_sugerido', 'custo_estimado', 'consumo_cimento_m3'} <= res.keys()
+    assert stub['otimizar_traco']({'traco_str': '1 : 2 : 3 : 0.5 a/c'})['traco_otimizado'] == '1 : 2 : 3 : 0.5 a/c'
+
+
+def test_execucao_curta_sem_erros():
+    pytest.importorskip('streamlit.testing.v1')
+    from components import ai_concreto
+    from persistencia import auth
+    original = (ai_concreto.sugerir_traco, auth._throttle)
+
+    relatorio = carga.executar(usuarios=1, duracao_s=600, escala=ESCALA, latencia_ia_ms=10, pausa_s=0,
+                               timeout_s=300, iteracoes=1)
+
+    assert relatorio['erros'] == {}, relatorio['exemplos_erro']
+    assert relatorio['fluxos']['login']['n'] == 1
+    assert sum(r['n'] for r in relatorio['fluxos'].values()) == 2
+    assert relatorio['rerun']['n'] > 0 and relatorio['reruns_s'] > 0
+    # O ambiente de carga é desfeito ao final.
+    assert (ai_concreto.sugerir_traco, auth._throttle) == original
@@ -44,3 +44,8 @@ class TestConfig:
     def test_database_url_defined(self):
         """DATABASE_URL deve estar definida."""
         assert hasattr(config, 'DATABASE_URL')
+
+    def test_openai_base_url_vazia_usa_api_padrao(self):
+        """OPENAI_BASE_URL vazia no .ini vira None (ChatOpenAI usa a API da OpenAI)."""
+        assert config.OPENAI_BASE_URL is None or config.OPENAI_BASE_URL.startswith('http')
+        assert config.OPENAI_MAX_RETRIES >= 0
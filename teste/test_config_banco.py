@@ -0,0 +1,92 @@
+"""
+test_config_banco.py — Testes da configuração do banco (banco.ini + ambiente).
+"""
+import sys
+import os
+import dataclasses
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from persistencia.config_banco import ConfigBanco, carregar_config_banco, config_banco, main
+
+
+def _ini(tmp_path, conteudo):
+    caminho = tmp_path / 'banco.ini'
+    caminho.write_text(conteudo, encoding='utf-8')
+    return caminho
+
+
+class TestCarregarConfigBanco:
+
+    def test_ignora_comentarios_e_secoes(self, tmp_path):
+        caminho = _ini(tmp_path, '[database]\n#type = mysql\n; host = x\ntype = SQLite\npath = teste.db\n')
+        cfg = carregar_config_banco(caminho, ambiente={})
+        assert cfg.tipo == 'sqlite'
+        assert cfg.path == 'teste.db'
+        assert cfg.sqlite_path.name == 'teste.db'
+        assert cfg.url().startswith('sqlite:///')
+
+    def test_ambiente_sobrepoe_ini(self, tmp_path):
+        caminho = _ini(tmp_path, 'type = sqlite\npath = teste.db\n')
+        cfg = carregar_config_banco(caminho, ambiente={'BANCO_PATH': 'outro.db'})
+        assert cfg.path == 'outro.db'
+
+    def test_ambiente_dispensa_ini(self, tmp_path):
+        cfg = carregar_config_banco(tmp_path / 'nao_existe.ini', ambiente={'BANCO_TYPE': 'sqlite'})
+        assert cfg.tipo == 'sqlite'
+
+    def test_ini_ausente(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            carregar_config_banco(tmp_path / 'nao_existe.ini', ambiente={})
+
+    def test_sem_configuracao_ativa(self, tmp_path):
+        caminho = _ini(tmp_path, '#type = sqlite\n')
+        with pytest.raises(ValueError, match='Nenhuma configuração'):
+            carregar_config_banco(caminho, ambiente={})
+
+    def test_tipo_nao_suportado(self, tmp_path):
+        caminho = _ini(tmp_path, 'type = access\n')
+        with pytest.raises(ValueError, match='não suportado'):
+            carregar_config_banco(caminho, ambiente={})
+
+    def test_parametros_faltando_para_servidor(self, tmp_path):
+        caminho = _ini(tmp_path, 'type = postgresql\nhost = localhost\n')
+        with pytest.raises(ValueError, match='dbname, user, password'):
+            carregar_config_banco(caminho, ambiente={})
+
+    def test_url_servidor_com_credenciais_em_texto(self, tmp_path):
+        caminho = _ini(tmp_path, 'type = postgresql\nhost = db\nport = 5432\ndbname = ge\nuser = u\npassword = p\n')
+        cfg = carregar_config_banco(caminho, ambiente={})
+        assert cfg.url() == 'postgresql+psycopg2://u:p@db:5432/ge'
+
+
+class TestConfigBanco:
+
+    def test_imutavel_com_slots(self):
+        cfg = ConfigBanco(tipo='sqlite')
+        assert not hasattr(cfg, '__dict__')
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            cfg.tipo = 'mysql'
+
+    def test_repr_oculta_credenciais(self):
+        assert 'segredo' not in repr(ConfigBanco(tipo='mysql', user='segredo', password='segredo'))
+
+    def test_config_do_processo_em_cache(self):
+        assert config_banco() is config_banco()
+
+    def test_check_conecta_e_confere_pragmas(self, tmp_path, monkeypatch, capsys):
+        arquivo = tmp_path / 'check.db'
+        monkeypatch.setenv('BANCO_TYPE', 'sqlite')
+        monkeypatch.setenv('BANCO_PATH', str(arquivo))
+        monkeypatch.setattr(config, 'DATABASE_ENABLED', True)
+        config_banco.cache_clear()
+        try:
+            assert main(['--check']) == 0
+        finally:
+            config_banco.cache_clear()
+        saida = capsys.readouterr().out
+        assert '[OK] conexão' in saida
+        assert str(arquivo) in saida
+        assert '[OK] PRAGMA foreign_keys' in saida
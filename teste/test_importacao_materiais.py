@@ -0,0 +1,103 @@
+"""
+test_importacao_materiais.py — Testes da importação de listas de preço de fornecedores.
+"""
+import sys
+import os
+import io
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+from components import importacao_materiais as im
+from persistencia.unit_of_work import UnitOfWork
+
+MATERIAIS = pd.DataFrame({
+    'id': [1, 2, 3],
+    'nome': ['CP-II-E-32', 'Areia Média', 'Brita 1'],
+    'tipo': ['Cimento', 'Areia', 'Brita'],
+    'custo_kg': [0.62, 0.08, 0.09],
+    'estoque_atual': [8000.0, 20000.0, 15000.0],
+})
+
+
+def test_numero_aceita_virgula_decimal_e_marca_invalidos():
+    valores = pd.Series(['R$ 1.234,56', '0.68', '', None, 'abc'])
+    numeros = im._numero(valores)
+    assert numeros[0] == pytest.approx(1234.56)
+    assert numeros[1] == pytest.approx(0.68)
+    assert numeros[2:4].isna().all()
+    assert numeros[4] == -np.inf
+
+
+def test_ler_planilha_em_blocos_com_sinonimos():
+    csv = io.StringIO('Material;Preço;Estoque\nCP-II-E-32;0,65;\nAreia Média;0,08;21000\nBrita 1;0,10;\n')
+    df = im.ler_planilha(csv, 'fornecedor.csv', linhas_por_bloco=2)
+    assert list(df.index) == [2, 3, 4]
+    assert list(df['custo_kg']) == pytest.approx([0.65, 0.08, 0.10])
+    assert df.loc[3, 'estoque_atual'] == 21000.0
+
+    with pytest.raises(ValueError, match='nome'):
+        im.ler_planilha(io.StringIO('codigo,preco\n1,2\n'), 'x.csv')
+
+
+def test_comparar_classifica_cada_linha():
+    planilha = pd.DataFrame({
+        'nome': ['cp-ii-e-32 ', 'Areia Média', 'Brita 1', 'Brita 1', 'Fibra PP', 'Desconhecido', 'Areia Média', ''],
+        'tipo': ['', '', 'Areia', 'brita', 'Fibra', '', 'Xisto', ''],
+        'custo_kg': [0.65, 0.08, 0.09, 0.11, 12.0, 1.0, np.nan, 1.0],
+        'estoque_atual': [np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, -np.inf, np.nan],
+    }, index=pd.RangeIndex(2, 10, name='linha'))
+
+    diff = im.comparar(planilha, MATERIAIS)
+
+    assert list(diff['acao']) == [
+        im.ATUALIZAR, im.REPETIDO, im.REPETIDO, im.ATUALIZAR, im.NOVO, im.NAO_ENCONTRADO, im.VALOR_INVALIDO, im.VALOR_INVALIDO,
+    ]
+    assert diff.loc[2, 'nome_atual'] == 'CP-II-E-32'
+    assert diff.loc[2, 'estoque_novo'] == 8000.0  # coluna vazia mantém o valor atual
+    assert diff.loc[5, 'variacao_pct'] == pytest.approx((0.11 / 0.09 - 1) * 100)
+    assert diff.loc[6, 'tipo_novo'] == 'Fibra'
+
+
+def test_aplicar_faz_upsert_e_registra_historico(engine):
+    with engine.connect() as conn:
+        conn.execute(text("INSERT OR IGNORE INTO fab_materiais (tipo, nome, custo_kg, estoque_atual) VALUES ('Areia', 'Areia Lote', 0.08, 100.0)"))
+        conn.commit()
+
+    planilha = pd.DataFrame({'nome': ['areia lote', 'Pigmento Lote'], 'tipo': ['', 'Pigmento'],
+                             'custo_kg': [0.09, 5.0], 'estoque_atual': [np.nan, 50.0]},
+                            index=pd.RangeIndex(2, 4, name='linha'))
+    diff = im.get_diff(planilha)
+    assert im.aplicar(diff, origem='teste') == 2
+    # A mesma planilha de novo não muda nada.
+    assert set(im.get_diff(planilha)['acao']) == {im.SEM_MUDANCA}
+
+    with UnitOfWork() as uow:
+        mats = uow.fabrica.get_all_materiais().set_index('nome')
+        historico = uow.connection.execute(text(
+            "SELECT m.nome, h.custo_kg, h.origem FROM fab_materiais_precos h JOIN fab_materiais m ON m.id = h.material_id "
+            "WHERE m.nome IN ('Areia Lote', 'Pigmento Lote') ORDER BY h.id")).fetchall()
+    assert mats.loc['Areia Lote', 'custo_kg'] == pytest.approx(0.09)
+    assert mats.loc['Areia Lote', 'estoque_atual'] == 100.0
+    assert mats.loc['Pigmento Lote', 'tipo'] == 'Pigmento'
+    assert [tuple(r) for r in historico] == [('Areia Lote', 0.09, 'teste'), ('Pigmento Lote', 5.0, 'teste')]
+
+
+def test_migracao_historico_precos_registra_custo_inicial():
+    from persistencia.migracoes import aplicar_migracoes
+
+    engine = create_engine('sqlite:///:memory:', poolclass=StaticPool)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE fab_materiais (id INTEGER PRIMARY KEY, tipo TEXT, nome TEXT UNIQUE, custo_kg REAL, estoque_atual REAL)"))
+        conn.execute(text("INSERT INTO fab_materiais VALUES (1, 'Cimento', 'A', 0.6, 10), (2, 'Areia', 'B', 0.1, 20)"))
+
+    aplicar_migracoes(engine)
+    aplicar_migracoes(engine)  # idempotente
+
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT material_id, custo_kg, origem FROM fab_materiais_precos ORDER BY material_id")).fetchall()
+    assert [tuple(r) for r in rows] == [(1, 0.6, 'inicial'), (2, 0.1, 'inicial')]
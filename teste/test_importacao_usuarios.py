@@ -0,0 +1,78 @@
+"""
+test_importacao_usuarios.py — Testes da importação/exportação de usuários em lote.
+"""
+import sys
+import os
+import io
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+import config
+from components import importacao_usuarios
+from persistencia import auth
+from persistencia.unit_of_work import UnitOfWork
+
+
+def _planilha(linhas):
+    return pd.DataFrame(linhas, columns=list(importacao_usuarios.COLUNAS))
+
+
+def test_validar_aponta_a_linha_e_o_primeiro_motivo():
+    df = _planilha([
+        ['ana', 'Ana Lima', 'Operador', 's1'],
+        ['', 'Sem Login', 'Operador', 's2'],
+        ['bob silva', 'Bob', 'operador', 's3'],
+        ['caio', 'Caio', 'Inexistente', 's4'],
+        ['ana', 'Ana Repetida', 'Operador', 's5'],
+        ['existente', 'Já Cadastrado', 'Operador', 's6'],
+        ['duda', 'Duda', 'OPERADOR', None],
+    ])
+    validas, erros = importacao_usuarios.validar(df, {'Operador': 3}, {'existente'}, senha_padrao='padrao')
+
+    assert list(validas['login_usuario']) == ['ana', 'duda']
+    assert list(validas['perfil_id']) == [3, 3]
+    assert validas.loc[1, 'senha'] == 'padrao'
+    assert dict(zip(erros['linha'], erros['motivo'])) == {
+        3: 'Login vazio.',
+        4: 'Login com espaços.',
+        5: 'Perfil inexistente.',
+        6: 'Login repetido na planilha.',
+        7: 'Login já existe.',
+    }
+
+
+def test_ler_planilha_csv_exige_colunas():
+    csv = io.StringIO('Login_Usuario;Nome_Completo;Perfil\nana;Ana;Operador\n')
+    df = importacao_usuarios.ler_planilha(csv, 'usuarios.csv')
+    assert list(df.columns) == list(importacao_usuarios.COLUNAS)
+    assert df['senha'].isna().all()
+
+    with pytest.raises(ValueError, match='perfil'):
+        importacao_usuarios.ler_planilha(io.StringIO('login_usuario,nome_completo\nana,Ana\n'), 'usuarios.csv')
+
+
+def test_importar_grava_em_lote_e_exporta(engine, monkeypatch):
+    monkeypatch.setattr(config, 'BCRYPT_ROUNDS', 4)
+    with engine.connect() as conn:
+        conn.execute(text("INSERT OR IGNORE INTO perfil_acesso (nome_perfil) VALUES ('Operador Lote')"))
+        conn.commit()
+
+    df = _planilha([[f'lote{i}', f'Operador {i}', 'Operador Lote', f'senha{i}'] for i in range(20)]
+                   + [['lote0', 'Repetido', 'Operador Lote', 'x']])
+    res = importacao_usuarios.importar(df, workers=4)
+
+    assert res['importados'] == 20
+    assert list(res['erros']['motivo']) == ['Login repetido na planilha.']
+    with UnitOfWork() as uow:
+        hash_7 = uow.connection.execute(text("SELECT senha_criptografada FROM usuarios WHERE login_usuario = 'lote7'")).scalar()
+    assert auth.check_password_hash('senha7', hash_7)
+
+    # Reimportar o mesmo arquivo não duplica ninguém.
+    assert importacao_usuarios.importar(df)['importados'] == 0
+
+    exportado = importacao_usuarios.exportar()
+    assert list(exportado.columns) == list(importacao_usuarios.COLUNAS_EXPORTACAO)
+    assert {'lote0', 'lote19'} <= set(exportado['login_usuario'])
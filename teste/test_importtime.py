@@ -0,0 +1,111 @@
+"""
+test_importtime.py — Orçamento de tempo de importação das páginas.
+Usa `python -X importtime` num processo limpo para medir o custo de importar
+os módulos do projeto usados por cada página e falha se passar do limite
+ou se alguma dependência pesada (LangChain, pydantic, plotly, scipy) for
+carregada antes de ser usada.
+"""
+import ast
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("langchain_core")
+
+RAIZ = Path(__file__).resolve().parent.parent
+PACOTES_DO_PROJETO = ("components", "persistencia", "utils", "tools", "config")
+
+# Já carregados pelo Streamlit/páginas de qualquer forma: ficam fora da conta.
+BASE = ("streamlit", "pandas", "numpy", "sqlalchemy", "bcrypt", "cryptography.fernet")
+
+# Só podem ser importados quando o usuário aciona a funcionalidade.
+PROIBIDOS = ("langchain_core", "langchain_openai", "pydantic", "plotly", "scipy")
+
+ORCAMENTO_MS = 400
+MARCO = "--marco-importtime--"
+
+
+def _modulos_do_projeto(arquivo: Path) -> list[str]:
+    """Módulos do projeto importados no topo do arquivo da página."""
+    arvore = ast.parse(arquivo.read_text(encoding="utf-8"))
+    modulos = []
+    for no in arvore.body:
+        if isinstance(no, ast.Import):
+            nomes = [a.name for a in no.names]
+        elif isinstance(no, ast.ImportFrom) and no.module and not no.level:
+            nomes = [no.module]
+        else:
+            continue
+        for nome in nomes:
+            if nome.split(".")[0] in PACOTES_DO_PROJETO and nome not in modulos:
+                modulos.append(nome)
+    return modulos
+
+
+def _medir(modulos: list[str]) -> tuple[float, set[str]]:
+    """Importa `modulos` a frio; devolve (ms após a base, proibidos carregados por eles)."""
+    codigo = "\n".join([
+        "import sys",
+        *(f"import {m}" for m in BASE),
+        # A base pode carregar proibidos por conta própria (o Streamlit importa
+        # o plotly); só conta o que os módulos do projeto trazem depois dela.
+        "ja_carregados = set(sys.modules)",
+        f"sys.stderr.write({MARCO!r} + '\\n')",
+        *(f"import {m}" for m in modulos),
+        f"print(','.join(m for m in {PROIBIDOS!r} if m in sys.modules and m not in ja_carregados))",
+    ])
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=RAIZ, capture_output=True, text=True, timeout=120,
+        env={**os.environ, "PYTHONPATH": str(RAIZ)},
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+
+    total_us = 0
+    depois_do_marco = False
+    for linha in proc.stderr.splitlines():
+        if linha == MARCO:
+            depois_do_marco = True
+            continue
+        if not depois_do_marco or not linha.startswith("import time:"):
+            continue
+        _, cumulativo, nome = linha.split("|")
+        # Só as entradas de nível superior; as aninhadas já estão no cumulativo.
+        if cumulativo.strip().isdigit() and not nome[1:].startswith(" "):
+            total_us += int(cumulativo)
+    carregados = {m for m in proc.stdout.strip().split(",") if m}
+    return total_us / 1000, carregados
+
+
+PAGINAS = sorted((RAIZ / "app_pages").glob("*.py")) + [RAIZ / "Home.py"]
+
+
+@pytest.mark.parametrize("pagina", PAGINAS, ids=lambda p: p.stem)
+def test_importacao_a_frio_dentro_do_orcamento(pagina):
+    modulos = _modulos_do_projeto(pagina)
+    if not modulos:
+        pytest.skip("página não importa módulos do projeto")
+    ms, carregados = _medir(modulos)
+    assert not carregados, f"{pagina.name} carrega {sorted(carregados)} na importação"
+    assert ms < ORCAMENTO_MS, f"{pagina.name}: {ms:.0f} ms > {ORCAMENTO_MS} ms"
+
+
+def test_ai_concreto_adia_langchain():
+    """Importar o serviço de IA não pode carregar LangChain nem pydantic."""
+    _, carregados = _medir(["components.ai_concreto"])
+    assert not carregados
+
+
+def test_ai_concreto_carrega_nomes_sob_demanda():
+    """Os nomes adiados continuam acessíveis como atributos do módulo."""
+    import components.ai_concreto as ai
+    from components.ai_modelos import TracoOutput
+
+    assert ai.TracoOutput is TracoOutput
+    assert callable(ai.ChatOpenAI)
+    with pytest.raises(AttributeError):
+        ai.nao_existe
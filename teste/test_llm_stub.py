@@ -0,0 +1,103 @@
+"""
+test_llm_stub.py — Testes do servidor local compatível com a API de chat da OpenAI.
+"""
+import sys
+import os
+import json
+import random
+import urllib.error
+import urllib.request
+import pytest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.llm_stub import Latencia, ServidorLLMStub, exemplo_do_schema, montar_mensagem
+
+FERRAMENTA = {'type': 'function', 'function': {
+    'name': 'consultar_limites_normativos',
+    'parameters': {'type': 'object', 'properties': {'fck': {'type': 'number'}}},
+}}
+
+
+@pytest.fixture
+def servidor():
+    with ServidorLLMStub() as s:
+        yield s
+
+
+def _post(servidor, corpo):
+    pedido = urllib.request.Request(f'{servidor.base_url}/chat/completions', json.dumps(corpo).encode(),
+                                    {'Content-Type': 'application/json'})
+    with urllib.request.urlopen(pedido) as resposta:
+        return json.loads(resposta.read())
+
+
+def test_ferramenta_e_chamada_uma_vez_com_fck_da_mensagem():
+    usuario = {'role': 'user', 'content': 'Calcule o traço para FCK=35.0 MPa.'}
+    msg = montar_mensagem({'messages': [usuario], 'tools': [FERRAMENTA]})
+    chamada = msg['tool_calls'][0]['function']
+    assert chamada['name'] == 'consultar_limites_normativos'
+    assert json.loads(chamada['arguments']) == {'fck': 35.0}
+
+    depois = montar_mensagem({'messages': [usuario, {'role': 'tool', 'content': '{}'}], 'tools': [FERRAMENTA]})
+    assert 'tool_calls' not in depois and depois['content']
+
+
+def test_saida_estruturada_por_json_schema_e_por_function_calling(servidor):
+    usuario = [{'role': 'user', 'content': 'FCK=30'}]
+    por_schema = _post(servidor, {'messages': usuario, 'response_format': {
+        'type': 'json_schema', 'json_schema': {'name': 'TracoOutput', 'schema': {}}}})
+    traco = json.loads(por_schema['choices'][0]['message']['content'])
+    assert traco['fck_alvo'] == 30.0 and 'Água' in traco['materiais_m3']
+
+    forcada = {'type': 'function', 'function': {'name': 'OtimizacaoOutput', 'parameters': {}}}
+    por_ferramenta = _post(servidor, {'messages': usuario, 'tools': [forcada],
+                                      'tool_choice': {'type': 'function', 'function': {'name': 'OtimizacaoOutput'}}})
+    escolha = por_ferramenta['choices'][0]
+    assert escolha['finish_reason'] == 'tool_calls'
+    assert 'economia_liquida_m3' in json.loads(escolha['message']['tool_calls'][0]['function']['arguments'])
+    assert por_ferramenta['usage']['total_tokens'] > 0
+
+
+def test_schema_desconhecido_e_preenchido_pelo_json_schema():
+    schema = {'type': 'object', 'properties': {'a': {'$ref': '#/$defs/A'}, 'fck': {'type': 'number'}},
+              '$defs': {'A': {'type': 'object', 'properties': {'n': {'type': 'integer'}, 'tags': {'type': 'array', 'items': {'type': 'string'}}}}}}
+    assert exemplo_do_schema(schema, {'fck': 20.0}) == {'a': {'n': 1, 'tags': ['stub']}, 'fck': 20.0}
+
+
+def test_tokens_configurados_e_estatisticas():
+    with ServidorLLMStub(tokens_prompt=1000, tokens_resposta=250) as s:
+        r = _post(s, {'messages': [{'role': 'user', 'content': 'oi'}]})
+        assert r['usage'] == {'prompt_tokens': 1000, 'completion_tokens': 250, 'total_tokens': 1250}
+        assert s.estatisticas()['tokens_resposta'] == 250
+
+
+def test_taxa_de_erro():
+    with ServidorLLMStub(taxa_erro=1.0, status_erro=(429,)) as s:
+        with pytest.raises(urllib.error.HTTPError) as erro:
+            _post(s, {'messages': []})
+        assert erro.value.code == 429
+        assert s.estatisticas()['erros_429'] == 1
+
+
+@pytest.mark.parametrize('distribuicao', ['fixa', 'uniforme', 'normal', 'lognormal'])
+def test_latencia_reprodutivel_e_nao_negativa(distribuicao):
+    latencia = Latencia(distribuicao, media_ms=100, desvio_ms=80)
+    a = [latencia.sortear(random.Random(1)) for _ in range(3)]
+    b = [latencia.sortear(random.Random(1)) for _ in range(3)]
+    assert a == b and all(v >= 0 for v in a)
+    with pytest.raises(ValueError):
+        Latencia('exponencial')
+
+
+def test_sugerir_traco_ponta_a_ponta(servidor):
+    pytest.importorskip('langchain_openai')
+    import config
+    from components.ai_concreto import sugerir_traco
+    with patch.multiple(config, OPENAI_BASE_URL=servidor.base_url, OPENAI_API_KEY='stub'):
+        res = sugerir_traco(25.0)
+    assert res['traco_sugerido'] != 'Erro na IA', res['justificativa']
+    assert res['fck_alvo'] == 25.0
+    # Uma chamada com a ferramenta e uma com a saída estruturada.
+    assert servidor.estatisticas()['respostas'] == 2
@@ -0,0 +1,112 @@
+"""
+test_logger.py — Testes do pipeline de logs (fila, rotação e redirecionamento).
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import logging
+import logging.handlers
+import threading
+import pytest
+from persistencia import logger
+
+
+@pytest.fixture
+def raiz_restaurada():
+    raiz = logging.getLogger()
+    handlers, nivel = list(raiz.handlers), raiz.level
+    yield raiz
+    logger.parar_loggers()
+    raiz.handlers[:] = handlers
+    raiz.setLevel(nivel)
+
+
+def test_modo_assincrono_grava_pela_fila(tmp_path, raiz_restaurada):
+    logger.setup_loggers(log_level=logging.DEBUG, log_dir=tmp_path, assincrono=True)
+    assert [type(h) for h in raiz_restaurada.handlers] == [logging.handlers.QueueHandler]
+
+    logging.getLogger('teste.fila').debug('pedido %s liberado', 42)
+    logger.parar_loggers()
+
+    conteudo = (tmp_path / 'app.log').read_text(encoding='utf-8')
+    assert '[teste.fila] [DEBUG   ] - pedido 42 liberado' in conteudo
+
+
+def test_rotacao_por_tamanho(tmp_path, raiz_restaurada, monkeypatch):
+    monkeypatch.setattr(logger, 'LOG_MAX_MB', 1)
+    monkeypatch.setattr(logger, 'LOG_BACKUPS', 2)
+    logger.setup_loggers(log_level=logging.INFO, log_dir=tmp_path, assincrono=False)
+    arquivo = next(h for h in raiz_restaurada.handlers if isinstance(h, logging.handlers.RotatingFileHandler))
+    arquivo.maxBytes = 2048
+
+    for i in range(200):
+        logging.getLogger('teste.rotacao').info('linha %04d %s', i, 'x' * 40)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['app.log', 'app.log.1', 'app.log.2']
+
+
+def test_redirector_registra_so_linhas_completas():
+    registros = []
+
+    class _Coletor(logging.Handler):
+        def emit(self, record):
+            registros.append(record.getMessage())
+
+    destino = logging.getLogger('teste.stdout')
+    destino.propagate = False
+    destino.setLevel(logging.INFO)
+    destino.addHandler(_Coletor())
+    saida = logger.LogRedirector(destino, logging.INFO)
+
+    saida.write('pedido ')
+    saida.write('42')
+    saida.write('\n')
+    saida.write('a\n\nb\nresto')
+    assert registros == ['pedido 42', 'a', 'b']
+    saida.flush()
+    assert registros[-1] == 'resto'
+
+
+def test_logs_json_reconstroem_o_rerun(tmp_path, raiz_restaurada, monkeypatch, engine):
+    from persistencia.unit_of_work import UnitOfWork
+    from utils.analise_logs import ler_registros, resumo_reruns, trace
+
+    monkeypatch.setattr(logger, 'LOG_FORMATO', 'json')
+    logger.setup_loggers(log_level=logging.DEBUG, log_dir=tmp_path, assincrono=True)
+
+    rerun_id = logger.iniciar_rerun()
+    with UnitOfWork() as uow:
+        uow.fabrica.get_all_clientes()
+    logging.getLogger('components.ai_concreto').info('LLM %s: ok', 'otimizar_traco', extra={'duracao_ms': 812.5, 'etapa': 'otimizar_traco'})
+    logging.getLogger('rerun').debug('Página %s renderizada.', 'Dashboard', extra={'pagina': 'Dashboard', 'usuario': 'admin'})
+    outro_id = logger.iniciar_rerun()
+    logging.getLogger('rerun').debug('Página %s renderizada.', 'Estoque', extra={'pagina': 'Estoque'})
+    logger.parar_loggers()
+
+    with open(tmp_path / 'app.log', encoding='utf-8') as f:
+        registros = ler_registros(f)
+    passos = trace(registros, rerun_id)
+    assert passos['decorrido_ms'].is_monotonic_increasing
+    assert 'UoW: Conexão fechada.' in passos['msg'].tolist()
+
+    resumo = resumo_reruns(registros).set_index('correlacao_id')
+    assert resumo.loc[rerun_id, 'pagina'] == 'Dashboard'
+    assert resumo.loc[rerun_id, 'usuario'] == 'admin'
+    assert resumo.loc[rerun_id, 'uow'] == 1 and resumo.loc[rerun_id, 'banco_ms'] > 0
+    assert resumo.loc[rerun_id, 'chamadas_ia'] == 1 and resumo.loc[rerun_id, 'ia_ms'] == 812.5
+    assert resumo.loc[outro_id, 'pagina'] == 'Estoque' and resumo.loc[outro_id, 'uow'] == 0
+
+
+def test_setup_uma_vez_por_processo(monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(logger, '_configurado', False)
+    monkeypatch.setattr(logger, 'setup_loggers', lambda: chamadas.append(1))
+    threads = [threading.Thread(target=logger.setup_loggers_uma_vez) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    logger.setup_loggers_uma_vez()
+    assert chamadas == [1]
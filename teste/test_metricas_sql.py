@@ -0,0 +1,102 @@
+"""
+test_metricas_sql.py — Testes das métricas de SQL por impressão digital.
+"""
+import sys
+import os
+import logging
+import pytest
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from persistencia import metricas_sql
+from persistencia.repositorios.base import BaseRepository
+
+
+class RepoTeste(BaseRepository):
+
+    def listar(self):
+        return self._execute_query_to_dataframe('SELECT v FROM t WHERE v > :v', {'v': 0})
+
+    def inserir(self, v):
+        return self._execute_raw_sql('INSERT INTO t (v) VALUES (:v)', {'v': v})
+
+
+@pytest.fixture(autouse=True)
+def metricas_limpas():
+    metricas_sql.zerar()
+    yield
+    metricas_sql.zerar()
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://')
+    metricas_sql.instrumentar(engine)
+    metricas_sql.instrumentar(engine)  # idempotente
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE t (v INTEGER)'))
+    metricas_sql.zerar()
+    return engine
+
+
+def test_normalizacao_agrupa_variacoes():
+    a = "SELECT * FROM fab_pedidos WHERE id IN (?, ?, ?) AND status = 'Pendente'"
+    b = "SELECT *   FROM fab_pedidos\n WHERE id IN (?,?) AND status = 'Concluído'"
+    assert metricas_sql.normalizar(a) == 'SELECT * FROM fab_pedidos WHERE id IN (?...) AND status = ?'
+    assert metricas_sql.impressao_digital(a) == metricas_sql.impressao_digital(b)
+    assert metricas_sql.normalizar('SELECT 1 FROM fab_pedidos LIMIT 10') == 'SELECT ? FROM fab_pedidos LIMIT ?'
+
+
+def test_repositorio_registra_origem_linhas_e_pagina(engine):
+    metricas_sql.definir_pagina('Novo Pedido')
+    with engine.begin() as conn:
+        repo = RepoTeste(conn)
+        for v in (1, 2, 3):
+            repo.inserir(v)
+        assert len(repo.listar()) == 3
+
+    por_sql = {linha['sql']: linha for linha in metricas_sql.top(10)}
+    insercao = por_sql['INSERT INTO t (v) VALUES (?)']
+    assert insercao['chamadas'] == 3 and insercao['linhas'] == 3
+    assert insercao['origens'] == {'RepoTeste.inserir': 3}
+    consulta = por_sql['SELECT v FROM t WHERE v > ?']
+    assert consulta['linhas'] == 3
+    assert consulta['origens'] == {'RepoTeste.listar': 1}
+    assert consulta['paginas'] == {'Novo Pedido': 1}
+    assert metricas_sql.resumo()['chamadas'] >= 4
+
+
+def test_fora_do_repositorio_fica_sem_origem(engine):
+    with engine.connect() as conn:
+        conn.execute(text('SELECT COUNT(*) FROM t')).scalar()
+    linha = next(l for l in metricas_sql.top(10) if l['sql'].startswith('SELECT COUNT'))
+    assert linha['origens'] == {metricas_sql.SEM_ORIGEM: 1}
+
+
+def test_sql_lenta_vai_para_o_log(engine, monkeypatch, caplog):
+    monkeypatch.setattr(config, 'SQL_LENTA_MS', 0.0)
+    with caplog.at_level(logging.WARNING, logger='persistencia.metricas_sql'):
+        with engine.connect() as conn:
+            RepoTeste(conn).listar()
+    registro = next(r for r in caplog.records if r.getMessage().startswith('SQL lenta'))
+    assert registro.origem == 'RepoTeste.listar' and registro.linhas == 0
+    assert metricas_sql.top(1, 'lentas')[0]['lentas'] >= 1
+
+
+def test_erro_e_contado(engine):
+    with engine.connect() as conn:
+        with pytest.raises(Exception):
+            RepoTeste(conn)._execute_raw_sql('SELECT * FROM tabela_inexistente')
+    assert metricas_sql.resumo()['erros'] == 1
+
+
+def test_limite_de_impressoes(monkeypatch):
+    monkeypatch.setattr(config, 'SQL_MAX_IMPRESSOES', 3)
+    for i in range(5):
+        metricas_sql.registrar(f'SELECT * FROM t{i}', 1.0)
+    chaves = {linha['impressao'] for linha in metricas_sql.top(10)}
+    assert len(chaves) == 4 and metricas_sql.IMPRESSAO_EXCEDENTE in chaves
+    with pytest.raises(ValueError):
+        metricas_sql.top(5, 'inexistente')
@@ -0,0 +1,71 @@
+"""
+test_perfilador.py — Testes do perfil por rerun (intervalos, categorias e gravação).
+"""
+import sys
+import os
+import time
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from persistencia import perfilador
+
+
+def test_sem_perfil_ativo_os_ganchos_nao_registram():
+    assert not perfilador.ativo()
+    assert perfilador.entrar('sql', 'x') is None
+    with perfilador.medir('sql', 'x'):
+        pass
+
+
+def test_arvore_e_categorias_somam_o_total(tmp_path):
+    perfil = perfilador.iniciar('Pedidos', 'admin')
+    assert perfilador.ativo()
+    with perfilador.medir('uow', 'pagina.py:10'):
+        with perfilador.medir('sql', 'FabricaRepository.get_all_pedidos'):
+            time.sleep(0.01)
+        with perfilador.medir('sql', 'FabricaRepository.get_all_pedidos'):
+            pass
+    with perfilador.medir('ia', 'sugerir_traco.estruturado'):
+        time.sleep(0.005)
+    perfilador.finalizar(perfil, arquivo=tmp_path / 'perfis.jsonl')
+    assert not perfilador.ativo()
+
+    nos = {rotulo: (nivel, chamadas) for nivel, rotulo, _, _, chamadas in perfil.arvore()}
+    assert nos['uow:pagina.py:10'] == (0, 1)
+    assert nos['sql:FabricaRepository.get_all_pedidos'] == (1, 2)
+    categorias = perfil.categorias()
+    assert categorias['sql'] >= 10 and categorias['ia'] >= 5
+    assert sum(categorias.values()) == pytest.approx(perfil.total_ms)
+
+
+def test_intervalo_aberto_e_fechado_ao_finalizar(tmp_path):
+    perfil = perfilador.iniciar('Pedidos')
+    perfilador.entrar('uow', 'interrompido por st.stop')
+    perfilador.finalizar(perfil, arquivo=tmp_path / 'perfis.jsonl')
+    assert perfil.nos[('uow:interrompido por st.stop',)][1] == 1
+
+
+def test_gravacao_e_comparacao(tmp_path):
+    arquivo = tmp_path / 'perfis.jsonl'
+    for pagina in ('A', 'A', 'B'):
+        perfil = perfilador.iniciar(pagina)
+        with perfilador.medir('sql', 'q'):
+            pass
+        perfilador.finalizar(perfil, arquivo=arquivo)
+    with arquivo.open('a', encoding='utf-8') as f:
+        f.write('linha corrompida\n')
+
+    perfis = perfilador.carregar_perfis(arquivo)
+    assert [p['pagina'] for p in perfis] == ['A', 'A', 'B']
+    comparacao = perfilador.comparar(perfis)
+    assert comparacao['A']['reruns'] == 2
+    assert set(comparacao['B']['categorias_ms']) == {'sql', 'pagina'}
+    assert perfilador.main([str(arquivo), '--pagina', 'B']) == 0
+
+
+def test_detalhado_com_cprofile(tmp_path):
+    perfil = perfilador.iniciar('Pedidos', detalhado='cprofile')
+    sorted(range(1000), key=lambda v: -v)
+    perfilador.finalizar(perfil, arquivo=tmp_path / 'perfis.jsonl')
+    assert 'function calls' in perfil.detalhe
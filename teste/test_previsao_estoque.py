@@ -0,0 +1,105 @@
+"""
+test_previsao_estoque.py — Testes da projeção de ruptura de estoque.
+"""
+import sys
+import os
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+from sqlalchemy import text
+from persistencia.unit_of_work import UnitOfWork
+from components import previsao_estoque
+from components.previsao_estoque import projetar_estoque, consumo_semanal_medio, get_projecao_estoque
+
+HOJE = date(2026, 3, 2)  # segunda-feira
+
+
+def _abertos(linhas):
+    colunas = ["data_entrega", "kg_cimento", "kg_areia", "kg_brita", "kg_agua", "kg_aditivo"]
+    return pd.DataFrame(linhas, columns=colunas)
+
+
+def test_ruptura_por_pedido_comprometido():
+    estoque = pd.DataFrame({"tipo": ["Cimento", "Areia"], "estoque_atual": [1000.0, 5000.0]})
+    abertos = _abertos([["2026-03-05", 1200.0, 100.0, 0, 0, 0]])
+    df = projetar_estoque(estoque, abertos, pd.Series(dtype=float), 30, HOJE).set_index("tipo")
+
+    assert df.loc["Cimento", "dias_ate_ruptura"] == 3
+    assert df.loc["Cimento", "data_ruptura"] == pd.Timestamp("2026-03-05")
+    assert pd.isna(df.loc["Areia", "dias_ate_ruptura"])
+
+
+def test_pedidos_fora_do_horizonte_sao_ignorados():
+    estoque = pd.DataFrame({"tipo": ["Cimento"], "estoque_atual": [1000.0]})
+    abertos = _abertos([["2026-12-01", 5000.0, 0, 0, 0, 0]])
+    df = projetar_estoque(estoque, abertos, pd.Series(dtype=float), 30, HOJE).set_index("tipo")
+
+    assert df.loc["Cimento", "demanda_comprometida"] == 0.0
+    assert pd.isna(df.loc["Cimento", "dias_ate_ruptura"])
+
+
+def test_consumo_historico_linear():
+    estoque = pd.DataFrame({"tipo": ["Cimento"], "estoque_atual": [700.0]})
+    df = projetar_estoque(estoque, _abertos([]), pd.Series({"Cimento": 700.0}), 30, HOJE).set_index("tipo")
+
+    assert df.loc["Cimento", "dias_ate_ruptura"] == 8
+
+
+def test_consumo_semanal_medio_conta_semanas_vazias():
+    semanal = pd.DataFrame({"Cimento": [800.0]}, index=pd.DatetimeIndex(["2026-02-23"]))
+    media = consumo_semanal_medio(semanal, HOJE, semanas=4)
+    assert media["Cimento"] == 200.0
+    assert media["Areia"] == 0.0
+
+
+def test_get_projecao_estoque_incremental():
+    previsao_estoque._historico.limpar()
+    antes = get_projecao_estoque(30, hoje=HOJE).set_index("tipo")
+    assert set(antes.index) == {"Cimento", "Areia", "Brita", "Água", "Aditivo"}
+    ultimo_id = previsao_estoque._historico.ultimo_id
+
+    with UnitOfWork() as uow:
+        uow.fabrica.save_pedido({'cliente_id': 1, 'elemento_id': 1, 'quantidade': 100,
+                                 'data_pedido': '2026-02-24', 'data_entrega': '2026-03-10',
+                                 'status': 'Pendente', 'traco_usado_id': 1})
+        pedido_id = uow.connection.execute(text("SELECT MAX(id) FROM fab_pedidos")).scalar()
+
+    # Pedido aberto: entra na demanda comprometida, não no histórico de consumo.
+    aberto = get_projecao_estoque(30, hoje=HOJE).set_index("tipo")
+    assert previsao_estoque._historico.ultimo_id == ultimo_id
+    assert aberto.loc["Cimento", "demanda_comprometida"] > antes.loc["Cimento", "demanda_comprometida"]
+    assert aberto.loc["Cimento", "consumo_semanal"] == antes.loc["Cimento", "consumo_semanal"]
+
+    # Concluir o pedido mais novo só soma ao acumulado, sem reconstruir.
+    versao = previsao_estoque._historico.versao
+    with UnitOfWork() as uow:
+        uow.fabrica.update_pedido_status(pedido_id, 'Concluído')
+    concluido = get_projecao_estoque(30, hoje=HOJE).set_index("tipo")
+    assert previsao_estoque._historico.versao == versao
+    assert previsao_estoque._historico.ultimo_id == pedido_id
+    assert concluido.loc["Cimento", "consumo_semanal"] > antes.loc["Cimento", "consumo_semanal"]
+    assert concluido.loc["Cimento", "demanda_comprometida"] == antes.loc["Cimento", "demanda_comprometida"]
+
+    # Reabrir um pedido concluído invalida o acumulado.
+    with UnitOfWork() as uow:
+        uow.fabrica.update_pedido_status(pedido_id, 'Em Produção')
+    reaberto = get_projecao_estoque(30, hoje=HOJE).set_index("tipo")
+    assert previsao_estoque._historico.versao != versao
+    assert reaberto.loc["Cimento", "consumo_semanal"] == antes.loc["Cimento", "consumo_semanal"]
+    with UnitOfWork() as uow:
+        uow.fabrica.update_pedido_status(pedido_id, 'Concluído')
+    de_novo = get_projecao_estoque(30, hoje=HOJE).set_index("tipo")
+    assert (de_novo["consumo_semanal"] - concluido["consumo_semanal"]).abs().max() < 1e-6
+
+    # Editar o traço também muda o consumo já registrado.
+    with UnitOfWork() as uow:
+        consumo = uow.fabrica.get_traco_by_id(1).iloc[0]["consumo_cimento_m3"]
+        uow.fabrica.save_traco({'consumo_cimento_m3': consumo * 2}, 1)
+    try:
+        editado = get_projecao_estoque(30, hoje=HOJE).set_index("tipo")
+        assert editado.loc["Cimento", "consumo_semanal"] > concluido.loc["Cimento", "consumo_semanal"]
+    finally:
+        with UnitOfWork() as uow:
+            uow.fabrica.save_traco({'consumo_cimento_m3': consumo}, 1)
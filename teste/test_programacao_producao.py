@@ -0,0 +1,116 @@
+"""
+test_programacao_producao.py — Testes do sequenciamento de pedidos.
+"""
+import sys
+import os
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+from persistencia.unit_of_work import UnitOfWork
+from components.programacao_producao import (
+    SITUACAO_ATRASADO, SITUACAO_PROGRAMADO, SITUACAO_SEM_MATERIAL,
+    carga_diaria, programar_producao, get_plano_producao,
+)
+
+INICIO = date(2026, 3, 2)  # segunda-feira
+ESTOQUE_FARTO = pd.DataFrame({"tipo": ["Cimento"], "estoque_atual": [1e9]})
+
+
+def _pedidos(linhas):
+    colunas = ["id", "status", "data_entrega", "volume_total_m3", "kg_cimento", "kg_areia", "kg_brita", "kg_agua", "kg_aditivo"]
+    return pd.DataFrame(linhas, columns=colunas)
+
+
+def test_ordem_em_producao_e_data_de_entrega():
+    pedidos = _pedidos([
+        [1, "Pendente", "2026-03-20", 1.0, 0, 0, 0, 0, 0],
+        [2, "Pendente", "2026-03-05", 1.0, 0, 0, 0, 0, 0],
+        [3, "Em Produção", "2026-03-30", 1.0, 0, 0, 0, 0, 0],
+    ])
+    plano = programar_producao(pedidos, ESTOQUE_FARTO, 10.0, INICIO)
+    assert plano["id"].tolist() == [3, 2, 1]
+    assert plano["sequencia"].tolist() == [1, 2, 3]
+    assert (plano["situacao"] == SITUACAO_PROGRAMADO).all()
+
+
+def test_pedido_dividido_em_dias_uteis_e_atraso():
+    pedidos = _pedidos([
+        [1, "Pendente", "2026-03-10", 25.0, 0, 0, 0, 0, 0],
+        [2, "Pendente", "2026-03-04", 10.0, 0, 0, 0, 0, 0],
+    ])
+    plano = programar_producao(pedidos, ESTOQUE_FARTO, 10.0, INICIO).set_index("id")
+
+    # Pedido 2 ocupa segunda; pedido 1 (25 m³) vai de terça a quinta.
+    assert plano.loc[2, "data_fim"] == pd.Timestamp("2026-03-02")
+    assert plano.loc[1, "data_inicio"] == pd.Timestamp("2026-03-03")
+    assert plano.loc[1, "data_fim"] == pd.Timestamp("2026-03-05")
+
+    # A 4 m³/dia o pedido 1 só termina no 9º dia útil (quinta 12/03).
+    atrasado = programar_producao(pedidos, ESTOQUE_FARTO, 4.0, INICIO).set_index("id")
+    assert atrasado.loc[2, "situacao"] == SITUACAO_PROGRAMADO
+    assert atrasado.loc[1, "data_fim"] == pd.Timestamp("2026-03-12")
+    assert atrasado.loc[1, "atraso_dias"] == 2
+    assert atrasado.loc[1, "situacao"] == SITUACAO_ATRASADO
+
+
+def test_pedido_sem_material_nao_ocupa_capacidade():
+    estoque = pd.DataFrame({"tipo": ["Cimento"], "estoque_atual": [1000.0]})
+    pedidos = _pedidos([
+        [1, "Pendente", "2026-03-03", 10.0, 800.0, 0, 0, 0, 0],
+        [2, "Pendente", "2026-03-04", 10.0, 800.0, 0, 0, 0, 0],
+        [3, "Pendente", "2026-03-05", 10.0, 150.0, 0, 0, 0, 0],
+    ])
+    plano = programar_producao(pedidos, estoque, 10.0, INICIO).set_index("id")
+
+    assert plano.loc[2, "situacao"] == SITUACAO_SEM_MATERIAL
+    assert pd.isna(plano.loc[2, "data_inicio"])
+    assert plano.loc[3, "data_inicio"] == pd.Timestamp("2026-03-03")
+
+    carga = carga_diaria(plano, 10.0, INICIO)
+    assert carga["volume_m3"].tolist() == [10.0, 10.0]
+
+
+def test_5000_pedidos_em_menos_de_um_segundo():
+    rng = np.random.default_rng(42)
+    n = 5000
+    pedidos = pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "status": "Pendente",
+        "data_entrega": pd.Timestamp("2026-03-02") + pd.to_timedelta(rng.integers(0, 365, n), unit="D"),
+        "volume_total_m3": rng.uniform(0.1, 5.0, n),
+        "kg_cimento": rng.uniform(10, 500, n),
+        "kg_areia": rng.uniform(10, 1500, n),
+        "kg_brita": rng.uniform(10, 1500, n),
+        "kg_agua": rng.uniform(10, 200, n),
+        "kg_aditivo": rng.uniform(0, 3, n),
+    })
+    estoque = pd.DataFrame({"tipo": ["Cimento", "Areia", "Brita", "Água", "Aditivo"],
+                            "estoque_atual": [300_000.0, 1e9, 1e9, 1e9, 1e9]})
+
+    inicio = time.perf_counter()
+    plano = programar_producao(pedidos, estoque, 30.0, INICIO)
+    assert time.perf_counter() - inicio < 1.0
+    assert len(plano) == n
+    assert (plano["situacao"] == SITUACAO_SEM_MATERIAL).any()
+
+
+def test_get_plano_producao_e_inicio_em_lote():
+    with UnitOfWork() as uow:
+        uow.fabrica.save_pedido({'cliente_id': 1, 'elemento_id': 1, 'quantidade': 2,
+                                 'data_pedido': '2026-02-24', 'data_entrega': '2026-03-10',
+                                 'status': 'Pendente', 'traco_usado_id': 1})
+
+    plano = get_plano_producao(30.0, INICIO)
+    assert not plano.empty
+    assert plano["cliente"].notna().all()
+
+    ids = plano.loc[plano["status"] == "Pendente", "id"].tolist()
+    with UnitOfWork() as uow:
+        assert uow.fabrica.update_pedidos_status(ids, "Em Produção") == len(ids)
+    with UnitOfWork() as uow:
+        df = uow.fabrica.get_demanda_pedidos(("Pendente",))
+    assert df.empty
@@ -0,0 +1,78 @@
+"""
+test_relatorio_custos.py — Testes do relatório de custo de materiais por pedido.
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+from components import relatorio_custos
+from persistencia.unit_of_work import UnitOfWork
+
+STATUS = ('Pendente', 'Em Produção', 'Concluído')
+
+
+class _Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+def test_cache_vale_ate_o_marcador_mudar_ou_expirar():
+    relogio = _Relogio()
+    cache = relatorio_custos._CacheRelatorios(max_entradas=2, ttl_s=10, relogio=relogio)
+    chamadas = []
+
+    def calcular():
+        chamadas.append(1)
+        return pd.DataFrame({'x': [len(chamadas)]})
+
+    assert cache.obter(('a',), 1, calcular)['x'][0] == 1
+    assert cache.obter(('a',), 1, calcular)['x'][0] == 1
+    assert cache.obter(('a',), 2, calcular)['x'][0] == 2  # marcador mudou
+    relogio.agora = 11
+    assert cache.obter(('a',), 2, calcular)['x'][0] == 3  # expirou
+    cache.obter(('b',), 2, calcular)
+    cache.obter(('c',), 2, calcular)
+    assert ('a',) not in cache._entradas  # LRU limitado a 2
+    assert (cache.acertos, cache.calculos) == (1, 5)
+
+
+def test_agregado_no_banco_confere_com_os_pedidos(engine):
+    relatorio_custos._cache.limpar()
+    with engine.connect() as conn:
+        conn.execute(text("INSERT INTO fab_materiais_precos (material_id, custo_kg, vigente_desde, origem) "
+                          "SELECT 1, 0.68, '0001-01-01', 'inicial' WHERE NOT EXISTS (SELECT 1 FROM fab_materiais_precos WHERE material_id = 1)"))
+        conn.commit()
+    with UnitOfWork() as uow:
+        pedidos = uow.fabrica.get_custo_pedidos(status=STATUS)
+        por_cliente = uow.fabrica.get_custo_agregado('cliente', status=STATUS)
+        por_mes = uow.fabrica.get_custo_agregado('mes', status=STATUS)
+        with pytest.raises(ValueError):
+            uow.fabrica.get_custo_agregado('fornecedor')
+
+    assert por_cliente['pedidos'].sum() == len(pedidos)
+    assert por_cliente['custo_materiais'].sum() == pytest.approx(pedidos['custo_materiais'].sum())
+    assert por_cliente['pct_custo'].sum() == pytest.approx(100.0)
+    assert list(por_mes['grupo']) == sorted(por_mes['grupo'])
+    assert por_mes['custo_acumulado'].iloc[-1] == pytest.approx(pedidos['custo_materiais'].sum())
+
+
+def test_pedido_novo_invalida_o_cache(engine):
+    relatorio_custos._cache.limpar()
+    antes = relatorio_custos.get_custos_agregados('tipo_elemento', STATUS)
+    relatorio_custos.get_custos_agregados('tipo_elemento', STATUS)
+    assert relatorio_custos.estatisticas_cache()['acertos'] == 1
+
+    with UnitOfWork() as uow:
+        uow.fabrica.save_pedido({'cliente_id': 1, 'elemento_id': 1, 'quantidade': 10,
+                                 'data_pedido': '2024-06-01', 'status': 'Pendente', 'traco_usado_id': 1})
+    depois = relatorio_custos.get_custos_agregados('tipo_elemento', STATUS)
+
+    assert depois['pedidos'].sum() == antes['pedidos'].sum() + 1
+    assert relatorio_custos.estatisticas_cache()['calculos'] == 2
@@ -1,6 +1,9 @@
 import pytest
+from datetime import date
+import pandas as pd
 from persistencia.unit_of_work import UnitOfWork
 from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
 
 
 def test_fabrica_catalogo_elementos():
@@ -129,3 +132,235 @@ def test_pagina_repository_permissions(engine):
     with UnitOfWork() as uow:
         roles = uow.paginas.get_allowed_roles_for_page('01_Test.py')
         assert roles is not None
+
+
+def test_fabrica_save_traco_preenche_proporcoes():
+    """save_traco deriva as colunas numéricas a partir de traco_str."""
+    with UnitOfWork() as uow:
+        uow.fabrica.save_traco({'nome': 'Traço Teste Estruturado', 'fck_alvo': 30.0,
+                                'traco_str': '1 : 2.2 : 3.1 : 0.50 a/c', 'consumo_cimento_m3': 370.0})
+
+    with UnitOfWork() as uow:
+        df = uow.fabrica.get_tracos_padrao()
+        traco = df[df['nome'] == 'Traço Teste Estruturado'].iloc[0]
+        assert float(traco['prop_areia']) == 2.2
+        assert float(traco['prop_brita']) == 3.1
+        assert float(traco['relacao_ac']) == 0.5
+
+
+def test_migracao_tracos_estruturados(caplog):
+    """A migração adiciona as colunas e preenche traços existentes; traço inválido gera um aviso só."""
+    from sqlalchemy import create_engine
+    from persistencia.migracoes import aplicar_migracoes
+
+    engine = create_engine('sqlite:///:memory:', poolclass=StaticPool)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE fab_tracos_padrao (id INTEGER PRIMARY KEY, nome TEXT, fck_alvo REAL, traco_str TEXT, consumo_cimento_m3 REAL)"))
+        conn.execute(text("INSERT INTO fab_tracos_padrao VALUES (1, 'A', 25, '1 : 2.5 : 3.5 : 0.55 a/c', 320), (2, 'B', 30, 'texto livre', 300)"))
+
+    with caplog.at_level('WARNING', logger='persistencia.migracoes'):
+        aplicar_migracoes(engine)
+        aplicar_migracoes(engine)  # idempotente
+    assert sum('formato inválido' in r.getMessage() for r in caplog.records) == 1
+
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT id, prop_cimento, prop_areia, relacao_ac FROM fab_tracos_padrao ORDER BY id")).fetchall()
+    assert tuple(rows[0]) == (1, 1.0, 2.5, 0.55)
+    assert rows[1][1] is None
+
+
+def test_migracao_registra_pagina_uma_vez():
+    """A página nova é liberada aos perfis só no registro; permissões removidas depois não voltam."""
+    from sqlalchemy import create_engine
+    from persistencia.migracoes import registrar_pagina_custos
+
+    engine = create_engine('sqlite:///:memory:', poolclass=StaticPool)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE perfil_acesso (perfil_id INTEGER PRIMARY KEY, nome_perfil TEXT)"))
+        conn.execute(text("CREATE TABLE pagina (pagina_id INTEGER PRIMARY KEY, nome_arquivo TEXT UNIQUE, nome_amigavel TEXT)"))
+        conn.execute(text("CREATE TABLE perfil_pagina_permissao (permissao_id INTEGER PRIMARY KEY, perfil_id INTEGER, pagina_id INTEGER, UNIQUE (perfil_id, pagina_id))"))
+        conn.execute(text("INSERT INTO perfil_acesso VALUES (1, 'Administrador Global'), (4, 'Comercial'), (5, 'Outro')"))
+        assert registrar_pagina_custos(conn)
+        perfis = conn.execute(text("SELECT perfil_id FROM perfil_pagina_permissao ORDER BY perfil_id")).scalars().all()
+        assert perfis == [1, 4]
+
+        conn.execute(text("DELETE FROM perfil_pagina_permissao WHERE perfil_id = 4"))
+        assert not registrar_pagina_custos(conn)
+        assert conn.execute(text("SELECT COUNT(*) FROM perfil_pagina_permissao")).scalar() == 1
+
+
+def test_rollup_semanal_incremental_igual_a_reconstrucao():
+    """Inserções e mudanças de status mantêm o rollup igual ao agregado completo."""
+    with UnitOfWork() as uow:
+        for data_pedido, qtd in [('2026-04-06', 10), ('2026-04-12', 20), ('2026-04-13', 30)]:
+            uow.fabrica.save_pedido({'cliente_id': 1, 'elemento_id': 1, 'quantidade': qtd,
+                                     'data_pedido': data_pedido, 'status': 'Pendente'})
+        ids = uow.connection.execute(text(
+            "SELECT id FROM fab_pedidos WHERE data_pedido BETWEEN '2026-04-06' AND '2026-04-13' ORDER BY id"
+        )).scalars().all()
+        uow.fabrica.update_pedido_status(ids[0], 'Concluído')
+        uow.fabrica.update_pedidos_status(ids, 'Cancelado')
+
+    with UnitOfWork() as uow:
+        incremental = uow.fabrica.get_tendencia_semanal()
+        por_status = uow.connection.execute(text(
+            "SELECT status, pedidos FROM fab_rollup_semanal WHERE semana = '2026-04-06' AND pedidos <> 0"
+        )).fetchall()
+        uow.fabrica.reconstruir_rollup_semanal()
+        reconstruido = uow.fabrica.get_tendencia_semanal()
+
+    assert por_status == [('Cancelado', 2)]
+    semana = incremental.set_index('semana').loc['2026-04-06']
+    assert semana['pedidos'] == 2
+    assert abs(semana['volume'] - 30 * 0.0106) < 1e-9
+    assert incremental.round(9).equals(reconstruido.round(9))
+
+
+def test_salvar_matriz_permissoes_aplica_so_a_diferenca(engine):
+    with engine.connect() as conn:
+        conn.execute(text("INSERT OR IGNORE INTO perfil_acesso (perfil_id, nome_perfil) VALUES (1, 'Administrador Global'), (2, 'Gerente Matriz'), (3, 'Operador Matriz')"))
+        conn.execute(text("INSERT OR IGNORE INTO pagina (pagina_id, nome_arquivo, nome_amigavel) VALUES (901, '901_A.py', 'A'), (902, '902_B.py', 'B')"))
+        conn.execute(text("DELETE FROM perfil_pagina_permissao"))
+        conn.execute(text("INSERT INTO perfil_pagina_permissao (perfil_id, pagina_id) VALUES (1, 901), (1, 902), (2, 901), (3, 901)"))
+        conn.commit()
+
+    def pares(uow):
+        df = uow.permissoes.get_permissoes()
+        return {(int(r.perfil_id), int(r.pagina_id)): int(r.permissao_id) for r in df.itertuples()}
+
+    with UnitOfWork() as uow:
+        antes = pares(uow)
+        versao = uow.permissoes.get_versao_permissoes()
+        # Matriz da tela (sem o Administrador): Gerente ganha B, Operador perde A.
+        matriz = pd.DataFrame({'perfil_id': [2, 2], 'pagina_id': [901, 902]})
+        assert uow.permissoes.salvar_matriz_permissoes(matriz) == (1, 1)
+
+    with UnitOfWork() as uow:
+        depois = pares(uow)
+        assert set(depois) == {(1, 901), (1, 902), (2, 901), (2, 902)}
+        # Linhas que não mudaram mantêm o id; as do Administrador nunca saem.
+        assert all(depois[par] == antes[par] for par in [(1, 901), (1, 902), (2, 901)])
+        assert uow.permissoes.get_versao_permissoes() == versao + 1
+
+        # Salvar de novo a mesma matriz não toca no banco nem na versão.
+        assert uow.permissoes.salvar_matriz_permissoes(matriz) == (0, 0)
+        assert uow.permissoes.get_versao_permissoes() == versao + 1
+
+
+def test_precos_vigentes_e_custo_de_pedidos_na_data(engine):
+    with engine.connect() as conn:
+        conn.execute(text("DELETE FROM fab_materiais_precos WHERE material_id = 1"))
+        conn.execute(text("INSERT INTO fab_materiais_precos (material_id, custo_kg, vigente_desde, origem) VALUES (1, 0.50, '0001-01-01', 'inicial')"))
+        hoje = date.today().isoformat()
+        for data in ('2020-01-01', hoje):
+            conn.execute(text(f"INSERT INTO fab_pedidos (cliente_id, elemento_id, quantidade, data_pedido, status, traco_usado_id) VALUES (1, 1, 100, '{data}', 'Concluído', 1)"))
+        conn.commit()
+
+    with UnitOfWork() as uow:
+        uow.fabrica.save_material({"custo_kg": 0.80}, 1)
+
+    with UnitOfWork() as uow:
+        historico = uow.fabrica.get_historico_precos(1)
+        assert list(historico["custo_kg"]) == [0.50, 0.80]
+        assert historico["vigente_desde"].iloc[1] == hoje
+        assert historico["vigente_ate"].iloc[0] == hoje
+        assert pd.isna(historico["vigente_ate"].iloc[1])
+        assert uow.fabrica.get_preco_em(1, "2020-01-01") == 0.50
+        assert uow.fabrica.get_preco_em(1, hoje) == 0.80
+        assert uow.fabrica.get_precos_em("2020-01-01").set_index("id").loc[1, "custo_kg"] == 0.50
+
+        custos = uow.fabrica.get_custo_pedidos(status=("Concluído",), data_inicio="2020-01-01")
+        custos = custos[custos["data_pedido"].isin(["2020-01-01", hoje])].set_index("data_pedido")
+    kg_cimento = 100 * 0.0106 * 250
+    assert custos.loc["2020-01-01", "custo_cimento"] == pytest.approx(kg_cimento * 0.50)
+    assert custos.loc[hoje, "custo_cimento"] == pytest.approx(kg_cimento * 0.80)
+    assert custos.loc["2020-01-01", "custo_m3"] == pytest.approx(custos.loc["2020-01-01", "custo_materiais"] / (100 * 0.0106))
+
+
+def test_tendencia_semanal_sem_rollup_igual_ao_rollup(monkeypatch):
+    """Fora do SQLite a tendência vem de fab_pedidos e bate com o rollup; o rollup não é tocado."""
+    from persistencia.repositorios.fabrica_repo import FabricaRepository
+    with UnitOfWork() as uow:
+        uow.fabrica.reconstruir_rollup_semanal()
+        com_rollup = uow.fabrica.get_tendencia_semanal()
+
+    monkeypatch.setattr(FabricaRepository, '_sqlite', property(lambda self: False))
+    with UnitOfWork() as uow:
+        antes = uow.connection.execute(text("SELECT COUNT(*), SUM(pedidos) FROM fab_rollup_semanal")).one()
+        uow.fabrica.save_pedido({'cliente_id': 1, 'elemento_id': 1, 'quantidade': 5,
+                                 'data_pedido': '2026-05-04', 'status': 'Pendente'})
+        depois = uow.connection.execute(text("SELECT COUNT(*), SUM(pedidos) FROM fab_rollup_semanal")).one()
+        direta = uow.fabrica.get_tendencia_semanal()
+        uow.connection.execute(text("DELETE FROM fab_pedidos WHERE data_pedido = '2026-05-04'"))
+
+    assert antes == depois
+    semana = direta.set_index('semana').loc['2026-05-04']
+    assert semana['pedidos'] == 1
+    assert abs(semana['volume'] - 5 * 0.0106) < 1e-9
+    sem_nova = direta[direta['semana'] != '2026-05-04'].reset_index(drop=True)
+    assert sem_nova['semana'].tolist() == com_rollup['semana'].tolist()
+    assert sem_nova['pedidos'].astype(int).tolist() == com_rollup['pedidos'].astype(int).tolist()
+    assert (sem_nova['volume'] - com_rollup['volume']).abs().max() < 1e-9
+
+
+def test_precos_sem_historico_usam_custo_atual(monkeypatch):
+    """Fora do SQLite não há fab_materiais_precos: salvar não grava histórico e as consultas usam custo_kg."""
+    from persistencia.repositorios.fabrica_repo import FabricaRepository
+    monkeypatch.setattr(FabricaRepository, '_sqlite', property(lambda self: False))
+    with UnitOfWork() as uow:
+        uow.fabrica.save_material({'tipo': 'Aditivo', 'nome': 'Aditivo Sem Histórico', 'custo_kg': 4.0, 'estoque_atual': 0.0})
+        material_id = uow.connection.execute(text("SELECT id FROM fab_materiais WHERE nome = 'Aditivo Sem Histórico'")).scalar()
+        uow.fabrica.save_material({'custo_kg': 4.5}, material_id)
+        registros = uow.connection.execute(text(
+            "SELECT COUNT(*) FROM fab_materiais_precos WHERE material_id = :id"), {'id': material_id}).scalar()
+        preco = uow.fabrica.get_preco_em(material_id, '2020-01-01')
+        precos = uow.fabrica.get_precos_em('2020-01-01').set_index('id')
+        historico = uow.fabrica.get_historico_precos(material_id)
+        uow.fabrica.delete_material(material_id)
+
+    assert registros == 0
+    assert preco == 4.5
+    assert precos.loc[material_id, 'custo_kg'] == 4.5
+    assert list(historico['custo_kg']) == [4.5]
+
+
+def test_marcador_custos_muda_com_traco_elemento_e_preco():
+    with UnitOfWork() as uow:
+        marcadores = [uow.fabrica.get_marcador_custos()]
+        traco = uow.fabrica.get_traco_by_id(1).iloc[0]
+        uow.fabrica.save_traco({'consumo_cimento_m3': float(traco['consumo_cimento_m3'])}, 1)
+        marcadores.append(uow.fabrica.get_marcador_custos())
+        elemento = uow.fabrica.get_elemento_by_id(1).iloc[0]
+        uow.fabrica.save_elemento({'fck_necessario': float(elemento['fck_necessario'])}, 1)
+        marcadores.append(uow.fabrica.get_marcador_custos())
+        material = uow.fabrica.get_all_materiais().set_index('id').loc[1]
+        uow.fabrica.save_material({'custo_kg': float(material['custo_kg'])}, 1)
+        marcadores.append(uow.fabrica.get_marcador_custos())
+
+    assert len(set(marcadores)) == 4
+
+
+def test_versao_pedidos_so_muda_quando_o_historico_incremental_nao_basta():
+    with UnitOfWork() as uow:
+        for _ in range(2):
+            uow.fabrica.save_pedido({'cliente_id': 1, 'elemento_id': 1, 'quantidade': 1,
+                                     'data_pedido': '2026-06-01', 'status': 'Pendente'})
+        a, b = uow.connection.execute(text("SELECT id FROM fab_pedidos ORDER BY id DESC LIMIT 2")).scalars().all()[::-1]
+
+    def versao():
+        with UnitOfWork() as uow:
+            return uow.fabrica.get_marcador_pedidos()
+
+    inicio = versao()
+    with UnitOfWork() as uow:
+        uow.fabrica.update_pedido_status(a, 'Em Produção')
+        uow.fabrica.update_pedido_status(b, 'Concluído')
+    assert versao() == {'ultimo_id': b, 'versao': inicio['versao']}
+
+    with UnitOfWork() as uow:
+        uow.fabrica.update_pedido_status(a, 'Concluído')  # fora da ordem de id
+    assert versao() == {'ultimo_id': b, 'versao': inicio['versao'] + 1}
+
+    with UnitOfWork() as uow:
+        uow.fabrica.update_pedidos_status([a, b], 'Cancelado')  # saem do histórico
+    assert versao()['versao'] == inicio['versao'] + 2
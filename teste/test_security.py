@@ -0,0 +1,66 @@
+"""
+test_security.py — Testes do Keyring (cache, rotação e recifragem do banco.ini).
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from cryptography.fernet import Fernet, InvalidToken
+from persistencia import security
+from persistencia.security import Keyring, reencriptar_ini
+
+
+def test_keyring_le_o_arquivo_uma_vez(tmp_path, monkeypatch):
+    anel = Keyring(tmp_path / 'secret.key')
+    token = anel.encrypt('segredo')
+
+    leituras = []
+    ler_original = security._ler_chaves
+    monkeypatch.setattr(security, '_ler_chaves', lambda p: leituras.append(p) or ler_original(p))
+    for _ in range(50):
+        assert anel.decrypt(token) == 'segredo'
+        anel.encrypt('outro')
+    assert leituras == []
+    assert anel.decrypt('texto-puro') == 'texto-puro'
+
+
+def test_rotacao_mantem_valores_antigos_legiveis(tmp_path):
+    anel = Keyring(tmp_path / 'secret.key')
+    antigo = anel.encrypt('senha_forte')
+    chave_antiga = anel.chave_principal
+
+    anel.rotacionar()
+    assert anel.chave_principal != chave_antiga
+    assert anel.chaves[1] == chave_antiga
+    assert anel.fernet.decrypt(antigo.encode()) == b'senha_forte'
+
+    novo = anel.rotate(antigo)
+    anel.descartar_antigas()
+    assert anel.chaves == [anel.chave_principal]
+    assert anel.fernet.decrypt(novo.encode()) == b'senha_forte'
+
+
+def test_reencriptar_ini_preserva_o_restante(tmp_path):
+    anel = Keyring(tmp_path / 'secret.key')
+    user, senha = anel.encrypt('sa'), anel.encrypt('senha_forte')
+    ini = tmp_path / 'banco.ini'
+    ini.write_text(
+        "[database]\n# comentário\ntype = sqlserver\n"
+        f"user = {user}\npassword = {senha}\n#password = {senha}\n#user = texto_puro\n",
+        encoding='utf-8',
+    )
+    chave_antiga = anel.chave_principal
+    anel.rotacionar()
+
+    assert reencriptar_ini(ini, anel) == 3
+    anel.descartar_antigas()
+
+    linhas = ini.read_text(encoding='utf-8').splitlines()
+    assert linhas[:3] == ['[database]', '# comentário', 'type = sqlserver']
+    assert linhas[-1] == '#user = texto_puro'
+    novos = [linha.split(' = ', 1)[1] for linha in linhas[3:6]]
+    assert [anel.decrypt(v) for v in novos] == ['sa', 'senha_forte', 'senha_forte']
+    with pytest.raises(InvalidToken):
+        Fernet(chave_antiga).decrypt(novos[0].encode())
@@ -0,0 +1,100 @@
+"""
+test_sessao.py — Testes dos tokens de sessão e do cache de permissões.
+"""
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from sqlalchemy import event, text
+from persistencia import sessao
+from persistencia.unit_of_work import UnitOfWork
+from components import servicos_gerenciador as servico
+
+USUARIO = {'user_id': 7, 'username': 'prod.teste', 'name': 'Produção Teste', 'access_level': 'Produção'}
+
+
+@pytest.fixture
+def consultas(engine):
+    """Conta os comandos SQL enviados ao banco durante o teste."""
+    executados = []
+    contar = lambda *args, **kwargs: executados.append(args[2])
+    event.listen(engine, 'before_cursor_execute', contar)
+    yield executados
+    event.remove(engine, 'before_cursor_execute', contar)
+
+
+def test_token_restaura_sessao_sem_consultar_o_banco(consultas):
+    sessao.limpar_cache()
+    token = sessao.emitir_token(USUARIO)
+    consultas.clear()
+
+    assert sessao.restaurar_sessao(token) == USUARIO
+    assert consultas == []
+
+
+def test_token_adulterado_ou_expirado(monkeypatch):
+    token = sessao.emitir_token(USUARIO)
+    assert sessao.restaurar_sessao(token[:-4] + 'AAAA') is None
+    assert sessao.restaurar_sessao('lixo') is None
+    assert sessao.restaurar_sessao(None) is None
+
+    antigo = sessao._fernet().encrypt_at_time(b'{"uid":1,"u":"a","n":"A","p":"X","v":0}', int(time.time()) - 3600)
+    monkeypatch.setattr(sessao.config, 'SESSAO_TTL_HORAS', 0.5)
+    assert sessao.restaurar_sessao(antigo.decode('ascii')) is None
+
+
+def test_mudanca_de_permissoes_invalida_tokens_e_cache(consultas):
+    token = sessao.emitir_token(USUARIO)
+    servico.get_allowed_roles_for_page('04_🏭_Controle_Producao.py')
+    consultas.clear()
+    servico.get_allowed_roles_for_page('04_🏭_Controle_Producao.py')
+    assert consultas == []
+
+    with UnitOfWork() as uow:
+        uow.connection.execute(text("INSERT OR IGNORE INTO perfil_acesso (perfil_id, nome_perfil) VALUES (50, 'Perfil Sessão')"))
+        uow.usuarios.salvar_perfil({'nome_perfil': 'Perfil Sessão Renomeado'}, 50)
+
+    assert sessao.restaurar_sessao(token) is None
+    assert sessao.restaurar_sessao(sessao.emitir_token(USUARIO)) == USUARIO
+    consultas.clear()
+    servico.get_allowed_roles_for_page('04_🏭_Controle_Producao.py')
+    assert consultas != []
+
+
+def test_versao_de_permissoes_so_publicada_apos_commit(consultas):
+    token = sessao.emitir_token(USUARIO)
+    versao = sessao.versao_permissoes()
+
+    with pytest.raises(RuntimeError):
+        with UnitOfWork() as uow:
+            uow.connection.execute(text("INSERT OR IGNORE INTO perfil_acesso (perfil_id, nome_perfil) VALUES (51, 'Perfil Rollback')"))
+            uow.usuarios.salvar_perfil({'nome_perfil': 'Perfil Rollback Renomeado'}, 51)
+            # Ainda não confirmada: os tokens emitidos continuam válidos.
+            assert sessao.versao_permissoes() == versao
+            raise RuntimeError('falha antes do commit')
+
+    assert sessao.versao_permissoes() == versao
+    assert sessao.restaurar_sessao(token) == USUARIO
+
+    with UnitOfWork() as uow:
+        uow.connection.execute(text("INSERT OR IGNORE INTO perfil_acesso (perfil_id, nome_perfil) VALUES (51, 'Perfil Rollback')"))
+        uow.usuarios.salvar_perfil({'nome_perfil': 'Perfil Commit'}, 51)
+    assert sessao.versao_permissoes() == versao + 1
+    assert sessao.restaurar_sessao(token) is None
+
+
+def test_logout_invalida_tokens_do_usuario():
+    outro = {**USUARIO, 'user_id': 8, 'username': 'outro.teste'}
+    token, token_outro = sessao.emitir_token(USUARIO), sessao.emitir_token(outro)
+
+    sessao.encerrar_sessao(USUARIO)
+
+    assert sessao.restaurar_sessao(token) is None
+    assert sessao.restaurar_sessao(token_outro) == outro
+    # Vale também para processos que ainda não tinham a versão em memória.
+    sessao.limpar_cache()
+    assert sessao.restaurar_sessao(token) is None
+    assert sessao.restaurar_sessao(sessao.emitir_token(USUARIO)) == USUARIO
@@ -0,0 +1,106 @@
+"""
+test_traco_utils.py — Testes do parser e formatadores de traço.
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+import pytest
+from utils.traco_utils import (
+    Traco,
+    parse_traco,
+    formatar_traco_legivel,
+    formatar_traco_detalhado,
+    formatar_traco_legivel_series,
+    extrair_tracos,
+)
+
+
+class TestParseTraco:
+
+    def test_formato_padrao(self):
+        assert parse_traco("1 : 2.2 : 3.1 : 0.5 a/c") == Traco(1.0, 2.2, 3.1, 0.5, None)
+
+    def test_sem_espacos_e_virgula_decimal(self):
+        assert parse_traco("1:3,5:4,5:0,68 a/c") == Traco(1.0, 3.5, 4.5, 0.68, None)
+
+    def test_sem_relacao_ac(self):
+        assert parse_traco("1:2:3") == Traco(1.0, 2.0, 3.0, None, None)
+
+    def test_aditivo_percentual(self):
+        traco = parse_traco("1 : 2.0 : 3.0 : 0.45 a/c + 0.8% superplastificante")
+        assert traco.aditivo_pct == 0.8
+
+    def test_invalido_retorna_none(self):
+        assert parse_traco("Erro na IA") is None
+        assert parse_traco("") is None
+        assert parse_traco(None) is None
+
+    def test_from_row_prefere_colunas_numericas(self):
+        row = pd.Series({"traco_str": "1:9:9", "prop_cimento": 1.0, "prop_areia": 2.0,
+                         "prop_brita": 3.0, "relacao_ac": 0.5, "aditivo_pct": None})
+        assert Traco.from_row(row) == Traco(1.0, 2.0, 3.0, 0.5, None)
+
+    def test_from_row_sem_colunas_usa_texto(self):
+        row = pd.Series({"traco_str": "1 : 2.5 : 3.5 : 0.55 a/c", "prop_cimento": float("nan")})
+        assert Traco.from_row(row) == Traco(1.0, 2.5, 3.5, 0.55, None)
+
+    def test_consumo_kg(self):
+        consumo = Traco(1.0, 2.0, 3.0, 0.5, 1.0).consumo_kg(100.0)
+        assert consumo == {"cimento": 100.0, "areia": 200.0, "brita": 300.0, "agua": 50.0, "aditivo": 1.0}
+
+
+class TestFormatacao:
+
+    def test_legivel(self):
+        assert formatar_traco_legivel("1 : 2.2 : 3.1 : 0.50 a/c") == \
+            "1 (Cimento) : 2.2 (Areia) : 3.1 (Brita) : 0.5 (a/c)"
+
+    def test_legivel_aceita_traco(self):
+        assert formatar_traco_legivel(Traco(1.0, 2.0, 3.0)) == "1 (Cimento) : 2 (Areia) : 3 (Brita)"
+
+    def test_legivel_invalido_retorna_original(self):
+        assert formatar_traco_legivel("Erro na IA") == "Erro na IA"
+        assert formatar_traco_legivel(None) == ""
+
+    def test_detalhado(self):
+        saida = formatar_traco_detalhado("1 : 2.2 : 3.1 : 0.5 a/c")
+        assert "**Cimento:** 1" in saida
+        assert "**a/c:** 0.5" in saida
+
+
+class TestVetorizado:
+
+    AMOSTRAS = [
+        "1 : 2.2 : 3.1 : 0.50 a/c",
+        "1:3,5:4,5:0,68 a/c",
+        "1:2:3",
+        "1 : 2.0 : 3.0 : 0.45 a/c + 0.8% superplastificante",
+        "Erro na IA",
+        None,
+    ]
+
+    def test_series_equivale_ao_escalar(self):
+        serie = pd.Series(self.AMOSTRAS)
+        esperado = [formatar_traco_legivel(t) for t in self.AMOSTRAS]
+        assert formatar_traco_legivel_series(serie).tolist() == esperado
+
+    @pytest.mark.parametrize("traco", [
+        "01 : 02.50 : 003 : 0.500 a/c",
+        "1 : 2.0000001 : 3.123456789 : 0,45 a/c",
+        "1 : 1234567 : 3 : 0.00001 a/c",
+        "100000 : 2 : 3 + 12.5% aditivo",
+        "1 : 2 : 3 sem a/c",
+    ])
+    def test_series_formata_como_g(self, traco):
+        serie = pd.Series([traco, None, "Erro na IA", traco])
+        assert formatar_traco_legivel_series(serie).tolist() == serie.map(formatar_traco_legivel).tolist()
+
+    def test_extrair_tracos(self):
+        df = extrair_tracos(pd.Series(self.AMOSTRAS))
+        assert list(df.columns) == list(Traco._fields)
+        assert df.loc[1, "areia"] == 3.5
+        assert df.loc[3, "aditivo_pct"] == 0.8
+        assert df.loc[4].isna().all()
@@ -0,0 +1,84 @@
+"""
+analise_logs.py — Leitura dos logs JSON (log_formato = json) por rerun.
+
+Agrupa os registros pelo correlacao_id atribuído em Home.py a cada execução
+do script e separa o tempo gasto em banco (unidades de trabalho) e em IA
+(chamadas ao LLM).
+"""
+import json
+from typing import Iterable
+
+import pandas as pd
+
+LOGGER_UOW = "persistencia.unit_of_work"
+LOGGER_IA = "components.ai_concreto"
+LOGGER_RERUN = "rerun"
+# Registro que fecha a unidade de trabalho: duracao_ms cobre a transação inteira.
+MSG_UOW_FIM = "UoW: Conexão fechada."
+
+
+def ler_registros(linhas: Iterable[str]) -> list:
+    """Registros JSON do arquivo; linhas em texto (formato antigo) são ignoradas."""
+    registros = []
+    for linha in linhas:
+        linha = linha.strip()
+        if not linha.startswith("{"):
+            continue
+        try:
+            registros.append(json.loads(linha))
+        except json.JSONDecodeError:
+            continue
+    return registros
+
+
+def trace(registros: list, correlacao_id: str) -> pd.DataFrame:
+    """Linha do tempo de um rerun, ordenada pelo tempo decorrido."""
+    df = pd.DataFrame([r for r in registros if r.get("correlacao_id") == correlacao_id])
+    if df.empty:
+        return df
+    for coluna in ("decorrido_ms", "duracao_ms"):
+        if coluna not in df:
+            df[coluna] = None
+    colunas = ["decorrido_ms", "duracao_ms", "nivel", "logger", "msg"]
+    return df.sort_values("decorrido_ms", kind="stable")[colunas].reset_index(drop=True)
+
+
+def resumo_reruns(registros: list) -> pd.DataFrame:
+    """
+    Uma linha por correlacao_id: página, usuário, tempo total, tempo e número de
+    unidades de trabalho (banco), tempo e número de chamadas ao LLM, e erros.
+    Ordenado do rerun mais lento para o mais rápido.
+    """
+    colunas = ["correlacao_id", "inicio", "pagina", "usuario", "total_ms",
+               "banco_ms", "uow", "ia_ms", "chamadas_ia", "erros"]
+    df = pd.DataFrame([r for r in registros if r.get("correlacao_id", "-") != "-"])
+    if df.empty:
+        return pd.DataFrame(columns=colunas)
+    for coluna in ("decorrido_ms", "duracao_ms", "pagina", "usuario", "etapa"):
+        if coluna not in df:
+            df[coluna] = None
+
+    df["duracao_ms"] = pd.to_numeric(df["duracao_ms"], errors="coerce").fillna(0.0)
+    fim_uow = (df["logger"] == LOGGER_UOW) & (df["msg"] == MSG_UOW_FIM)
+    ia = (df["logger"] == LOGGER_IA) & df["etapa"].notna()
+    df["banco_ms"] = df["duracao_ms"].where(fim_uow, 0.0)
+    df["uow"] = fim_uow.astype(int)
+    df["ia_ms"] = df["duracao_ms"].where(ia, 0.0)
+    df["chamadas_ia"] = ia.astype(int)
+    df["erros"] = df["nivel"].isin(["ERROR", "CRITICAL"]).astype(int)
+    rerun = df["logger"] == LOGGER_RERUN
+    df["pagina"] = df["pagina"].where(rerun)
+    df["usuario"] = df["usuario"].where(rerun)
+
+    resumo = df.groupby("correlacao_id", sort=False).agg(
+        inicio=("ts", "min"),
+        pagina=("pagina", "last"),
+        usuario=("usuario", "last"),
+        total_ms=("decorrido_ms", "max"),
+        banco_ms=("banco_ms", "sum"),
+        uow=("uow", "sum"),
+        ia_ms=("ia_ms", "sum"),
+        chamadas_ia=("chamadas_ia", "sum"),
+        erros=("erros", "sum"),
+    ).reset_index()
+    return resumo.sort_values("total_ms", ascending=False, kind="stable")[colunas].reset_index(drop=True)
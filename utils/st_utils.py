@@ -2,53 +2,83 @@
 import streamlit as st
 import logging
 import config
+from persistencia import perfilador, sessao
 log = logging.getLogger(__name__)
 
+PERFIS_ADMIN = ('Administrador', 'Administrador Global')
+
 def st_check_session():
     log.debug('Executando st_check_session()...')
     if 'user_info' not in st.session_state or st.session_state.user_info is None:
-        log.warning(f"Falha na verificação de sessão: 'user_info' não encontrado.")
+        log.warning("Falha na verificação de sessão: 'user_info' não encontrado.")
         log.debug('Chamando st.rerun() para forçar recarregamento e exibir login...')
         st.warning('Acesso negado. Por favor, faça o login.')
         st.rerun()
         st.stop()
-    log.debug(f'Sessão válida encontrada para: {st.session_state.user_info.get('name', 'N/A')}')
-    log.debug(f'Sessão válida encontrada para: {st.session_state.user_info.get("name", "N/A")}')
+    log.debug('Sessão válida encontrada para: %s', st.session_state.user_info.get('name', 'N/A'))
     st.sidebar.title('Painel de Controle')
     st.sidebar.markdown(f'**Usuário:** `{st.session_state.user_info["name"]}`')
     st.sidebar.markdown(f'**Perfil:** `{st.session_state.user_info["access_level"]}`')
     if st.sidebar.button('🚪 Sair', width='stretch', type='primary'):
         username = st.session_state.user_info.get('username', 'desconhecido')
-        log.info(f"Botão 'Sair' clicado. Iniciando logout do usuário: '{username}'.")
+        log.info("Botão 'Sair' clicado. Iniciando logout do usuário: '%s'.", username)
+        try:
+            sessao.encerrar_sessao(st.session_state.user_info)
+        except Exception as e:
+            log.error('Não foi possível invalidar o token de sessão de %s: %s', username, e)
         keys_to_clear = list(st.session_state.keys())
-        log.debug(f'Limpando {len(keys_to_clear)} chaves da sessão: {keys_to_clear}')
+        log.debug('Limpando %d chaves da sessão: %s', len(keys_to_clear), keys_to_clear)
         for key in keys_to_clear:
             del st.session_state[key]
+        st.query_params.clear()
         log.info('Sessão limpa.')
         log.debug('Chamando st.rerun() para recarregar Home.py e mostrar login...')
         st.rerun()
         st.stop()
 
 def check_access(allowed_roles: list):
-    log.debug(f'Executando check_access(). Perfis permitidos para esta página: {allowed_roles}')
+    log.debug('Executando check_access(). Perfis permitidos para esta página: %s', allowed_roles)
     if not allowed_roles:
         log.debug("Acesso permitido: 'allowed_roles' está vazia (página pública para logados).")
         return True
     try:
         user_access_level = st.session_state.user_info.get('access_level')
-        log.debug(f"Perfil do usuário atual (da sessão): '{user_access_level}'.")
+        log.debug("Perfil do usuário atual (da sessão): '%s'.", user_access_level)
         if user_access_level not in allowed_roles:
-            log.warning(f"ACESSO NEGADO. Usuário '{st.session_state.user_info.get('username')}' (Perfil: '{user_access_level}') não está na lista de perfis permitidos: {allowed_roles}.")
+            log.warning("ACESSO NEGADO. Usuário '%s' (Perfil: '%s') não está na lista de perfis permitidos: %s.", st.session_state.user_info.get('username'), user_access_level, allowed_roles)
             st.error('Você não tem permissão para acessar esta página.')
             st.image('https://http.cat/401', use_container_width=True)
             st.stop()
-        log.debug(f"Acesso PERMITIDO. Perfil '{user_access_level}' está na lista.")
+        log.debug("Acesso PERMITIDO. Perfil '%s' está na lista.", user_access_level)
         return True
     except AttributeError:
-        log.error(f'Falha em check_access: st.session_state.user_info não é um dicionário ou é None. {st.session_state.user_info}')
+        log.error('Falha em check_access: st.session_state.user_info não é um dicionário ou é None. %s', st.session_state.user_info)
         st.error("Erro na verificação de permissão. 'user_info' inválido.")
         st.stop()
     except Exception as e:
-        log.error(f'Erro inesperado em check_access: {e}', exc_info=True)
+        log.error('Erro inesperado em check_access: %s', e, exc_info=True)
         st.error(f'Erro inesperado na verificação de permissão: {e}')
-        st.stop()
\ No newline at end of file
+        st.stop()
+
+def perfil_rerun_ligado() -> bool:
+    """PERFIL_RERUNS no config, ou o interruptor que só administradores veem na barra lateral."""
+    user_info = st.session_state.get('user_info') or {}
+    if user_info.get('access_level') in PERFIS_ADMIN:
+        st.sidebar.toggle('🔬 Perfilar reruns', key='perfil_rerun_ativo',
+                          help='Mede banco, IA e página a cada execução e grava em logs/perfis.jsonl.')
+    return config.PERFIL_RERUNS or st.session_state.get('perfil_rerun_ativo', False)
+
+def painel_perfil(perfil: perfilador.PerfilRerun):
+    """Resumo do perfil do rerun num expansor da barra lateral."""
+    total = perfil.total_ms or 0.0
+    with st.sidebar.expander(f'🔬 Perfil: {total:.0f} ms', expanded=False):
+        categorias = sorted(perfil.categorias().items(), key=lambda item: -item[1])
+        st.caption(' · '.join(f'**{c}** {ms:.0f} ms ({ms / total:.0%})' for c, ms in categorias if total))
+        linhas = []
+        for nivel, rotulo, ms, proprio, chamadas in perfil.arvore():
+            barra = '█' * max(1, round(20 * ms / total)) if total else ''
+            vezes = f' ×{chamadas}' if chamadas > 1 else ''
+            linhas.append(f"{'  ' * nivel}{rotulo}{vezes}  {ms:.1f} ms (próprio {proprio:.1f})  {barra}")
+        st.code('\n'.join(linhas) or 'Nenhum intervalo de banco ou IA neste rerun.', language=None)
+        if perfil.detalhe:
+            st.code(perfil.detalhe, language=None)
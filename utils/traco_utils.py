@@ -1,73 +1,191 @@
 """
-traco_utils.py — Utility functions for formatting concrete mix trace strings.
+traco_utils.py — Utility functions for parsing and formatting concrete mix traces.
 
-Converts raw trace proportions like "1 : 2.2 : 3.1 : 0.5 a/c" into
-human-readable, labeled versions for display throughout the system.
+Converts raw trace proportions like "1 : 2.2 : 3.1 : 0.5 a/c" into a
+structured `Traco` value and into human-readable, labeled versions for
+display throughout the system.
 """
+import math
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
 
+import pandas as pd
 
-def formatar_traco_legivel(traco_str: str) -> str:
+# Numeric columns of fab_tracos_padrao that mirror the fields of `Traco`.
+COLUNAS_TRACO = ("prop_cimento", "prop_areia", "prop_brita", "relacao_ac", "aditivo_pct")
+
+# Additive dosage (% of cement mass) assumed when the trace does not specify one.
+ADITIVO_PCT_PADRAO = 0.5
+
+_NUMERO = r"\d+(?:[.,]\d+)?"
+# Groups: cimento, areia, brita, a/c (optional), aditivo % (optional, anywhere after).
+_RE_TRACO = re.compile(
+    rf"({_NUMERO})\s*:\s*({_NUMERO})\s*:\s*({_NUMERO})(?:\s*:\s*({_NUMERO}))?"
+    rf"(?:.*?({_NUMERO})\s*%)?"
+)
+_ROTULOS = ("Cimento", "Areia", "Brita", "a/c", "Aditivo %")
+
+
+def _to_float(value: Optional[str]) -> Optional[float]:
+    return float(value.replace(",", ".")) if value else None
+
+
+def _formatar_numero(value: float) -> str:
+    return f"{value:g}"
+
+
+class Traco(NamedTuple):
+    """Mass proportions of a concrete mix, relative to cement."""
+
+    cimento: float
+    areia: float
+    brita: float
+    relacao_ac: Optional[float] = None
+    aditivo_pct: Optional[float] = None
+
+    @classmethod
+    def from_row(cls, row) -> Optional["Traco"]:
+        """
+        Builds a Traco from a DataFrame row (or dict) of fab_tracos_padrao.
+
+        Uses the numeric columns when present and falls back to parsing
+        `traco_str` for rows that have not been backfilled yet.
+        """
+        cimento = row.get("prop_cimento")
+        if cimento is not None and not _is_nan(cimento):
+            return cls(
+                float(cimento),
+                float(row["prop_areia"]),
+                float(row["prop_brita"]),
+                _optional_float(row.get("relacao_ac")),
+                _optional_float(row.get("aditivo_pct")),
+            )
+        return parse_traco(row.get("traco_str"))
+
+    def como_colunas(self) -> dict:
+        """Returns the values keyed by the fab_tracos_padrao column names."""
+        return dict(zip(COLUNAS_TRACO, self))
+
+    def consumo_kg(self, kg_cimento: float) -> dict:
+        """Estimates the mass of each material for a given mass of cement."""
+        fator = kg_cimento / self.cimento if self.cimento else 0.0
+        aditivo_pct = ADITIVO_PCT_PADRAO if self.aditivo_pct is None else self.aditivo_pct
+        return {
+            "cimento": kg_cimento,
+            "areia": fator * self.areia,
+            "brita": fator * self.brita,
+            "agua": kg_cimento * (self.relacao_ac or 0.0),
+            "aditivo": kg_cimento * aditivo_pct / 100.0,
+        }
+
+
+def _is_nan(value) -> bool:
+    return isinstance(value, float) and math.isnan(value)
+
+
+def _optional_float(value) -> Optional[float]:
+    if value is None or _is_nan(value):
+        return None
+    return float(value)
+
+
+@lru_cache(maxsize=1024)
+def parse_traco(traco_str: str) -> Optional[Traco]:
     """
-    Converts a raw trace string into a labeled, readable version.
+    Parses a raw trace string into a `Traco`.
 
     Input:  "1 : 2.2 : 3.1 : 0.5 a/c"
-    Output: "1 (Cimento) : 2.2 (Areia) : 3.1 (Brita) : 0.5 (a/c)"
+    Output: Traco(cimento=1.0, areia=2.2, brita=3.1, relacao_ac=0.5, aditivo_pct=None)
 
-    If the string cannot be parsed, returns the original unchanged.
+    An additive dosage written as a percentage (e.g. "+ 0.8% aditivo") is
+    captured in `aditivo_pct`. Returns None if the string cannot be parsed.
     """
     if not traco_str or not isinstance(traco_str, str):
-        return traco_str or ""
+        return None
+
+    match = _RE_TRACO.search(traco_str)
+    if not match:
+        return None
 
-    labels = ["Cimento", "Areia", "Brita", "a/c"]
+    return Traco(*(_to_float(g) for g in match.groups()))
 
-    try:
-        # Remove "a/c" suffix and extra whitespace
-        clean = traco_str.replace("a/c", "").strip()
-        parts = [p.strip() for p in clean.split(":")]
 
-        if len(parts) < 3:
-            return traco_str  # Cannot parse, return original
+def _como_traco(traco) -> Optional[Traco]:
+    return traco if isinstance(traco, Traco) else parse_traco(traco)
 
-        result_parts = []
-        for i, part in enumerate(parts):
-            if i < len(labels):
-                result_parts.append(f"{part} ({labels[i]})")
-            else:
-                result_parts.append(part)
 
-        return " : ".join(result_parts)
-    except Exception:
-        return traco_str
+def _partes_rotuladas(traco: Traco) -> list:
+    return [(label, _formatar_numero(value)) for label, value in zip(_ROTULOS, traco) if value is not None]
 
 
-def formatar_traco_detalhado(traco_str: str) -> str:
+@lru_cache(maxsize=1024)
+def formatar_traco_legivel(traco_str) -> str:
     """
-    Returns a multi-line Markdown breakdown of each trace component.
+    Converts a raw trace string (or a `Traco`) into a labeled, readable version.
+
+    Input:  "1 : 2.2 : 3.1 : 0.5 a/c"
+    Output: "1 (Cimento) : 2.2 (Areia) : 3.1 (Brita) : 0.5 (a/c)"
+
+    If the string cannot be parsed, returns the original unchanged.
+    """
+    traco = _como_traco(traco_str)
+    if traco is None:
+        return traco_str if isinstance(traco_str, str) else ""
+
+    return " : ".join(f"{value} ({label})" for label, value in _partes_rotuladas(traco))
+
+
+@lru_cache(maxsize=1024)
+def formatar_traco_detalhado(traco_str) -> str:
+    """
+    Returns a Markdown breakdown of each trace component.
 
     Input:  "1 : 2.2 : 3.1 : 0.5 a/c"
     Output:
         "**Cimento:** 1 | **Areia:** 2.2 | **Brita:** 3.1 | **a/c:** 0.5"
     """
-    if not traco_str or not isinstance(traco_str, str):
-        return traco_str or ""
+    traco = _como_traco(traco_str)
+    if traco is None:
+        return traco_str if isinstance(traco_str, str) else ""
 
-    labels = ["Cimento", "Areia", "Brita", "a/c"]
-    icons = ["🧱", "🏖️", "🪨", "💧"]
+    icons = {"Cimento": "🧱", "Areia": "🏖️", "Brita": "🪨", "a/c": "💧", "Aditivo %": "🧪"}
+    return " &nbsp;|&nbsp; ".join(
+        f"{icons[label]} **{label}:** {value}" for label, value in _partes_rotuladas(traco)
+    )
 
-    try:
-        clean = traco_str.replace("a/c", "").strip()
-        parts = [p.strip() for p in clean.split(":")]
 
-        if len(parts) < 3:
-            return traco_str
+# ── Vectorized counterparts (pandas Series) ─────────────────
+
+def extrair_tracos(series: pd.Series) -> pd.DataFrame:
+    """
+    Vectorized `parse_traco`: extracts the numeric proportions of a Series
+    of trace strings into float columns named after `Traco` fields.
+
+    Rows that cannot be parsed yield NaN in every column.
+    """
+    partes = series.astype("string").str.extract(_RE_TRACO)
+    partes.columns = list(Traco._fields)
+    return partes.apply(lambda col: pd.to_numeric(col.str.replace(",", ".", regex=False)).astype("float64"))
+
+
+def _formatar_numeros(numeros: pd.DataFrame) -> pd.DataFrame:
+    """Applies `_formatar_numero` (`:g`) to each value, once per distinct value."""
+    formatos = {v: _formatar_numero(v) for v in pd.unique(numeros.to_numpy().ravel()) if not math.isnan(v)}
+    return numeros.apply(lambda col: col.map(formatos)).astype("string")
+
+
+def formatar_traco_legivel_series(series: pd.Series) -> pd.Series:
+    """
+    Vectorized `formatar_traco_legivel` for a Series of trace strings.
+
+    Unparseable values are returned unchanged; missing values become "".
+    """
+    texto = series.astype("string")
+    partes = _formatar_numeros(extrair_tracos(series))
 
-        items = []
-        for i, part in enumerate(parts):
-            if i < len(labels):
-                items.append(f"{icons[i]} **{labels[i]}:** {part}")
-            else:
-                items.append(part)
+    rotulado = partes.iloc[:, 0] + f" ({_ROTULOS[0]})"
+    for i in range(1, len(_ROTULOS)):
+        rotulado = rotulado.str.cat((" : " + partes.iloc[:, i] + f" ({_ROTULOS[i]})").fillna(""))
 
-        return " &nbsp;|&nbsp; ".join(items)
-    except Exception:
-        return traco_str
+    return rotulado.fillna(texto).fillna("").astype(object)